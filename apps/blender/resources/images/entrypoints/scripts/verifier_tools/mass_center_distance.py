@@ -1,4 +1,5 @@
 from PIL import Image
+import numpy
 import sys
 
 
@@ -31,34 +32,37 @@ class MetricMassCenterDistance:
     @staticmethod
     def compute_mass_centers(image):
         image = image.convert('RGB')
-        pixels = image.load()
         width, height = image.size
+        # Integer accumulation keeps the sums exact, as in per pixel addition
+        pixels = numpy.asarray(image, dtype=numpy.int64)
+
+        # Project masses onto the axes first, then weight by coordinates
+        column_masses = pixels.sum(axis=0)
+        row_masses = pixels.sum(axis=1)
+        total_masses = column_masses.sum(axis=0)
+        moments_x = numpy.arange(width, dtype=numpy.int64).dot(column_masses)
+        moments_y = numpy.arange(height, dtype=numpy.int64).dot(row_masses)
+
         results = dict()
-        for channel_index in range(len(pixels[0, 0])):
-            mass_center_x = 0
-            mass_center_y = 0
-            total_mass = 0
-            for x in range(width):
-                for y in range(height):
-                    mass = pixels[x, y][channel_index]
-                    mass_center_x += mass * x
-                    mass_center_y += mass * y
-                    total_mass += mass
-                    
+        for channel_index in range(pixels.shape[2]):
+            total_mass = int(total_masses[channel_index])
+            mass_center_x = int(moments_x[channel_index])
+            mass_center_y = int(moments_y[channel_index])
+
             divisor_x = (float(total_mass) * width)
             divisor_y = (float(total_mass) * height)
-               
+
             if divisor_x == 0:
                 mass_center_x = 0.5
             else:
                 mass_center_x = mass_center_x / divisor_x
-                
+
             if divisor_y == 0:
                 mass_center_y = 0.5
             else:
                 mass_center_y = mass_center_y / divisor_y
-            
-            results[channel_index] = mass_center_x, mass_center_y        
+
+            results[channel_index] = mass_center_x, mass_center_y
         return results
 
 
@@ -6,7 +6,8 @@ import sys
 
 
 def calculate_sum(coefficient):
-    return sum(sum(coefficient ** 2))
+    coefficient = numpy.ravel(coefficient)
+    return numpy.dot(coefficient, coefficient)
 
 
 def calculate_size(coefficient):
@@ -14,19 +15,22 @@ def calculate_size(coefficient):
     return shape[0] * shape[1]
 
 
-def calculate_mse(coefficient1, coefficient2, low, high):
+def _levels_range(low, high):
     if low == high:
         if low == 0:
             high = low + 1
         else:
             low = high - 1
+    return range(low, high)
+
+
+def calculate_mse(coefficient1, coefficient2, low, high):
     sum_ = 0
     count = 0
-    for i in range(low, high):
+    for i in _levels_range(low, high):
         if type(coefficient1[i]) is tuple:
-            sum_ += calculate_sum(coefficient1[i][0] - coefficient2[i][0])
-            sum_ += calculate_sum(coefficient1[i][1] - coefficient2[i][1])
-            sum_ += calculate_sum(coefficient1[i][2] - coefficient2[i][2])
+            for detail1, detail2 in zip(coefficient1[i], coefficient2[i]):
+                sum_ += calculate_sum(detail1 - detail2)
             count += 3 * coefficient1[i][0].size
         else:
             sum_ += calculate_sum(coefficient1[i] - coefficient2[i])
@@ -37,6 +41,27 @@ def calculate_mse(coefficient1, coefficient2, low, high):
         return sum_ / count
 
 
+def calculate_difference_mse(difference, low, high):
+    """ Same as `calculate_mse`, but takes a decomposition of the difference
+    of images. Wavelet transform is linear, so its coefficients are equal to
+    differences of coefficients of both images.
+    """
+    sum_ = 0
+    count = 0
+    for i in _levels_range(low, high):
+        if type(difference[i]) is tuple:
+            for detail in difference[i]:
+                sum_ += calculate_sum(detail)
+            count += 3 * difference[i][0].size
+        else:
+            sum_ += calculate_sum(difference[i])
+            count += difference[i].size
+    if (count == 0):
+        return 0
+    else:
+        return sum_ / count
+
+
 ## ======================= ##
 ##
 def calculate_frequencies(coefficient1, coefficient2):
@@ -46,11 +71,8 @@ def calculate_frequencies(coefficient1, coefficient2):
     frequencies = list()
 
     for i in range(start_level, num_of_levels):
-        abs_coeff1 = numpy.absolute(coefficient1[i])
-        abs_coeff2 = numpy.absolute(coefficient2[i])
-
-        sum_coeffs1 = sum(sum(sum(abs_coeff1)))
-        sum_coeffs2 = sum(sum(sum(abs_coeff2)))
+        sum_coeffs1 = numpy.sum(numpy.absolute(coefficient1[i]))
+        sum_coeffs2 = numpy.sum(numpy.absolute(coefficient2[i]))
 
         diff = numpy.absolute(sum_coeffs2 - sum_coeffs1) / (
                     3 * coefficient1[i][0].size)
@@ -60,148 +82,82 @@ def calculate_frequencies(coefficient1, coefficient2):
     return frequencies
 
 
+## ======================= ##
+##
+def get_bands_ranges(coefficient):
+    total_length = len(coefficient) - 1
+    one_third_of_length = int(total_length / 3)
+    two_thirds_of_length = int(total_length * 2 / 3)
+
+    return (
+        (0, 1),
+        (1, 1 + one_third_of_length),
+        (1 + one_third_of_length, 1 + two_thirds_of_length),
+        (1 + two_thirds_of_length, 1 + total_length),
+    )
+
+
+## ======================= ##
+##
+def get_channels(image):
+    # Contiguous float planes, so that they are not converted for every
+    # decomposition
+    np_image = numpy.asarray(image.convert("RGB"), dtype=numpy.float64)
+    return numpy.ascontiguousarray(numpy.moveaxis(np_image, -1, 0))
+
+
 ## ======================= ##
 ##
 class MetricWavelet:
 
+    BANDS = ("base", "low", "mid", "high")
+
     ## ======================= ##
     ##
     @staticmethod
     def compute_metrics(image1, image2):
 
-        image1 = image1.convert("RGB")
-        image2 = image2.convert("RGB")
-
-        np_image1 = numpy.array(image1)
-        np_image2 = numpy.array(image2)
+        channels1 = get_channels(image1)
+        channels2 = get_channels(image2)
 
         result = dict()
-        result["wavelet_db4_base"] = 0
-        result["wavelet_db4_low"] = 0
-        result["wavelet_db4_mid"] = 0
-        result["wavelet_db4_high"] = 0
 
-        for i in range(0, 3):
-            coefficient1 = pywt.wavedec2(np_image1[..., i], "db4")
-            coefficient2 = pywt.wavedec2(np_image2[..., i], "db4")
-
-            total_length = len(coefficient1) - 1
-            one_third_of_length = int(total_length / 3)
-            two_thirds_of_length = int(total_length * 2 / 3)
-
-            result["wavelet_db4_base"] += calculate_mse(
-                coefficient1,
-                coefficient2,
-                0,
-                1
-            )
-            result["wavelet_db4_low"] = result[
-                "wavelet_db4_low"
-            ] + calculate_mse(
-                coefficient1, coefficient2, 1, 1 + one_third_of_length
-            )
-            result["wavelet_db4_mid"] = result[
-                "wavelet_db4_mid"
-            ] + calculate_mse(
-                coefficient1, coefficient2, 1 + one_third_of_length,
-                1 + two_thirds_of_length
-            )
-            result["wavelet_db4_high"] = result[
-                "wavelet_db4_high"
-            ] + calculate_mse(
-                coefficient1, coefficient2, 1 + two_thirds_of_length,
-                1 + total_length
-            )
-
-        #
-        result["wavelet_sym2_base"] = 0
-        result["wavelet_sym2_low"] = 0
-        result["wavelet_sym2_mid"] = 0
-        result["wavelet_sym2_high"] = 0
+        # Only differences of coefficients are needed, a single
+        # decomposition of the difference of images suffices
+        differences = channels1 - channels2
+        for wavelet in ("db4", "sym2"):
+            for band in MetricWavelet.BANDS:
+                result["wavelet_{}_{}".format(wavelet, band)] = 0
 
-        for i in range(0, 3):
-            coefficient1 = pywt.wavedec2(np_image1[..., i], "sym2")
-            coefficient2 = pywt.wavedec2(np_image2[..., i], "sym2")
-
-            total_length = len(coefficient1) - 1
-            one_third_of_length = int(total_length / 3)
-            two_thirds_of_length = int(total_length * 2 / 3)
-
-            result["wavelet_sym2_base"] += calculate_mse(
-                coefficient1,
-                coefficient2,
-                0,
-                1
-            )
-            result["wavelet_sym2_low"] = result[
-                "wavelet_sym2_low"
-             ] + calculate_mse(
-                coefficient1, coefficient2, 1, 1 + one_third_of_length
-            )
-            result["wavelet_sym2_mid"] = result[
-                "wavelet_sym2_mid"
-             ] + calculate_mse(
-                coefficient1, coefficient2, 1 + one_third_of_length,
-                1 + two_thirds_of_length
-            )
-            result["wavelet_sym2_high"] = result[
-                "wavelet_sym2_high"
-            ] + calculate_mse(
-                coefficient1, coefficient2, 1 + two_thirds_of_length,
-                1 + total_length
-            )
+            for i in range(0, 3):
+                difference = pywt.wavedec2(differences[i], wavelet)
+                ranges = get_bands_ranges(difference)
+                for band, (low, high) in zip(MetricWavelet.BANDS, ranges):
+                    result["wavelet_{}_{}".format(wavelet, band)] += \
+                        calculate_difference_mse(difference, low, high)
 
         # Frequency metrics based on haar wavlets
         result["wavelet_haar_freq_x1"] = 0
         result["wavelet_haar_freq_x2"] = 0
         result["wavelet_haar_freq_x3"] = 0
-
-        result["wavelet_haar_base"] = 0
-        result["wavelet_haar_low"] = 0
-        result["wavelet_haar_mid"] = 0
-        result["wavelet_haar_high"] = 0
+        for band in MetricWavelet.BANDS:
+            result["wavelet_haar_" + band] = 0
 
         for i in range(0, 3):
-            coefficient1 = pywt.wavedec2(np_image1[..., i], "haar")
-            coefficient2 = pywt.wavedec2(np_image2[..., i], "haar")
+            coefficient1 = pywt.wavedec2(channels1[i], "haar")
+            coefficient2 = pywt.wavedec2(channels2[i], "haar")
 
             frequencies = calculate_frequencies(coefficient1, coefficient2)
 
-            result["wavelet_haar_freq_x1"] = result["wavelet_haar_freq_x1"] + \
-                                             frequencies[0]
-            result["wavelet_haar_freq_x2"] = result["wavelet_haar_freq_x2"] + \
-                                             frequencies[1]
-            result["wavelet_haar_freq_x3"] = result["wavelet_haar_freq_x3"] + \
-                                             frequencies[2]
-
-            total_length = len(coefficient1) - 1
-            one_third_of_length = int(total_length / 3)
-            two_thirds_of_length = int(total_length * 2 / 3)
-
-            result["wavelet_haar_base"] += calculate_mse(
-                coefficient1,
-                coefficient2,
-                0,
-                1
-            )
-            result["wavelet_haar_low"] += calculate_mse(
-                coefficient1,
-                coefficient2,
-                1,
-                1 + one_third_of_length
-            )
-            result["wavelet_haar_mid"] += calculate_mse(
-                coefficient1,
-                coefficient2,
-                1 + one_third_of_length,
-                1 + two_thirds_of_length
-            )
-            result["wavelet_haar_high"] += calculate_mse(
-                coefficient1,
-                coefficient2,
-                1 + two_thirds_of_length,
-                1 + total_length
-            )
+            result["wavelet_haar_freq_x1"] += frequencies[0]
+            result["wavelet_haar_freq_x2"] += frequencies[1]
+            result["wavelet_haar_freq_x3"] += frequencies[2]
+
+            ranges = get_bands_ranges(coefficient1)
+            for band, (low, high) in zip(MetricWavelet.BANDS, ranges):
+                result["wavelet_haar_" + band] += calculate_mse(
+                    coefficient1, coefficient2, low, high
+                )
 
         return result
 
@@ -11,7 +11,7 @@ from typing import Optional, Type
 import apps.blender.resources.blenderloganalyser as log_analyser
 from apps.blender.blenderenvironment import BlenderEnvironment, \
     BlenderNVGPUEnvironment
-from apps.core.task.coretask import CoreTaskTypeInfo
+from apps.core.task.coretask import CoreTask, CoreTaskTypeInfo
 from apps.rendering.resources.imgrepr import OpenCVImgRepr
 from apps.rendering.resources.renderingtaskcollector import \
     RenderingTaskCollector
@@ -48,8 +48,15 @@ class BlenderNVGPUDefaults(BlenderDefaults):
 
 
 class PreviewUpdater(object):
+    """ Keeps preview of the task (or one of its frames) in memory and pastes
+    incoming chunks into it. Preview file is saved at most once per
+    `save_interval` seconds, changes made in the meantime are saved together.
+    """
+
+    SAVE_INTERVAL = 2.0
+
     def __init__(self, preview_file_path, preview_res_x, preview_res_y,
-                 expected_offsets):
+                 expected_offsets, save_interval=SAVE_INTERVAL):
         # pairs of (subtask_number, its_image_filepath)
         # careful: chunks' numbers start from 1
         self.chunks = {}
@@ -57,6 +64,7 @@ class PreviewUpdater(object):
         self.preview_res_y = preview_res_y
         self.preview_file_path = preview_file_path
         self.expected_offsets = expected_offsets
+        self.save_interval = save_interval
 
         # where the match ends - since the chunks have unexpectable sizes, we
         # don't know where to paste new chunk unless all of the above are in
@@ -64,10 +72,123 @@ class PreviewUpdater(object):
         self.perfect_match_area_y = 0
         self.perfectly_placed_subtasks = 0
 
+        self._canvas: Optional[OpenCVImgRepr] = None
+        self._encoded: Optional[bytes] = None
+        # Whether preview file contains all changes of the canvas
+        self._saved = True
+        self._last_save: Optional[float] = None
+        self._save_call = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # Preview is restored from the file
+        state['_canvas'] = None
+        state['_encoded'] = None
+        state['_saved'] = True
+        state['_last_save'] = None
+        state['_save_call'] = None
+        return state
+
+    def __setstate__(self, state):
+        # Updaters pickled before the preview was kept in memory lack
+        # these attributes
+        state.setdefault('save_interval', self.SAVE_INTERVAL)
+        self.__dict__.update(state)
+        self._canvas = None
+        self._encoded = None
+        self._saved = True
+        self._last_save = None
+        self._save_call = None
+
     def get_offset(self, subtask_number):
         return self.expected_offsets.get(subtask_number, self.preview_res_y)
 
     def update_preview(self, subtask_path, subtask_number):
+        updated = False
+        while self._paste_chunk(subtask_path, subtask_number):
+            updated = True
+            # Chunks that arrived out of order can be placed now
+            if subtask_number != self.perfectly_placed_subtasks or \
+                    (subtask_number + 1) not in self.chunks:
+                break
+            subtask_number += 1
+            subtask_path = self.chunks[subtask_number]
+
+        if updated:
+            self._schedule_save()
+
+    def remove_part(self, subtask_number):
+        """ Clear the area of the given chunk """
+        canvas = self._get_canvas()
+        if canvas is None:
+            return
+        canvas.img[self.get_offset(subtask_number):
+                   self.get_offset(subtask_number + 1)] = 0
+        if canvas.get_channels() == OpenCVImgRepr.RGBA:
+            canvas.img[self.get_offset(subtask_number):
+                       self.get_offset(subtask_number + 1), :, 3] = 255
+        self._changed()
+        self._schedule_save()
+
+    def get_preview(self) -> Optional[OpenCVImgRepr]:
+        """ Return a copy of the current preview or None if there's none """
+        canvas = self._get_canvas()
+        if canvas is None:
+            return None
+        preview = OpenCVImgRepr()
+        preview.img = canvas.img.copy()
+        return preview
+
+    def get_preview_bytes(self) -> Optional[bytes]:
+        """ Return the current preview encoded as PREVIEW_EXT """
+        if self._encoded is None:
+            canvas = self._get_canvas()
+            if canvas is None:
+                return None
+            with handle_opencv_image_error(logger):
+                self._encoded = canvas.to_bytes(PREVIEW_EXT)
+        return self._encoded
+
+    def has_unsaved_changes(self) -> bool:
+        return self._canvas is not None and not self._saved
+
+    def save(self):
+        """ Save the preview file right away """
+        self._cancel_save()
+        if self._canvas is None:
+            return
+        with handle_opencv_image_error(logger) as handler_result:
+            self._canvas.save_with_extension(self.preview_file_path,
+                                             PREVIEW_EXT)
+        self._saved = handler_result.success
+        self._last_save = time.monotonic()
+
+    def mark_saved(self):
+        """ Preview has been saved to `preview_file_path` by the caller """
+        self._cancel_save()
+        self._saved = True
+        self._last_save = time.monotonic()
+
+    def invalidate(self):
+        """ Preview file has been replaced by the caller. Preview is going to
+        be loaded from it when needed.
+        """
+        self._cancel_save()
+        self._canvas = None
+        self._encoded = None
+        self._saved = True
+
+    def restart(self):
+        self.invalidate()
+        self.chunks = {}
+        self.perfect_match_area_y = 0
+        self.perfectly_placed_subtasks = 0
+        if os.path.exists(self.preview_file_path):
+            with handle_opencv_image_error(logger):
+                OpenCVImgRepr.empty(self.preview_res_x, self.preview_res_y) \
+                    .save_with_extension(self.preview_file_path, PREVIEW_EXT)
+
+    def _paste_chunk(self, subtask_path, subtask_number):
         if subtask_number not in self.chunks:
             self.chunks[subtask_number] = subtask_path
 
@@ -85,38 +206,52 @@ class PreviewUpdater(object):
             subtask_img_resized = subtask_img.resize(self.preview_res_x,
                                                      chunk_height)
 
-            def open_or_create_image():
-                if not os.path.exists(self.preview_file_path) \
-                        or len(self.chunks) == 1:
-                    chunk_channels = subtask_img.get_channels()
-                    return OpenCVImgRepr.empty(self.preview_res_x,
-                                               self.preview_res_y,
-                                               channels=chunk_channels)
-                return OpenCVImgRepr.from_image_file(self.preview_file_path)
-
-            preview_img = open_or_create_image()
+            if self._canvas is None or len(self.chunks) == 1:
+                self._canvas = self._open_canvas(subtask_img.get_channels())
 
             subtask_img_resized.try_adjust_type(OpenCVImgRepr.IMG_U8)
 
-            preview_img.paste_image(subtask_img_resized, 0, offset)
-            preview_img.save_with_extension(self.preview_file_path, PREVIEW_EXT)
+            self._canvas.paste_image(subtask_img_resized, 0, offset)
+            self._changed()
 
-        if not handler_result.success:
-            return
+        return handler_result.success
 
-        if subtask_number == self.perfectly_placed_subtasks and \
-                (subtask_number + 1) in self.chunks:
-            self.update_preview(self.chunks[subtask_number + 1],
-                                subtask_number + 1)
+    def _open_canvas(self, channels):
+        if self.preview_file_path and len(self.chunks) > 1 and \
+                os.path.exists(self.preview_file_path):
+            return OpenCVImgRepr.from_image_file(self.preview_file_path)
+        return OpenCVImgRepr.empty(self.preview_res_x, self.preview_res_y,
+                                   channels=channels)
 
-    def restart(self):
-        self.chunks = {}
-        self.perfect_match_area_y = 0
-        self.perfectly_placed_subtasks = 0
-        if os.path.exists(self.preview_file_path):
+    def _get_canvas(self) -> Optional[OpenCVImgRepr]:
+        if self._canvas is None and self.preview_file_path and \
+                os.path.exists(self.preview_file_path):
             with handle_opencv_image_error(logger):
-                OpenCVImgRepr.empty(self.preview_res_x, self.preview_res_y) \
-                    .save_with_extension(self.preview_file_path, PREVIEW_EXT)
+                self._canvas = OpenCVImgRepr.from_image_file(
+                    self.preview_file_path)
+        return self._canvas
+
+    def _changed(self):
+        self._encoded = None
+        self._saved = False
+
+    def _schedule_save(self):
+        if self._save_call is not None:
+            # Pending save is going to include this change too
+            return
+        delay = 0.
+        if self._last_save is not None:
+            delay = self._last_save + self.save_interval - time.monotonic()
+        if delay <= 0:
+            self.save()
+            return
+        from twisted.internet import reactor
+        self._save_call = reactor.callLater(delay, self.save)
+
+    def _cancel_save(self):
+        if self._save_call is not None and self._save_call.active():
+            self._save_call.cancel()
+        self._save_call = None
 
     def _get_height(self, subtask_number):
         next_offset = \
@@ -147,6 +282,22 @@ class RenderingTaskTypeInfo(CoreTaskTypeInfo):
                                 task.preview_file_path)
         return cls._preview_result(result, single=single)
 
+    @classmethod
+    def get_preview_bytes(cls, task, frame=None):
+        if not task:
+            return None
+        if not task.use_frames:
+            preview_updater = task.preview_updater
+        else:
+            try:
+                num = task.frames.index(frame) if frame is not None else 0
+                preview_updater = task.preview_updaters[num]
+            except (ValueError, IndexError, TypeError):
+                return None
+        if preview_updater is None:
+            return None
+        return preview_updater.get_preview_bytes()
+
     @classmethod
     def scale_factor(cls, res_x, res_y):
         preview_x = PREVIEW_X
@@ -522,6 +673,48 @@ class BlenderRenderTask(FrameRenderingTask):
     def _update_preview(self, new_chunk_file_path, num_start):
         self.preview_updater.update_preview(new_chunk_file_path, num_start)
 
+    def _open_preview(self, mode=OpenCVImgRepr.RGB, ext=PREVIEW_EXT):
+        if self.preview_updater is not None:
+            preview = self.preview_updater.get_preview()
+            if preview is not None:
+                return preview
+        return super()._open_preview(mode, ext)
+
+    def _get_unsaved_frame_preview(self, preview_file_path) \
+            -> Optional[PreviewUpdater]:
+        """ Preview updater of the frame which shares the file with the task
+        preview of the frame and has changes that aren't saved yet """
+        for preview_updater in self.preview_updaters or []:
+            if preview_updater.preview_file_path == preview_file_path and \
+                    preview_updater.has_unsaved_changes():
+                return preview_updater
+        return None
+
+    def _open_frame_preview(self, preview_file_path):
+        preview_updater = self._get_unsaved_frame_preview(preview_file_path)
+        if preview_updater is not None:
+            return preview_updater.get_preview()
+        return super()._open_frame_preview(preview_file_path)
+
+    def _save_frame_preview(self, img, preview_file_path):
+        preview_updater = self._get_unsaved_frame_preview(preview_file_path)
+        super()._save_frame_preview(img, preview_file_path)
+        if preview_updater is not None:
+            # The saved task preview contains the changes of the updater
+            preview_updater.mark_saved()
+
+    @CoreTask.handle_key_error
+    def _remove_from_preview(self, subtask_id):
+        subtask = self.subtasks_given[subtask_id]
+        if not self.use_frames:
+            self.preview_updater.remove_part(subtask['start_task'])
+            return
+        parts = self.get_parts_in_frame(self.get_total_tasks())
+        part = self._count_part(subtask['start_task'], parts)
+        for frame in subtask['frames']:
+            num = self.frames.index(frame)
+            self.preview_updaters[num].remove_part(part)
+
     def _update_frame_preview(self, new_chunk_file_path, frame_num, part=1,
                               final=False):
         num = self.frames.index(frame_num)
@@ -539,6 +732,7 @@ class BlenderRenderTask(FrameRenderingTask):
                 img.save_with_extension(preview_task_file_path, PREVIEW_EXT)
                 img.save_with_extension(self._get_preview_file_path(num),
                                         PREVIEW_EXT)
+            self.preview_updaters[num].invalidate()
         else:
             self.preview_updaters[num].update_preview(new_chunk_file_path, part)
             self._update_frame_task_preview()
@@ -587,13 +781,13 @@ class BlenderRenderTask(FrameRenderingTask):
         frame_key = str(frame_num)
         collected = self.frames_given[frame_key]
         collected = OrderedDict(sorted(collected.items()))
-        collector = CustomCollector(width=self.res_x,
-                                    height=self.res_y)
+        collector = self._get_frame_collector(CustomCollector)
         for file in collected.values():
             collector.add_img_file(file)
         with handle_opencv_image_error(logger):
             image = collector.finalize()
             image.save_with_extension(output_file_name, self.output_format)
+        self._update_frame_collector_stats(frame_num, collector)
         self.collected_file_names[frame_num] = output_file_name
         self._update_frame_preview(output_file_name, frame_num, final=True)
         self._update_frame_task_preview()
@@ -643,8 +837,8 @@ class BlenderNVGPURenderTaskBuilder(BlenderRenderTaskBuilder):
 
 
 class CustomCollector(RenderingTaskCollector):
-    def __init__(self, width=1, height=1):
-        RenderingTaskCollector.__init__(self, width, height)
+    def __init__(self, width=1, height=1, **kwargs):
+        RenderingTaskCollector.__init__(self, width, height, **kwargs)
         self.current_offset = 0
 
     def _paste_image(self, final_img, new_part, num):
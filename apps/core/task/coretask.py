@@ -8,6 +8,7 @@ from typing import (
     Callable,
     Dict,
     List,
+    Optional,
     Type,
     TYPE_CHECKING,
 )
@@ -77,6 +78,11 @@ class CoreTaskTypeInfo(TaskTypeInfo):
     def get_preview(cls, task, single=False):
         pass
 
+    @classmethod
+    # pylint:disable=unused-argument
+    def get_preview_bytes(cls, task, frame=None) -> Optional[bytes]:
+        return None
+
     # pylint:disable=no-else-return
     @staticmethod
     def _preview_result(result, single=False):
@@ -225,6 +231,7 @@ class CoreTask(Task):
             subtask_id,
             self._deadline,
             verification_finished_,
+            task_id=self.header.task_id,
             subtask_info={**self.subtasks_given[subtask_id],
                           **{'owner': self.header.task_owner.key}},
             results=result_files,
@@ -309,7 +316,7 @@ class CoreTask(Task):
             subtask_info['status'] = SubtaskStatus.restarted
 
     def abort(self):
-        pass
+        self.VERIFICATION_QUEUE.cancel(self.header.task_id)
 
     def get_progress(self):
         if self.get_total_tasks() == 0:
@@ -1,9 +1,14 @@
+import heapq
+import itertools
 import logging
-import queue
+import time
+from collections import Counter
 from functools import partial
+from multiprocessing import cpu_count
 from types import FunctionType
-from typing import Optional, Type, Dict, Tuple
+from typing import Any, Dict, List, Optional, Type, Tuple
 
+import psutil
 from golem.verifier.core_verifier import CoreVerifier
 from twisted.internet.defer import Deferred, gatherResults
 
@@ -11,8 +16,18 @@ from apps.core.verification_task import VerificationTask
 
 logger = logging.getLogger(__name__)
 
+QueueEntry = Tuple[int, int, VerificationTask, Type[CoreVerifier]]
+
 
 class VerificationQueue:
+    """ Runs up to `concurrency` verifications at the same time.
+
+    Pending verifications are grouped by task. The next verification is
+    taken from the task with the fewest verifications running at the
+    moment, so a task with many subtasks doesn't block the other ones;
+    ties are resolved by the earliest deadline. Pending and running
+    verifications of an aborted task can be cancelled.
+    """
 
     #  We assume that after 30 minutes verification tasks is stalled (possibly
     #  to bugs in third party docker api). After this period we finish
@@ -20,19 +35,41 @@ class VerificationQueue:
     #  configurable from config, and will be relative to nodes benchmark
     #  results.
     VERIFICATION_TIMEOUT = 1800
-
-    def __init__(self, concurrency: int = 1) -> None:
-        self._concurrency = concurrency
-        self._queue: queue.Queue = queue.Queue()
+    # Memory reserved for a single verification when the concurrency is
+    # chosen automatically
+    VERIFICATION_MEMORY = 1024 ** 3
+
+    def __init__(self, concurrency: Optional[int] = 1) -> None:
+        self._concurrency = 1
+        self._pending: Dict[str, List[QueueEntry]] = dict()
+        self._sequence = itertools.count()
         self._jobs: Dict[str, Deferred] = dict()
+        self._running: Dict[str, VerificationTask] = dict()
+        self._running_per_task: Counter = Counter()
         self.callbacks: Dict[VerificationTask, FunctionType] = dict()
         self._paused = False
+        self._metrics = self._empty_metrics()
+        self.set_concurrency(concurrency)
+
+    @classmethod
+    def auto_concurrency(cls) -> int:
+        """ Use half of the cores, as long as there's enough memory """
+        memory = psutil.virtual_memory().available
+        return max(1, min(cpu_count() // 2, memory // cls.VERIFICATION_MEMORY))
+
+    def set_concurrency(self, concurrency: Optional[int]) -> None:
+        """ :param concurrency: number of verifications run at the same time,
+            chosen automatically when 0 or None """
+        self._concurrency = concurrency or self.auto_concurrency()
+        logger.debug("Verification concurrency: %d", self._concurrency)
+        self._process_queue()
 
     def submit(self,
                verifier_class: Type[CoreVerifier],
                subtask_id: str,
                deadline: int,
                cb: FunctionType,
+               task_id: Optional[str] = None,
                **kwargs) -> None:
 
         logger.debug(
@@ -41,11 +78,32 @@ class VerificationQueue:
             verifier_class, subtask_id, deadline, kwargs
         )
 
-        entry = VerificationTask(subtask_id, deadline, kwargs)
+        entry = VerificationTask(subtask_id, deadline, kwargs,
+                                 task_id=task_id)
         self.callbacks[entry] = cb
-        self._queue.put((entry, verifier_class))
+        pending = self._pending.setdefault(self._task_key(entry), [])
+        heapq.heappush(
+            pending,
+            (deadline, next(self._sequence), entry, verifier_class),
+        )
+        self._metrics['submitted'] += 1
         self._process_queue()
 
+    def cancel(self, task_id: str) -> None:
+        """ Drop pending and stop running verifications of the task. Their
+        callbacks won't be called. """
+        for _, _, entry, _ in self._pending.pop(task_id, []):
+            self.callbacks.pop(entry, None)
+            self._metrics['cancelled'] += 1
+
+        for subtask_id, entry in list(self._running.items()):
+            if entry.task_id != task_id:
+                continue
+            logger.info("Cancelling verification of subtask %r", subtask_id)
+            self.callbacks.pop(entry, None)
+            self._metrics['cancelled'] += 1
+            entry.stop(self._jobs[subtask_id])
+
     def pause(self) -> Deferred:
         self._paused = True
         deferred_list = list(self._jobs.values())
@@ -59,35 +117,70 @@ class VerificationQueue:
     def can_run(self) -> bool:
         return not self._paused and len(self._jobs) < self._concurrency
 
+    def get_metrics(self) -> Dict[str, Any]:
+        metrics = dict(self._metrics)
+        started = metrics['started']
+        finished = metrics['finished']
+        metrics.update(
+            concurrency=self._concurrency,
+            pending=sum(len(pending) for pending in self._pending.values()),
+            running=len(self._jobs),
+            avg_wait_time=metrics['wait_time'] / started if started else 0.,
+            avg_run_time=metrics['run_time'] / finished if finished else 0.,
+        )
+        return metrics
+
     def _process_queue(self) -> None:
-        if self.can_run:
+        while self.can_run:
             entry, verifier_cls = self._next()
-            if entry and verifier_cls:
-                self._run(entry, verifier_cls)
+            if not (entry and verifier_cls):
+                return
+            self._run(entry, verifier_cls)
 
     def _next(self) -> Tuple[Optional[VerificationTask],
                              Optional[Type[CoreVerifier]]]:
-        try:
-            return self._queue.get(block=False)
-        except queue.Empty:
+        if not self._pending:
             return None, None
 
+        task_key = min(
+            self._pending,
+            key=lambda key: (self._running_per_task[key],
+                             self._pending[key][0][:2]),
+        )
+        pending = self._pending[task_key]
+        _, _, entry, verifier_cls = heapq.heappop(pending)
+        if not pending:
+            del self._pending[task_key]
+        return entry, verifier_cls
+
     def _run(self, entry: VerificationTask,
              verifier_cls: Type[CoreVerifier]) -> None:
         subtask_id = entry.subtask_id
 
         logger.info("Running verification of subtask %r", subtask_id)
+        entry.started_at = time.monotonic()
+        wait_time = entry.started_at - entry.submitted_at
+        self._metrics['started'] += 1
+        self._metrics['wait_time'] += wait_time
+        self._metrics['max_wait_time'] = max(
+            self._metrics['max_wait_time'], wait_time)
 
         def callback(*args):
-            logger.info("Finished verification of subtask %r", subtask_id)
+            run_time = time.monotonic() - entry.started_at
+            logger.info("Finished verification of subtask %r, waited %.1fs, "
+                        "verified in %.1fs", subtask_id, wait_time, run_time)
             try:
-                self.callbacks[entry](subtask_id=args[0][0], verdict=args[0][1],
-                                      result=args[0][2])
+                cb = self.callbacks.pop(entry, None)
+                if cb is not None:
+                    cb(subtask_id=args[0][0], verdict=args[0][1],
+                       result=args[0][2])
             finally:
-                self._jobs.pop(subtask_id, None)
-                self._process_queue()
+                self._finished(entry, run_time)
 
         def errback(_):
+            if entry not in self.callbacks:  # cancelled
+                self._finished(entry, time.monotonic() - entry.started_at)
+                return True
             logger.warning("Finishing verification with fail")
             callback(entry.get_results())
             return True
@@ -104,14 +197,53 @@ class VerificationQueue:
             result.addTimeout(VerificationQueue.VERIFICATION_TIMEOUT, reactor,
                               onTimeoutCancel=fn_timeout)
             self._jobs[subtask_id] = result
+            self._running[subtask_id] = entry
+            self._running_per_task[self._task_key(entry)] += 1
 
-    @staticmethod
-    def _verification_timed_out(_result, _timeout, task, event,
+    def _finished(self, entry: VerificationTask, run_time: float) -> None:
+        subtask_id = entry.subtask_id
+        if self._running.pop(subtask_id, None) is not None:
+            task_key = self._task_key(entry)
+            self._running_per_task[task_key] -= 1
+            if self._running_per_task[task_key] <= 0:
+                del self._running_per_task[task_key]
+        self._jobs.pop(subtask_id, None)
+
+        self._metrics['finished'] += 1
+        self._metrics['run_time'] += run_time
+        self._metrics['max_run_time'] = max(
+            self._metrics['max_run_time'], run_time)
+        self._process_queue()
+
+    def _verification_timed_out(self, _result, _timeout, task, event,
                                 subtask_id):
         logger.warning("Timeout detected for subtask %s", subtask_id)
+        self._metrics['timed_out'] += 1
         task.stop(event)
 
+    @staticmethod
+    def _task_key(entry: VerificationTask) -> str:
+        # Verifications submitted without a task id don't share fairness
+        return entry.task_id or entry.subtask_id
+
+    @staticmethod
+    def _empty_metrics() -> Dict[str, Any]:
+        return {
+            'submitted': 0,
+            'started': 0,
+            'finished': 0,
+            'cancelled': 0,
+            'timed_out': 0,
+            'wait_time': 0.,
+            'max_wait_time': 0.,
+            'run_time': 0.,
+            'max_run_time': 0.,
+        }
+
     def _reset(self) -> None:
-        self._queue = queue.Queue()
+        self._pending = dict()
         self._jobs = dict()
+        self._running = dict()
+        self._running_per_task = Counter()
         self.callbacks = dict()
+        self._metrics = self._empty_metrics()
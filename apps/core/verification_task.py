@@ -1,3 +1,4 @@
+import time
 import typing
 from twisted.internet.defer import Deferred, succeed
 from golem.core.common import deadline_to_timeout
@@ -5,11 +6,15 @@ from golem.core.common import deadline_to_timeout
 
 class VerificationTask:
 
-    def __init__(self, subtask_id, deadline, kwargs) -> None:
+    def __init__(self, subtask_id, deadline, kwargs,
+                 task_id: typing.Optional[str] = None) -> None:
         self.deadline = deadline
         self.kwargs = kwargs
         self.subtask_id = subtask_id
+        self.task_id = task_id
         self.verifier: typing.Any = None
+        self.submitted_at = time.monotonic()
+        self.started_at: typing.Optional[float] = None
 
     def start(self, verifier_class) -> Deferred:
         self.verifier = verifier_class(self.kwargs)
@@ -1,8 +1,9 @@
 import os
 import abc
 import logging
+import struct
 from copy import deepcopy
-from typing import Optional
+from typing import Optional, Tuple
 import numpy
 import cv2
 import OpenEXR
@@ -155,6 +156,16 @@ class OpenCVImgRepr:
             raise OpenCVError('Cannot save image {}: {}'.format(path,
                                                                 str(e))) from e
 
+    def to_bytes(self, extension) -> bytes:
+        try:
+            success, data = cv2.imencode('.' + extension.lower(), self.img)
+        except cv2.error as e:
+            logger.error('Error encoding image: {}'.format(str(e)))
+            raise OpenCVError('Cannot encode image: {}'.format(str(e))) from e
+        if not success:
+            raise OpenCVError('Cannot encode image as {}'.format(extension))
+        return data.tobytes()
+
     @staticmethod
     def load_from_file_or_empty(img_path, width, height, channels=3,
                                 dtype=numpy.uint8):
@@ -234,6 +245,42 @@ class EXRImgRepr(ImgRepr):
             self.img.close()
 
 
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+PNG_IHDR = struct.Struct('!4s4sII')
+
+
+def read_image_size(file_: str) -> Tuple[int, int]:
+    """
+    Read width and height of the image without decoding its pixels.
+    Only headers of PNG and EXR files are parsed, images in other formats
+    are loaded with OpenCV.
+    :param file_: path to the file
+    :return: (width, height)
+    """
+    _, ext = os.path.splitext(file_)
+    try:
+        if ext.upper() == ".EXR":
+            exr_file = OpenEXR.InputFile(file_)
+            try:
+                dw = exr_file.header()['dataWindow']
+            finally:
+                exr_file.close()
+            return dw.max.x - dw.min.x + 1, dw.max.y - dw.min.y + 1
+
+        with open(file_, 'rb') as f:
+            header = f.read(len(PNG_SIGNATURE) + PNG_IHDR.size)
+    except (OSError, IOError) as e:
+        raise OpenCVError('Cannot read image header: {}'.format(e)) from e
+
+    if header.startswith(PNG_SIGNATURE):
+        _, chunk_type, width, height = \
+            PNG_IHDR.unpack_from(header, len(PNG_SIGNATURE))
+        if chunk_type == b'IHDR':
+            return width, height
+
+    return OpenCVImgRepr.from_image_file(file_).get_size()
+
+
 def load_img(file_: str) -> Optional[ImgRepr]:
     """
     Load image from file path and return ImgRepr
@@ -1,20 +1,59 @@
 import logging
 import math
-from typing import Optional
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Optional, Tuple
 
-from apps.rendering.resources.imgrepr import OpenCVImgRepr
+import numpy
+
+from apps.rendering.resources.imgrepr import OpenCVImgRepr, read_image_size
 
 logger = logging.getLogger("apps.rendering")
 
 
+class CollectorStats(object):
+    """ Time and memory spent on connecting images by the collector """
+
+    def __init__(self):
+        self.parts = 0
+        self.sizing_time = 0.0
+        self.decoding_time = 0.0
+        self.pasting_time = 0.0
+        self.total_time = 0.0
+        # Bytes held at once by decoded parts and the final image
+        self.peak_memory = 0
+        self.memory_mapped = False
+
+    def __repr__(self):
+        return '<CollectorStats parts={} total_time={:.3f}s ' \
+               'sizing_time={:.3f}s decoding_time={:.3f}s ' \
+               'pasting_time={:.3f}s peak_memory={} memory_mapped={}>' \
+            .format(self.parts, self.total_time, self.sizing_time,
+                    self.decoding_time, self.pasting_time,
+                    self.peak_memory, self.memory_mapped)
+
+
 class RenderingTaskCollector(object):
-    def __init__(self, width=None, height=None):
+    def __init__(self, width=None, height=None, streaming=False, workers=1,
+                 memmap_threshold=None):
+        """
+        :param streaming: size the final image from file headers and decode
+            parts one at a time, pasting each of them right after decoding
+        :param workers: number of parts decoded in parallel in streaming mode
+        :param memmap_threshold: in streaming mode, final images bigger than
+            this number of bytes are kept in a memory mapped temporary file
+        """
 
         self.accepted_img_files = []
         self.width = width
         self.height = height
         self.channels = 1
         self.dtype = None
+        self.streaming = streaming
+        self.workers = max(1, workers)
+        self.memmap_threshold = memmap_threshold
+        self.stats = CollectorStats()
 
     def add_img_file(self, img_file):
         """
@@ -31,7 +70,15 @@ class RenderingTaskCollector(object):
         if len(self.accepted_img_files) == 0:
             return None
 
-        return self.finalize_img()
+        self.stats = CollectorStats()
+        self.stats.parts = len(self.accepted_img_files)
+        start = time.monotonic()
+        try:
+            if self.streaming:
+                return self.finalize_img_streaming()
+            return self.finalize_img()
+        finally:
+            self.stats.total_time = time.monotonic() - start
 
     def finalize_img(self):
 
@@ -44,6 +91,7 @@ class RenderingTaskCollector(object):
             self.dtype = image.img.dtype
             if len(image.img.shape) == 3:
                 self.channels = image.img.shape[2]
+            self._update_peak_memory(image.img.nbytes)
 
         self.width = res_x
         self.height = res_y
@@ -54,8 +102,85 @@ class RenderingTaskCollector(object):
             image = OpenCVImgRepr.from_image_file(img_path)
             final_img.paste_image(image, 0, offset)
             offset += image.get_height()
+            self._update_peak_memory(final_img.img.nbytes + image.img.nbytes)
+        return final_img
+
+    def finalize_img_streaming(self):
+        start = time.monotonic()
+        offsets = []
+        res_x, res_y = 0, 0
+        for name in self.accepted_img_files:
+            res_x, img_y = read_image_size(name)
+            offsets.append(res_y)
+            res_y += img_y
+        self.width = res_x
+        self.height = res_y
+        self.stats.sizing_time = time.monotonic() - start
+
+        final_img = None
+        parts = iter(zip(self.accepted_img_files, offsets))
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            decoding = {}
+            while True:
+                # Keep at most `workers` decoded parts in memory
+                for img_path, offset in parts:
+                    decoding[executor.submit(self._decode, img_path)] = offset
+                    if len(decoding) >= self.workers:
+                        break
+                if not decoding:
+                    break
+
+                done, _ = wait(decoding, return_when=FIRST_COMPLETED)
+                decoded = []
+                for future in done:
+                    image, decoding_time = future.result()
+                    self.stats.decoding_time += decoding_time
+                    decoded.append((image, decoding.pop(future)))
+
+                if final_img is None:
+                    final_img = self._allocate(decoded[0][0])
+                self._update_peak_memory(
+                    final_img.img.nbytes +
+                    sum(image.img.nbytes for image, _ in decoded)
+                )
+
+                start = time.monotonic()
+                for image, offset in decoded:
+                    final_img.paste_image(image, 0, offset)
+                self.stats.pasting_time += time.monotonic() - start
         return final_img
 
+    @staticmethod
+    def _decode(img_path: str) -> Tuple[OpenCVImgRepr, float]:
+        start = time.monotonic()
+        image = OpenCVImgRepr.from_image_file(img_path)
+        return image, time.monotonic() - start
+
+    def _allocate(self, first_part: OpenCVImgRepr) -> OpenCVImgRepr:
+        """ Allocate final image with type and channels of the first decoded
+        part.
+        """
+        self.dtype = first_part.img.dtype
+        if len(first_part.img.shape) == 3:
+            self.channels = first_part.img.shape[2]
+        shape = (self.height, self.width, self.channels)
+
+        final_img = OpenCVImgRepr()
+        nbytes = int(numpy.prod(shape)) * numpy.dtype(self.dtype).itemsize
+        if self.memmap_threshold is not None and \
+                nbytes > self.memmap_threshold:
+            # Anonymous file, removed as soon as the image is released
+            final_img.img = numpy.memmap(tempfile.TemporaryFile(),
+                                         dtype=self.dtype, mode='w+',
+                                         shape=shape)
+            self.stats.memory_mapped = True
+        else:
+            final_img.img = numpy.zeros(shape, self.dtype)
+        return final_img
+
+    def _update_peak_memory(self, nbytes: int) -> None:
+        self.stats.peak_memory = max(self.stats.peak_memory, nbytes)
+
     def _paste_image(self, final_img, new_part, num):
         img_offset = OpenCVImgRepr.empty(self.width, self.height)
         offset = int(math.floor(num * float(self.height)
@@ -115,6 +115,12 @@ class FrameRenderingTask(RenderingTask):
 
     VERIFIER_CLASS = FrameRenderingVerifier
 
+    # Frame parts are decoded by this many threads while being put together
+    COLLECTOR_WORKERS = 2
+    # Frames bigger than this number of bytes are put together in a memory
+    # mapped file
+    COLLECTOR_MEMMAP_THRESHOLD = 1024 * 1024 * 1024
+
     ################
     # Task methods #
     ################
@@ -142,6 +148,8 @@ class FrameRenderingTask(RenderingTask):
             self.preview_file_path = [None] * len(self.frames)
             self.preview_task_file_path = [None] * len(self.frames)
         self.last_preview_path = None
+        # Frame number -> CollectorStats of the last `_put_frame_together`
+        self.frames_collector_stats = {}
 
     @CoreTask.handle_key_error
     def computation_failed(self, subtask_id: str, ban_node: bool = True):
@@ -410,18 +418,32 @@ class FrameRenderingTask(RenderingTask):
         frame_key = str(frame_num)
         collected = self.frames_given[frame_key]
         collected = OrderedDict(sorted(collected.items()))
-        collector = RenderingTaskCollector(width=self.res_x,
-                                           height=self.res_y)
+        collector = self._get_frame_collector()
         for file in collected.values():
             collector.add_img_file(file)
         with handle_opencv_image_error(logger):
             image = collector.finalize()
             image.save_with_extension(output_file_name, self.output_format)
+        self._update_frame_collector_stats(frame_num, collector)
 
         self.collected_file_names[frame_num] = output_file_name
         self._update_frame_preview(output_file_name, frame_num, final=True)
         self._update_frame_task_preview()
 
+    def _get_frame_collector(self, collector_class=RenderingTaskCollector):
+        return collector_class(
+            width=self.res_x,
+            height=self.res_y,
+            streaming=True,
+            workers=self.COLLECTOR_WORKERS,
+            memmap_threshold=self.COLLECTOR_MEMMAP_THRESHOLD,
+        )
+
+    def _update_frame_collector_stats(self, frame_num, collector):
+        self.frames_collector_stats[frame_num] = collector.stats
+        logger.debug('Frame %r of task %r put together. %r', frame_num,
+                     self.header.task_id, collector.stats)
+
     def _collect_image_part(self, num_start, tr_file):
         self.collected_file_names[num_start] = tr_file
         self._update_preview(tr_file, num_start)
@@ -456,7 +478,10 @@ class FrameRenderingTask(RenderingTask):
         preview_task_file_path = self._get_preview_task_file_path(idx)
         img_task = self._open_frame_preview(preview_task_file_path)
         self._mark_task_area(sub, img_task, color, idx)
-        img_task.save_with_extension(preview_task_file_path, PREVIEW_EXT)
+        self._save_frame_preview(img_task, preview_task_file_path)
+
+    def _save_frame_preview(self, img, preview_file_path):
+        img.save_with_extension(preview_file_path, PREVIEW_EXT)
 
     def _get_subtask_file_path(self, subtask_dir_list, name_dir, num):
         if subtask_dir_list[num] is None:
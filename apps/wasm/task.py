@@ -1,4 +1,5 @@
 from copy import deepcopy
+from functools import partial
 from pathlib import Path, PurePath
 from typing import (
     Any,
@@ -13,6 +14,7 @@ from typing import (
     Callable,
     Set
 )
+import hashlib
 import logging
 
 from golem_messages.message import ComputeTaskDef
@@ -39,6 +41,43 @@ from .vbr import (
 
 logger = logging.getLogger("apps.wasm")
 
+READ_CHUNK_SIZE = 2 ** 20
+
+
+def file_digest(path: str) -> bytes:
+    """Returns sha256 of the file, read in chunks"""
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(partial(f.read, READ_CHUNK_SIZE), b''):
+            sha.update(chunk)
+    return sha.digest()
+
+
+def files_equal(path_a: str, path_b: str) -> bool:
+    """Compares files byte by byte, reading them in chunks"""
+    if Path(path_a).stat().st_size != Path(path_b).stat().st_size:
+        return False
+    with open(path_a, 'rb') as f1, open(path_b, 'rb') as f2:
+        while True:
+            b1 = f1.read(READ_CHUNK_SIZE)
+            b2 = f2.read(READ_CHUNK_SIZE)
+            if b1 != b2:
+                return False
+            if not b1:
+                return True
+
+
+class WasmResult:
+    """Result files of a single subtask along with their digests, computed
+    once when the results arrive"""
+
+    def __init__(self, files: List[str]) -> None:
+        self.files = files
+        self.digests = [file_digest(f) for f in files]
+
+    def __repr__(self):
+        return '<WasmResult %r>' % (self.files,)
+
 
 class VbrSubtask:
     """Encapsulating subtask handling behavior for Verification by
@@ -46,16 +85,20 @@ class VbrSubtask:
     and subtask related data management from the client code.
     """
     # __DEBUG_COUNTER: int = 0
-    def __init__(self, id_gen, name, params, redundancy_factor):
+    def __init__(self, id_gen, name, params, redundancy_factor,
+                 compare_bytewise=False):
         self.id_gen = id_gen
         self.name = name
         self.params = params
         self.result = None
         self.redundancy_factor = redundancy_factor
+        self.compare_bytewise = compare_bytewise
 
         self.subtasks = {}
         self.verifier = BucketVerifier(
-            redundancy_factor, WasmTask.cmp_results, referee_count=0)
+            redundancy_factor,
+            partial(WasmTask.cmp_results, compare_bytewise=compare_bytewise),
+            referee_count=0)
 
     def contains(self, s_id) -> bool:
         return s_id in self.subtasks
@@ -91,8 +134,9 @@ class VbrSubtask:
     def get_instances(self) -> List[str]:
         return self.subtasks.keys()
 
-    def add_result(self, s_id, task_result):
-        self.verifier.add_result(self.subtasks[s_id]["actor"], task_result)
+    def add_result(self, s_id, task_result: Optional[List[str]]):
+        result = WasmResult(task_result) if task_result is not None else None
+        self.verifier.add_result(self.subtasks[s_id]["actor"], result)
         self.subtasks[s_id]["results"] = task_result
 
     def get_result(self):
@@ -105,7 +149,7 @@ class VbrSubtask:
         verdicts = []
         for actor, result, verdict in self.verifier.get_verdicts():
             if verdict == VerificationResult.SUCCESS and not self.result:
-                self.result = result
+                self.result = result.files
 
             verdicts.append((actor, verdict))
 
@@ -126,6 +170,8 @@ class WasmTaskOptions(Options):
         self.wasm_name: str = ''
         self.input_dir: str = ''
         self.output_dir: str = ''
+        # Confirm results with equal digests by comparing them byte by byte
+        self.compare_bytewise: bool = False
         self.subtasks: Dict[str, WasmTaskOptions.SubtaskOptions] = {}
 
     def _subtasks(self) -> Generator[Tuple[str, Dict[str, Any]], None, None]:
@@ -171,6 +217,8 @@ class WasmTask(CoreTask):
         self.options: WasmTaskOptions = task_definition.options
         self.subtasks: List[VbrSubtask] = []
         self.subtasks_given = {}
+        # subtask id -> VbrSubtask containing it
+        self._vbrsubtasks: Dict[str, VbrSubtask] = {}
 
         for s_name, s_params in self.options.get_subtask_iterator():
             s_params = {
@@ -178,7 +226,8 @@ class WasmTask(CoreTask):
                 **s_params
             }
             subtask = VbrSubtask(self.create_subtask_id,
-                                 s_name, s_params, self.REDUNDANCY_FACTOR)
+                                 s_name, s_params, self.REDUNDANCY_FACTOR,
+                                 self.options.compare_bytewise)
             self.subtasks.append(subtask)
 
         self.nodes_blacklist: Set[str] = set()
@@ -193,6 +242,7 @@ class WasmTask(CoreTask):
             next_subtask = s.new_instance(node_id)
             if next_subtask:
                 s_id, s_params = next_subtask
+                self._vbrsubtasks[s_id] = s
                 self.subtasks_given[s_id] = {
                     'status': SubtaskStatus.starting,
                     'node_id': node_id
@@ -203,21 +253,25 @@ class WasmTask(CoreTask):
         raise RuntimeError()
 
     def _find_vbrsubtask_by_id(self, subtask_id) -> VbrSubtask:
+        subtask = self._vbrsubtasks.get(subtask_id)
+        if subtask is not None:
+            return subtask
+        # Instances not created by query_extra_data
         for subtask in self.subtasks:
             if subtask.contains(subtask_id):
+                self._vbrsubtasks[subtask_id] = subtask
                 return subtask
         raise KeyError()
 
     @staticmethod
-    def cmp_results(result_list_a: List[Any],
-                    result_list_b: List[Any]) -> bool:
-        logger.debug("Comparing: %s and %s", result_list_a, result_list_b)
-        for r1, r2 in zip(result_list_a, result_list_b):
-            with open(r1, 'rb') as f1, open(r2, 'rb') as f2:
-                b1 = f1.read()
-                b2 = f2.read()
-                if b1 != b2:
-                    return False
+    def cmp_results(result_a: WasmResult, result_b: WasmResult,
+                    compare_bytewise: bool = False) -> bool:
+        logger.debug("Comparing: %s and %s", result_a, result_b)
+        if result_a.digests != result_b.digests:
+            return False
+        if compare_bytewise:
+            return all(files_equal(r1, r2) for r1, r2
+                       in zip(result_a.files, result_b.files))
         return True
 
     def __resolve_payments(self, subtask: VbrSubtask):
@@ -250,7 +304,8 @@ class WasmTask(CoreTask):
             self.save_results(subtask.name, result)
         else:
             new_subtask = VbrSubtask(self.create_subtask_id, subtask.name,
-                                     subtask.params, subtask.redundancy_factor)
+                                     subtask.params, subtask.redundancy_factor,
+                                     subtask.compare_bytewise)
             self.subtasks.append(new_subtask)
 
     def computation_finished(
@@ -479,6 +534,8 @@ class WasmTaskBuilder(CoreTaskBuilder):
         task_def.options.wasm_name = options['wasm_name']
         task_def.options.input_dir = options['input_dir']
         task_def.options.output_dir = options['output_dir']
+        task_def.options.compare_bytewise = \
+            options.get('compare_bytewise', False)
 
         task_def.options.subtasks = {
             name: WasmTaskOptions.SubtaskOptions(
@@ -50,6 +50,32 @@ NETWORK_CHECK_INTERVAL = 10.0
 MASK_UPDATE_INTERVAL = 30.0
 MAX_SENDING_DELAY = 360
 OFFER_POOLING_INTERVAL = 15.0
+# How long subtask level changes of requested tasks may wait before being
+# saved to disk (in seconds)
+TASK_PERSISTENCE_INTERVAL = 5.0
+# Append subtask changes to a journal instead of re-saving whole tasks
+TASK_PERSISTENCE_JOURNAL = 0
+# Run SQLite with WAL, relaxed syncing, memory mapped I/O and a single
+# serialized writer thread
+DB_PERFORMANCE_PROFILE = 0
+# How frequently statistics are written to the database (in seconds), also
+# the longest period of statistics lost on a crash; 0 writes every change
+STATS_FLUSH_INTERVAL = 10.0
+# How frequently local rank changes are written to the database (in seconds);
+# 0 writes every change
+LOCAL_RANK_FLUSH_INTERVAL = 10.0
+# Number of subtasks computed at the same time, limited by num_cores
+TASK_COMPUTER_SLOTS = 1
+# Request tasks in order of expected profit instead of at random
+PROFIT_TASK_SCHEDULER = 0
+# Number of subtask results verified at the same time, 0 - based on the
+# number of cores and available memory
+VERIFICATION_CONCURRENCY = 0
+# Number of files transferred to and from Concent at the same time
+CONCENT_TRANSFERS_CONCURRENCY = 2
+# Number of environment benchmarks run at the same time, limited by num_cores
+# and max_memory_size
+BENCHMARK_CONCURRENCY = 1
 # How frequently task archive should be saved to disk (in seconds)
 TASKARCHIVE_MAINTENANCE_INTERVAL = 30
 # Filename for task archive disk file
@@ -173,6 +199,16 @@ class AppConfig:
             mask_update_interval=MASK_UPDATE_INTERVAL,
             max_results_sending_delay=MAX_SENDING_DELAY,
             offer_pooling_interval=OFFER_POOLING_INTERVAL,
+            task_persistence_interval=TASK_PERSISTENCE_INTERVAL,
+            task_persistence_journal=TASK_PERSISTENCE_JOURNAL,
+            db_performance_profile=DB_PERFORMANCE_PROFILE,
+            stats_flush_interval=STATS_FLUSH_INTERVAL,
+            local_rank_flush_interval=LOCAL_RANK_FLUSH_INTERVAL,
+            task_computer_slots=TASK_COMPUTER_SLOTS,
+            profit_task_scheduler=PROFIT_TASK_SCHEDULER,
+            verification_concurrency=VERIFICATION_CONCURRENCY,
+            concent_transfers_concurrency=CONCENT_TRANSFERS_CONCURRENCY,
+            benchmark_concurrency=BENCHMARK_CONCURRENCY,
             # timeouts
             p2p_session_timeout=P2P_SESSION_TIMEOUT,
             task_session_timeout=TASK_SESSION_TIMEOUT,
@@ -160,6 +160,7 @@ class Client:  # noqa pylint: disable=too-many-instance-attributes,too-many-publ
         self.concent_filetransfers = ConcentFiletransferService(
             keys_auth=self.keys_auth,
             variant=concent_variant,
+            concurrency=self.config_desc.concent_transfers_concurrency,
         )
 
         self.task_server: Optional[TaskServer] = None
@@ -333,6 +334,7 @@ class Client:  # noqa pylint: disable=too-many-instance-attributes,too-many-publ
         self.environments_manager.load_config(self.datadir)
         self.concent_service.start()
         self.concent_filetransfers.start()
+        msg_queue.recover()
 
         if self.use_monitor and not self.monitor:
             self.init_monitor()
@@ -351,6 +353,7 @@ class Client:  # noqa pylint: disable=too-many-instance-attributes,too-many-publ
     def stop(self):
         logger.debug('Stopping client services ...')
         self.stop_network()
+        msg_queue.flush()
 
         for service in self._services:
             if service.running:
@@ -360,6 +363,7 @@ class Client:  # noqa pylint: disable=too-many-instance-attributes,too-many-publ
             self.concent_filetransfers.stop()
         if self.task_server:
             self.task_server.task_computer.quit()
+            self.task_server.task_manager.quit()
         if self.use_monitor and self.monitor:
             self.diag_service.stop()
             # This effectively removes monitor dispatcher connections (weakrefs)
@@ -925,6 +929,14 @@ class Client:  # noqa pylint: disable=too-many-instance-attributes,too-many-publ
         return self.task_server.task_manager.get_task_preview(task_id,
                                                               single=single)
 
+    @rpc_utils.expose('comp.task.preview.bytes')
+    def get_task_preview_bytes(self, task_id, frame=None) -> Optional[bytes]:
+        """ Return the current preview of the task, or of one of its frames,
+        encoded as an image file
+        """
+        return self.task_server.task_manager.get_task_preview_bytes(
+            task_id, frame=frame)
+
     @rpc_utils.expose('comp.tasks.stats')
     def get_task_stats(self) -> Dict[str, Any]:
         return {
@@ -1194,6 +1206,10 @@ class Client:  # noqa pylint: disable=too-many-instance-attributes,too-many-publ
         result = yield deferred
         return result
 
+    @rpc_utils.expose('comp.environment.benchmark.progress')
+    def get_benchmark_progress(self):
+        return self.task_server.benchmark_manager.get_progress()
+
     @rpc_utils.expose('comp.environment.enable')
     def enable_environment(self, env_id):
         try:
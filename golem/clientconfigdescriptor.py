@@ -44,6 +44,16 @@ class ClientConfigDescriptor(object):
         self.node_snapshot_interval = 0.0
         self.network_check_interval = 0.0
         self.max_results_sending_delay = 0.0
+        self.task_persistence_interval = 0.0
+        self.task_persistence_journal = 0
+        self.db_performance_profile = 0
+        self.stats_flush_interval = 0.0
+        self.local_rank_flush_interval = 0.0
+        self.task_computer_slots = 1
+        self.profit_task_scheduler = 0
+        self.verification_concurrency = 0
+        self.concent_transfers_concurrency = 1
+        self.benchmark_concurrency = 1
 
         self.num_cores = 0
         self.max_resource_size = 0  # KiB
@@ -1,4 +1,6 @@
 import abc
+import io
+import os
 from hashlib import sha256
 from Crypto.Cipher import AES
 from Crypto import Random
@@ -7,6 +9,9 @@ from threading import Lock
 
 from io import IOBase
 
+# Size of buffers used by streaming encryption and decryption
+STREAM_BUFFER_SIZE = 1024 * 1024
+
 
 class FileHelper(object):
 
@@ -124,3 +129,173 @@ class AESFileEncryptor(FileEncryptor):
                     working = False
 
                 dst.write(chunk)
+
+    @classmethod
+    def stream_encryptor(cls, file_out, secret, key_len=32, hash_obj=None,
+                         plain_out=None):
+        """ Return a writable file object that encrypts everything written
+        to it into `file_out`, producing the same format as `encrypt`.
+        :param file_out: path of the encrypted file
+        :param hash_obj: optional hashlib object updated with the plaintext
+        :param plain_out: optional path where the plaintext is copied to
+        """
+        block_size = cls.block_size
+        salt = cls.gen_salt(block_size)
+        key, iv = cls.get_key_and_iv(secret, salt, key_len, block_size)
+        return AESStreamEncryptor(
+            AES.new(key, cls.aes_mode, iv),
+            file_out,
+            header=cls.salt_prefix + salt,
+            hash_obj=hash_obj,
+            plain_out=plain_out,
+        )
+
+    @classmethod
+    def stream_decryptor(cls, file_in, secret, key_len=32):
+        """ Return a readable and seekable file object with the decrypted
+        contents of `file_in`. Data is decrypted on demand, which CBC mode
+        allows at any block offset.
+        """
+        block_size = cls.block_size
+        src = open(file_in, 'rb')
+        try:
+            salt = src.read(block_size)[cls.salt_prefix_len:]
+            key, iv = cls.get_key_and_iv(secret, salt, key_len, block_size)
+            raw = AESStreamDecryptor(src, key, iv, cls.aes_mode,
+                                     offset=block_size)
+        except Exception:
+            src.close()
+            raise
+        return io.BufferedReader(raw, buffer_size=STREAM_BUFFER_SIZE)
+
+
+class AESStreamEncryptor(io.RawIOBase):
+    """ Write-only, non-seekable stream encrypting data with AES-CBC """
+
+    block_size = AES.block_size
+
+    def __init__(self, cipher, file_out, header=b'', hash_obj=None,
+                 plain_out=None):
+        super().__init__()
+        self._cipher = cipher
+        self._hash = hash_obj
+        self._pending = bytearray()
+        self._position = 0
+        self._dst = open(file_out, 'wb', buffering=STREAM_BUFFER_SIZE)
+        self._plain = None
+        if plain_out:
+            self._plain = open(plain_out, 'wb',
+                               buffering=STREAM_BUFFER_SIZE)
+        self._dst.write(header)
+
+    def writable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def write(self, b):
+        data = memoryview(b).cast('B')
+        if self._hash:
+            self._hash.update(data)
+        if self._plain:
+            self._plain.write(data)
+        self._pending += data
+        self._position += len(data)
+
+        if len(self._pending) >= STREAM_BUFFER_SIZE:
+            length = len(self._pending) - len(self._pending) % self.block_size
+            self._dst.write(self._cipher.encrypt(bytes(self._pending[:length])))
+            del self._pending[:length]
+        return len(data)
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            pad_len = self.block_size - len(self._pending) % self.block_size
+            self._pending += chr(pad_len).encode() * pad_len
+            self._dst.write(self._cipher.encrypt(bytes(self._pending)))
+            self._pending = bytearray()
+        finally:
+            self._dst.close()
+            if self._plain:
+                self._plain.close()
+            super().close()
+
+
+class AESStreamDecryptor(io.RawIOBase):
+    """ Read-only, seekable stream decrypting AES-CBC data on demand """
+
+    block_size = AES.block_size
+
+    def __init__(self, src, key, iv, aes_mode, offset=0):
+        super().__init__()
+        self._src = src
+        self._key = key
+        self._iv = iv
+        self._aes_mode = aes_mode
+        self._offset = offset
+        self._position = 0
+
+        encrypted_size = os.fstat(src.fileno()).st_size - offset
+        if encrypted_size <= 0 or encrypted_size % self.block_size:
+            raise ValueError("Invalid encrypted data size")
+        last_block = self._decrypt_blocks(
+            encrypted_size // self.block_size - 1, 1)
+        pad_len = last_block[-1]
+        if not 0 < pad_len <= self.block_size:
+            raise ValueError("Invalid padding")
+        self._size = encrypted_size - pad_len
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self._size + offset
+        else:
+            raise ValueError("Invalid whence: {}".format(whence))
+        if position < 0:
+            raise ValueError("Negative seek position {}".format(position))
+        self._position = position
+        return position
+
+    def readinto(self, b):
+        length = min(len(b), self._size - self._position)
+        if length <= 0:
+            return 0
+
+        first_block = self._position // self.block_size
+        last_block = (self._position + length - 1) // self.block_size
+        data = self._decrypt_blocks(first_block, last_block - first_block + 1)
+        start = self._position - first_block * self.block_size
+
+        b[:length] = data[start:start + length]
+        self._position += length
+        return length
+
+    def close(self):
+        if not self.closed:
+            self._src.close()
+        super().close()
+
+    def _decrypt_blocks(self, first_block, count):
+        if first_block == 0:
+            iv = self._iv
+            self._src.seek(self._offset)
+        else:
+            self._src.seek(self._offset + (first_block - 1) * self.block_size)
+            iv = self._src.read(self.block_size)
+        data = self._src.read(count * self.block_size)
+        return AES.new(self._key, self._aes_mode, iv).decrypt(data)
@@ -0,0 +1,125 @@
+import struct
+from typing import Callable, Iterator, Optional
+
+from .variables import LONG_STANDARD_SIZE
+
+
+class FrameDecoder:
+    """ Decoder of length prefixed frames received from the network.
+
+    Incoming chunks are appended to a single growable bytearray and consumed
+    by moving a read cursor, so receiving a large message in many small
+    chunks is linear in its size. Consumed space is reclaimed lazily, once
+    it exceeds both `compact_threshold` and the amount of unread data.
+    """
+
+    HEADER = struct.Struct("!L")
+
+    def __init__(self,
+                 max_frame_size: int,
+                 oversized_callback: Optional[Callable[[int], None]] = None,
+                 compact_threshold: int = 64 * 1024) -> None:
+        """
+        :param max_frame_size: frames announcing a bigger length are dropped
+            without being buffered
+        :param oversized_callback: called with the announced length of every
+            dropped frame
+        :param compact_threshold: minimum size of consumed data that triggers
+            buffer compaction
+        """
+        self.max_frame_size = max_frame_size
+        self.oversized_callback = oversized_callback
+        self.compact_threshold = compact_threshold
+
+        self._buffer = bytearray()
+        self._offset = 0
+        self._discard = 0
+
+    def feed(self, data: bytes) -> None:
+        """ Append received chunk of data. Frames returned by previous
+        `frames()` calls must not be used afterwards.
+        :param bytes data: received data
+        """
+        if self._discard:
+            skipped = min(self._discard, len(data))
+            self._discard -= skipped
+            data = memoryview(data)[skipped:]
+            if not data:
+                return
+
+        try:
+            self._compact()
+            self._buffer += data
+        except BufferError:
+            # Some frames are still referenced, the buffer can't be resized
+            self._buffer = self._buffer[self._offset:] + data
+            self._offset = 0
+
+    def frames(self) -> Iterator[memoryview]:
+        """ Generator returning all complete frames from the buffer. Returned
+        memoryviews point directly into the buffer and are only valid until
+        the next `feed()` or `clear()` call.
+        """
+        header_size = self.HEADER.size
+
+        while self.data_size() >= header_size:
+            (length,) = self.HEADER.unpack_from(self._buffer, self._offset)
+
+            if length > self.max_frame_size:
+                self._drop_frame(length)
+                if self.oversized_callback:
+                    self.oversized_callback(length)
+                continue
+
+            start = self._offset + header_size
+            end = start + length
+            if end > len(self._buffer):
+                return
+
+            self._offset = end
+            with memoryview(self._buffer) as view:
+                yield view[start:end]
+
+    def data_size(self) -> int:
+        """ Return size of unread data in buffer
+        :return int: size of unread data
+        """
+        return len(self._buffer) - self._offset
+
+    def clear(self) -> None:
+        """ Remove all data from the buffer """
+        self._buffer = bytearray()
+        self._offset = 0
+        self._discard = 0
+
+    @classmethod
+    def encode(cls, data: bytes) -> bytes:
+        """ Prefix given data with its length
+        :param bytes data: frame payload
+        :return bytes: frame ready to be sent
+        """
+        return cls.HEADER.pack(len(data)) + data
+
+    def _drop_frame(self, length: int) -> None:
+        available = self.data_size() - LONG_STANDARD_SIZE
+        if available >= length:
+            self._offset += LONG_STANDARD_SIZE + length
+            return
+
+        self._discard = length - available
+        self._buffer = bytearray()
+        self._offset = 0
+
+    def _compact(self) -> None:
+        if self._offset == len(self._buffer):
+            if self._offset:
+                self._buffer = bytearray()
+                self._offset = 0
+            return
+
+        if self._offset < self.compact_threshold or \
+                self._offset < self.data_size():
+            return
+
+        del self._buffer[:self._offset]
+        self._offset = 0
@@ -1,12 +1,20 @@
 # Generating, solving and checking solutions of crypto-puzzles for proof of work system
 
+import logging
+from concurrent.futures import Future, ProcessPoolExecutor
+from hashlib import sha256
 from random import sample
 import time
+from typing import Optional
+
+from twisted.internet.defer import Deferred, succeed
 
 from golem.core.keysauth import get_random, sha2
 
 __author__ = 'Magda.Stasiewicz'
 
+logger = logging.getLogger(__name__)
+
 CHALLENGE_HISTORY_LIMIT = 100
 MAX_RANDINT = 100000000000000000000000000
 
@@ -33,12 +41,93 @@ def solve_challenge(challenge, difficulty):
     representation of solution's hash returns solution and computation time in seconds
     """
     start = time.time()
-    min_hash = pow(2, 256 - difficulty)     # could be done prettier
     solution = 0
-    while sha2(challenge + str(solution)) > min_hash:
-        solution += 1
-    end = time.time()
-    return solution, end - start
+    while True:
+        found = solve_challenge_range(challenge, difficulty, solution, 2 ** 20)
+        if found is not None:
+            return found, time.time() - start
+        solution += 2 ** 20
+
+
+def solve_challenge_range(challenge: str, difficulty: int, start: int,
+                          count: int) -> Optional[int]:
+    """
+    Looks for the smallest solution in [start, start + count). The challenge is hashed only once, the hash state is
+    copied for every candidate. Digests are compared as big endian bytes, which is equivalent to comparing numbers.
+    :return: solution or None if there's no solution in the range
+    """
+    if difficulty <= 0:
+        return start
+    max_digest = pow(2, 256 - difficulty).to_bytes(32, 'big')
+    prefix = sha256(challenge.encode())
+    for solution in range(start, start + count):
+        candidate = prefix.copy()
+        candidate.update(str(solution).encode())
+        if candidate.digest() <= max_digest:
+            return solution
+    return None
+
+
+class ChallengeSolver:
+    """
+    Solves challenges in a process pool, so that the reactor isn't blocked. Candidates are checked in chunks of
+    `chunk_size`, solving is cancelled before the next chunk when the returned deferred is cancelled. Challenges
+    with difficulty up to `inline_difficulty` are cheaper to solve than to send to another process.
+    """
+
+    def __init__(self, workers: int = 1, chunk_size: int = 2 ** 16, inline_difficulty: int = 10) -> None:
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.inline_difficulty = inline_difficulty
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def solve(self, challenge: str, difficulty: int) -> Deferred:
+        """
+        :return: deferred solution and computation time in seconds
+        """
+        if difficulty <= self.inline_difficulty:
+            return succeed(solve_challenge(challenge, difficulty))
+
+        from twisted.internet import reactor
+        start = time.time()
+        future: Optional[Future] = None
+
+        def canceller(_):
+            if future is not None:
+                future.cancel()
+
+        deferred = Deferred(canceller)
+
+        def submit(offset: int) -> None:
+            nonlocal future
+            future = self._get_executor().submit(
+                solve_challenge_range, challenge, difficulty, offset, self.chunk_size)
+            future.add_done_callback(lambda f: reactor.callFromThread(done, offset, f))
+
+        def done(offset: int, f: Future) -> None:
+            if deferred.called or f.cancelled():
+                return  # cancelled
+            if f.exception() is not None:
+                deferred.errback(f.exception())
+            elif f.result() is None:
+                submit(offset + self.chunk_size)
+            else:
+                deferred.callback((f.result(), time.time() - start))
+
+        submit(0)
+        return deferred
+
+    def stop(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            from twisted.internet import reactor
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            reactor.addSystemEventTrigger('during', 'shutdown', self.stop)
+        return self._executor
 
 
 def accept_challenge(challenge, solution, difficulty):
@@ -1,12 +1,12 @@
 import functools
 import logging
-from threading import Lock
-from typing import Type, Any, Optional
+import threading
+from typing import Type, Any, Dict, Optional, Tuple
 
 from peewee import DatabaseError
 
 from golem.core.common import HandleAttributeError, HandleError
-from golem.model import Stats
+from golem.model import Stats, db
 
 logger = logging.getLogger(__name__)
 
@@ -16,20 +16,51 @@ def log_error(*args, **_kwargs):
 
 
 class StatsKeeper:
+    """ Keeps session and global statistics, the latter are stored in the
+    `Stats` table.
+
+    With `flush_interval` set, changes are kept in memory and written
+    back to the database in a single transaction every `flush_interval`
+    seconds and on shutdown, so that's how much of statistics can be lost
+    on a crash. Increments are added to the value stored in the database
+    at the time of a flush, like they would be when written through.
+    """
 
     handle_attribute_error = HandleAttributeError(log_error)
 
-    def __init__(self, stat_class: Type, default_value: str = '') -> None:
-        self._lock = Lock()
+    # Used by keepers created without `flush_interval`; 0 writes every
+    # change through to the database
+    default_flush_interval = 0.0
+
+    def __init__(self, stat_class: Type, default_value: str = '',
+                 flush_interval: Optional[float] = None) -> None:
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
         self.session_stats = stat_class()
         self.global_stats = stat_class()
         self.default_value = default_value
+        self.flush_interval = self.default_flush_interval \
+            if flush_interval is None else flush_interval
+
+        # name -> (is absolute value, value or increment)
+        self._dirty: Dict[str, Tuple[bool, Any]] = {}
+        self._flush_thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
 
         for stat in vars(self.global_stats):
             val = self._get_or_create(stat)
             if val is not None:
                 setattr(self.global_stats, stat, val)
 
+        if self.write_back:
+            self._start_flushing()
+
+    @property
+    def write_back(self) -> bool:
+        """ Are changes written back periodically, as opposed to being
+        written through to the database """
+        return self.flush_interval > 0 and not self._stop_event.is_set()
+
     @HandleError(error=(TypeError, AttributeError), handle_error=log_error)
     def increase_stat(self, name: str, increment: Any = 1) -> None:
         with self._lock:
@@ -37,6 +68,13 @@ class StatsKeeper:
             session_val = self._cast_type(session_val + increment, name)
             setattr(self.session_stats, name, session_val)
 
+            if self.write_back:
+                global_val = getattr(self.global_stats, name)
+                global_val = self._cast_type(global_val + increment, name)
+                setattr(self.global_stats, name, global_val)
+                self._mark_dirty(name, increment)
+                return
+
             global_val = self._get_or_create(name)
             global_val = self._cast_type(global_val + increment, name)
             setattr(self.global_stats, name, global_val)
@@ -49,8 +87,106 @@ class StatsKeeper:
             setattr(self.session_stats, name, value)
             setattr(self.global_stats, name, value)
 
+            if self.write_back:
+                self._dirty[name] = (True, value)
+                return
+
             self._update_stat(name, value)
 
+    def flush(self) -> None:
+        """ Write pending changes to the database """
+        with self._flush_lock:
+            self._flush()
+
+    def _flush(self) -> None:
+        with self._lock:
+            dirty, self._dirty = self._dirty, {}
+        if not dirty:
+            return
+
+        try:
+            written = db.write(self._write, dirty)
+        except DatabaseError as err:
+            logger.error("Cannot flush stats: %r", err)
+            with self._lock:
+                for name, (absolute, value) in dirty.items():
+                    pending = self._dirty.get(name)
+                    if pending is None:
+                        self._dirty[name] = (absolute, value)
+                    elif not pending[0]:
+                        # Increments made since are applied on top of
+                        # the change that failed to be written
+                        self._dirty[name] = (absolute, value)
+                        self._mark_dirty(name, pending[1])
+            return
+
+        with self._lock:
+            # Include changes made by other keepers, unless there was
+            # a change in the meantime which overrides the value
+            for name, value in written.items():
+                absolute, increment = self._dirty.get(name, (False, 0))
+                if not absolute:
+                    setattr(self.global_stats, name,
+                            self._cast_type(value + increment, name))
+
+    def stop(self) -> None:
+        """ Stop flushing periodically and write pending changes; changes
+        made from now on are written through """
+        with self._lock:
+            self._stop_event.set()
+        if self._flush_thread is not None \
+                and self._flush_thread is not threading.current_thread():
+            self._flush_thread.join()
+        self._flush_thread = None
+        self.flush()
+
+    def _write(self, dirty: Dict[str, Tuple[bool, Any]]) -> Dict[str, Any]:
+        """ Database errors are raised, so that no change is lost """
+        written = {}
+        with db.atomic():
+            for name, (absolute, value) in dirty.items():
+                if not absolute:
+                    stat, _ = Stats.get_or_create(
+                        name=name, defaults={'value': self.default_value})
+                    try:
+                        value = self._cast_type(
+                            self._cast_type(stat.value, name) + value, name)
+                    except (ValueError, TypeError):
+                        logger.warning("Wrong stat '%s' format:", name,
+                                       exc_info=True)
+                        continue
+                Stats.update(value=f"{value}") \
+                    .where(Stats.name == name) \
+                    .execute()
+                written[name] = value
+        return written
+
+    def _mark_dirty(self, name: str, increment: Any) -> None:
+        absolute, value = self._dirty.get(name, (False, 0))
+        if absolute:
+            value = self._cast_type(value + increment, name)
+        else:
+            value += increment
+        self._dirty[name] = (absolute, value)
+
+    def _start_flushing(self) -> None:
+        self._flush_thread = threading.Thread(
+            target=self._flush_periodically,
+            name='StatsKeeperFlush',
+            daemon=True,
+        )
+        self._flush_thread.start()
+
+        from twisted.internet import reactor
+        reactor.addSystemEventTrigger('before', 'shutdown', self.stop)
+
+    def _flush_periodically(self) -> None:
+        while not self._stop_event.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Cannot flush stats")
+
     @staticmethod
     def _update_stat(name: str, value: Any) -> None:
         try:
@@ -93,8 +229,9 @@ class StatsKeeper:
 
 class IntStatsKeeper(StatsKeeper):
 
-    def __init__(self, stat_class: Type) -> None:
-        super(IntStatsKeeper, self).__init__(stat_class, '0')
+    def __init__(self, stat_class: Type,
+                 flush_interval: Optional[float] = None) -> None:
+        super(IntStatsKeeper, self).__init__(stat_class, '0', flush_interval)
 
     def _cast_type(self, value: Any, name: str) -> Any:
         return int(value)
@@ -1,9 +1,12 @@
 import datetime
 import logging
 import os
+import queue
 import sqlite3
+import threading
 import time
-from typing import Optional, Type, Sequence
+from concurrent.futures import Future
+from typing import Any, Callable, Optional, Type, Sequence
 
 import peewee
 
@@ -13,13 +16,123 @@ from golem.database.migration.migrate import migrate_schema, MigrationError
 logger = logging.getLogger('golem.db')
 
 
+class DatabaseWriter(threading.Thread):
+    """ Executes write operations one at a time, in a dedicated thread with
+    its own database connection, so that writers don't compete for the
+    database lock.
+    """
+
+    def __init__(self, db: peewee.Database) -> None:
+        super().__init__(name='DatabaseWriter', daemon=True)
+        self._db = db
+        self._queue: queue.Queue = queue.Queue()
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        future: Future = Future()
+        self._queue.put((future, fn, args, kwargs))
+        return future
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._queue.put(None)
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout)
+
+    def run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            future, fn, args, kwargs = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:  # pylint: disable=broad-except
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+        if not self._db.is_closed():
+            self._db.close()
+
+
 class GolemSqliteDatabase(peewee.SqliteDatabase):
     RETRY_TIMEOUT = datetime.timedelta(minutes=1)
+    # Applied by enable_performance_profile(). busy_timeout goes first,
+    # so that switching the journal mode waits for other connections.
+    PERFORMANCE_PRAGMAS = (
+        ('busy_timeout', 10000),  # ms
+        ('journal_mode', 'WAL'),
+        ('synchronous', 'NORMAL'),
+        ('mmap_size', 256 * 1024 * 1024),  # bytes
+        ('cache_size', -64 * 1024),  # negative values are in KiB
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.performance_profile = False
+        self.writer: Optional[DatabaseWriter] = None
 
     def sequence_exists(self, seq):
         raise NotImplementedError()
 
+    def enable_performance_profile(self, **pragmas) -> None:
+        """
+        Switch to WAL journaling with relaxed syncing, bigger page cache and
+        memory mapped I/O. Locked database is waited for by SQLite itself
+        (busy_timeout) instead of reconnecting in execute_sql(). Writes
+        passed to write() are serialized by a dedicated writer thread.
+        :param pragmas: overrides of PERFORMANCE_PRAGMAS values
+        """
+        profile = dict(self.PERFORMANCE_PRAGMAS)
+        profile.update(pragmas)
+        current = [(key, value) for key, value in self._pragmas
+                   if key not in profile]
+        self._pragmas = list(profile.items()) + current
+        self.performance_profile = True
+
+        if not self.is_closed():
+            # Connections opened from now on are configured on connect
+            for key, value in profile.items():
+                self.pragma(key, value)
+
+        if not (self.writer and self.writer.is_alive()):
+            self.writer = DatabaseWriter(self)
+            self.writer.start()
+        logger.info('SQLite performance profile enabled: %r', profile)
+
+    def stop_writer(self) -> None:
+        if self.writer:
+            self.writer.stop()
+        self.writer = None
+
+    def write(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Execute a write operation and return its result. With performance
+        profile enabled, the operation is queued and executed by the writer
+        thread, the calling thread waits for it to finish.
+        """
+        writer = self.writer
+        if writer is None or not writer.is_alive() \
+                or threading.current_thread() is writer:
+            return fn(*args, **kwargs)
+        return writer.submit(fn, *args, **kwargs).result()
+
     def execute_sql(self, sql, params=None, require_commit=True):
+        if self.performance_profile:
+            # SQLite waits for a locked database up to busy_timeout
+            try:
+                return super().execute_sql(sql, params, require_commit)
+            except (
+                    sqlite3.ProgrammingError,
+                    peewee.OperationalError,
+            ) as e:
+                if str(e).startswith('no such savepoint'):
+                    logger.warning('execute_sql() tx rollback failed: %r', e)
+                    return None
+                raise
+
         # Loosely based on
         # https://github.com/coleifer/peewee/blob/2.10.2/playhouse/shortcuts.py#L206-L219
         deadline = datetime.datetime.now() + self.RETRY_TIMEOUT
@@ -61,7 +174,7 @@ class GolemSqliteDatabase(peewee.SqliteDatabase):
 
 
 class Database:
-    SCHEMA_VERSION = 35
+    SCHEMA_VERSION = 36
 
     def __init__(self,  # noqa pylint: disable=too-many-arguments
                  db: peewee.Database,
@@ -90,6 +203,8 @@ class Database:
             self._migrate_schema(version, to_version=self.SCHEMA_VERSION)
 
     def close(self):
+        if isinstance(self.db, GolemSqliteDatabase):
+            self.db.stop_writer()
         if not self.db.is_closed():
             self.db.close()
 
@@ -0,0 +1,27 @@
+# pylint: disable=no-member
+# pylint: disable=unused-argument
+# pylint: disable=unused-variable
+
+import datetime as dt
+import peewee as pw
+
+SCHEMA_VERSION = 36
+
+
+def migrate(migrator, database, fake=False, **kwargs):
+
+    @migrator.create_model
+    class BenchmarkResult(pw.Model):
+        created_date = pw.UTCDateTimeField(default=dt.datetime.now)
+        modified_date = pw.UTCDateTimeField(default=dt.datetime.now)
+        environment_id = pw.CharField(max_length=255)
+        fingerprint = pw.CharField(max_length=255)
+        value = pw.FloatField()
+
+        class Meta:
+            db_table = "benchmarkresult"
+            primary_key = pw.CompositeKey('environment_id', 'fingerprint')
+
+
+def rollback(migrator, database, fake=False, **kwargs):
+    migrator.remove_model('benchmarkresult')
@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 import logging
 import time
+from collections import defaultdict
+from typing import Dict, List
 
 from ethereum.utils import denoms
 from pydispatch import dispatcher
@@ -42,13 +44,13 @@ class IncomesKeeper:
             amount: int,
             closure_time: int) -> None:
 
-        expected = model.TaskPayment.incomes().where(
+        expected = list(model.TaskPayment.incomes().where(
             model.WalletOperation.sender_address == sender,
             model.TaskPayment.accepted_ts > 0,
             model.TaskPayment.accepted_ts <= closure_time,
             model.WalletOperation.tx_hash.is_null(),
             model.TaskPayment.settled_ts.is_null(),
-        )
+        ))
 
         expected_value = sum([e.missing_amount for e in expected])
         if expected_value == 0:
@@ -62,6 +64,9 @@ class IncomesKeeper:
                 amount / denoms.ether)
 
         amount_left = amount
+        # Operations are grouped by their new amount, so that a batch
+        # of equally priced subtasks is updated with a single query
+        updates: Dict[int, List[int]] = defaultdict(list)
 
         for e in expected:
             received = min(amount_left, e.expected_amount)
@@ -69,8 +74,18 @@ class IncomesKeeper:
             amount_left -= received
             e.wallet_operation.tx_hash = tx_hash
             e.wallet_operation.status = model.WalletOperation.STATUS.confirmed
-            e.wallet_operation.save()
+            updates[e.wallet_operation.amount].append(e.wallet_operation.id)
+
+        with model.db.atomic():
+            for new_amount, ids in updates.items():
+                model.WalletOperation.update_many(
+                    ids,
+                    amount=new_amount,
+                    tx_hash=tx_hash,
+                    status=model.WalletOperation.STATUS.confirmed,
+                )
 
+        for e in expected:
             if e.missing_amount == 0:
                 dispatcher.send(
                     signal='golem.income',
@@ -202,10 +217,13 @@ class IncomesKeeper:
         if not incomes:
             return
 
+        model.WalletOperation.update_many(
+            [income.wallet_operation.id for income in incomes],
+            status=model.WalletOperation.STATUS.overdue,
+        )
         for income in incomes:
             income.wallet_operation.status = \
                 model.WalletOperation.STATUS.overdue
-            income.wallet_operation.save()
             dispatcher.send(
                 signal='golem.income',
                 event='overdue_single',
@@ -102,10 +102,13 @@ class PaymentProcessor:
         if not receipt.status:
             log.critical("Failed batch transfer: %s", receipt)
             for p in payments:
-                wallet_operation = p.wallet_operation
-                wallet_operation.status = model.WalletOperation.STATUS.awaiting
-                wallet_operation.save()
+                p.wallet_operation.status = \
+                    model.WalletOperation.STATUS.awaiting
                 self._awaiting.add(p)
+            model.WalletOperation.update_many(
+                [p.wallet_operation.id for p in payments],
+                status=model.WalletOperation.STATUS.awaiting,
+            )
             return
 
         block = self._sci.get_block_by_number(receipt.block_number)
@@ -121,7 +124,12 @@ class PaymentProcessor:
             wallet_operation = p.wallet_operation
             wallet_operation.status = model.WalletOperation.STATUS.confirmed
             wallet_operation.gas_cost = fee
-            wallet_operation.save()
+        model.WalletOperation.update_many(
+            [p.wallet_operation.id for p in payments],
+            status=model.WalletOperation.STATUS.confirmed,
+            gas_cost=fee,
+        )
+        for p in payments:
             self._gntb_reserved -= p.wallet_operation.amount
             self._payment_confirmed(p, block.timestamp)
 
@@ -274,11 +282,15 @@ class PaymentProcessor:
             wallet_operation = payment.wallet_operation
             wallet_operation.status = model.WalletOperation.STATUS.sent
             wallet_operation.tx_hash = tx_hash
-            wallet_operation.save()
             log.debug("- {} send to {} ({:.18f} GNTB)".format(
                 payment.subtask,
                 wallet_operation.recipient_address,
                 wallet_operation.amount / denoms.ether))
+        model.WalletOperation.update_many(
+            [p.wallet_operation.id for p in payments],
+            status=model.WalletOperation.STATUS.sent,
+            tx_hash=tx_hash,
+        )
 
         self._sci.on_transaction_confirmed(
             tx_hash,
@@ -294,7 +306,7 @@ class PaymentProcessor:
         created_deadline = datetime.datetime.now(
             tz=datetime.timezone.utc
         ) - PAYMENT_DEADLINE_TD
-        counter = 0
+        overdue = []
         for payment in self._awaiting:
             if payment.created_date >= created_deadline:
                 # All subsequent payments won't be overdue
@@ -304,8 +316,11 @@ class PaymentProcessor:
             if wallet_operation.status is model.WalletOperation.STATUS.overdue:
                 continue
             wallet_operation.status = model.WalletOperation.STATUS.overdue
-            wallet_operation.save()
+            overdue.append(wallet_operation.id)
             log.debug("Marked as overdue. payment=%r", payment)
-            counter += 1
-        if counter:
-            log.info("Marked %d payments as overdue.", counter)
+        if overdue:
+            model.WalletOperation.update_many(
+                overdue,
+                status=model.WalletOperation.STATUS.overdue,
+            )
+            log.info("Marked %d payments as overdue.", len(overdue))
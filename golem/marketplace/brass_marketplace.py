@@ -36,12 +36,14 @@ class RequestorBrassMarketStrategy(RequestorPoolingMarketStrategy):
             return None
 
         offers = cls._pools.pop(task_id)
+        reputation = dbm.get_providers_reputation(
+            offer.provider_id for offer in offers)
 
         permutation = order_providers([
             BrassMarketOffer(  # type: ignore
                 scale_price(offer.max_price, offer.price),
-                dbm.get_provider_efficiency(offer.provider_id),
-                dbm.get_provider_efficacy(offer.provider_id).vector)
+                reputation[offer.provider_id][0],
+                reputation[offer.provider_id][1].vector)
             for offer in offers
         ])
 
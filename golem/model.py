@@ -5,7 +5,7 @@ import json
 import pickle
 import sys
 import time
-from typing import Optional
+from typing import List, Optional
 
 from eth_utils import decode_hex, encode_hex
 from ethereum.utils import denoms
@@ -298,6 +298,19 @@ class WalletOperation(BaseModel):
             f" amount={self.amount/denoms.ether}{self.currency}"
         )
 
+    # Maximum number of ids in a single UPDATE query
+    # (SQLITE_MAX_VARIABLE_NUMBER)
+    UPDATE_BATCH_SIZE = 500
+
+    @classmethod
+    def update_many(cls, ids: List[int], **fields) -> None:
+        """ Set the same `fields` of many operations in a single transaction
+        """
+        with db.atomic():
+            for start in range(0, len(ids), cls.UPDATE_BATCH_SIZE):
+                chunk = ids[start:start + cls.UPDATE_BATCH_SIZE]
+                cls.update(**fields).where(cls.id << chunk).execute()
+
     @classmethod
     def deposit_transfers(cls):
         return cls.select() \
@@ -368,7 +381,9 @@ class TaskPayment(BaseModel):
 
     @classmethod
     def incomes(cls):
-        return cls.select() \
+        # Select the joined operation too, so that accessing
+        # `wallet_operation` doesn't query the database for every row
+        return cls.select(cls, WalletOperation) \
             .join(WalletOperation) \
             .where(
                 WalletOperation.operation_type
@@ -379,7 +394,7 @@ class TaskPayment(BaseModel):
 
     @classmethod
     def payments(cls):
-        return cls.select() \
+        return cls.select(cls, WalletOperation) \
             .join(WalletOperation) \
             .where(
                 WalletOperation.operation_type
@@ -555,6 +570,31 @@ class Performance(BaseModel):
             perf.save()
 
 
+class BenchmarkResult(BaseModel):
+    """ Keeps benchmark performance of an environment measured with
+    the hardware and configuration identified by a fingerprint """
+    environment_id = CharField(null=False)
+    fingerprint = CharField(null=False)
+    value = FloatField()
+
+    class Meta:
+        database = db
+        primary_key = CompositeKey('environment_id', 'fingerprint')
+
+    @classmethod
+    def update_or_create(cls, env_id, fingerprint, performance):
+        cls.insert(environment_id=env_id, fingerprint=fingerprint,
+                   value=performance).upsert().execute()
+
+    @classmethod
+    def get_value(cls, env_id, fingerprint):
+        try:
+            return cls.get(cls.environment_id == env_id,
+                           cls.fingerprint == fingerprint).value
+        except cls.DoesNotExist:
+            return None
+
+
 class DockerWhitelist(BaseModel):
     repository = CharField(primary_key=True)
 
@@ -1,14 +1,17 @@
 import calendar
+import collections
 import datetime
 import logging
 import queue
 import threading
 import time
 import typing
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urljoin
 
 from pydispatch import dispatcher
 import requests
+from requests.adapters import HTTPAdapter
 import golem_messages
 from golem_messages import message
 from golem_messages import datastructures as msg_datastructures
@@ -79,9 +82,13 @@ def verify_response(response: requests.Response) -> None:
 def send_to_concent(
         msg: message.base.Message,
         signing_key: bytes,
-        concent_variant: dict) -> typing.Optional[bytes]:
+        concent_variant: dict,
+        session: typing.Optional[requests.Session] = None) \
+        -> typing.Optional[bytes]:
     """Sends a message to the concent server
 
+    :param session: Session to send the request with, so that connections
+                    to Concent are reused. A new connection is made if None
     :return: Raw reply message, None or exception
     :rtype: Bytes|None
     """
@@ -120,7 +127,7 @@ def send_to_concent(
             concent_post_url,
             headers,
         )
-        response = requests.post(
+        response = (session or requests).post(
             concent_post_url,
             data=data,
             headers=headers,
@@ -138,7 +145,9 @@ def receive_from_concent(
         signing_key,
         public_key,
         concent_variant: dict,
-        path: str = '/api/v1/receive/') -> typing.Optional[bytes]:
+        path: str = '/api/v1/receive/',
+        session: typing.Optional[requests.Session] = None) \
+        -> typing.Optional[bytes]:
     concent_receive_url = urljoin(concent_variant['url'], path)
     headers = {
         'Content-Type': 'application/octet-stream',
@@ -155,7 +164,7 @@ def receive_from_concent(
             concent_receive_url,
             headers,
         )
-        response = requests.post(
+        response = (session or requests).post(
             concent_receive_url,
             data=data,
             headers=headers,
@@ -180,11 +189,66 @@ def build_key(*args) -> str:
     return '/'.join(str(a) for a in args)
 
 
+def ordering_key(key: typing.Hashable) -> typing.Hashable:
+    """
+    Messages with the same ordering key are sent to Concent one by one,
+    in the order of submission. For keys made by `build_key` it's the
+    first component, i.e. the subtask id.
+    """
+    if isinstance(key, str):
+        return key.split('/', 1)[0]
+    return key
+
+
+class Backoff:
+    """
+    Exponential backoff of requests to a single failure domain.
+    The delay grows `factor` times on each consecutive failure and is
+    reset on success.
+    """
+
+    def __init__(self, min_delay: float, max_delay: float,
+                 factor: float) -> None:
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.factor = factor
+        self.delay = 0.0
+        self._until = 0.0
+
+    @property
+    def remaining(self) -> float:
+        return max(0.0, self._until - time.monotonic())
+
+    @property
+    def active(self) -> bool:
+        return self.remaining > 0
+
+    def failed(self) -> None:
+        self.delay = min(max(self.delay * self.factor, self.min_delay),
+                         self.max_delay)
+        self._until = time.monotonic() + self.delay
+
+    def succeeded(self) -> None:
+        self.delay = 0.0
+        self._until = 0.0
+
+
+class ConcentRequest(typing.NamedTuple):
+    key: typing.Hashable
+    msg: message.base.Message
+    enqueued: float
+
+
 class ConcentClientService(threading.Thread):
 
     MIN_GRACE_TIME = 5  # s
     MAX_GRACE_TIME = 5 * 60  # s
     GRACE_FACTOR = 2  # n times on each failure
+    CONCURRENCY = 4  # messages sent at the same time
+    IDLE_TIME = 1  # s, maximum time between checks of the queue
+    # Failure domains with separate backoffs
+    SEND = 'send'
+    RECEIVE = 'receive'
 
     def __init__(self, keys_auth: keysauth.KeysAuth, variant: dict) -> None:
         super().__init__(daemon=True)
@@ -193,9 +257,33 @@ class ConcentClientService(threading.Thread):
         # SEE golem.core.variables.CONCENT_CHOICES
         self.variant: dict = variant
         self._stop_event = threading.Event()
+        self._wakeup = threading.Event()
 
         self._queue: queue.Queue = queue.Queue()
-        self._grace_time: int = self.MIN_GRACE_TIME
+        self._backoff = {
+            domain: Backoff(self.MIN_GRACE_TIME, self.MAX_GRACE_TIME,
+                            self.GRACE_FACTOR)
+            for domain in (self.SEND, self.RECEIVE)
+        }
+
+        # Keep-alive connections to Concent, shared by all requests
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=self.CONCURRENCY + 1)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+        self._executor: typing.Optional[ThreadPoolExecutor] = None
+
+        # ordering key -> requests waiting for the one being sent
+        self._sending: typing.Dict[
+            typing.Hashable, typing.Deque[ConcentRequest]] = dict()
+        self._lock = threading.Lock()
+        self.stats = {
+            'sent': 0,
+            'failed': 0,
+            'total_request_time': 0.0,
+            'total_latency': 0.0,
+            'max_latency': 0.0,
+        }
 
         self._delayed: dict = dict()
         self.received_messages: queue.Queue = queue.Queue(maxsize=100)
@@ -227,19 +315,42 @@ class ConcentClientService(threading.Thread):
         """
         return soft_switch.is_required_as_provider()
 
+    @property
+    def queue_depth(self) -> int:
+        """ Number of messages enqueued or being sent to Concent """
+        with self._lock:
+            return self._queue.qsize() + sum(
+                len(waiting) + 1 for waiting in self._sending.values())
+
+    def get_stats(self) -> dict:
+        stats = dict(self.stats)
+        done = stats['sent'] + stats['failed']
+        stats['queue_depth'] = self.queue_depth
+        stats['avg_latency'] = \
+            stats['total_latency'] / done if done else 0.0
+        stats['avg_request_time'] = \
+            stats['total_request_time'] / done if done else 0.0
+        return stats
+
     def run(self) -> None:
         last_receive = 0.0
         while not self._stop_event.isSet():
+            self._wakeup.clear()
             self._loop()
-            if time.time() - last_receive > variables.CONCENT_PULL_INTERVAL:
+            if time.time() - last_receive > variables.CONCENT_PULL_INTERVAL \
+                    and not self._backoff[self.RECEIVE].active:
                 last_receive = time.time()
                 self.receive()
-            time.sleep(1)
+            self._wakeup.wait(self.IDLE_TIME)
 
     def stop(self) -> None:
         self._stop_event.set()
+        self._wakeup.set()
+        if self._executor:
+            self._executor.shutdown(wait=False)
         logger.info('Waiting for received messages queue to empty')
         self.received_messages.join()
+        self._session.close()
         logger.info('%s stopped', self)
 
     def submit_task_message(
@@ -323,36 +434,114 @@ class ConcentClientService(threading.Thread):
             return True
         return False
 
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.CONCURRENCY,
+                thread_name_prefix='ConcentClient',
+            )
+        return self._executor
+
     def _loop(self) -> None:
         """
-        Main service loop. Requests from the queue are sent one by one (FIFO).
-        In case of failure, service enters a grace period.
+        Main service loop. Requests from the queue are sent concurrently,
+        up to CONCURRENCY at a time, but requests with the same ordering key
+        are sent one by one (FIFO). In case of failure, sending enters
+        a grace period.
         """
-        try:
-            msg = self._queue.get_nowait()
-        except queue.Empty:
-            return
-
-        if not self.available:
-            logger.debug('Concent disabled. Dropping %r', msg)
-            return
-
+        while not self._backoff[self.SEND].active:
+            with self._lock:
+                if len(self._sending) >= self.CONCURRENCY:
+                    return
+                try:
+                    request = self._queue.get_nowait()
+                except queue.Empty:
+                    return
+
+                if not self.available:
+                    logger.debug('Concent disabled. Dropping %r', request.msg)
+                    continue
+
+                domain = ordering_key(request.key)
+                if domain in self._sending:
+                    self._sending[domain].append(request)
+                    continue
+                self._sending[domain] = collections.deque()
+
+            self._get_executor().submit(self._send_all, domain, request)
+
+    def _send_all(self, domain: typing.Hashable,
+                  request: ConcentRequest) -> None:
+        """
+        Sends the request and then all requests with the same ordering key,
+        which were queued in the meantime.
+        """
+        while True:
+            backoff = self._backoff[self.SEND]
+            while backoff.active and not self._stop_event.is_set():
+                self._stop_event.wait(backoff.remaining)
+            if self._stop_event.is_set():
+                return
+
+            try:
+                self._send(request)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception('Processing Concent request %r failed',
+                                 request.key)
+
+            with self._lock:
+                waiting = self._sending[domain]
+                if not waiting:
+                    del self._sending[domain]
+                    break
+                request = waiting.popleft()
+        # A slot is free, so more requests may be sent
+        self._wakeup.set()
+
+    def _send(self, request: ConcentRequest) -> None:
+        msg = request.msg
+        start = time.monotonic()
         try:
             res = send_to_concent(
                 msg,
                 self.keys_auth._private_key,  # pylint: disable=protected-access
                 concent_variant=self.variant,
+                session=self._session,
             )
+        except exceptions.ConcentRequestError as e:
+            # Concent is fine, it's only this request that was rejected
+            logger.info('send_to_concent error: %s', e)
+            self._update_stats(request, start, failed=True)
         except exceptions.ConcentError as e:
             logger.info('send_to_concent error: %s', e)
-            self._grace_sleep()
+            self._update_stats(request, start, failed=True)
+            self._backoff[self.SEND].failed()
         except Exception:  # pylint: disable=broad-except
             logger.exception('send_to_concent(%r) failed', msg)
-            self._grace_sleep()
+            self._update_stats(request, start, failed=True)
+            self._backoff[self.SEND].failed()
         else:
-            self._grace_time = self.MIN_GRACE_TIME
+            self._update_stats(request, start)
+            self._backoff[self.SEND].succeeded()
             self.react_to_concent_message(res, response_to=msg)
 
+    def _update_stats(self, request: ConcentRequest, start: float,
+                      failed: bool = False) -> None:
+        now = time.monotonic()
+        latency = now - request.enqueued
+        with self._lock:
+            self.stats['failed' if failed else 'sent'] += 1
+            self.stats['total_request_time'] += now - start
+            self.stats['total_latency'] += latency
+            self.stats['max_latency'] = max(self.stats['max_latency'],
+                                            latency)
+        logger.debug(
+            'Concent request %r took %.3fs, %.3fs since submission',
+            request.key,
+            now - start,
+            latency,
+        )
+
     def receive(self) -> None:
         if not self.available:
             return
@@ -362,15 +551,17 @@ class ConcentClientService(threading.Thread):
                 signing_key=self.keys_auth._private_key,  # noqa pylint: disable=protected-access
                 public_key=self.keys_auth.public_key,
                 concent_variant=self.variant,
+                session=self._session,
             )
         except exceptions.ConcentError as e:
             logger.warning("Can't receive message from Concent: %s", e)
-            self._grace_sleep()
+            self._backoff[self.RECEIVE].failed()
             return
         except Exception:  # pylint: disable=broad-except
             logger.exception('receive_from_concent() failed')
-            self._grace_sleep()
+            self._backoff[self.RECEIVE].failed()
             return
+        self._backoff[self.RECEIVE].succeeded()
         self.react_to_concent_message(res)
 
     @staticmethod
@@ -403,17 +594,11 @@ class ConcentClientService(threading.Thread):
         else:
             self.process_synchronous_response(msg, response_to)
 
-    def _grace_sleep(self):
-        self._grace_time = min(self._grace_time * self.GRACE_FACTOR,
-                               self.MAX_GRACE_TIME)
-
-        logger.debug('Concent grace time: %r', self._grace_time)
-        time.sleep(self._grace_time)
-
     def _enqueue(self, key, msg):
         logger.debug("_enqueue(%r, %r)", key, msg)
         self._delayed.pop(key, None)
-        self._queue.put(msg)
+        self._queue.put(ConcentRequest(key, msg, time.monotonic()))
+        self._wakeup.set()
 
     def income_listener(self, event, **kwargs):
         logger.debug("income listener event: %s", event)
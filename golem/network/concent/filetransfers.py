@@ -1,9 +1,15 @@
 import base64
+import hashlib
 import logging
+import os
+import threading
+import time
 import typing
 import queue
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
+from requests.adapters import HTTPAdapter
 
 import golem_messages
 from golem_messages.message.concents import (
@@ -18,6 +24,11 @@ from .helpers import ssl_kwargs
 
 logger = logging.getLogger(__name__)
 
+# Size of chunks in which transferred files are read, written and hashed
+CHUNK_SIZE = 1 << 16
+# Suffix of partially downloaded files
+PART_SUFFIX = '.part'
+
 
 class ConcentFileRequest:
     def __init__(self,  # noqa pylint:disable=too-many-arguments
@@ -47,19 +58,98 @@ class ConcentFiletransferError(Exception):
     pass
 
 
+def new_checksum(checksum: typing.Optional[str]):
+    """
+    Returns a hash object for the algorithm of a `FileInfo` checksum
+    (e.g. 'sha1:<hex digest>') or None if there's no checksum.
+    """
+    if not checksum:
+        return None
+    algorithm, _, _ = checksum.partition(':')
+    return hashlib.new(algorithm)
+
+
+def verify_checksum(hash_obj, checksum: typing.Optional[str],
+                    size: typing.Optional[int], actual_size: int) -> None:
+    if size is not None and size != actual_size:
+        raise ConcentFiletransferError(
+            'Size mismatch: expected {}, got {}'.format(size, actual_size))
+    if hash_obj is None:
+        return
+    actual = '{}:{}'.format(hash_obj.name, hash_obj.hexdigest())
+    if actual != checksum:
+        raise ConcentFiletransferError(
+            'Checksum mismatch: expected {}, got {}'.format(checksum, actual))
+
+
+class ChecksumReader:
+    """
+    Wraps a file that's being uploaded and computes its checksum on the fly.
+    The checksum is verified before the last chunk is returned, so a file
+    which doesn't match its `FileInfo` is never fully sent.
+    """
+
+    def __init__(self, file: typing.BinaryIO, size: int,
+                 checksum: typing.Optional[str] = None,
+                 expected_size: typing.Optional[int] = None) -> None:
+        self._file = file
+        self._size = size
+        self._read = 0
+        self._checksum = checksum
+        self._expected_size = expected_size
+        self._hash = new_checksum(checksum)
+        self._verified = False
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self):
+        chunk = self.read(CHUNK_SIZE)
+        while chunk:
+            yield chunk
+            chunk = self.read(CHUNK_SIZE)
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = self._size - self._read
+        chunk = self._file.read(min(size, self._size - self._read))
+        self._read += len(chunk)
+        if self._hash is not None:
+            self._hash.update(chunk)
+        if self._read == self._size and not self._verified:
+            verify_checksum(self._hash, self._checksum,
+                            self._expected_size, self._read)
+            self._verified = True
+        return chunk
+
+
 class ConcentFiletransferService(LoopingCallService):
     """
     Golem service responsible for exchanging files with the Concent service.
     """
 
+    # Attempts of a transfer interrupted by a network error
+    RETRIES = 3
+    RETRY_DELAY = 1.0  # s, doubled on each retry
+
     def __init__(self,
                  keys_auth: keysauth.KeysAuth,
                  variant: dict,
-                 interval_seconds: int = 1,) -> None:
+                 interval_seconds: int = 1,
+                 concurrency: int = 1) -> None:
         # SEE golem.core.variables.CONCENT_CHOICES
         self.variant = variant
         self.keys_auth = keys_auth
+        self.concurrency = max(1, concurrency)
         self._transfers: queue.Queue = queue.Queue()
+        self._active = 0
+        self._lock = threading.Lock()
+        self._executor: typing.Optional[ThreadPoolExecutor] = None
+        # Keep-alive connections to the storage cluster
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=self.concurrency)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
         super().__init__(interval_seconds=interval_seconds)
 
     def start(self, now: bool = True):
@@ -69,6 +159,9 @@ class ConcentFiletransferService(LoopingCallService):
     def stop(self):
         self._transfers.join()
         super().stop()
+        if self._executor:
+            self._executor.shutdown()
+            self._executor = None
         logger.debug("Concent Filetransfer Service stopped")
 
     def transfer(self,  # noqa pylint:disable=too-many-arguments
@@ -89,33 +182,93 @@ class ConcentFiletransferService(LoopingCallService):
         logger.debug("Scheduling: %r", request)
         self._transfers.put(request)
 
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.concurrency,
+                thread_name_prefix='ConcentFiletransfer',
+            )
+        return self._executor
+
     def _run(self):
+        """ Starts queued transfers, up to `concurrency` at the same time """
+        while True:
+            with self._lock:
+                if self._active >= self.concurrency:
+                    return
+                try:
+                    request = self._transfers.get_nowait()
+                except queue.Empty:
+                    return
+                self._active += 1
+            self._get_executor().submit(self._process_queued, request)
+
+    def _process_queued(self, request: ConcentFileRequest):
+        """ Transfers the file on the thread pool, callbacks of the request
+        are called on the reactor thread """
+        from twisted.internet import reactor
         try:
-            request = self._transfers.get_nowait()
-        except queue.Empty:
-            return
-        self.process(request)
-        self._transfers.task_done()
+            response = self._transfer(request)
+        except Exception as e:  # noqa pylint:disable=broad-except
+            reactor.callFromThread(self._finish, request, None, e)
+        else:
+            reactor.callFromThread(self._finish, request, response)
+        finally:
+            with self._lock:
+                self._active -= 1
+            self._transfers.task_done()
+
+    def _finish(self, request: ConcentFileRequest, response,
+                error: typing.Optional[Exception] = None):
+        try:
+            self._notify(request, response, error)
+        except Exception:  # noqa pylint:disable=broad-except
+            logger.exception("Concent file transfer failed: %r", request)
 
     def process(self, request: ConcentFileRequest):
-        logger.debug("Processing: %r", request)
         try:
-            if request.file_transfer_token.is_upload:
-                response = self.upload(request)
-            else:
-                response = self.download(request)
-            if not response.ok:
-                raise ConcentFiletransferError(
-                    '{}: {}'.format(response.status_code, response.text))
+            response = self._transfer(request)
         except Exception as e:  # noqa pylint:disable=broad-except
+            return self._notify(request, None, e)
+        return self._notify(request, response)
+
+    def _transfer(self, request: ConcentFileRequest):
+        logger.debug("Processing: %r", request)
+        if request.file_transfer_token.is_upload:
+            response = self._retry(self.upload, request)
+        else:
+            response = self._retry(self.download, request)
+        if not response.ok:
+            raise ConcentFiletransferError(
+                '{}: {}'.format(response.status_code, response.text))
+        return response
+
+    @staticmethod
+    def _notify(request: ConcentFileRequest, response,
+                error: typing.Optional[Exception] = None):
+        if error is not None:
             if request.error:
-                request.error(e)
+                request.error(error)
                 return None
-            else:
-                raise e
-
+            raise error
         return request.success(response) if request.success else response
 
+    def _retry(self, transfer: typing.Callable, request: ConcentFileRequest):
+        delay = self.RETRY_DELAY
+        attempt = 1
+        while True:
+            try:
+                return transfer(request)
+            except (requests.exceptions.ConnectionError,
+                    requests.exceptions.Timeout,
+                    requests.exceptions.ChunkedEncodingError) as e:
+                if attempt >= self.RETRIES:
+                    raise
+                logger.info("Retrying %r in %.1fs: %r", request, delay, e)
+            time.sleep(delay)
+            delay *= 2
+            attempt += 1
+
     @staticmethod
     def _get_upload_uri(file_transfer_token: FileTransferToken):
         return '{}upload/'.format(
@@ -152,10 +305,16 @@ class ConcentFiletransferService(LoopingCallService):
         }
 
     def upload(self, request: ConcentFileRequest):
+        """
+        Uploads the whole file, verifying its checksum while it's sent.
+        The storage cluster doesn't accept partial uploads, so interrupted
+        uploads are started over.
+        """
         uri = self._get_upload_uri(request.file_transfer_token)
         ftt = request.file_transfer_token
         headers = self._get_auth_headers(ftt)
-        path = ftt.get_file_info(request.file_category).get('path')
+        file_info = ftt.get_file_info(request.file_category)
+        path = file_info.get('path')
         headers.update({
             'Concent-Upload-Path': path,
             'Content-Type': 'application/octet-stream',
@@ -165,17 +324,62 @@ class ConcentFiletransferService(LoopingCallService):
                      request.file_path, uri, headers)
 
         with open(request.file_path, mode='rb') as f:
-            response = requests.post(
-                uri, data=f, headers=headers, **ssl_kwargs(self.variant))
+            data = ChecksumReader(
+                f, os.fstat(f.fileno()).st_size,
+                checksum=file_info.get('checksum'),
+                expected_size=file_info.get('size'))
+            response = self._session.post(
+                uri, data=data, headers=headers, **ssl_kwargs(self.variant))
         return response
 
     def download(self, request: ConcentFileRequest):
+        """
+        Downloads the file to a '.part' file first, which is renamed once
+        the download is complete and matches its checksum. A download
+        interrupted before is resumed with a ranged request.
+        """
         uri = self._get_download_uri(request.file_transfer_token,
                                      request.file_category)
+        file_info = request.file_transfer_token.get_file_info(
+            request.file_category)
         headers = self._get_auth_headers(request.file_transfer_token)
-        response = requests.get(
+
+        part_path = request.file_path + PART_SUFFIX
+        offset = os.path.getsize(part_path) \
+            if os.path.exists(part_path) else 0
+        if offset:
+            headers['Range'] = 'bytes={}-'.format(offset)
+
+        response = self._session.get(
             uri, stream=True, headers=headers, **ssl_kwargs(self.variant))
-        with open(request.file_path, mode='wb') as f:
-            for chunk in response.iter_content(chunk_size=None):
+        if not response.ok:
+            if response.status_code == 416:
+                # The part file is invalid, start over the next time
+                os.remove(part_path)
+            return response
+        if response.status_code != 206:
+            # The whole file is sent
+            offset = 0
+
+        hash_obj = new_checksum(file_info.get('checksum'))
+        if offset and hash_obj is not None:
+            with open(part_path, mode='rb') as f:
+                for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                    hash_obj.update(chunk)
+
+        size = offset
+        with open(part_path, mode='ab' if offset else 'wb') as f:
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
                 f.write(chunk)
+                size += len(chunk)
+                if hash_obj is not None:
+                    hash_obj.update(chunk)
+
+        try:
+            verify_checksum(hash_obj, file_info.get('checksum'),
+                            file_info.get('size'), size)
+        except ConcentFiletransferError:
+            os.remove(part_path)
+            raise
+        os.replace(part_path, request.file_path)
         return response
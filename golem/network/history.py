@@ -4,8 +4,10 @@ import operator
 import pickle
 import queue
 import threading
+import time
+from collections import OrderedDict
 from functools import reduce, wraps
-from typing import List
+from typing import Any, Dict, List, Tuple
 from typing import Optional
 
 from golem_messages import message
@@ -13,7 +15,7 @@ from peewee import (PeeweeException, DataError, ProgrammingError,
                     NotSupportedError, Field, IntegrityError)
 
 from golem.core.service import IService
-from golem.model import NetworkMessage, Actor
+from golem.model import NetworkMessage, Actor, db
 
 logger = logging.getLogger('golem.network.history')
 
@@ -35,6 +37,11 @@ class MessageHistoryService(IService):
     - NetworkMessages have to be saved ASAP
     - removal and sweeping is not critical and can be slightly delayed
 
+    Queued messages are saved in batches of at most `max_batch_size`,
+    each batch in a single transaction. A batch is written as soon as it's
+    full or `flush_interval` seconds after its first message was queued.
+    Queued removals are grouped by task and executed in a single transaction.
+
     Background operations performed by this service do not fit the looping call
     model of golem.core.service.LoopingCallService.
     """
@@ -42,12 +49,19 @@ class MessageHistoryService(IService):
     MESSAGE_LIFETIME = datetime.timedelta(days=1)
     SWEEP_INTERVAL = datetime.timedelta(hours=12)
     QUEUE_TIMEOUT = datetime.timedelta(seconds=2).total_seconds()
+    FLUSH_INTERVAL = datetime.timedelta(milliseconds=500).total_seconds()
+    MAX_BATCH_SIZE = 500
+    # Rows per INSERT query, keeps the number of query parameters below
+    # SQLITE_MAX_VARIABLE_NUMBER
+    INSERT_CHUNK_SIZE = 90
 
     # Decorators (at the end of this file) need to access an instance
     # of MessageHistoryService
     instance = None
 
-    def __init__(self):
+    def __init__(self,
+                 flush_interval: Optional[float] = None,
+                 max_batch_size: Optional[int] = None) -> None:
         IService.__init__(self)
 
         if self.__class__.instance is None:
@@ -55,11 +69,23 @@ class MessageHistoryService(IService):
 
         self._thread = None  # set in start
         self._queue_timeout = None  # set in start
+        self._flush_timeout = None  # set in start
+        self.flush_interval = self.FLUSH_INTERVAL if flush_interval is None \
+            else flush_interval
+        self.max_batch_size = self.MAX_BATCH_SIZE if max_batch_size is None \
+            else max(1, max_batch_size)
         self._stop_event = threading.Event()
         self._save_queue = queue.Queue()
         self._remove_queue = queue.Queue()
         self._sweep_ts = datetime.datetime.now()
 
+        self._metrics_lock = threading.Lock()
+        self._flushes = 0
+        self._saved = 0
+        self._removed = 0
+        self._last_flush_latency = 0.0
+        self._max_flush_latency = 0.0
+
     def run(self) -> None:
         """
         Thread activity method.
@@ -84,6 +110,7 @@ class MessageHistoryService(IService):
 
         self._stop_event.clear()
         self._queue_timeout = self.QUEUE_TIMEOUT
+        self._flush_timeout = self.flush_interval
         self._thread = threading.Thread(target=self.run, daemon=True)
         self._thread.start()
 
@@ -95,9 +122,26 @@ class MessageHistoryService(IService):
         self.instance = None
 
         self._queue_timeout = 0
+        self._flush_timeout = 0
         while not self._save_queue.empty():
             self._loop()
 
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Returns queue depths and statistics of background writes.
+        Latencies are in seconds.
+        """
+        with self._metrics_lock:
+            return {
+                'save_queue_depth': self._save_queue.qsize(),
+                'remove_queue_depth': self._remove_queue.qsize(),
+                'flushes': self._flushes,
+                'saved': self._saved,
+                'removed': self._removed,
+                'last_flush_latency': self._last_flush_latency,
+                'max_flush_latency': self._max_flush_latency,
+            }
+
     @classmethod
     def get_sync(cls, **properties) -> List[NetworkMessage]:
         """
@@ -209,8 +253,8 @@ class MessageHistoryService(IService):
         """
         Main service loop.
         - calls _sweep every SWEEP_INTERVAL
-        - saves queued (1) messages to database (FIFO)
-        - removes queued (2) messages from database
+        - removes queued messages from database (in a batch)
+        - saves queued messages to database (FIFO, in a batch)
         """
 
         # Sweep messages.
@@ -221,20 +265,126 @@ class MessageHistoryService(IService):
             self._sweep_ts = now + self.SWEEP_INTERVAL
 
         # Remove messages
+        removals = self._collect(self._remove_queue, None, 0)
+        if removals:
+            self._flush(self._remove_batch, removals)
+
+        # Save messages
+        msg_dicts = self._collect(self._save_queue, self._queue_timeout,
+                                  self._flush_timeout or 0)
+        if msg_dicts:
+            self._flush(self._save_batch, msg_dicts)
+
+    def _collect(self, source: queue.Queue, timeout: Optional[float],
+                 flush_timeout: float) -> list:
+        """
+        Pops up to max_batch_size items from the queue.
+        :param timeout: Time to wait for the first item, None if the method
+                        shouldn't wait
+        :param flush_timeout: Time to wait for subsequent items
+        """
+        items = []
         try:
-            task, parameters = self._remove_queue.get(False)
+            if timeout is None:
+                items.append(source.get(False))
+            else:
+                items.append(source.get(True, timeout))
         except queue.Empty:
-            pass
+            return items
+
+        deadline = time.monotonic() + flush_timeout
+        while len(items) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    items.append(source.get(True, remaining))
+                else:
+                    items.append(source.get(False))
+            except queue.Empty:
+                break
+        return items
+
+    def _flush(self, method, items: list) -> None:
+        started = time.monotonic()
+        db.write(method, items)
+        latency = time.monotonic() - started
+        with self._metrics_lock:
+            self._flushes += 1
+            self._last_flush_latency = latency
+            self._max_flush_latency = max(self._max_flush_latency, latency)
+
+    def _save_batch(self, msg_dicts: List[dict]) -> None:
+        """
+        Saves messages in a single transaction. Falls back to saving
+        messages one by one if the batch contains an invalid message.
+        """
+        try:
+            with db.atomic():
+                for i in range(0, len(msg_dicts), self.INSERT_CHUNK_SIZE):
+                    NetworkMessage.insert_many(
+                        msg_dicts[i:i + self.INSERT_CHUNK_SIZE],
+                    ).execute()
+        except (DataError, ProgrammingError, NotSupportedError,
+                TypeError, IntegrityError) as exc:
+            # Unrecoverable error, find out which messages are affected
+            logger.debug("Cannot save message batch: %r", exc)
+            for msg_dict in msg_dicts:
+                self.add_sync(msg_dict)
+        except PeeweeException:
+            # Temporary error
+            logger.warning("Message batch save queued (%d messages)",
+                           len(msg_dicts))
+            for msg_dict in msg_dicts:
+                self._save_queue.put(msg_dict)
         else:
-            self.remove_sync(task, **parameters)
+            with self._metrics_lock:
+                self._saved += len(msg_dicts)
+
+    def _remove_batch(self, removals: List[Tuple[str, dict]]) -> None:
+        """
+        Removes messages in a single transaction, one query per task.
+        """
+        by_task: Dict[str, list] = OrderedDict()
+        for task, properties in removals:
+            by_task.setdefault(task, []).append(
+                self.build_clauses(**properties),
+            )
+
+        # Tasks whose messages are removed entirely share a single query
+        whole_tasks = [task for task, alternatives in by_task.items()
+                       if not all(alternatives)]
+        queries = []
+        if whole_tasks:
+            queries.append(NetworkMessage.task << whole_tasks)
+        for task, alternatives in by_task.items():
+            if task in whole_tasks:
+                continue
+            queries.append(
+                (NetworkMessage.task == task)
+                & reduce(operator.or_, [reduce(operator.and_, clauses)
+                                        for clauses in alternatives])
+            )
 
-        # Save messages
         try:
-            msg_dict = self._save_queue.get(True, self._queue_timeout)
-        except queue.Empty:
-            pass
+            removed = 0
+            with db.atomic():
+                for where in queries:
+                    removed += NetworkMessage.delete() \
+                        .where(where) \
+                        .execute() or 0
+        except (DataError, ProgrammingError, NotSupportedError,
+                TypeError, IntegrityError) as exc:
+            # Unrecoverable error
+            logger.error("Cannot remove task messages from the database: "
+                         "(tasks: %r): %r", list(by_task), exc)
+        except PeeweeException:
+            # Temporary error
+            logger.warning("Message removal queued (%d tasks)", len(by_task))
+            for removal in removals:
+                self._remove_queue.put(removal)
         else:
-            self.add_sync(msg_dict)
+            with self._metrics_lock:
+                self._removed += removed
 
     def _sweep(self) -> None:
         """
@@ -16,6 +16,7 @@ from typing import (
 from golem_messages import message
 from golem_messages.datastructures import p2p as dt_p2p
 from golem_messages.datastructures import tasks as dt_tasks
+from twisted.internet.defer import Deferred
 
 from golem.config.active import P2P_SEEDS
 from golem.core import simplechallenge
@@ -103,6 +104,7 @@ class P2PService(tcpserver.PendingConnectionsServer, DiagnosticsProvider):  # no
         self.challenge_history = deque(maxlen=HISTORY_LEN)
         self.last_challenge = ""
         self.base_difficulty = BASE_DIFFICULTY
+        self.challenge_solver = simplechallenge.ChallengeSolver()
         self.connect_to_known_hosts = connect_to_known_hosts
 
         # Peers options
@@ -526,22 +528,29 @@ class P2PService(tcpserver.PendingConnectionsServer, DiagnosticsProvider):  # no
             solution,
             difficulty)
 
-    def solve_challenge(self, key_id, challenge, difficulty):
-        """ Solve challenge with given difficulty for a node with key_id
+    def solve_challenge(self, key_id, challenge, difficulty) -> Deferred:
+        """ Solve challenge with given difficulty for a node with key_id,
+        without blocking the reactor. Cancel the returned deferred to stop
+        solving.
         :param str key_id: key id of a node that has send this challenge
         :param str challenge: puzzle to solve
         :param int difficulty: difficulty of challenge
-        :return str: solution of a challenge
+        :return Deferred: solution of a challenge
         """
         self.challenge_history.append([key_id, challenge])
-        solution, time_ = simplechallenge.solve_challenge(
-            challenge, difficulty)
-        logger.debug(
-            "Solved challenge with difficulty %r in %r sec",
-            difficulty,
-            time_
-        )
-        return solution
+
+        def _solved(result):
+            solution, time_ = result
+            logger.debug(
+                "Solved challenge with difficulty %r in %r sec",
+                difficulty,
+                time_
+            )
+            return solution
+
+        deferred = self.challenge_solver.solve(challenge, difficulty)
+        deferred.addCallback(_solved)
+        return deferred
 
     def get_peers_degree(self):
         """ Return peers degree level
@@ -693,6 +702,15 @@ class P2PService(tcpserver.PendingConnectionsServer, DiagnosticsProvider):  # no
         """
         return self.task_server.add_task_header(task_header)
 
+    def add_task_headers(self, task_headers: List[dt_tasks.TaskHeader]) \
+            -> Deferred:
+        """ Add new task headers to a list of known task headers. Their
+        signatures are verified in background.
+        :return Deferred: fires with a list of results, True if a task header
+                          was in a right format, False otherwise
+        """
+        return self.task_server.add_task_headers(task_headers)
+
     def remove_task_header(self, task_id) -> bool:
         """ Remove header of a task with given id from a list of a known tasks
         :param str task_id: id of a task that should be removed
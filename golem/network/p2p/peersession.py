@@ -7,6 +7,7 @@ import semantic_version
 from golem_messages import message
 from golem_messages.datastructures import p2p as dt_p2p
 from pydispatch import dispatcher
+from twisted.internet.defer import CancelledError, Deferred
 
 import golem
 from golem import constants as gconst
@@ -84,6 +85,8 @@ class PeerSession(BasicSafeSession):
         # Verification by challenge not a random value
         self.solve_challenge = False
         self.challenge = None
+        # Challenge sent by the peer, being solved at the moment
+        self._solving: typing.Optional[Deferred] = None
         self.difficulty = 0
 
         self.can_be_unverified.extend(
@@ -101,6 +104,8 @@ class PeerSession(BasicSafeSession):
         """
         Close connection and inform p2p service about disconnection
         """
+        if self._solving is not None:
+            self._solving.cancel()
         BasicSafeSession.dropped(self)
         self.p2p_service.remove_peer(self)
 
@@ -317,12 +322,23 @@ class PeerSession(BasicSafeSession):
             self.send(message.base.RandVal(rand_val=msg.rand_val))
 
     def _solve_challenge(self, challenge, difficulty):
-        solution = self.p2p_service.solve_challenge(
+        def _solved(solution):
+            self._solving = None
+            self.send(message.base.ChallengeSolution(solution=solution))
+
+        def _failed(failure):
+            self._solving = None
+            if failure.check(CancelledError):
+                return
+            logger.error("Cannot solve challenge: %r", failure.value)
+            self.disconnect(message.base.Disconnect.REASON.Unverified)
+
+        self._solving = self.p2p_service.solve_challenge(
             self.key_id,
             challenge,
             difficulty
         )
-        self.send(message.base.ChallengeSolution(solution=solution))
+        self._solving.addCallbacks(_solved, _failed)
 
     def _react_to_get_peers(self, msg):
         self._send_peers()
@@ -363,11 +379,20 @@ class PeerSession(BasicSafeSession):
         logger.debug("Running handler for `Tasks`. msg=%r", msg)
         for t in msg.tasks:
             logger.debug("Task information received. task header: %r", t)
-            if not self.p2p_service.add_task_header(t):
+
+        def _added(results):
+            if not all(results):
                 self.disconnect(
                     message.base.Disconnect.REASON.BadProtocol
                 )
 
+        def _error(failure):
+            logger.error("Cannot add task headers: %r", failure.value)
+            logger.debug("Detailed traceback", exc_info=failure.value)
+
+        deferred = self.p2p_service.add_task_headers(msg.tasks)
+        deferred.addCallbacks(_added, _error)
+
     def _react_to_remove_task(self, msg):
         if not self._verify_remove_task(msg):
             return
@@ -1,3 +1,4 @@
+import collections
 import datetime
 import logging
 import threading
@@ -13,32 +14,48 @@ from golem.core import variables
 
 
 logger = logging.getLogger(__name__)
-READ_LOCK = threading.Lock()
+READ_LOCK = threading.RLock()
 # CLasses that aren't allowed in queue
 FORBIDDEN_CLASSES = (
     message.base.Disconnect,
     message.base.Hello,
     message.base.RandVal,
 )
+# Seconds between putting a message into the queue and persisting it
+FLUSH_INTERVAL = 1.0
+# Maximum number of ids in a single DELETE query (SQLITE_MAX_VARIABLE_NUMBER)
+DELETE_BATCH_SIZE = 500
+
+# Queued messages are kept in memory, in per node deques ordered by
+# creation time. Database only mirrors them to survive restarts.
+_queues: typing.Dict[str, typing.Deque[model.QueuedMessage]] = {}
+# Messages not persisted yet, by node
+_unsaved: typing.Dict[str, typing.List[model.QueuedMessage]] = {}
+_flush_call = None
 
 
 def put(node_id: str, msg: message.base.Message) -> None:
     assert not isinstance(msg, FORBIDDEN_CLASSES),\
         "Disconnect message shouldn't be in a queue"
     db_model = model.QueuedMessage.from_message(node_id, msg)
-    db_model.save()
+    with READ_LOCK:
+        _queues.setdefault(node_id, collections.deque()).append(db_model)
+        _unsaved.setdefault(node_id, []).append(db_model)
+    _schedule_flush()
 
 
 def get(node_id: str) -> typing.Iterator['message.base.Base']:
-    while True:
-        with READ_LOCK:
-            try:
-                db_model = model.QueuedMessage.select()\
-                    .where(
-                        model.QueuedMessage.node == node_id,
-                    ).order_by(model.QueuedMessage.created_date).get()
-            except model.QueuedMessage.DoesNotExist:
-                return
+    with READ_LOCK:
+        db_models = _queues.pop(node_id, None)
+        if not db_models:
+            return
+        _unsaved.pop(node_id, None)
+        _delete([db_model.id for db_model in db_models
+                 if db_model.id is not None])
+
+    try:
+        while db_models:
+            db_model = db_models.popleft()
             try:
                 msg = db_model.as_message()
             except msg_exceptions.VersionMismatchError:
@@ -58,22 +75,37 @@ def get(node_id: str) -> typing.Iterator['message.base.Base']:
                     exc_info=True,
                 )
                 continue
-            finally:
-                db_model.delete_instance()
-        yield msg
+            yield msg
+    finally:
+        if db_models:
+            # Iteration was interrupted, queue remaining messages again
+            _requeue(node_id, db_models)
 
 
 def waiting() -> typing.Iterator[str]:
-    for db_row in model.QueuedMessage.select(
-            model.QueuedMessage.node,
-    ).group_by(model.QueuedMessage.node):
-        yield db_row.node
+    with READ_LOCK:
+        nodes = [node_id for node_id, db_models in _queues.items()
+                 if db_models]
+    yield from nodes
 
 
 @decorators.run_with_db()
 def sweep() -> None:
     """Sweep ancient messages"""
     with READ_LOCK:
+        oldest_allowed = model.default_now() \
+            - variables.MESSAGE_QUEUE_MAX_AGE
+        for node_id in list(_queues):
+            db_models = _queues[node_id]
+            while db_models and db_models[0].created_date < oldest_allowed:
+                db_models.popleft()
+            if not db_models:
+                del _queues[node_id]
+            if node_id in _unsaved:
+                _unsaved[node_id] = [
+                    db_model for db_model in _unsaved[node_id]
+                    if db_model.created_date >= oldest_allowed
+                ]
         oldest_allowed = datetime.datetime.now() \
             - variables.MESSAGE_QUEUE_MAX_AGE
         count = model.QueuedMessage.delete().where(
@@ -81,3 +113,97 @@ def sweep() -> None:
         ).execute()
     if count:
         logger.info('Sweeped ancient messages from queue. count=%d', count)
+
+
+def flush() -> None:
+    """Persist all messages put into the queue since the last flush"""
+    global _flush_call  # pylint: disable=global-statement
+    if _flush_call is not None and _flush_call.active():
+        _flush_call.cancel()
+    _flush_call = None
+    if model.db.is_closed():
+        logger.debug('Queued messages not persisted. DB inactive')
+        return
+
+    with READ_LOCK:
+        unsaved = [db_model for db_models in _unsaved.values()
+                   for db_model in db_models]
+        if not unsaved:
+            return
+        try:
+            model.db.write(_insert, unsaved)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception('Cannot persist queued messages')
+            for db_model in unsaved:
+                db_model.id = None
+            _schedule_flush()
+            return
+        _unsaved.clear()
+    logger.debug('Persisted queued messages. count=%d', len(unsaved))
+
+
+@decorators.run_with_db()
+def recover() -> None:
+    """Replace queue contents with messages persisted in the database.
+    Should be called once on startup.
+    """
+    with READ_LOCK:
+        _queues.clear()
+        _unsaved.clear()
+        count = 0
+        for db_model in model.QueuedMessage.select().order_by(
+                model.QueuedMessage.created_date,
+                model.QueuedMessage.id,
+        ):
+            _queues.setdefault(db_model.node, collections.deque())\
+                .append(db_model)
+            count += 1
+    if count:
+        logger.info(
+            'Recovered queued messages. count=%d, nodes=%d',
+            count,
+            len(_queues),
+        )
+
+
+def _requeue(node_id: str,
+             db_models: typing.Deque[model.QueuedMessage]) -> None:
+    with READ_LOCK:
+        # Rows of these messages have already been deleted
+        unsaved = _unsaved.setdefault(node_id, [])
+        for db_model in db_models:
+            db_model.id = None
+        unsaved[:0] = db_models
+        queued = _queues.get(node_id)
+        if queued:
+            db_models.extend(queued)
+        _queues[node_id] = db_models
+    _schedule_flush()
+
+
+def _delete(ids: typing.List[int]) -> None:
+    if not ids or model.db.is_closed():
+        return
+    model.db.write(_delete_rows, ids)
+
+
+def _insert(db_models: typing.List[model.QueuedMessage]) -> None:
+    with model.db.atomic():
+        for db_model in db_models:
+            db_model.save(force_insert=True)
+
+
+def _delete_rows(ids: typing.List[int]) -> None:
+    with model.db.atomic():
+        for start in range(0, len(ids), DELETE_BATCH_SIZE):
+            model.QueuedMessage.delete().where(
+                model.QueuedMessage.id << ids[start:start+DELETE_BATCH_SIZE],
+            ).execute()
+
+
+def _schedule_flush() -> None:
+    global _flush_call  # pylint: disable=global-statement
+    if _flush_call is not None:
+        return
+    from twisted.internet import reactor
+    _flush_call = reactor.callLater(FLUSH_INTERVAL, flush)
@@ -1,5 +1,4 @@
 import logging
-import struct
 import time
 
 import golem_messages
@@ -10,7 +9,7 @@ from twisted.internet.endpoints import TCP4ServerEndpoint, \
     HostnameEndpoint
 from twisted.internet.protocol import connectionDone
 
-from golem.core.databuffer import DataBuffer
+from golem.core.framedecoder import FrameDecoder
 from golem.core.hostaddress import get_host_addresses
 from golem.network.transport.limiter import CallRateLimiter
 from .network import Network, SessionProtocol, IncomingProtocolFactoryWrapper, \
@@ -272,7 +271,10 @@ class BasicProtocol(SessionProtocol):
     def __init__(self):
         super().__init__()
         self.opened = False
-        self.db = DataBuffer()
+        self.decoder = FrameDecoder(
+            MAX_MESSAGE_SIZE,
+            oversized_callback=self._oversized_frame,
+        )
         self.spam_protector = SpamProtector()
 
     def send_message(self, msg):
@@ -336,17 +338,14 @@ class BasicProtocol(SessionProtocol):
     # Protected functions
     def _prepare_msg_to_send(self, msg):
         ser_msg = golem_messages.dump(msg, None, None)
-
-        db = DataBuffer()
-        db.append_len_prefixed_bytes(ser_msg)
-        return db.read_all()
+        return FrameDecoder.encode(ser_msg)
 
     def _can_receive(self) -> bool:
-        return self.opened and isinstance(self.db, DataBuffer)
+        return self.opened and isinstance(self.decoder, FrameDecoder)
 
     def _interpret(self, data):
         self.session.last_message_time = time.time()
-        self.db.append_bytes(data)
+        self.decoder.feed(data)
         mess = self._data_to_messages()
         for m in mess:
             self.session.interpret(m)
@@ -362,15 +361,10 @@ class BasicProtocol(SessionProtocol):
     def _data_to_messages(self):
         messages = []
 
-        for data in self.db.get_len_prefixed_bytes():
-            if len(data) > MAX_MESSAGE_SIZE:
-                logger.info(
-                    'Ignoring huge message %dB from %r',
-                    len(data),
-                    self.transport.getPeer(),
-                )
-                continue
-
+        for frame in self.decoder.frames():
+            # Signature checks in golem_messages concatenate slices of the
+            # message, which memoryview doesn't support
+            data = bytes(frame)
             try:
                 if not self.spam_protector.check_msg(data):
                     continue
@@ -415,6 +409,13 @@ class BasicProtocol(SessionProtocol):
 
         return messages
 
+    def _oversized_frame(self, length: int) -> None:
+        logger.info(
+            'Ignoring huge message %dB from %r',
+            length,
+            self.transport.getPeer(),
+        )
+
 
 class ServerProtocol(BasicProtocol):
     """ Basic protocol connected to server instance
@@ -465,8 +466,7 @@ class SafeProtocol(ServerProtocol):
             self.session.my_private_key,
             self.session.theirs_public_key,
         )
-        length = struct.pack("!L", len(serialized))
-        return length + serialized
+        return FrameDecoder.encode(serialized)
 
     def _load_message(self, data):
         msg = golem_messages.load(
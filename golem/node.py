@@ -30,6 +30,7 @@ from golem.config.active import EthereumConfig
 from golem.core.deferred import chain_function
 from golem.hardware.presets import HardwarePresets, HardwarePresetsMixin
 from golem.core.keysauth import KeysAuth, WrongPassword
+from golem.core.statskeeper import StatsKeeper
 from golem.core import golem_async
 from golem.core.variables import PRIVATE_KEY
 from golem.core import virtualization
@@ -38,6 +39,7 @@ from golem.docker.manager import DockerManager
 from golem.ethereum.transactionsystem import TransactionSystem
 from golem.model import DB_MODELS, db, DB_FIELDS
 from golem.network.transport.tcpnetwork_helpers import SocketAddress
+from golem.ranking.manager.database_manager import local_rank_ledger
 from golem.report import StatusPublisher, Component, Stage, report_calls
 from golem.rpc import utils as rpc_utils
 from golem.rpc.mapping import rpceventnames
@@ -133,8 +135,12 @@ class Node(HardwarePresetsMixin):
         self._peers: List[SocketAddress] = peers or []
 
         # Initialize database
+        if config_desc.db_performance_profile:
+            db.enable_performance_profile()
         self._db = Database(
             db, fields=DB_FIELDS, models=DB_MODELS, db_dir=datadir)
+        StatsKeeper.default_flush_interval = config_desc.stats_flush_interval
+        local_rank_ledger.start(config_desc.local_rank_flush_interval)
 
         self.client: Optional[Client] = None
 
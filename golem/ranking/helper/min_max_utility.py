@@ -1,5 +1,7 @@
 import logging
 
+import numpy as np
+
 from golem.ranking.helper.trust_const import MAX_TRUST, MIN_TRUST
 
 POS_WEIGHT = 1.0
@@ -19,6 +21,14 @@ def count_trust(pos, neg):
     return result
 
 
+def count_trusts(pos: np.ndarray, neg: np.ndarray) -> np.ndarray:
+    """ count_trust of arrays of positive and negative counters """
+    pw = pos * POS_WEIGHT
+    nw = neg * NEG_WEIGHT
+    result = (pw - nw) / np.maximum(pw + nw, MIN_OPERATION_NUMBER)
+    return np.clip(result, MIN_TRUST, MAX_TRUST)
+
+
 def vec_to_trust(val):
     if val is None:
         return 0.0
@@ -29,3 +39,12 @@ def vec_to_trust(val):
         return None
     return min(MAX_TRUST, max(MIN_TRUST, float(a) / float(
         b))) if a != 0.0 and b != 0.0 else 0.0
+
+
+def vecs_to_trust(vecs: np.ndarray) -> np.ndarray:
+    """ vec_to_trust of an array of (value, weight) pairs in the last axis """
+    values, weights = vecs[..., 0], vecs[..., 1]
+    valid = (values != 0.0) & (weights != 0.0)
+    result = np.divide(values, weights, out=np.zeros_like(values),
+                       where=valid)
+    return np.clip(result, MIN_TRUST, MAX_TRUST, out=result)
@@ -0,0 +1,71 @@
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+
+class TrustVector:
+    """ Values of the gossip ranking algorithm, one row of shape `shape`
+    per node, kept in a NumPy array in the order of `node_ids`.
+    Rows of nodes can be read as lists, like in a dict of lists.
+    """
+
+    def __init__(self, shape: Tuple[int, ...]) -> None:
+        self.node_ids: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._values = np.zeros((0, ) + shape)
+
+    @property
+    def array(self) -> np.ndarray:
+        return self._values[:len(self.node_ids)]
+
+    def __len__(self) -> int:
+        return len(self.node_ids)
+
+    def __contains__(self, node_id: str) -> bool:
+        return node_id in self._index
+
+    def __getitem__(self, node_id: str) -> list:
+        return self._values[self._index[node_id]].tolist()
+
+    def values(self) -> list:
+        return self.array.tolist()
+
+    def items(self) -> Iterator[Tuple[str, list]]:
+        return zip(self.node_ids, self.values())
+
+    def indices(self, node_ids: Sequence[str]) -> np.ndarray:
+        """ Return rows of the nodes, adding rows of zeros for new nodes """
+        index = self._index
+        indices = list(map(index.get, node_ids))
+        if None in indices:
+            for i, node_id in enumerate(node_ids):
+                if indices[i] is None:
+                    if node_id not in index:
+                        index[node_id] = len(self.node_ids)
+                        self.node_ids.append(node_id)
+                    indices[i] = index[node_id]
+
+            if len(self.node_ids) > len(self._values):
+                capacity = max(len(self.node_ids), 2 * len(self._values))
+                values = np.zeros((capacity, ) + self._values.shape[1:])
+                values[:len(self._values)] = self._values
+                self._values = values
+        return np.array(indices, dtype=np.intp)
+
+    def get(self, node_ids: Sequence[str]) -> np.ndarray:
+        """ Return rows of the nodes, zeros for unknown nodes """
+        indices = np.array([self._index.get(node_id, -1)
+                            for node_id in node_ids], dtype=np.intp)
+        known = indices >= 0
+        result = np.zeros((len(indices), ) + self._values.shape[1:])
+        result[known] = self._values[indices[known]]
+        return result
+
+    def set(self, node_ids: Sequence[str], values: np.ndarray) -> None:
+        indices = self.indices(node_ids)
+        self._values[indices] = values
+
+    def add(self, node_ids: Sequence[str], values: np.ndarray) -> None:
+        """ Add values to the rows, a node may occur more than once """
+        indices = self.indices(node_ids)
+        np.add.at(self._values, indices, values)
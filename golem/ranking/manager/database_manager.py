@@ -1,7 +1,13 @@
 import datetime
 import logging
+import threading
+import time
+from collections import defaultdict
+from typing import (
+    Callable, Dict, Iterable, List, Optional, Sequence, Tuple,
+)
 
-from peewee import IntegrityError
+from peewee import DatabaseError, Field, IntegrityError
 
 from golem.model import LocalRank, GlobalRank, NeighbourLocRank, db
 from golem.ranking import ProviderEfficacy
@@ -13,113 +19,250 @@ logger = logging.getLogger(__name__)
 REQUESTOR_FORGETTING_FACTOR = 0.9
 PROVIDER_FORGETTING_FACTOR = 0.9
 
+# For how long results of get_providers_reputation are cached, in seconds
+PROVIDER_REPUTATION_TTL = 60.0
+# Expired entries are dropped when the cache grows larger than this
+PROVIDER_REPUTATION_CACHE_SIZE = 10000
+# Maximum number of node ids in a single query (SQLITE_MAX_VARIABLE_NUMBER)
+PROVIDER_REPUTATION_BATCH_SIZE = 500
+
+# node_id -> (expiration time, (efficiency, efficacy))
+_providers_reputation: Dict[
+    str, Tuple[float, Tuple[float, ProviderEfficacy]]] = {}
+
+# Cached local ranks are dropped when there are more of them than this
+LOCAL_RANK_CACHE_SIZE = 10000
+# Maximum number of node ids in a single query
+LOCAL_RANK_BATCH_SIZE = 500
+# Rows in a single INSERT, each of them takes one variable per column
+LOCAL_RANK_INSERT_BATCH_SIZE = 50
+
+# Maximum number of node ids in a single query and rows in a single INSERT
+GLOBAL_RANK_BATCH_SIZE = 500
+GLOBAL_RANK_INSERT_BATCH_SIZE = 100
+
+
+class LocalRankLedger:
+    """ Accumulates changes of the local rank counters.
+
+    With `flush_interval` set, changes are kept in memory, per node, and
+    written back to the database in a single transaction every
+    `flush_interval` seconds and on shutdown. Local ranks are then read
+    from memory, including the changes which are not written yet.
+    Otherwise every change is written through to the database.
+    """
+
+    def __init__(self) -> None:
+        self.flush_interval = 0.0
+        self._lock = threading.Lock()
+        # node_id -> counter -> increment
+        self._deltas: Dict[str, Dict[str, float]] = {}
+        # node_id -> local rank with the pending increments, if any
+        self._ranks: Dict[str, Optional[LocalRank]] = {}
+        self._flush_thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    @property
+    def write_back(self) -> bool:
+        return self.flush_interval > 0 and not self._stop_event.is_set()
+
+    def start(self, flush_interval: float) -> None:
+        """ Start writing changes back every `flush_interval` seconds """
+        if flush_interval <= 0 or self._flush_thread is not None:
+            return
+        self.flush_interval = flush_interval
+        self._stop_event.clear()
+        self._flush_thread = threading.Thread(
+            target=self._flush_periodically,
+            name='LocalRankFlush',
+            daemon=True,
+        )
+        self._flush_thread.start()
+
+        from twisted.internet import reactor
+        reactor.addSystemEventTrigger('before', 'shutdown', self.stop)
+
+    def stop(self) -> None:
+        """ Stop flushing periodically and write pending changes; changes
+        made from now on are written through """
+        with self._lock:
+            self._stop_event.set()
+            self._ranks.clear()
+        if self._flush_thread is not None \
+                and self._flush_thread is not threading.current_thread():
+            self._flush_thread.join()
+        self._flush_thread = None
+        self.flush()
+
+    def increase(self, node_id: str, counter: str, increment: float) -> None:
+        with self._lock:
+            if self.write_back:
+                deltas = self._deltas.setdefault(node_id, {})
+                deltas[counter] = deltas.get(counter, 0.0) + increment
+                if node_id in self._ranks:
+                    rank = self._ranks[node_id]
+                    if rank is None:
+                        rank = self._ranks[node_id] = \
+                            LocalRank(node_id=node_id)
+                    setattr(rank, counter, getattr(rank, counter) + increment)
+                return
+        self._write({node_id: {counter: increment}})
+
+    def get(self, node_id: str) -> Optional[LocalRank]:
+        with self._lock:
+            if not self.write_back:
+                return self._select(node_id)
+            if node_id in self._ranks:
+                return self._ranks[node_id]
+
+            rank = self._select(node_id)
+            deltas = self._deltas.get(node_id)
+            if deltas:
+                if rank is None:
+                    rank = LocalRank(node_id=node_id)
+                for counter, increment in deltas.items():
+                    setattr(rank, counter, getattr(rank, counter) + increment)
+
+            if len(self._ranks) >= LOCAL_RANK_CACHE_SIZE:
+                self._ranks.clear()
+            self._ranks[node_id] = rank
+            return rank
+
+    def update(self, node_id: str, update: Callable[[LocalRank], None],
+               fields: Sequence[Field]) -> None:
+        """ Change columns of the local rank other than the counters.
+        Only `fields` are saved and flushes wait meanwhile, so that
+        increments written by the flush thread aren't overwritten. """
+        def _update():
+            with db.transaction():
+                rank, _ = LocalRank.get_or_create(node_id=node_id)
+                update(rank)
+                rank.save(only=fields)
+
+        with self._lock:
+            db.write(_update)
+            self._ranks.pop(node_id, None)
+
+    def flush(self) -> None:
+        """ Write pending changes to the database """
+        # Reads of uncached ranks wait for the write, so that they don't
+        # miss the changes which are being written
+        with self._lock:
+            deltas, self._deltas = self._deltas, {}
+            if not deltas:
+                return
+            try:
+                db.write(self._write, deltas)
+            except DatabaseError as err:
+                logger.error("Cannot flush local ranks: %r", err)
+                self._deltas = deltas
+
+    def _flush_periodically(self) -> None:
+        while not self._stop_event.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Cannot flush local ranks")
+
+    @staticmethod
+    def _select(node_id: str) -> Optional[LocalRank]:
+        return LocalRank.select().where(LocalRank.node_id == node_id).first()
+
+    @staticmethod
+    def _write(deltas: Dict[str, Dict[str, float]]) -> None:
+        """ Insert the ranks of new nodes and add increments to the existing
+        ones, nodes with the same increments are updated together """
+        node_ids = list(deltas)
+        with db.atomic():
+            existing = set()
+            for start in range(0, len(node_ids), LOCAL_RANK_BATCH_SIZE):
+                query = LocalRank.select(LocalRank.node_id).where(
+                    LocalRank.node_id << node_ids[
+                        start:start + LOCAL_RANK_BATCH_SIZE],
+                )
+                existing.update(rank.node_id for rank in query)
+
+            rows = [dict(deltas[node_id], node_id=node_id)
+                    for node_id in node_ids if node_id not in existing]
+            for start in range(0, len(rows), LOCAL_RANK_INSERT_BATCH_SIZE):
+                LocalRank.insert_many(
+                    rows[start:start + LOCAL_RANK_INSERT_BATCH_SIZE],
+                ).execute()
+
+            updates: Dict[Tuple, List[str]] = defaultdict(list)
+            for node_id in existing:
+                updates[tuple(sorted(deltas[node_id].items()))] \
+                    .append(node_id)
+            for increments, ids in updates.items():
+                fields = {
+                    counter: getattr(LocalRank, counter) + increment
+                    for counter, increment in increments
+                }
+                for start in range(0, len(ids), LOCAL_RANK_BATCH_SIZE):
+                    LocalRank.update(
+                        modified_date=str(datetime.datetime.now()),
+                        **fields,
+                    ).where(
+                        LocalRank.node_id << ids[
+                            start:start + LOCAL_RANK_BATCH_SIZE],
+                    ).execute()
+
+
+local_rank_ledger = LocalRankLedger()
+
 
 def increase_positive_computed(node_id, trust_mod):
     logger.debug('increase_positive_computed. node_id=%r, trust_mod=%r',
                  node_id, trust_mod)
-    try:
-        with db.transaction():
-            LocalRank.create(node_id=node_id, positive_computed=trust_mod)
-    except IntegrityError:
-        LocalRank.update(positive_computed=LocalRank.positive_computed + trust_mod,
-                         modified_date=str(datetime.datetime.now())) \
-            .where(LocalRank.node_id == node_id).execute()
+    local_rank_ledger.increase(node_id, 'positive_computed', trust_mod)
 
 
 def increase_negative_computed(node_id, trust_mod):
     logger.debug('increase_negative_computed. node_id=%r, trust_mod=%r',
                  node_id, trust_mod)
-    try:
-        with db.transaction():
-            LocalRank.create(node_id=node_id, negative_computed=trust_mod)
-    except IntegrityError:
-        LocalRank.update(negative_computed=LocalRank.negative_computed + trust_mod,
-                         modified_date=str(datetime.datetime.now())) \
-            .where(LocalRank.node_id == node_id).execute()
+    local_rank_ledger.increase(node_id, 'negative_computed', trust_mod)
 
 
 def increase_wrong_computed(node_id, trust_mod):
     logger.debug('increase_wrong_computed. node_id=%r, trust_mod=%r',
                  node_id, trust_mod)
-    try:
-        with db.transaction():
-            LocalRank.create(node_id=node_id, wrong_computed=trust_mod)
-    except IntegrityError:
-        LocalRank.update(wrong_computed=LocalRank.wrong_computed + trust_mod,
-                         modified_date=str(datetime.datetime.now())) \
-            .where(LocalRank.node_id == node_id).execute()
+    local_rank_ledger.increase(node_id, 'wrong_computed', trust_mod)
 
 
 def increase_positive_requested(node_id, trust_mod):
     logger.debug('increase_positive_requested. node_id=%r, trust_mod=%r',
                  node_id, trust_mod)
-    try:
-        with db.transaction():
-            LocalRank.create(node_id=node_id, positive_requested=trust_mod)
-    except IntegrityError:
-        LocalRank.update(positive_requested=LocalRank.positive_requested + trust_mod,
-                         modified_date=str(datetime.datetime.now())) \
-            .where(LocalRank.node_id == node_id).execute()
+    local_rank_ledger.increase(node_id, 'positive_requested', trust_mod)
 
 
 def increase_negative_requested(node_id, trust_mod):
     logger.debug('increase_negative_requested. node_id=%r, trust_mod=%r',
                  node_id, trust_mod)
-    try:
-        with db.transaction():
-            LocalRank.create(node_id=node_id, negative_requested=trust_mod)
-    except IntegrityError:
-        LocalRank.update(negative_requested=LocalRank.negative_requested + trust_mod,
-                         modified_date=str(datetime.datetime.now())) \
-            .where(LocalRank.node_id == node_id).execute()
+    local_rank_ledger.increase(node_id, 'negative_requested', trust_mod)
 
 
 def increase_positive_payment(node_id, trust_mod):
     logger.debug('increase_positive_payment. node_id=%r, trust_mod=%r',
                  node_id, trust_mod)
-    try:
-        with db.transaction():
-            LocalRank.create(node_id=node_id, positive_payment=trust_mod)
-    except IntegrityError:
-        LocalRank.update(positive_payment=LocalRank.positive_payment + trust_mod,
-                         modified_date=str(datetime.datetime.now())) \
-            .where(LocalRank.node_id == node_id).execute()
+    local_rank_ledger.increase(node_id, 'positive_payment', trust_mod)
 
 
 def increase_negative_payment(node_id, trust_mod):
     logger.debug('increase_negative_payment. node_id=%r, trust_mod=%r',
                  node_id, trust_mod)
-    try:
-        with db.transaction():
-            LocalRank.create(node_id=node_id, negative_payment=trust_mod)
-    except IntegrityError:
-        LocalRank.update(negative_payment=LocalRank.negative_payment + trust_mod,
-                         modified_date=str(datetime.datetime.now())) \
-            .where(LocalRank.node_id == node_id).execute()
+    local_rank_ledger.increase(node_id, 'negative_payment', trust_mod)
 
 
 def increase_positive_resource(node_id, trust_mod):
     logger.debug('increase_positive_resource. node_id=%r, trust_mod=%r',
                  node_id, trust_mod)
-    try:
-        with db.transaction():
-            LocalRank.create(node_id=node_id, positive_resource=trust_mod)
-    except IntegrityError:
-        LocalRank.update(positive_resource=LocalRank.positive_resource + trust_mod,
-                         modified_date=str(datetime.datetime.now())) \
-            .where(LocalRank.node_id == node_id).execute()
+    local_rank_ledger.increase(node_id, 'positive_resource', trust_mod)
 
 
 def increase_negative_resource(node_id, trust_mod):
     logger.debug('increase_negative_resource. node_id=%r, trust_mod=%r',
                  node_id, trust_mod)
-    try:
-        with db.transaction():
-            LocalRank.create(node_id=node_id, negative_resource=trust_mod)
-    except IntegrityError:
-        LocalRank.update(negative_resource=LocalRank.negative_resource + trust_mod,
-                         modified_date=str(datetime.datetime.now())) \
-            .where(LocalRank.node_id == node_id).execute()
+    local_rank_ledger.increase(node_id, 'negative_resource', trust_mod)
 
 
 def _calculate_efficiency(efficiency: float,
@@ -153,8 +296,7 @@ def update_requestor_efficiency(node_id: str,
     Update efficiency function from both Requestor and Provider perspective as
     proposed in https://docs.golem.network/About/img/Brass_Golem_Marketplace.pdf
     """
-    with db.transaction():
-        rank, _ = LocalRank.get_or_create(node_id=node_id)
+    def update(rank):
         efficiency = rank.requestor_efficiency
 
         if efficiency is None:
@@ -165,7 +307,9 @@ def update_requestor_efficiency(node_id: str,
 
         rank.requestor_efficiency = _calculate_efficiency(
             efficiency, timeout, computation_time, REQUESTOR_FORGETTING_FACTOR)
-        rank.save()
+
+    local_rank_ledger.update(
+        node_id, update, [LocalRank.requestor_efficiency])
 
 
 def get_requestor_assigned_sum(node_id: str) -> int:
@@ -179,11 +323,11 @@ def update_requestor_assigned_sum(node_id: str, amount: int) -> None:
     V_assigned from Provider perspective as
     proposed in https://docs.golem.network/About/img/Brass_Golem_Marketplace.pdf
     """
-
-    with db.transaction():
-        rank, _ = LocalRank.get_or_create(node_id=node_id)
+    def update(rank):
         rank.requestor_assigned_sum += amount
-        rank.save()
+
+    local_rank_ledger.update(
+        node_id, update, [LocalRank.requestor_assigned_sum])
 
 
 def update_requestor_paid_sum(node_id: str, amount: int) -> None:
@@ -191,11 +335,10 @@ def update_requestor_paid_sum(node_id: str, amount: int) -> None:
     V_paid from Provider perspective as
     proposed in https://docs.golem.network/About/img/Brass_Golem_Marketplace.pdf
     """
-
-    with db.transaction():
-        rank, _ = LocalRank.get_or_create(node_id=node_id)
+    def update(rank):
         rank.requestor_paid_sum += amount
-        rank.save()
+
+    local_rank_ledger.update(node_id, update, [LocalRank.requestor_paid_sum])
 
 
 def get_requestor_paid_sum(node_id: str) -> int:
@@ -214,13 +357,13 @@ def update_provider_efficiency(node_id: str,
                                timeout: float,
                                computation_time: float) -> None:
 
-    with db.transaction():
-        rank, _ = LocalRank.get_or_create(node_id=node_id)
-        efficiency = rank.provider_efficiency
-
+    def update(rank):
         rank.provider_efficiency = _calculate_efficiency(
-            efficiency, timeout, computation_time, PROVIDER_FORGETTING_FACTOR)
-        rank.save()
+            rank.provider_efficiency, timeout, computation_time,
+            PROVIDER_FORGETTING_FACTOR)
+
+    local_rank_ledger.update(node_id, update, [LocalRank.provider_efficiency])
+    _providers_reputation.pop(node_id, None)
 
 
 def get_provider_efficacy(node_id: str) -> ProviderEfficacy:
@@ -231,10 +374,60 @@ def get_provider_efficacy(node_id: str) -> ProviderEfficacy:
 
 def update_provider_efficacy(node_id: str, op: SubtaskOp) -> None:
 
-    with db.transaction():
-        rank, _ = LocalRank.get_or_create(node_id=node_id)
+    def update(rank):
         rank.provider_efficacy.update(op)
-        rank.save()
+
+    local_rank_ledger.update(node_id, update, [LocalRank.provider_efficacy])
+    _providers_reputation.pop(node_id, None)
+
+
+def get_providers_reputation(node_ids: Iterable[str]) \
+        -> Dict[str, Tuple[float, ProviderEfficacy]]:
+    """
+    Return (efficiency, efficacy) of many providers at once. Providers which
+    are not cached are fetched with a single query. Unknown providers get
+    the default values, without creating a local rank for them.
+    """
+    now = time.monotonic()
+    reputation: Dict[str, Tuple[float, ProviderEfficacy]] = {}
+    missing: List[str] = []
+
+    for node_id in set(node_ids):
+        cached = _providers_reputation.get(node_id)
+        if cached and cached[0] > now:
+            reputation[node_id] = cached[1]
+        else:
+            missing.append(node_id)
+
+    if not missing:
+        return reputation
+
+    for start in range(0, len(missing), PROVIDER_REPUTATION_BATCH_SIZE):
+        query = LocalRank.select(
+            LocalRank.node_id,
+            LocalRank.provider_efficiency,
+            LocalRank.provider_efficacy,
+        ).where(
+            LocalRank.node_id << missing[
+                start:start + PROVIDER_REPUTATION_BATCH_SIZE],
+        )
+        for rank in query:
+            reputation[rank.node_id] = (rank.provider_efficiency,
+                                        rank.provider_efficacy)
+
+    if len(_providers_reputation) > PROVIDER_REPUTATION_CACHE_SIZE:
+        for node_id, cached in list(_providers_reputation.items()):
+            if cached[0] <= now:
+                del _providers_reputation[node_id]
+
+    expires = now + PROVIDER_REPUTATION_TTL
+    for node_id in missing:
+        if node_id not in reputation:
+            reputation[node_id] = (LocalRank.provider_efficiency.default,
+                                   ProviderEfficacy(0., 0., 0., 0.))
+        _providers_reputation[node_id] = (expires, reputation[node_id])
+
+    return reputation
 
 
 def get_global_rank(node_id):
@@ -253,14 +446,69 @@ def upsert_global_rank(node_id, comp_trust, req_trust, comp_weight, req_weight):
             .where(GlobalRank.node_id == node_id).execute()
 
 
+def upsert_global_ranks(
+        ranks: Iterable[Tuple[str, float, float, float, float]]) -> None:
+    """
+    Upsert many global ranks in a single transaction, ranks are tuples of
+    the arguments of upsert_global_rank. Existing rows are replaced, keeping
+    their ids and creation dates.
+    """
+    rows = {
+        node_id: {
+            'node_id': node_id,
+            'computing_trust_value': comp_trust,
+            'requesting_trust_value': req_trust,
+            'gossip_weight_computing': comp_weight,
+            'gossip_weight_requesting': req_weight,
+        }
+        for node_id, comp_trust, req_trust, comp_weight, req_weight in ranks
+    }
+    node_ids = list(rows)
+
+    with db.atomic():
+        for start in range(0, len(node_ids), GLOBAL_RANK_BATCH_SIZE):
+            query = GlobalRank.select(
+                GlobalRank.id,
+                GlobalRank.node_id,
+                GlobalRank.created_date,
+            ).where(
+                GlobalRank.node_id << node_ids[
+                    start:start + GLOBAL_RANK_BATCH_SIZE],
+            )
+            for rank in query:
+                rows[rank.node_id].update(id=rank.id,
+                                          created_date=rank.created_date)
+
+        new = [row for row in rows.values() if 'id' not in row]
+        replaced = [row for row in rows.values() if 'id' in row]
+        for start in range(0, len(new), GLOBAL_RANK_INSERT_BATCH_SIZE):
+            GlobalRank.insert_many(
+                new[start:start + GLOBAL_RANK_INSERT_BATCH_SIZE],
+            ).execute()
+        for start in range(0, len(replaced), GLOBAL_RANK_INSERT_BATCH_SIZE):
+            GlobalRank.insert_many(
+                replaced[start:start + GLOBAL_RANK_INSERT_BATCH_SIZE],
+            ).upsert().execute()
+
+
 def get_local_rank(node_id):
-    return LocalRank.select().where(LocalRank.node_id == node_id).first()
+    return local_rank_ledger.get(node_id)
 
 
 def get_local_rank_for_all():
+    local_rank_ledger.flush()
     return LocalRank.select()
 
 
+def get_local_rank_counters(counters: Sequence[str]):
+    """ Return (node_id, *counters) tuples of all local ranks """
+    local_rank_ledger.flush()
+    return LocalRank.select(
+        LocalRank.node_id,
+        *(getattr(LocalRank, counter) for counter in counters),
+    ).tuples()
+
+
 def get_neighbour_loc_rank(neighbour_id, about_id):
     return NeighbourLocRank.select().where(
         (NeighbourLocRank.node_id == neighbour_id) & (NeighbourLocRank.about_node_id == about_id)).first()
@@ -1,8 +1,12 @@
-from golem.ranking.helper.min_max_utility import count_trust
+from typing import List, Tuple
+
+import numpy as np
+
+from golem.ranking.helper.min_max_utility import count_trust, count_trusts
 from golem.ranking.helper.trust_const import \
     UNKNOWN_TRUST, NEIGHBOUR_WEIGHT_BASE, NEIGHBOUR_WEIGHT_POWER
 from golem.ranking.manager.database_manager \
-    import get_neighbour_loc_rank, get_local_rank
+    import get_neighbour_loc_rank, get_local_rank, get_local_rank_counters
 
 
 def __neighbour_weight(local_trust):
@@ -68,3 +72,22 @@ def requested_neighbours_rank(node_id, neighbours):
         sum_trust += (weight - 1) * neighbour_trust_to_node_id
         sum_weight += weight
     return sum_trust, sum_weight
+
+
+#######
+# all #
+#######
+
+def local_trust_for_all() -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """ Return ids of all nodes with local ranks, with arrays of their
+    computed and requested local trust """
+    counters = list(get_local_rank_counters((
+        'positive_computed', 'negative_computed', 'wrong_computed',
+        'positive_payment', 'negative_requested', 'negative_payment',
+    )))
+    node_ids = [row[0] for row in counters]
+    values = np.array([row[1:] for row in counters],
+                      dtype=float).reshape(-1, 6)
+    computed = count_trusts(values[:, 0], values[:, 1] + values[:, 2])
+    requested = count_trusts(values[:, 3], values[:, 4] + values[:, 5])
+    return node_ids, computed, requested
@@ -4,10 +4,12 @@ import random
 
 from threading import Lock
 
+import numpy as np
 from twisted.internet.task import deferLater
 
 from golem.ranking.helper import min_max_utility as util
 from golem.ranking.helper.trust_const import UNKNOWN_TRUST
+from golem.ranking.helper.trust_vector import TrustVector
 from golem.ranking.manager import database_manager as dm
 from golem.ranking.manager import trust_manager as tm
 from golem.ranking.manager.time_manager import TimeManager
@@ -31,8 +33,10 @@ class Ranking(object):
         self.neighbours = []
         self.step = 0
         self.max_steps = max_steps
-        self.working_vec = {}
-        self.prevRank = {}
+        # [[computing trust, weight], [requesting trust, weight]] per node
+        self.working_vec = TrustVector((2, 2))
+        # [computing trust, requesting trust] per node
+        self.prevRank = TrustVector((2, ))
         self.globRank = {}
         self.received_gossip = []
         self.finished = False
@@ -53,27 +57,29 @@ class Ranking(object):
     def __init_stage(self):
         try:
             logger.debug("New gossip stage")
-            self.__push_local_ranks()
+            local_trust = tm.local_trust_for_all()
+            self.__push_local_ranks(*local_trust)
             self.finished = False
             self.global_finished = False
             self.step = 0
             self.finished_neighbours = set()
-            self.__init_working_vec()
+            self.__init_working_vec(*local_trust)
         finally:
             deferLater(self.reactor,
                        self.round_oracle.sec_to_round(),
                        self.__new_round)
 
-    def __init_working_vec(self):
+    def __init_working_vec(self, node_ids, comp_trust, req_trust):
         with self.lock:
-            self.working_vec = {}
-            self.prevRank = {}
-            for loc_rank in dm.get_local_rank_for_all():
-                comp_trust = tm.computed_trust_local(loc_rank)
-                req_trust = tm.requested_trust_local(loc_rank)
-                self.working_vec[loc_rank.node_id] = \
-                    [[comp_trust, 1.0], [req_trust, 1.0]]
-                self.prevRank[loc_rank.node_id] = [comp_trust, req_trust]
+            weights = np.ones_like(comp_trust)
+            self.working_vec = TrustVector((2, 2))
+            self.working_vec.set(node_ids, np.stack([
+                np.stack([comp_trust, weights], axis=-1),
+                np.stack([req_trust, weights], axis=-1),
+            ], axis=1))
+            self.prevRank = TrustVector((2, ))
+            self.prevRank.set(node_ids,
+                              np.stack([comp_trust, req_trust], axis=-1))
 
     def __new_round(self):
         logger.debug("New gossip round")
@@ -98,7 +104,7 @@ class Ranking(object):
             self.received_gossip = \
                 self.client.collect_gossip() + self.received_gossip
             self.__make_prev_rank()
-            self.working_vec = {}
+            self.working_vec = TrustVector((2, 2))
             self.__add_gossip()
             self.__check_finished()
         finally:
@@ -186,19 +192,18 @@ class Ranking(object):
             with self.lock:
                 dm.upsert_neighbour_loc_rank(neighbour_id, about_id, loc_rank)
 
-    def __push_local_ranks(self):
-        for loc_rank in dm.get_local_rank_for_all():
-            comp_trust = tm.computed_trust_local(loc_rank)
-            req_trust = tm.requested_trust_local(loc_rank)
-            trust = [comp_trust, req_trust]
-            if loc_rank.node_id in self.prev_loc_rank:
-                prev_trust = self.prev_loc_rank[loc_rank.node_id]
+    def __push_local_ranks(self, node_ids, comp_trust, req_trust):
+        for node_id, trust in zip(node_ids, zip(comp_trust.tolist(),
+                                                req_trust.tolist())):
+            trust = list(trust)
+            if node_id in self.prev_loc_rank:
+                prev_trust = self.prev_loc_rank[node_id]
             else:
                 prev_trust = [float("inf")] * 2
             if max(map(abs, map(operator.sub, prev_trust, trust))) \
                     > self.loc_rank_push_delta:
-                self.client.push_local_rank(loc_rank.node_id, trust)
-                self.prev_loc_rank[loc_rank.node_id] = trust
+                self.client.push_local_rank(node_id, trust)
+                self.prev_loc_rank[node_id] = trust
 
     def __check_finished(self):
         if self.global_finished:
@@ -220,23 +225,10 @@ class Ranking(object):
                 set(self.neighbours) <= self.finished_neighbours
 
     def __compare_working_vec_and_prev_rank(self):
-        aggregated_trust = 0.0
-        for node_id, val in list(self.working_vec.items()):
-            try:
-                computing, requesting = val
-            except (TypeError, ValueError):
-                logger.warning("Wrong trust vector element {}".format(val))
-                break
-            comp_trust = util.vec_to_trust(computing)
-            req_trust = util.vec_to_trust(requesting)
-            if node_id in self.prevRank:
-                comp_trust_old = self.prevRank[node_id][0]
-                req_trust_old = self.prevRank[node_id][1]
-            else:
-                comp_trust_old, req_trust_old = 0, 0
-            aggregated_trust += abs(comp_trust - comp_trust_old)
-            aggregated_trust += abs(req_trust - req_trust_old)
-        return aggregated_trust
+        trust = util.vecs_to_trust(self.working_vec.array)
+        # Nodes without previous rank are compared with 0
+        prev_trust = self.prevRank.get(self.working_vec.node_ids)
+        return float(np.abs(trust - prev_trust).sum())
 
     def __set_k(self):
         degrees = self.__get_neighbours_degree()
@@ -254,62 +246,66 @@ class Ranking(object):
         return degrees
 
     def __make_prev_rank(self):
-        for node_id, val in list(self.working_vec.items()):
-            try:
-                computing, requesting = val
-            except (TypeError, ValueError):
-                logger.warning("Wrong trust vector element {}".format(val))
-                break
-            comp_trust = util.vec_to_trust(computing)
-            req_trust = util.vec_to_trust(requesting)
-            self.prevRank[node_id] = [comp_trust, req_trust]
+        self.prevRank.set(self.working_vec.node_ids,
+                          util.vecs_to_trust(self.working_vec.array))
 
     def __save_working_vec(self):
-        for node_id, val in list(self.working_vec.items()):
-            try:
-                computing, requesting = val
-            except (TypeError, ValueError):
-                logger.warning("Wrong trust vector element {}".format(val))
-                break
-            comp_trust = util.vec_to_trust(computing)
-            req_trust = util.vec_to_trust(requesting)
-            dm.upsert_global_rank(node_id,
-                                  comp_trust,
-                                  req_trust,
-                                  computing[1],
-                                  requesting[1])
+        values = self.working_vec.array
+        trust = util.vecs_to_trust(values)
+        dm.upsert_global_ranks(zip(
+            self.working_vec.node_ids,
+            trust[:, 0].tolist(),
+            trust[:, 1].tolist(),
+            values[:, 0, 1].tolist(),
+            values[:, 1, 1].tolist(),
+        ))
 
     def __prepare_gossip(self):
-        gossip_vec = []
-        for node_id, val in list(self.working_vec.items()):
-            comp_trust = list(map(self.__scale_gossip, val[0]))
-            req_trust = list(map(self.__scale_gossip, val[1]))
-            gossip_vec.append([node_id, [comp_trust, req_trust]])
-        return gossip_vec
-
-    def __scale_gossip(self, val):
-        return val / float(self.k + 1)
+        scaled = self.working_vec.array / float(self.k + 1)
+        return [[node_id, trust] for node_id, trust
+                in zip(self.working_vec.node_ids, scaled.tolist())]
 
     def __add_gossip(self):
+        node_ids = []
+        values = []
         for gossip_group in self.received_gossip:
-            for gossip in gossip_group:
-                try:
-                    node_id, [comp, req] = gossip
-                    if node_id in self.working_vec:
-                        [prev_comp, prev_req] = self.working_vec[node_id]
-                        self.working_vec[node_id] = [
-                            self.__sum_gossip(comp, prev_comp),
-                            self.__sum_gossip(req, prev_req)]
-                    else:
-                        self.working_vec[node_id] = [comp, req]
-                except Exception as err:
-                    logger.error("Wrong gossip {}, {}".format(gossip, err))
+            group_ids, group_values = self.__parse_gossip(gossip_group)
+            node_ids += group_ids
+            values.append(group_values)
+        if node_ids:
+            self.working_vec.add(node_ids, np.concatenate(values))
 
         self.received_gossip = []
 
     @staticmethod
-    def __sum_gossip(a, b):
-        return list(map(sum, zip(a, b)))
+    def __parse_gossip(gossip_group):
+        """ Return node ids and an array of trust vectors of valid gossip
+        in the group """
+        try:
+            node_ids = [node_id for node_id, _ in gossip_group]
+            values = np.array([vec for _, vec in gossip_group], dtype=float)
+            if values.shape == (len(node_ids), 2, 2) \
+                    and np.isfinite(values).all() \
+                    and set(map(type, node_ids)) == {str}:
+                return node_ids, values
+        except (TypeError, ValueError):
+            pass
+
+        # Drop the wrong gossip only
+        node_ids, values = [], []
+        for gossip in gossip_group:
+            try:
+                node_id, vec = gossip
+                vec = np.array(vec, dtype=float)
+                if not isinstance(node_id, str) or vec.shape != (2, 2) \
+                        or not np.isfinite(vec).all():
+                    raise ValueError("wrong trust vector")
+            except (TypeError, ValueError) as err:
+                logger.error("Wrong gossip {}, {}".format(gossip, err))
+                continue
+            node_ids.append(node_id)
+            values.append(vec)
+        return node_ids, np.array(values).reshape(-1, 2, 2)
 
     def __send_finished(self):
         self.client.send_stop_gossip()
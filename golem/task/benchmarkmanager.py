@@ -1,19 +1,56 @@
+from collections import deque
 from copy import copy
+from functools import lru_cache
+import hashlib
+import json
 import logging
-from threading import Thread
-from typing import Union
+from threading import Lock, Thread
+import time
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from cpuinfo import get_cpu_info
 
 from apps.core.benchmark.benchmarkrunner import BenchmarkRunner
 from apps.core.task.coretaskstate import TaskDesc
+import golem
 from golem.core.threads import callback_wrapper
 from golem.environments.environment import Environment as DefaultEnvironment
 
-from golem.model import Performance
+from golem.model import BenchmarkResult, Performance
 from golem.resource.dirmanager import DirManager
 from golem.task.taskstate import TaskStatus
 
 logger = logging.getLogger(__name__)
 
+# Memory needed by every benchmark run at the same time as others (in KiB)
+BENCHMARK_MEMORY = 1024 * 1024
+
+# Starts a benchmark, which calls one of the given callbacks when finished
+BenchmarkStart = Callable[[Callable, Callable], None]
+
+
+@lru_cache(maxsize=1)
+def get_cpu_model() -> str:
+    info = get_cpu_info()
+    return info.get('brand') or info.get('brand_raw') or ''
+
+
+def get_fingerprint(num_cores: int, max_memory_size: int,
+                    concurrency: int = 1) -> str:
+    """ Identifies the hardware, resource limits and version of environments
+    which benchmark results were measured with, and the number of
+    benchmarks sharing them. Environment images are pinned to the Golem
+    release, so its version is used for them.
+    """
+    data = json.dumps({
+        'cpu': get_cpu_model(),
+        'num_cores': num_cores,
+        'max_memory_size': max_memory_size,
+        'version': golem.__version__,
+        'concurrency': concurrency,
+    }, sort_keys=True)
+    return hashlib.sha1(data.encode()).hexdigest()
+
 
 class BenchmarkManager(object):
     def __init__(self, node_name, task_server, root_path, benchmarks=None):
@@ -21,6 +58,9 @@ class BenchmarkManager(object):
         self.task_server = task_server
         self.dir_manager = DirManager(root_path)
         self.benchmarks = benchmarks
+        # env_id -> status, start time, duration and performance of the
+        # latest benchmark of the environment
+        self._progress: Dict[str, dict] = {}
 
     @staticmethod
     def get_saved_benchmarks_ids():
@@ -35,6 +75,24 @@ class BenchmarkManager(object):
                            {DefaultEnvironment.get_id()}).issubset(ids)
         return False
 
+    def get_fingerprint(self, concurrency: int = 1) -> str:
+        config_desc = self.task_server.client.config_desc
+        return get_fingerprint(config_desc.num_cores,
+                               config_desc.max_memory_size,
+                               concurrency)
+
+    def get_concurrency(self) -> int:
+        """ Number of benchmarks run at the same time, limited by the number
+        of cores and the memory given to the computations """
+        config_desc = self.task_server.client.config_desc
+        return max(1, min(config_desc.benchmark_concurrency,
+                          config_desc.num_cores,
+                          config_desc.max_memory_size // BENCHMARK_MEMORY))
+
+    def get_progress(self) -> Dict[str, dict]:
+        return {env_id: copy(progress)
+                for env_id, progress in self._progress.items()}
+
     def run_benchmark(self, benchmark, task_builder, env_id, success=None,
                       error=None):
         logger.info('Running benchmark for %s', env_id)
@@ -81,36 +139,144 @@ class BenchmarkManager(object):
             self.run_benchmarks(copy(self.benchmarks), success, error)
 
         if DefaultEnvironment.get_id() not in self.get_saved_benchmarks_ids():
-            # run once in lifetime, since it's for single CPU core
-            self.run_default_benchmark(run_non_default_benchmarks, error)
+            # run once in lifetime, since it's for single CPU core; alone,
+            # so that other benchmarks don't skew the result
+            self._run_jobs(
+                [(DefaultEnvironment.get_id(), self.run_default_benchmark)],
+                run_non_default_benchmarks, error, concurrency=1)
         else:
             run_non_default_benchmarks()
 
     def run_benchmarks(self, benchmarks, success=None, error=None):
-        if not benchmarks:
+        self._run_jobs(self._benchmark_jobs(benchmarks), success, error)
+
+    def _benchmark_jobs(self, benchmarks) -> List[Tuple[str, BenchmarkStart]]:
+        jobs = []
+        while benchmarks:
+            env_id, (benchmark, builder_class) = benchmarks.popitem()
+
+            def start(success, error, env_id=env_id, benchmark=benchmark,
+                      builder_class=builder_class):
+                self.run_benchmark(benchmark, builder_class, env_id,
+                                   success, error)
+
+            jobs.append((env_id, start))
+        return jobs
+
+    def _run_jobs(self, jobs: List[Tuple[str, BenchmarkStart]],
+                  success=None, error=None,
+                  concurrency: Optional[int] = None) -> None:
+        """ Run benchmarks in order, at most `concurrency` (by default
+        `get_concurrency()`) of them at the same time. Results cached for
+        the current fingerprint are used instead of running benchmarks
+        again. Results measured while sharing the machine with other
+        benchmarks are cached apart from the ones measured alone, and the
+        latter are preferred. `success` is called once all of them finish;
+        after the first error no more benchmarks are started and `error`
+        is called. """
+        if concurrency is None:
+            concurrency = self.get_concurrency()
+        concurrency = max(1, min(concurrency, len(jobs)))
+        fingerprint = self.get_fingerprint(concurrency)
+        pending = deque(jobs)
+        lock = Lock()
+        state = {'running': 0, 'failed': False, 'finished': False}
+
+        def finished(err: Optional[Exception] = None) -> None:
+            with lock:
+                state['running'] -= 1
+                first_error = err is not None and not state['failed']
+                if err is not None:
+                    state['failed'] = True
+            if first_error:
+                if error:
+                    error(err)
+            elif err is None:
+                schedule()
+
+        def schedule() -> None:
+            while True:
+                with lock:
+                    if state['failed'] or state['finished']:
+                        return
+                    if not pending:
+                        if state['running'] == 0:
+                            state['finished'] = True
+                            break
+                        return
+                    if state['running'] >= concurrency:
+                        return
+                    env_id, start = pending.popleft()
+                    state['running'] += 1
+                self._start_job(env_id, start, fingerprint, finished)
+
             if success:
                 success(None)
+
+        logger.info('Running %d benchmarks, %d at a time',
+                    len(pending), concurrency)
+        schedule()
+
+    def _start_job(self, env_id: str, start: BenchmarkStart,
+                   fingerprint: str, finished: Callable) -> None:
+        performance = BenchmarkResult.get_value(env_id, self.get_fingerprint())
+        if performance is None:
+            performance = BenchmarkResult.get_value(env_id, fingerprint)
+        if performance is not None:
+            logger.info('%s performance is %.2f (cached)', env_id,
+                        performance)
+            Performance.update_or_create(env_id, performance)
+            self._progress[env_id] = {'status': 'cached', 'started': None,
+                                      'duration': 0.0,
+                                      'performance': performance}
+            finished()
             return
 
-        env_id, (benchmark, builder_class) = benchmarks.popitem()
+        started = time.time()
+        progress = {'status': 'running', 'started': started,
+                    'duration': None, 'performance': None}
+        self._progress[env_id] = progress
+
+        def success(performance):
+            progress['duration'] = time.time() - started
+            progress['performance'] = performance
+            progress['status'] = 'done'
+            logger.info('%s benchmark finished in %.1fs', env_id,
+                        progress['duration'])
+            BenchmarkResult.update_or_create(env_id, fingerprint, performance)
+            finished()
 
-        def recurse(_):
-            self.run_benchmarks(benchmarks, success, error)
+        def error(err):
+            progress['duration'] = time.time() - started
+            progress['status'] = 'failed'
+            logger.info('%s benchmark failed after %.1fs', env_id,
+                        progress['duration'])
+            finished(err)
 
-        self.run_benchmark(benchmark, builder_class, env_id, recurse, error)
+        try:
+            start(success, error)
+        except Exception as err:  # pylint: disable=broad-except
+            logger.error("Unable to run %s benchmark: %s", env_id, err)
+            error(err)
 
     @staticmethod
     def _validate_task_state(task_state):
         return True
 
     def run_benchmark_for_env_id(self, env_id, callback, errback):
+        fingerprint = self.get_fingerprint()
+
+        def success(performance):
+            BenchmarkResult.update_or_create(env_id, fingerprint, performance)
+            callback(performance)
+
         if env_id == DefaultEnvironment.get_id():
-            self.run_default_benchmark(callback, errback)
+            self.run_default_benchmark(success, errback)
         else:
             benchmark_data = self.benchmarks.get(env_id)
             if benchmark_data:
                 self.run_benchmark(benchmark_data[0], benchmark_data[1],
-                                   env_id, callback, errback)
+                                   env_id, success, errback)
             else:
                 raise Exception("Unknown environment: {}".format(env_id))
 
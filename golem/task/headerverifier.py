@@ -0,0 +1,160 @@
+import hashlib
+import logging
+import pickle
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from golem_messages.datastructures import tasks as dt_tasks
+from twisted.internet.defer import Deferred, gatherResults, succeed
+from twisted.internet.threads import deferToThreadPool
+from twisted.python.threadpool import ThreadPool
+
+logger = logging.getLogger(__name__)
+
+HeaderKey = Tuple[str, Optional[bytes], bytes]
+
+
+class TaskHeaderVerifier:
+    """ Verifies signatures of task headers received from the network.
+
+    Headers are broadcast over and over again, so signatures which were
+    already verified are kept in a bounded LRU cache, keyed by task id,
+    signature and a digest of the whole header, so that a valid signature
+    replayed with altered fields is verified again. Headers missing from
+    the cache are verified in batches on a dedicated thread pool;
+    `verify_many` returns a deferred that fires on the reactor thread.
+    """
+
+    def __init__(self,
+                 verify: Callable[[dt_tasks.TaskHeader], bool],
+                 cache_size: int = 10000,
+                 batch_size: int = 32,
+                 workers: int = 4) -> None:
+        """
+        :param verify: checks the signature of a single header; called from
+            worker threads by `verify_many`
+        """
+        self._verify = verify
+        self.cache_size = cache_size
+        self.batch_size = batch_size
+        self.workers = workers
+
+        self._verified: 'OrderedDict[HeaderKey, None]' = OrderedDict()
+        self._pool: Optional[ThreadPool] = None
+        self.stats = {
+            'cached': 0,
+            'verified': 0,
+            'invalid': 0,
+            'crypto_time': 0.0,
+        }
+
+    def is_verified(self, header: dt_tasks.TaskHeader) -> bool:
+        return self._is_cached(self._key(header))
+
+    def _is_cached(self, key: HeaderKey) -> bool:
+        if key not in self._verified:
+            return False
+        self._verified.move_to_end(key)
+        return True
+
+    def verify(self, header: dt_tasks.TaskHeader) -> bool:
+        """ Verify a single header synchronously """
+        if self.is_verified(header):
+            self.stats['cached'] += 1
+            return True
+
+        valid, elapsed = self._verify_batch([header])
+        self._update([self._key(header)], valid, elapsed)
+        return valid[0]
+
+    def verify_many(self, headers: Sequence[dt_tasks.TaskHeader]) \
+            -> Deferred:
+        """ Verify headers on the thread pool
+        :return: deferred list of verification results, in the same order
+            as `headers`
+        """
+        results: List[Optional[bool]] = [None] * len(headers)
+        pending: Dict[HeaderKey, List[int]] = OrderedDict()
+        unique: List[dt_tasks.TaskHeader] = []
+
+        keys: List[HeaderKey] = []
+
+        for i, header in enumerate(headers):
+            key = self._key(header)
+            if self._is_cached(key):
+                self.stats['cached'] += 1
+                results[i] = True
+                continue
+            if key not in pending:
+                pending[key] = []
+                unique.append(header)
+                keys.append(key)
+            pending[key].append(i)
+
+        if not unique:
+            return succeed(results)
+
+        from twisted.internet import reactor
+        batches = [unique[i:i + self.batch_size]
+                   for i in range(0, len(unique), self.batch_size)]
+        batch_keys = [keys[i:i + self.batch_size]
+                      for i in range(0, len(keys), self.batch_size)]
+        deferreds = [
+            deferToThreadPool(reactor, self._get_pool(),
+                              self._verify_batch, batch)
+            for batch in batches
+        ]
+
+        def _apply(batch_results):
+            for batch, (valid, elapsed) in zip(batch_keys, batch_results):
+                self._update(batch, valid, elapsed)
+                for key, is_valid in zip(batch, valid):
+                    for i in pending[key]:
+                        results[i] = is_valid
+            return results
+
+        deferred = gatherResults(deferreds, consumeErrors=True)
+        deferred.addCallback(_apply)
+        return deferred
+
+    def stop(self) -> None:
+        if self._pool is not None:
+            self._pool.stop()
+            self._pool = None
+
+    def _get_pool(self) -> ThreadPool:
+        if self._pool is None:
+            from twisted.internet import reactor
+            self._pool = ThreadPool(minthreads=0, maxthreads=self.workers,
+                                    name='TaskHeaderVerifier')
+            self._pool.start()
+            reactor.addSystemEventTrigger('during', 'shutdown', self.stop)
+        return self._pool
+
+    def _verify_batch(self, headers: List[dt_tasks.TaskHeader]) \
+            -> Tuple[List[bool], float]:
+        start = time.perf_counter()
+        valid = [self._verify(header) for header in headers]
+        return valid, time.perf_counter() - start
+
+    def _update(self, keys: List[HeaderKey],
+                valid: List[bool], elapsed: float) -> None:
+        self.stats['crypto_time'] += elapsed
+        for key, is_valid in zip(keys, valid):
+            if not is_valid:
+                self.stats['invalid'] += 1
+                continue
+            self.stats['verified'] += 1
+            self._verified[key] = None
+            self._verified.move_to_end(key)
+        while len(self._verified) > self.cache_size:
+            self._verified.popitem(last=False)
+
+    @staticmethod
+    def _key(header: dt_tasks.TaskHeader) -> HeaderKey:
+        # Equal headers may serialize differently, which only costs
+        # a cache miss; different ones never share a digest
+        content = pickle.dumps(header.to_dict(), protocol=4)
+        return (header.task_id, header.signature,
+                hashlib.sha256(content).digest())
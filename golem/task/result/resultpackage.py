@@ -153,25 +153,43 @@ class EncryptingPackager(Packager):
     def create(self,
                output_path: str,
                disk_files: Dict[str, str]):
+        """ Packs, encrypts and hashes files in a single pass. The plain
+        package is still written next to the encrypted one, since it's
+        the one that Concent verifies.
+        """
+        pkg_file_path = self.package_name(output_path)
+        backup_rename(pkg_file_path)
 
-        tmp_file_path = self.package_name(output_path)
-        backup_rename(tmp_file_path)
-
-        pkg_file_path, pkg_sha1 = super().create(tmp_file_path, disk_files)
+        if not disk_files:
+            logger.warning('No files to pack')
+        else:
+            disk_files = self._prepare_file_dict(disk_files)
 
-        self.encryptor_class.encrypt(pkg_file_path, output_path,
-                                     secret=self._secret)
+        sha1 = SimpleHash.hash_object()
+        with self.encryptor_class.stream_encryptor(
+                output_path,
+                secret=self._secret,
+                hash_obj=sha1,
+                plain_out=pkg_file_path) as stream:
+            with self.generator(stream) as of:
+                if disk_files:
+                    for file_path, file_name in disk_files.items():
+                        self.write_disk_file(of, file_path, file_name)
+
+        pkg_sha1 = binascii.hexlify(sha1.digest()).decode('utf8')
         return output_path, pkg_sha1
 
     def extract(self, input_path, output_dir=None):
-        tmp_file_path = self.package_name(input_path)
-        backup_rename(tmp_file_path)
+        """ Decrypts the package on the fly while unpacking it """
+        if not output_dir:
+            output_dir = os.path.dirname(input_path)
 
-        self.encryptor_class.decrypt(input_path, tmp_file_path,
-                                     secret=self._secret)
+        with self.encryptor_class.stream_decryptor(
+                input_path, secret=self._secret) as stream:
+            result = self._packager.extract(stream, output_dir=output_dir)
         os.remove(input_path)
 
-        return self._packager.extract(tmp_file_path, output_dir=output_dir)
+        return result
 
     def generator(self, output_path):
         return self._packager.generator(output_path)
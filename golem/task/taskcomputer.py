@@ -1,7 +1,7 @@
 import asyncio
 import logging
 from pathlib import Path
-from typing import Optional, TYPE_CHECKING, Callable, Any
+from typing import Optional, TYPE_CHECKING, Callable, Any, Dict, List
 
 import os
 import time
@@ -29,7 +29,7 @@ from golem.manager.nodestatesnapshot import ComputingSubtaskStateSnapshot
 from golem.resource.dirmanager import DirManager
 from golem.task.task_api import EnvironmentTaskApiService
 from golem.task.envmanager import EnvironmentManager
-from golem.task.timer import ProviderTimer
+from golem.task.timer import ActionTimer, ProviderTimer
 from golem.vm.vm import PythonProcVM, PythonTestVM
 
 from .taskthread import TaskThread
@@ -66,7 +66,8 @@ class TaskComputerAdapter:
             task_server=task_server,
             stats_keeper=self.stats,
             use_docker_manager=use_docker_manager,
-            finished_cb=finished_cb
+            finished_cb=finished_cb,
+            slots=getattr(task_server.config_desc, 'task_computer_slots', 1),
         )
         self._new_computer = NewTaskComputer(
             env_manager=env_manager,
@@ -85,21 +86,43 @@ class TaskComputerAdapter:
         # FIXME: This shouldn't be part of the public interface probably
         return self._old_computer.dir_manager
 
-    def task_given(self, ctd: ComputeTaskDef) -> None:
-        assert not self._new_computer.has_assigned_task()
-        assert not self._old_computer.has_assigned_task()
+    def task_given(self, ctd: ComputeTaskDef) -> bool:
+        """ Assign subtask to a free slot. Task API subtasks occupy the whole
+        machine. Returns False if the subtask cannot be assigned. """
+        if not self.has_free_slot():
+            return False
 
         task_id = ctd['task_id']
         task_header = self._task_server.task_keeper.task_headers[task_id]
         if task_header.environment_prerequisites is not None:
+            if self._old_computer.has_assigned_task():
+                return False
             self._new_computer.task_given(task_header, ctd)
         else:
             self._old_computer.task_given(ctd)
+        return True
 
     def has_assigned_task(self) -> bool:
         return self._new_computer.has_assigned_task() \
             or self._old_computer.has_assigned_task()
 
+    def has_free_slot(self) -> bool:
+        return not self._new_computer.has_assigned_task() \
+            and self._old_computer.has_free_slot()
+
+    def waiting_subtask_id(self, task_id: str) -> Optional[str]:
+        """ Returns the earliest assigned subtask of the given task, which
+        hasn't been started yet """
+        if self._new_computer.has_assigned_task():
+            if self._new_computer.assigned_task_id == task_id \
+                    and not self._new_computer.is_computing():
+                return self._new_computer.assigned_subtask_id
+            return None
+        return self._old_computer.waiting_subtask_id(task_id)
+
+    def get_slots_stats(self) -> List[Dict[str, Any]]:
+        return self._old_computer.get_slots_stats()
+
     @property
     def assigned_task_id(self) -> Optional[str]:
         return self._new_computer.assigned_task_id \
@@ -125,7 +148,7 @@ class TaskComputerAdapter:
                 'is assigned')
         return self._new_computer.get_subtask_inputs_dir()
 
-    def start_computation(self) -> None:
+    def start_computation(self, subtask_id: Optional[str] = None) -> None:
         if self._new_computer.has_assigned_task():
             task_id = self.assigned_task_id
             subtask_id = self.assigned_subtask_id
@@ -134,7 +157,7 @@ class TaskComputerAdapter:
             # Fire and forget because it resolves when computation ends
             self._handle_computation_results(task_id, subtask_id, computation)
         elif self._old_computer.has_assigned_task():
-            self._old_computer.start_computation()
+            self._old_computer.start_computation(subtask_id)
         else:
             raise RuntimeError('start_computation: No task assigned.')
 
@@ -165,11 +188,11 @@ class TaskComputerAdapter:
             self._task_server.task_keeper.task_ended(task_id)
             self._finished_cb()
 
-    def task_interrupted(self) -> None:
+    def task_interrupted(self, subtask_id: Optional[str] = None) -> None:
         if self._new_computer.has_assigned_task():
             self._new_computer.task_interrupted()
         elif self._old_computer.has_assigned_task():
-            self._old_computer.task_interrupted()
+            self._old_computer.task_interrupted(subtask_id)
         else:
             raise RuntimeError('task_interrupted: No task assigned.')
 
@@ -263,7 +286,7 @@ class NewTaskComputer:
     def get_subtask_inputs_dir(self) -> Path:
         return self._get_task_dir() / task_api_constants.SUBTASK_INPUTS_DIR
 
-    def _is_computing(self) -> bool:
+    def is_computing(self) -> bool:
         return self._computation is not None
 
     def task_given(
@@ -407,7 +430,7 @@ class NewTaskComputer:
             config_desc: ClientConfigDescriptor,
             work_dir: Path
     ) -> defer.Deferred:
-        assert not self._is_computing()
+        assert not self.is_computing()
         self._work_dir = work_dir
 
         config_dict = dict(
@@ -432,9 +455,46 @@ class NewTaskComputer:
         return defer.succeed(None)
 
 
+class ComputingSlot:  # pylint: disable=too-many-instance-attributes
+    """ A single subtask computed by TaskComputer, along with the resources
+    budget and statistics of the slot. """
+
+    def __init__(self, index: int) -> None:
+        self.index = index
+        # Docker host config overrides limiting the slot's CPUs and memory
+        self.host_config: Optional[Dict[str, Any]] = None
+        self.subtask: Optional[ComputeTaskDef] = None
+        self.counting_thread: Optional[TaskThread] = None
+        self.assigned_at: Optional[float] = None
+        self.timer = ActionTimer()
+
+        self.computed_tasks = 0
+        self.tasks_with_timeout = 0
+        self.tasks_with_errors = 0
+        self.busy_time = 0.0
+
+    @property
+    def free(self) -> bool:
+        return self.subtask is None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(
+            index=self.index,
+            subtask_id=self.subtask['subtask_id'] if self.subtask else None,
+            computing=self.counting_thread is not None,
+            computed_tasks=self.computed_tasks,
+            tasks_with_timeout=self.tasks_with_timeout,
+            tasks_with_errors=self.tasks_with_errors,
+            busy_time=self.busy_time,
+        )
+
+
 class TaskComputer:  # pylint: disable=too-many-instance-attributes
     """ TaskComputer is responsible for task computations that take
-    place in Golem application. Tasks are started in separate threads. """
+    place in Golem application. Tasks are started in separate threads.
+
+    Up to `slots` subtasks are computed at the same time. CPUs and memory
+    available to Docker are split evenly between the slots. """
 
     lock = Lock()
     dir_lock = Lock()
@@ -444,11 +504,12 @@ class TaskComputer:  # pylint: disable=too-many-instance-attributes
             task_server: 'TaskServer',
             stats_keeper: Optional[IntStatsKeeper] = None,
             use_docker_manager=True,
-            finished_cb=None
+            finished_cb=None,
+            slots: int = 1,
     ) -> None:
         self.task_server = task_server
-        # Currently computing TaskThread
-        self.counting_thread = None
+        self.slots: List[ComputingSlot] = \
+            [ComputingSlot(i) for i in range(max(1, slots))]
 
         self.dir_manager: DirManager = DirManager(
             task_server.get_task_computer_root())
@@ -460,22 +521,45 @@ class TaskComputer:  # pylint: disable=too-many-instance-attributes
 
         self.stats = stats_keeper or IntStatsKeeper(CompStats)
 
-        # So apparently it is perfectly fine for mypy to assign None to a
-        # non-optional variable. And if I tried Optional['ComputeTaskDef']
-        # then I would get "Optional[Any] is not indexable" error.
-        # Get your sh*t together, mypy!
-        self.assigned_subtask: ComputeTaskDef = None
-
         self.support_direct_computation = False
         self.finished_cb = finished_cb
 
+    @property
+    def assigned_subtask(self) -> Optional[ComputeTaskDef]:
+        """ Subtask of the first busy slot """
+        slot = self._get_slot()
+        return slot.subtask if slot else None
+
+    @assigned_subtask.setter
+    def assigned_subtask(self, ctd: Optional[ComputeTaskDef]) -> None:
+        self.slots[0].subtask = ctd
+
+    @property
+    def counting_thread(self) -> Optional[TaskThread]:
+        """ Currently computing TaskThread of the first busy slot """
+        for slot in self.slots:
+            if slot.counting_thread is not None:
+                return slot.counting_thread
+        return None
+
+    @counting_thread.setter
+    def counting_thread(self, task_thread: Optional[TaskThread]) -> None:
+        self.slots[0].counting_thread = task_thread
+
     def task_given(self, ctd: ComputeTaskDef) -> None:
-        assert self.assigned_subtask is None
-        self.assigned_subtask = ctd
-        ProviderTimer.start()
+        slot = self._get_free_slot()
+        assert slot is not None
+        if not self.has_assigned_task():
+            ProviderTimer.start()
+        slot.subtask = ctd
+        slot.assigned_at = time.time()
+        slot.timer.start()
 
     def has_assigned_task(self) -> bool:
-        return bool(self.assigned_subtask)
+        return any(not slot.free for slot in self.slots)
+
+    def has_free_slot(self) -> bool:
+        return self._get_free_slot() is not None
 
     @property
     def assigned_task_id(self) -> Optional[str]:
@@ -489,17 +573,40 @@ class TaskComputer:  # pylint: disable=too-many-instance-attributes
             return None
         return self.assigned_subtask.get('subtask_id')
 
-    def task_interrupted(self) -> None:
-        assert self.assigned_subtask is not None
-        self._task_finished()
+    def waiting_subtask_id(self, task_id: str) -> Optional[str]:
+        """ Returns the earliest assigned subtask of the given task, which
+        hasn't been started yet """
+        waiting = [slot for slot in self.slots
+                   if slot.subtask is not None
+                   and slot.subtask.get('task_id') == task_id
+                   and slot.counting_thread is None]
+        if not waiting:
+            return None
+        slot = min(waiting, key=lambda s: s.assigned_at or 0)
+        return slot.subtask['subtask_id']
+
+    def get_slots_stats(self) -> List[Dict[str, Any]]:
+        return [slot.get_stats() for slot in self.slots]
+
+    def task_interrupted(self, subtask_id: Optional[str] = None) -> None:
+        slot = self._get_slot(subtask_id)
+        assert slot is not None
+        self._task_finished(slot)
 
     def task_computed(self, task_thread: TaskThread) -> None:
         if task_thread.end_time is None:
             task_thread.end_time = time.time()
 
+        slot = self._get_slot_by_thread(task_thread)
+        if slot is None:
+            logger.error("Computed task thread not found in any slot. "
+                         "task_thread=%r", task_thread)
+            return
+
         work_wall_clock_time = task_thread.end_time - task_thread.start_time
+        subtask_id = task_id = None
         try:
-            subtask = self.assigned_subtask
+            subtask = slot.subtask
             assert subtask is not None
             subtask_id = subtask['subtask_id']
             task_id = subtask['task_id']
@@ -512,7 +619,7 @@ class TaskComputer:  # pylint: disable=too-many-instance-attributes
             logger.error("Task header not found in task keeper. "
                          "task_id=%r, subtask_id=%r",
                          task_id, subtask_id)
-            self._task_finished()
+            self._task_finished(slot)
             return
 
         was_success = False
@@ -521,8 +628,10 @@ class TaskComputer:  # pylint: disable=too-many-instance-attributes
 
             if "Task timed out" in task_thread.error_msg:
                 self.stats.increase_stat('tasks_with_timeout')
+                slot.tasks_with_timeout += 1
             else:
                 self.stats.increase_stat('tasks_with_errors')
+                slot.tasks_with_errors += 1
                 self.task_server.send_task_failed(
                     subtask_id,
                     subtask['task_id'],
@@ -531,10 +640,12 @@ class TaskComputer:  # pylint: disable=too-many-instance-attributes
 
         elif task_thread.result and 'data' in task_thread.result:
 
-            logger.info("Task %r computed, work_wall_clock_time %s",
+            logger.info("Task %r computed, work_wall_clock_time %s, slot %d",
                         subtask_id,
-                        str(work_wall_clock_time))
+                        str(work_wall_clock_time),
+                        slot.index)
             self.stats.increase_stat('computed_tasks')
+            slot.computed_tasks += 1
 
             assert isinstance(task_thread.result, dict)
             try:
@@ -551,6 +662,7 @@ class TaskComputer:  # pylint: disable=too-many-instance-attributes
 
         else:
             self.stats.increase_stat('tasks_with_errors')
+            slot.tasks_with_errors += 1
             self.task_server.send_task_failed(
                 subtask_id,
                 subtask['task_id'],
@@ -559,17 +671,25 @@ class TaskComputer:  # pylint: disable=too-many-instance-attributes
 
         dispatcher.send(signal='golem.monitor', event='computation_time_spent',
                         success=was_success, value=work_time_to_be_paid)
-        self._task_finished()
+        self._task_finished(slot)
 
     def check_timeout(self):
-        if self.counting_thread is not None:
-            self.counting_thread.check_timeout()
+        for slot in self.slots:
+            if slot.counting_thread is not None:
+                slot.counting_thread.check_timeout()
 
     def get_progress(self) -> Optional[ComputingSubtaskStateSnapshot]:
-        if not self._is_computing() or self.assigned_subtask is None:
-            return None
+        """ Progress of the first computing slot """
+        for slot in self.slots:
+            if slot.counting_thread is not None and slot.subtask is not None:
+                return self._get_slot_progress(slot)
+        return None
 
-        c: TaskThread = self.counting_thread
+    @staticmethod
+    def _get_slot_progress(
+            slot: ComputingSlot
+    ) -> Optional[ComputingSubtaskStateSnapshot]:
+        c: TaskThread = slot.counting_thread
         try:
             outfilebasename = c.extra_data.get(  # type: ignore
                 'crops'
@@ -582,7 +702,7 @@ class TaskComputer:  # pylint: disable=too-many-instance-attributes
             return None
 
         tcss = ComputingSubtaskStateSnapshot(
-            subtask_id=self.assigned_subtask['subtask_id'],
+            subtask_id=slot.subtask['subtask_id'],
             progress=c.get_progress(),
             seconds_to_timeout=c.task_timeout,
             running_time_seconds=(time.time() - c.start_time),
@@ -593,7 +713,8 @@ class TaskComputer:  # pylint: disable=too-many-instance-attributes
 
     def _is_computing(self) -> bool:
         with self.lock:
-            return self.counting_thread is not None
+            return any(slot.counting_thread is not None
+                       for slot in self.slots)
 
     def get_environment(self):
         task_header_keeper = self.task_server.task_keeper
@@ -621,6 +742,8 @@ class TaskComputer:  # pylint: disable=too-many-instance-attributes
         dm = self.docker_manager
         assert isinstance(dm, DockerManager)
         dm.build_config(config_desc)
+        self._set_slots(getattr(config_desc, 'task_computer_slots', 1),
+                        config_desc.num_cores)
         work_dirs = [Path(self.dir_manager.root_path)]
 
         if dm.hypervisor and self.use_docker_manager:  # noqa pylint: disable=no-member
@@ -637,9 +760,23 @@ class TaskComputer:  # pylint: disable=too-many-instance-attributes
 
         return False
 
-    def start_computation(self) -> None:  # pylint: disable=too-many-locals
-        subtask = self.assigned_subtask
-        assert subtask is not None
+    def _set_slots(self, slots: int, num_cores: int) -> None:
+        # Every slot needs at least a single CPU core
+        slots = max(1, min(int(slots or 1), max(1, num_cores)))
+        if slots == len(self.slots):
+            return
+        if self.has_assigned_task():
+            logger.warning("Cannot change number of computing slots "
+                           "while computing. slots=%d", len(self.slots))
+            return
+        logger.info("Computing slots: %d", slots)
+        self.slots = [ComputingSlot(i) for i in range(slots)]
+
+    def start_computation(self, subtask_id: Optional[str] = None) -> None:
+        # pylint: disable=too-many-locals
+        slot = self._get_slot(subtask_id)
+        assert slot is not None and slot.subtask is not None
+        subtask = slot.subtask
 
         task_id = subtask['task_id']
         subtask_id = subtask['subtask_id']
@@ -661,8 +798,8 @@ class TaskComputer:  # pylint: disable=too-many-instance-attributes
         unique_str = str(uuid.uuid4())
 
         logger.info("Starting computation of subtask %r (task: %r, deadline: "
-                    "%r, docker images: %r)", subtask_id, task_id, deadline,
-                    docker_images)
+                    "%r, docker images: %r, slot: %d)", subtask_id, task_id,
+                    deadline, docker_images, slot.index)
 
         with self.dir_lock:
             resource_dir = self.dir_manager.get_task_resource_dir(task_id)
@@ -677,8 +814,13 @@ class TaskComputer:  # pylint: disable=too-many-instance-attributes
             docker_images = [DockerImage(**did) for did in docker_images]
             dir_mapping = DockerTaskThread.generate_dir_mapping(resource_dir,
                                                                 temp_dir)
+            if len(self.slots) > 1:
+                # pylint: disable=no-member
+                slot.host_config = self.docker_manager.get_slot_host_config(
+                    slot.index, len(self.slots))
             tt = DockerTaskThread(docker_images, extra_data,
-                                  dir_mapping, task_timeout)
+                                  dir_mapping, task_timeout,
+                                  host_config=slot.host_config)
         elif self.support_direct_computation:
             tt = PyTaskThread(extra_data, resource_dir, temp_dir,
                               task_timeout)
@@ -686,41 +828,80 @@ class TaskComputer:  # pylint: disable=too-many-instance-attributes
             logger.error("Cannot run PyTaskThread in this version")
             self.task_server.send_task_failed(
                 subtask_id,
-                self.assigned_subtask['task_id'],
+                task_id,
                 "Host direct task not supported",
             )
 
-            self._task_finished()
+            self._task_finished(slot)
             return
 
         with self.lock:
-            self.counting_thread = tt
+            slot.counting_thread = tt
 
         self.task_server.task_keeper.task_started(task_id)
         tt.start().addBoth(lambda _: self.task_computed(tt))
 
-    def _task_finished(self) -> None:
-        ctd = self.assigned_subtask
-        assert ctd is not None
-        self.assigned_subtask = None
+    def _get_free_slot(self) -> Optional[ComputingSlot]:
+        for slot in self.slots:
+            if slot.free:
+                return slot
+        return None
+
+    def _get_slot(self,
+                  subtask_id: Optional[str] = None) -> Optional[ComputingSlot]:
+        """ Returns slot computing the given subtask or the first busy slot """
+        for slot in self.slots:
+            if slot.free:
+                continue
+            if subtask_id is None or slot.subtask['subtask_id'] == subtask_id:
+                return slot
+        return None
+
+    def _get_slot_by_thread(
+            self,
+            task_thread: TaskThread
+    ) -> Optional[ComputingSlot]:
+        for slot in self.slots:
+            if slot.counting_thread is task_thread:
+                return slot
+        return None
 
-        ProviderTimer.finish()
+    def _task_finished(self, slot: Optional[ComputingSlot] = None) -> None:
+        if slot is None:
+            slot = self._get_slot()
+        assert slot is not None
+        ctd = slot.subtask
+        assert ctd is not None
+        slot.subtask = None
+        slot.assigned_at = None
+
+        started = slot.counting_thread is not None
+        if not slot.timer.finished:
+            slot.timer.finish()
+        computation_time = slot.timer.time
+        if computation_time is not None:
+            slot.busy_time += computation_time
+        if not self.has_assigned_task():
+            ProviderTimer.finish()
         dispatcher.send(
             signal='golem.taskcomputer',
             event='subtask_finished',
             subtask_id=ctd['subtask_id'],
             min_performance=ctd['performance'],
+            computation_time=computation_time,
         )
 
         with self.lock:
-            self.counting_thread = None
-        self.task_server.task_keeper.task_ended(ctd['task_id'])
+            slot.counting_thread = None
+        if started:
+            self.task_server.task_keeper.task_ended(ctd['task_id'])
         if self.finished_cb:
             self.finished_cb()
 
     def quit(self):
-        if self.counting_thread is not None:
-            self.counting_thread.end_comp()
+        for slot in self.slots:
+            if slot.counting_thread is not None:
+                slot.counting_thread.end_comp()
 
 
 class PyTaskThread(TaskThread):
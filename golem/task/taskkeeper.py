@@ -1,11 +1,12 @@
 import datetime
+import heapq
 import logging
 import pathlib
 import pickle
 import time
 import typing
 import random
-from collections import Counter
+from collections import Counter, OrderedDict
 
 from eth_utils import decode_hex
 from twisted.internet.defer import inlineCallbacks, Deferred
@@ -29,6 +30,10 @@ from golem.environments.environmentsmanager import \
 from golem.task.envmanager import EnvironmentManager as NewEnvManager
 from golem.task.taskproviderstats import ProviderStatsManager
 
+if typing.TYPE_CHECKING:
+    # pylint:disable=unused-import, ungrouped-imports
+    from golem.task.taskscheduler import ExpectedProfitScheduler
+
 logger = logging.getLogger(__name__)
 
 
@@ -57,6 +62,74 @@ class WrongOwnerException(Exception):
     pass
 
 
+class IndexedSet:
+    """ Set of ids that supports O(1) membership checks, removal and
+    random choice. Removal swaps the removed element with the last one,
+    so the order of elements is not preserved.
+    """
+
+    def __init__(self, items: typing.Iterable[str] = ()) -> None:
+        self._items: typing.List[str] = []
+        self._index: typing.Dict[str, int] = {}
+        for item in items:
+            self.add(item)
+
+    def __contains__(self, item) -> bool:
+        return item in self._index
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> typing.Iterator[str]:
+        return iter(list(self._items))
+
+    def __getitem__(self, position: int) -> str:
+        return self._items[position]
+
+    def __repr__(self):
+        return '<IndexedSet: %r>' % (self._items,)
+
+    def add(self, item: str) -> None:
+        if item in self._index:
+            return
+        self._index[item] = len(self._items)
+        self._items.append(item)
+
+    def discard(self, item: str) -> None:
+        position = self._index.pop(item, None)
+        if position is None:
+            return
+        last = self._items.pop()
+        if position < len(self._items):
+            self._items[position] = last
+            self._index[last] = position
+
+    def remove(self, item: str) -> None:
+        if item not in self._index:
+            raise KeyError(item)
+        self.discard(item)
+
+    def choice(
+            self,
+            exclude: typing.Optional[typing.Set[str]] = None,
+    ) -> typing.Optional[str]:
+        """ Return a random element not present in `exclude` or None """
+        if not exclude:
+            return random.choice(self._items) if self._items else None
+
+        excluded = sum(1 for item in exclude if item in self._index)
+        if excluded >= len(self._items):
+            return None
+        # Rejection sampling keeps the choice uniform and is cheap as long
+        # as most of the elements are not excluded
+        if excluded * 2 <= len(self._items):
+            while True:
+                item = random.choice(self._items)
+                if item not in exclude:
+                    return item
+        return random.choice([i for i in self._items if i not in exclude])
+
+
 class CompTaskInfo:
     def __init__(self, header: dt_tasks.TaskHeader, performance: float) -> None:
         self.header = header
@@ -323,22 +396,27 @@ class TaskHeaderKeeper:
             remove_task_timeout=180,
             verification_timeout=3600,
             max_tasks_per_requestor=10,
-            task_archiver=None):
+            task_archiver=None,
+            scheduler: 'typing.Optional[ExpectedProfitScheduler]' = None):
         # all computing tasks that this node knows about
         self.task_headers: typing.Dict[str, dt_tasks.TaskHeader] = {}
         # ids of tasks that this node may try to compute
-        self.supported_tasks: typing.List[str] = []
-        # ids of tasks that are computing on this node
-        self.running_tasks: typing.Set[str] = set()
+        self.supported_tasks = IndexedSet()
+        # ids of tasks that are computing on this node, along with
+        # the number of their subtasks being computed
+        self.running_tasks: typing.Counter[str] = Counter()
         # results of tasks' support checks
         self.support_status: typing.Dict[str, SupportStatus] = {}
         # tasks that were removed from network recently, so they won't
         # be added again to task_headers
         self.removed_tasks: typing.Dict[str, float] = {}
-        # task ids by owner
-        self.tasks_by_owner: typing.Dict[str, typing.Set[str]] = {}
+        # task ids by owner, ordered by the time of the last check
+        self.tasks_by_owner: \
+            typing.Dict[str, typing.MutableMapping[str, None]] = {}
         # Keep track which tasks were checked when
         self.last_checking: typing.Dict[str, datetime.datetime] = {}
+        # (deadline, task_id) heap; outdated entries are skipped on pop
+        self._deadlines: typing.List[typing.Tuple[int, str]] = []
 
         self.min_price = min_price
         self.verification_timeout = verification_timeout
@@ -350,6 +428,9 @@ class TaskHeaderKeeper:
         self.max_tasks_per_requestor = max_tasks_per_requestor
         self.task_archiver = task_archiver
         self.node = node
+        # orders supported tasks in `get_task`; tasks are chosen at random
+        # when there's no scheduler
+        self.scheduler = scheduler
 
     @inlineCallbacks
     def check_support(self, header: dt_tasks.TaskHeader) \
@@ -471,12 +552,16 @@ class TaskHeaderKeeper:
         if config_desc.min_price == self.min_price:
             return
         self.min_price = config_desc.min_price
-        self.supported_tasks = []
-        for id_, th in self.task_headers.items():
+        self.supported_tasks = IndexedSet()
+        if self.scheduler is not None:
+            self.scheduler.clear()
+        for id_, th in list(self.task_headers.items()):
             supported = yield self.check_support(th)
             self.support_status[id_] = supported
             if supported:
-                self.supported_tasks.append(id_)
+                self.supported_tasks.add(id_)
+                if self.scheduler is not None:
+                    self.scheduler.add(th)
             if self.task_archiver:
                 self.task_archiver.add_support_status(id_, supported)
 
@@ -508,8 +593,12 @@ class TaskHeaderKeeper:
 
             self.task_headers[task_id] = header
             self.last_checking[task_id] = datetime.datetime.now()
+            if not old_header or old_header.deadline != header.deadline:
+                heapq.heappush(self._deadlines, (header.deadline, task_id))
 
-            self._get_tasks_by_owner_set(header.task_owner.key).add(task_id)
+            owner_tasks = self._get_tasks_by_owner_set(header.task_owner.key)
+            owner_tasks[task_id] = None
+            owner_tasks.move_to_end(task_id)  # type: ignore
 
             sync_wait(self.update_supported_set(header))
 
@@ -533,14 +622,19 @@ class TaskHeaderKeeper:
         self.support_status[task_id] = support
 
         if not support and task_id in self.supported_tasks:
-            self.supported_tasks.remove(task_id)
+            self.supported_tasks.discard(task_id)
+            if self.scheduler is not None:
+                self.scheduler.discard(task_id)
         if support and task_id not in self.supported_tasks:
             logger.info(
                 "Adding task %r support=%r",
                 task_id,
                 support
             )
-            self.supported_tasks.append(task_id)
+            self.supported_tasks.add(task_id)
+        if support and self.scheduler is not None:
+            # Price or deadline of the task might have changed
+            self.scheduler.add(header)
 
     @staticmethod
     def check_owner(task_id: str, owner_id: str) -> None:
@@ -548,9 +642,10 @@ class TaskHeaderKeeper:
             raise WrongOwnerException(
                 "Task_id %s doesn't match task owner %s", task_id, owner_id)
 
-    def _get_tasks_by_owner_set(self, owner_key_id):
+    def _get_tasks_by_owner_set(self, owner_key_id) \
+            -> typing.MutableMapping[str, None]:
         if owner_key_id not in self.tasks_by_owner:
-            self.tasks_by_owner[owner_key_id] = set()
+            self.tasks_by_owner[owner_key_id] = OrderedDict()
 
         return self.tasks_by_owner[owner_key_id]
 
@@ -570,19 +665,20 @@ class TaskHeaderKeeper:
         return node
 
     def check_max_tasks_per_owner(self, owner_key_id):
-        owner_task_set = self._get_tasks_by_owner_set(owner_key_id)
+        owner_tasks = self._get_tasks_by_owner_set(owner_key_id)
 
-        not_running = owner_task_set - self.running_tasks
+        if len(owner_tasks) <= self.max_tasks_per_requestor:
+            return
 
+        # owner_tasks are already ordered by age
+        not_running = [tid for tid in owner_tasks
+                       if tid not in self.running_tasks]
         if len(not_running) <= self.max_tasks_per_requestor:
             return
 
-        by_age = sorted(not_running,
-                        key=lambda tid: self.last_checking[tid])
-
         # leave alone the first (oldest) max_tasks_per_requestor
         # headers, remove the rest
-        to_remove = by_age[self.max_tasks_per_requestor:]
+        to_remove = not_running[self.max_tasks_per_requestor:]
 
         logger.debug(
             "Limiting tasks for this node, dropping %d tasks. "
@@ -607,31 +703,19 @@ class TaskHeaderKeeper:
 
         try:
             owner_key_id = self.task_headers[task_id].task_owner.key
-            self.tasks_by_owner[owner_key_id].discard(task_id)
+            self.tasks_by_owner[owner_key_id].pop(task_id, None)
         except KeyError:
             pass
 
+        self.supported_tasks.discard(task_id)
+        if self.scheduler is not None:
+            self.scheduler.discard(task_id)
         for container in (
                 self.task_headers,
-                self.supported_tasks,
                 self.support_status,
                 self.last_checking
         ):
-            if isinstance(container, list):
-                try:
-                    container.remove(task_id)
-                except ValueError:
-                    pass
-                continue
-            if isinstance(container, dict):
-                try:
-                    del container[task_id]
-                except KeyError:
-                    pass
-                continue
-            raise RuntimeError(
-                "Unknown container type {}".format(type(container)),
-            )
+            container.pop(task_id, None)  # type: ignore
 
         self.removed_tasks[task_id] = time.time()
         return True
@@ -649,34 +733,52 @@ class TaskHeaderKeeper:
             self,
             exclude: typing.Optional[typing.Set[str]] = None
     ) -> typing.Optional[dt_tasks.TaskHeader]:
-        """ Returns random task from supported tasks that may be computed
+        """ Returns the best task, according to the scheduler, or a random
+        one from supported tasks that may be computed
         :param exclude: Task ids to exclude
         :return: None if there are no tasks that this node may want to compute
         """
         logger.debug("`get_task` called. exclude=%r", exclude)
-        tasks = self.supported_tasks
-        if exclude:
-            tasks = [t for t in tasks if t not in exclude]
-        if not tasks:
+        if self.scheduler is not None:
+            task_id = self.scheduler.choose(exclude)
+        else:
+            task_id = self.supported_tasks.choice(exclude)
+        if task_id is None:
             logger.debug("`get_task`: no potential task candidates found.")
             return None
-        task_id = random.choice(tasks)
         logger.debug("`get_task`: task candidate found. task_id=%r", task_id)
         return self.task_headers[task_id]
 
+    def postpone_task(self, task_id: str) -> None:
+        """ Let `get_task` choose other tasks for a while, after the task
+        couldn't be requested """
+        if self.scheduler is not None:
+            self.scheduler.postpone(task_id)
+
     def remove_old_tasks(self):
-        for t in list(self.task_headers.values()):
-            cur_time = common.get_timestamp_utc()
-            if cur_time > t.deadline:
-                logger.debug("Task owned by %s removed after deadline, "
-                             "task_id: %s",
-                             t.task_owner.key, t.task_id)
-                self.remove_task_header(t.task_id)
-
-        for task_id, remove_time in list(self.removed_tasks.items()):
-            cur_time = time.time()
-            if cur_time - remove_time > self.removed_task_timeout:
-                del self.removed_tasks[task_id]
+        cur_time = common.get_timestamp_utc()
+        postponed = []
+        while self._deadlines and self._deadlines[0][0] < cur_time:
+            entry = heapq.heappop(self._deadlines)
+            deadline, task_id = entry
+            t = self.task_headers.get(task_id)
+            if t is None or t.deadline != deadline:
+                continue  # outdated entry
+            logger.debug("Task owned by %s removed after deadline, "
+                         "task_id: %s",
+                         t.task_owner.key, t.task_id)
+            if not self.remove_task_header(t.task_id):
+                postponed.append(entry)
+        for entry in postponed:
+            heapq.heappush(self._deadlines, entry)
+
+        # removed_tasks are ordered by the time of removal
+        cur_time = time.time()
+        while self.removed_tasks:
+            task_id, remove_time = next(iter(self.removed_tasks.items()))
+            if cur_time - remove_time <= self.removed_task_timeout:
+                break
+            del self.removed_tasks[task_id]
 
     def get_unsupport_reasons(self):
         """
@@ -710,14 +812,16 @@ class TaskHeaderKeeper:
         return ret
 
     def task_started(self, task_id):
-        self.running_tasks.add(task_id)
+        self.running_tasks[task_id] += 1
 
     def task_ended(self, task_id):
-        try:
-            self.running_tasks.remove(task_id)
-        except KeyError:
+        if task_id not in self.running_tasks:
             logger.debug(
                 "Cannot remove running task. Not found. "
                 "task_id=%r",
                 task_id,
             )
+            return
+        self.running_tasks[task_id] -= 1
+        if self.running_tasks[task_id] <= 0:
+            del self.running_tasks[task_id]
@@ -2,7 +2,6 @@
 
 import logging
 import os
-import pickle
 import shutil
 import time
 import uuid
@@ -46,6 +45,7 @@ from golem.task.result.resultmanager import EncryptedResultPackageManager
 from golem.task.taskbase import TaskEventListener, Task, \
     TaskPurpose, AcceptClientVerdict, TaskResult
 from golem.task.taskkeeper import CompTaskKeeper, compute_subtask_value
+from golem.task.taskpersistence import TaskPersistence
 from golem.task.taskrequestorstats import RequestorTaskStatsManager
 from golem.task.taskstate import TaskState, TaskStatus, SubtaskStatus, \
     SubtaskState, Operation, TaskOp, SubtaskOp, OtherOp
@@ -128,6 +128,12 @@ class TaskManager(TaskEventListener):
         self.tasks_dir = tasks_dir / "tmanager"
         if not self.tasks_dir.is_dir():
             self.tasks_dir.mkdir(parents=True)
+        self.persistence = TaskPersistence(
+            self.tasks_dir,
+            snapshot_getter=self._get_task_snapshot,
+            flush_interval=config_desc.task_persistence_interval,
+            journal=bool(config_desc.task_persistence_journal),
+        )
         self.root_path = root_path
         self.dir_manager = DirManager(self.get_task_manager_root())
 
@@ -274,35 +280,24 @@ class TaskManager(TaskEventListener):
         logger.info("Task %s started", task_id)
 
     def _dump_filepath(self, task_id):
-        return self.tasks_dir / ('%s.pickle' % (task_id,))
+        return self.persistence.snapshot_path(task_id)
+
+    def _get_task_snapshot(self, task_id: str) \
+            -> Optional[Tuple[Task, TaskState]]:
+        if task_id not in self.tasks:
+            return None
+        return self.tasks[task_id], self.tasks_states[task_id]
 
     def dump_task(self, task_id: str) -> None:
         logger.debug('DUMP TASK %r', task_id)
-        filepath = self._dump_filepath(task_id)
-        try:
-            data = self.tasks[task_id], self.tasks_states[task_id]
-            logger.debug('DUMPING TASK %r', filepath)
-            with filepath.open('wb') as f:
-                pickle.dump(data, f, protocol=2)
-            logger.debug('TASK %s DUMPED in %r', task_id, filepath)
-        except Exception:  # pylint: disable=broad-except
-            logger.exception(
-                'DUMP ERROR task_id: %r task: %r state: %r',
-                task_id, self.tasks.get(task_id, '<not found>'),
-                self.tasks_states.get(task_id, '<not found>'),
-            )
-            if filepath.exists():
-                filepath.unlink()
-            raise
+        self.persistence.dump(task_id)
 
     def remove_dump(self, task_id: str):
-        filepath = self._dump_filepath(task_id)
-        try:
-            filepath.unlink()
-            logger.debug('TASK DUMP with id %s REMOVED from %r',
-                         task_id, filepath)
-        except (FileNotFoundError, OSError) as e:
-            logger.warning("Couldn't remove dump file: %s - %s", filepath, e)
+        self.persistence.remove(task_id)
+
+    def quit(self) -> None:
+        """ Save pending task changes """
+        self.persistence.quit()
 
     def _create_task_output_dir(self, task_def: 'TaskDefinition'):
         """
@@ -342,41 +337,29 @@ class TaskManager(TaskEventListener):
     def restore_tasks(self) -> None:
         logger.debug('SEARCHING FOR TASKS TO RESTORE')
         broken_paths = set()
-        for path in self.tasks_dir.iterdir():
-            if not path.suffix == '.pickle':
+        for path, restored in self.persistence.restore():
+            if restored is None:
+                broken_paths.add(path)
                 continue
-            logger.debug('RESTORE TASKS %r', path)
-
-            task_id = None
-            with path.open('rb') as f:
-                try:
-                    task: Task
-                    state: TaskState
-                    task, state = pickle.load(f)
-                except Exception:  # pylint: disable=broad-except
-                    logger.exception('Problem restoring task from: %s', path)
-                    # On Windows, attempting to remove a file that is in use
-                    # causes an exception to be raised, therefore
-                    # we'll remove broken files later
-                    broken_paths.add(path)
-                else:
-                    task.register_listener(self)
 
-                    task_id = task.header.task_id
-                    self.tasks[task_id] = task
-                    self.tasks_states[task_id] = state
+            task: Task
+            state: TaskState
+            task, state = restored
+            task.register_listener(self)
 
-                    for sub in state.subtask_states.values():
-                        self.subtask2task_mapping[sub.subtask_id] = task_id
+            task_id = task.header.task_id
+            self.tasks[task_id] = task
+            self.tasks_states[task_id] = state
 
-                    logger.debug('TASK %s RESTORED from %r', task_id, path)
+            for sub in state.subtask_states.values():
+                self.subtask2task_mapping[sub.subtask_id] = task_id
 
-            if task_id is not None:
-                self.notice_task_updated(task_id, op=TaskOp.RESTORED,
-                                         persist=False)
+            logger.debug('TASK %s RESTORED from %r', task_id, path)
+            self.notice_task_updated(task_id, op=TaskOp.RESTORED,
+                                     persist=False)
 
         for path in broken_paths:
-            path.unlink()
+            self.persistence.remove(path.stem)
 
     @handle_task_key_error
     def resources_send(self, task_id):
@@ -1146,6 +1129,12 @@ class TaskManager(TaskEventListener):
         task_type = self.task_types[task_type_name]
         return task_type.get_preview(task, single=single)
 
+    def get_task_preview_bytes(self, task_id, frame=None):
+        task = self.tasks[task_id]
+        task_type_name = task.task_definition.task_type.lower()
+        task_type = self.task_types[task_type_name]
+        return task_type.get_preview_bytes(task, frame=frame)
+
     def add_comp_task_request(self, theader, price, performance):
         """ Add a header of a task which this node may try to compute """
         self.comp_task_keeper.add_request(theader, price, performance)
@@ -1212,7 +1201,7 @@ class TaskManager(TaskEventListener):
         )
 
         if persist:
-            self.dump_task(task_id)
+            self._persist_task(task_id, subtask_id, op)
 
         task_state = self.tasks_states.get(task_id)
         dispatcher.send(
@@ -1231,6 +1220,23 @@ class TaskManager(TaskEventListener):
                 and op.task_related() and op.is_completed():
             self.finished_cb()
 
+    def _persist_task(self, task_id: str,
+                      subtask_id: Optional[str] = None,
+                      op: Optional[Operation] = None):
+        """ Task level operations are saved right away, subtask level ones
+        are coalesced and saved in the background """
+        if not subtask_id or (op and op.task_related()):
+            self.dump_task(task_id)
+            return
+
+        task_state = self.tasks_states[task_id]
+        subtask_state = task_state.subtask_states.get(subtask_id)
+        if subtask_state is None:
+            self.persistence.mark_dirty(task_id)
+        else:
+            self.persistence.journal_subtask(task_id, subtask_state,
+                                             task_state)
+
     def _stop_timers(self, task_id: str,
                      subtask_id: Optional[str] = None,
                      op: Optional[Operation] = None):
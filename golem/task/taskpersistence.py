@@ -0,0 +1,279 @@
+import logging
+import os
+import pickle
+import queue
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional, Set, Tuple, \
+    TYPE_CHECKING
+
+from golem.task.taskstate import TaskState
+
+if TYPE_CHECKING:
+    # pylint:disable=unused-import, ungrouped-imports
+    from golem.task.taskbase import Task
+    from golem.task.taskstate import SubtaskState
+
+
+logger = logging.getLogger(__name__)
+
+SnapshotGetter = Callable[[str], Optional[Tuple['Task', TaskState]]]
+
+
+class TaskPersistence:
+    """ Persists requested tasks without blocking the reactor on every change
+
+    Task snapshots are pickled at most once per `flush_interval`, no matter
+    how many times the task was marked as dirty in the meantime. Pickling
+    is performed on the calling (reactor) thread, so that it never observes
+    a task in the middle of a change; writing the data to disk is done by
+    a background writer thread, one file at a time and in order.
+
+    Snapshots are saved atomically: data is written to a temporary file,
+    which then replaces the previous snapshot.
+
+    When `journal` is enabled, subtask operations append the changed
+    subtask state to a per-task journal instead of scheduling a snapshot.
+    Journals are compacted, i.e. replaced with a fresh snapshot, after
+    `journal_limit` entries. `restore` replays the journal on top of
+    the snapshot.
+    """
+
+    SNAPSHOT_SUFFIX = '.pickle'
+    JOURNAL_SUFFIX = '.journal'
+    TMP_SUFFIX = '.tmp'
+
+    def __init__(self,
+                 tasks_dir: Path,
+                 snapshot_getter: SnapshotGetter,
+                 flush_interval: float = 5.0,
+                 journal: bool = False,
+                 journal_limit: int = 1000) -> None:
+        self.tasks_dir = tasks_dir
+        self.flush_interval = flush_interval
+        self.journal = journal
+        self.journal_limit = journal_limit
+
+        self._snapshot_getter = snapshot_getter
+        self._dirty: Set[str] = set()
+        self._journal_sizes: Dict[str, int] = {}
+        self._flush_call = None
+        # Snapshot generations, used to drop writes that became outdated
+        # while waiting in the queue
+        self._generations: Dict[str, int] = {}
+        self._written: Dict[str, int] = {}
+
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def snapshot_path(self, task_id: str) -> Path:
+        return self.tasks_dir / (task_id + self.SNAPSHOT_SUFFIX)
+
+    def journal_path(self, task_id: str) -> Path:
+        return self.tasks_dir / (task_id + self.JOURNAL_SUFFIX)
+
+    def dump(self, task_id: str) -> None:
+        """ Save task snapshot synchronously """
+        self._dirty.discard(task_id)
+        data = self._serialize(task_id)
+        if data is None:
+            return
+        with self._lock:
+            self._write_snapshot(task_id, *data)
+
+    def mark_dirty(self, task_id: str) -> None:
+        """ Schedule saving task snapshot with the next flush """
+        self._dirty.add(task_id)
+        self._schedule_flush()
+
+    def journal_subtask(self, task_id: str,
+                        subtask_state: 'SubtaskState',
+                        task_state: TaskState) -> None:
+        """ Record a change of a single subtask. Falls back to `mark_dirty`
+        when journaling is disabled.
+        """
+        if not self.journal or task_id in self._dirty:
+            self.mark_dirty(task_id)
+            return
+
+        attributes = {k: v for k, v in vars(task_state).items()
+                      if k != 'subtask_states'}
+        entry = pickle.dumps(
+            (subtask_state.subtask_id, subtask_state, attributes),
+            protocol=2,
+        )
+        generation = self._generations.get(task_id, 0)
+        self._submit(self._append_journal, task_id, generation, entry)
+
+        size = self._journal_sizes.get(task_id, 0) + 1
+        self._journal_sizes[task_id] = size
+        if size >= self.journal_limit:
+            self.mark_dirty(task_id)
+
+    def remove(self, task_id: str) -> None:
+        """ Remove snapshot and journal of the task """
+        self._dirty.discard(task_id)
+        self._journal_sizes.pop(task_id, None)
+        with self._lock:
+            self._written[task_id] = self._generations.get(task_id, 0)
+            for path in (self.snapshot_path(task_id),
+                         self.journal_path(task_id)):
+                try:
+                    path.unlink()
+                    logger.debug('TASK DUMP with id %s REMOVED from %r',
+                                 task_id, path)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    logger.warning("Couldn't remove dump file: %s - %s",
+                                   path, e)
+
+    def flush(self) -> None:
+        """ Serialize all dirty tasks and pass them to the writer """
+        if self._flush_call and self._flush_call.active():
+            self._flush_call.cancel()
+        self._flush_call = None
+
+        dirty, self._dirty = self._dirty, set()
+        for task_id in dirty:
+            try:
+                data = self._serialize(task_id)
+            except Exception:  # pylint: disable=broad-except
+                continue
+            if data is not None:
+                self._submit(self._write_snapshot, task_id, *data)
+
+    def quit(self) -> None:
+        """ Flush all pending changes and wait for the writer to finish """
+        self.flush()
+        if self._thread and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._thread = None
+
+    def restore(self) -> Iterator[Tuple[Path, Optional[Tuple['Task',
+                                                            TaskState]]]]:
+        """ Generator returning snapshot paths along with restored task and
+        its state, or None if the snapshot is broken.
+        """
+        for path in self.tasks_dir.iterdir():
+            if path.suffix == self.TMP_SUFFIX:
+                path.unlink()
+                continue
+            if not path.suffix == self.SNAPSHOT_SUFFIX:
+                continue
+            logger.debug('RESTORE TASKS %r', path)
+
+            try:
+                with path.open('rb') as f:
+                    task, state = pickle.load(f)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception('Problem restoring task from: %s', path)
+                yield path, None
+                continue
+
+            task_id = task.header.task_id
+            self._replay_journal(task_id, state)
+            yield path, (task, state)
+
+    def _serialize(self, task_id: str) -> Optional[Tuple[int, bytes]]:
+        snapshot = self._snapshot_getter(task_id)
+        if snapshot is None:
+            return None
+        try:
+            data = pickle.dumps(snapshot, protocol=2)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception(
+                'DUMP ERROR task_id: %r task: %r state: %r',
+                task_id, *snapshot,
+            )
+            raise
+        self._journal_sizes.pop(task_id, None)
+        generation = self._generations.get(task_id, 0) + 1
+        self._generations[task_id] = generation
+        return generation, data
+
+    def _schedule_flush(self) -> None:
+        if self._flush_call:
+            return
+        from twisted.internet import reactor
+        self._flush_call = reactor.callLater(self.flush_interval, self.flush)
+
+    def _submit(self, method: Callable[[str, int, bytes], None],
+                task_id: str, generation: int, data: bytes) -> None:
+        if not (self._thread and self._thread.is_alive()):
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        self._queue.put((method, task_id, generation, data))
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            method, task_id, generation, data = item
+            try:
+                with self._lock:
+                    method(task_id, generation, data)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception('Cannot persist task %s', task_id)
+
+    def _write_snapshot(self, task_id: str, generation: int,
+                        data: bytes) -> None:
+        if generation <= self._written.get(task_id, 0):
+            return
+        self._written[task_id] = generation
+
+        filepath = self.snapshot_path(task_id)
+        tmp_path = filepath.with_suffix(self.TMP_SUFFIX)
+        logger.debug('DUMPING TASK %r', filepath)
+
+        with tmp_path.open('wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(str(tmp_path), str(filepath))
+
+        # Snapshot includes all the changes journaled so far
+        journal_path = self.journal_path(task_id)
+        if journal_path.exists():
+            journal_path.unlink()
+        logger.debug('TASK %s DUMPED in %r', task_id, filepath)
+
+    def _append_journal(self, task_id: str, generation: int,
+                        data: bytes) -> None:
+        if generation < self._written.get(task_id, 0):
+            # Change is already included in a newer snapshot
+            return
+        if not self.snapshot_path(task_id).exists():
+            # Task has been removed in the meantime
+            return
+        with self.journal_path(task_id).open('ab') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _replay_journal(self, task_id: str, state: TaskState) -> None:
+        journal_path = self.journal_path(task_id)
+        if not journal_path.exists():
+            return
+
+        entries = 0
+        with journal_path.open('rb') as f:
+            while True:
+                try:
+                    subtask_id, subtask_state, attributes = pickle.load(f)
+                except EOFError:
+                    break
+                except Exception:  # pylint: disable=broad-except
+                    # Last entry might have been written partially
+                    logger.warning('Truncated journal of task %s', task_id)
+                    break
+                state.subtask_states[subtask_id] = subtask_state
+                state.__dict__.update(attributes)
+                entries += 1
+
+        self._journal_sizes[task_id] = entries
+        logger.debug('TASK %s journal replayed, entries=%d', task_id, entries)
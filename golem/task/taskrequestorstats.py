@@ -1,6 +1,6 @@
 import logging
 import time
-from collections import defaultdict
+from collections import Counter, defaultdict
 from threading import Lock
 from typing import NamedTuple, Optional
 
@@ -18,9 +18,39 @@ TaskMsg = NamedTuple("TaskMsg", [("ts", float), ("op", Operation)])
 
 
 class SubtaskInfo:
+    """Latest state of a subtask
+
+    Only the state needed by the statistics is kept, so memory used by
+    a subtask does not grow with the number of messages about it.
+    """
+
     def __init__(self):
         self.latest_status = SubtaskStatus.starting
-        self.messages = []
+        # RESULT_DOWNLOADING not followed by FINISHED nor NOT_ACCEPTED
+        self.downloading = False
+        # ASSIGNED not followed by TIMEOUT, FINISHED, FAILED nor NOT_ACCEPTED
+        self.assigned = False
+
+    def got_message(self, op: Operation, latest_status: SubtaskStatus):
+        self.latest_status = latest_status
+        if op == SubtaskOp.RESULT_DOWNLOADING:
+            self.downloading = True
+        elif op in [SubtaskOp.FINISHED, SubtaskOp.NOT_ACCEPTED]:
+            self.downloading = False
+        if op == SubtaskOp.ASSIGNED:
+            self.assigned = True
+        elif op in [SubtaskOp.TIMEOUT,
+                    SubtaskOp.FINISHED,
+                    SubtaskOp.FAILED,
+                    SubtaskOp.NOT_ACCEPTED]:
+            self.assigned = False
+
+    def is_verified(self) -> bool:
+        return self.latest_status == SubtaskStatus.finished
+
+    def is_in_progress(self) -> bool:
+        return self.assigned and self.latest_status not in [
+            SubtaskStatus.finished, SubtaskStatus.failure]
 
 
 class TaskInfo:
@@ -30,14 +60,23 @@ class TaskInfo:
     processes those information to get statistical information. It is probably
     only useful for :py:class:`RequestorTaskStats` objects which fill instances
     of this class with information.
+
+    Counters are updated with every message, so that getting the statistics
+    doesn't depend on the number of subtasks and messages.
     """
 
     def __init__(self):
         self.latest_status = TaskStatus.notStarted  # type: TaskStatus
         self._want_to_compute_count = 0
-        self.messages = []  # type: List[TaskMsg]
         self.subtasks = defaultdict(
             SubtaskInfo)  # type: DefaultDict[str, SubtaskInfo]
+        self._subtask_ops = Counter()  # type: Counter[Operation]
+        self._verified_count = 0
+        self._not_downloaded_count = 0
+        self._in_progress_count = 0
+        self._had_failures = False
+        self._start_time = 0.0
+        self._finish_time = 0.0
 
     def got_want_to_compute(self):
         """Makes note of a received work offer"""
@@ -46,14 +85,32 @@ class TaskInfo:
 
     def got_task_message(self, msg: TaskMsg, latest_status: TaskStatus):
         """Stores information from task level message"""
-        self.messages.append(msg)
+        if msg.op in [TaskOp.CREATED, TaskOp.RESTORED]:
+            self._start_time = msg.ts or self._start_time
+        elif msg.op.is_completed():
+            self._finish_time = msg.ts or self._finish_time
+        if msg.op in [TaskOp.NOT_ACCEPTED, TaskOp.TIMEOUT]:
+            self._had_failures = True
         self.latest_status = latest_status
 
     def got_subtask_message(self, subtask_id: str, msg: TaskMsg,
                             latest_status: SubtaskStatus):
         """Stores information from subtask level message"""
-        self.subtasks[subtask_id].latest_status = latest_status
-        self.subtasks[subtask_id].messages.append(msg)
+        st = self.subtasks[subtask_id]
+        self._verified_count -= st.is_verified()
+        self._not_downloaded_count -= st.downloading
+        self._in_progress_count -= st.is_in_progress()
+
+        st.got_message(msg.op, latest_status)
+        if msg.op in [SubtaskOp.FAILED,
+                      SubtaskOp.NOT_ACCEPTED,
+                      SubtaskOp.TIMEOUT]:
+            self._subtask_ops[msg.op] += 1
+            self._had_failures = True
+
+        self._verified_count += st.is_verified()
+        self._not_downloaded_count += st.downloading
+        self._in_progress_count += st.is_in_progress()
 
     def subtask_count(self) -> int:
         """Number of subtasks of this task"""
@@ -75,34 +132,19 @@ class TaskInfo:
         This is equal to the number of subtasks with the latest state
         ``SubtaskStatus.finished``.
         """
-        cnt = 0
-        for st in self.subtasks.values():
-            if st.latest_status == SubtaskStatus.finished:
-                cnt += 1
-        return cnt
-
-    def _subtasks_count_specific_ops(self, op: Operation):
-        cnt = 0
-        for st in self.subtasks.values():
-            for msg in st.messages:
-                if msg.op == op:
-                    cnt += 1
-        return cnt
+        return self._verified_count
 
     def not_accepted_results_count(self) -> int:
         """Number of times a subtask failed verification"""
-        return self._subtasks_count_specific_ops(
-            SubtaskOp.NOT_ACCEPTED)
+        return self._subtask_ops[SubtaskOp.NOT_ACCEPTED]
 
     def timeout_count(self) -> int:
         """Number of times a subtask has not beed finished in time"""
-        return self._subtasks_count_specific_ops(
-            SubtaskOp.TIMEOUT)
+        return self._subtask_ops[SubtaskOp.TIMEOUT]
 
     def failed_count(self) -> int:
         """Number of subtasks that failed on computing side"""
-        return self._subtasks_count_specific_ops(
-            SubtaskOp.FAILED)
+        return self._subtask_ops[SubtaskOp.FAILED]
 
     def not_downloaded_count(self) -> int:
         """Returns # of subtasks that were reported as computed but their
@@ -116,18 +158,7 @@ class TaskInfo:
         also include subtasks that are actively sending results at the moment
         of a call.
         """
-        cnt = 0
-        for st in self.subtasks.values():
-            download_in_progress = False
-            for msg in st.messages:
-                if msg.op == SubtaskOp.RESULT_DOWNLOADING:
-                    download_in_progress = True
-                elif msg.op in [SubtaskOp.FINISHED,
-                                SubtaskOp.NOT_ACCEPTED]:
-                    download_in_progress = False
-            if download_in_progress:
-                cnt += 1
-        return cnt
+        return self._not_downloaded_count
 
     def total_time(self) -> float:
         """Returns total time in seconds spent on the task
@@ -139,21 +170,13 @@ class TaskInfo:
         latter. Note that the time spent paused is also included in
         the total time.
         """
-        start_time = 0.0
-        finish_time = 0.0
-
-        if not self.is_completed():
+        if self.is_completed():
+            finish_time = self._finish_time
+        else:
             finish_time = time.time()
 
-        for msg in reversed(self.messages):
-            if (msg.op in [TaskOp.CREATED, TaskOp.RESTORED]
-                    and not start_time):
-                start_time = msg.ts
-            elif msg.op.is_completed() and not finish_time:
-                finish_time = msg.ts
-
-        assert finish_time >= start_time
-        return finish_time - start_time
+        assert finish_time >= self._start_time
+        return finish_time - self._start_time
 
     def had_failures_or_timeouts(self) -> bool:
         """Were there any failures or timeouts during computation
@@ -161,17 +184,7 @@ class TaskInfo:
         Both failure to calculate (SUBTASK_FAILED) and failure to verify
         (SUBTASK_NOT_ACCEPTED) are considered failures in this method.
         """
-        for msg in self.messages:
-            if msg.op in [TaskOp.NOT_ACCEPTED,
-                          TaskOp.TIMEOUT]:
-                return True
-        for st in self.subtasks.values():
-            for msg in st.messages:
-                if msg.op in [SubtaskOp.FAILED,
-                              SubtaskOp.NOT_ACCEPTED,
-                              SubtaskOp.TIMEOUT]:
-                    return True
-        return False
+        return self._had_failures
 
     def is_completed(self) -> bool:
         """Has the task already been completed
@@ -202,24 +215,7 @@ class TaskInfo:
         """
         if self.is_completed():
             return 0
-
-        cnt = 0
-        for st in self.subtasks.values():
-            if st.latest_status in [SubtaskStatus.finished,
-                                    SubtaskStatus.failure]:
-                continue
-            in_progress = False
-            for msg in st.messages:
-                if msg.op == SubtaskOp.ASSIGNED:
-                    in_progress = True
-                elif msg.op in [SubtaskOp.TIMEOUT,
-                                SubtaskOp.FINISHED,
-                                SubtaskOp.FAILED,
-                                SubtaskOp.NOT_ACCEPTED]:
-                    in_progress = False
-            if in_progress:
-                cnt += 1
-        return cnt
+        return self._in_progress_count
 
 
 TaskStats = NamedTuple("TaskStats", [("finished", bool),
@@ -0,0 +1,218 @@
+import heapq
+import logging
+import random
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from golem_messages.datastructures import tasks as dt_tasks
+
+from golem.core.common import get_timestamp_utc
+from golem.ranking.manager.database_manager import (
+    get_requestor_assigned_sum,
+    get_requestor_efficiency,
+    get_requestor_paid_sum,
+)
+from golem.task.taskkeeper import compute_subtask_value
+
+logger = logging.getLogger(__name__)
+
+PriceGetter = Callable[[str], int]
+
+
+class RequestorInfo(NamedTuple):
+    # Price the provider would offer to the requestor
+    price: int
+    # Estimated probability of being paid, based on V_paid / V_assigned
+    trust: float
+    # Subtask timeout to computation time ratio seen so far
+    efficiency: float
+
+
+def get_requestor_info(requestor_id: str, price: int) -> RequestorInfo:
+    paid = get_requestor_paid_sum(requestor_id)
+    assigned = get_requestor_assigned_sum(requestor_id)
+    return RequestorInfo(
+        price=price,
+        trust=min(1.0, (paid + 1) / (assigned + 1)),
+        efficiency=get_requestor_efficiency(requestor_id),
+    )
+
+
+class ExpectedProfitScheduler:
+    """ Orders supported tasks by the profit they are expected to bring
+    per second of computation.
+
+    The score of a task combines:
+      - the value of a subtask at the price the provider would offer,
+      - the chance of getting paid by the requestor,
+      - requestor's efficiency, i.e. how fast its subtasks were computed
+        compared to their timeouts,
+      - time left to the deadline; tasks that leave less than
+        `deadline_margin` subtask timeouts are penalized.
+
+    Tasks are kept in a max-heap which is updated as headers arrive and
+    are removed. Entries are rescored lazily when they reach the top of the
+    heap and are older than `rescore_interval`. Since scores only decrease
+    as the deadline approaches, the first fresh entry is the best task.
+    Requestor statistics are cached for `requestor_info_ttl` seconds.
+
+    A task is chosen at random, weighted by score, from up to
+    `max_candidates` tasks scoring within `tolerance` of the best one, so
+    that providers don't all rush for the same task. Tasks that couldn't be
+    requested are postponed for `postpone_interval` seconds, so that they
+    don't block the others.
+    """
+
+    def __init__(self,  # pylint: disable=too-many-arguments
+                 price_getter: PriceGetter,
+                 rescore_interval: float = 30.0,
+                 requestor_info_ttl: float = 60.0,
+                 deadline_margin: float = 2.0,
+                 tolerance: float = 0.05,
+                 max_candidates: int = 16,
+                 postpone_interval: float = 300.0) -> None:
+        self.price_getter = price_getter
+        self.rescore_interval = rescore_interval
+        self.requestor_info_ttl = requestor_info_ttl
+        self.deadline_margin = deadline_margin
+        self.tolerance = tolerance
+        self.max_candidates = max_candidates
+        self.postpone_interval = postpone_interval
+
+        self._headers: Dict[str, dt_tasks.TaskHeader] = {}
+        # (-score, sequence number, task_id, scoring time) heap; entries
+        # whose sequence number isn't current are skipped on pop
+        self._heap: List[Tuple[float, int, str, float]] = []
+        self._current: Dict[str, int] = {}
+        self._sequence = 0
+        self._requestors: Dict[str, Tuple[float, RequestorInfo]] = {}
+        # task_id -> time until which the task won't be chosen
+        self._postponed: Dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._headers)
+
+    def __contains__(self, task_id) -> bool:
+        return task_id in self._headers
+
+    def add(self, header: dt_tasks.TaskHeader) -> None:
+        """ Add a new task or rescore an updated one """
+        self._headers[header.task_id] = header
+        self._push(header, time.time())
+
+    def discard(self, task_id: str) -> None:
+        self._headers.pop(task_id, None)
+        self._current.pop(task_id, None)
+        self._postponed.pop(task_id, None)
+        if len(self._heap) > 2 * len(self._current) + 64:
+            self._compact()
+
+    def clear(self) -> None:
+        self._headers.clear()
+        self._heap = []
+        self._current.clear()
+        self._requestors.clear()
+        self._postponed.clear()
+
+    def postpone(self, task_id: str,
+                 interval: Optional[float] = None) -> None:
+        """ Don't choose the task for `interval` seconds, e.g. after
+        the task couldn't be requested """
+        if task_id not in self._headers:
+            return
+        if interval is None:
+            interval = self.postpone_interval
+        self._postponed[task_id] = time.time() + interval
+
+    def choose(self, exclude: Optional[Set[str]] = None) -> Optional[str]:
+        """ Return the id of one of the best tasks not present in `exclude`
+        and not postponed, or None """
+        now = time.time()
+        skipped = []
+        candidates: List[Tuple[float, int, str, float]] = []
+        while self._heap and len(candidates) < self.max_candidates:
+            entry = self._heap[0]
+            neg_score, sequence, task_id, scored_at = entry
+            if self._current.get(task_id) != sequence:
+                heapq.heappop(self._heap)  # outdated entry
+            elif candidates and \
+                    -neg_score < -candidates[0][0] * (1 - self.tolerance):
+                break
+            elif (exclude and task_id in exclude) \
+                    or self._is_postponed(task_id, now):
+                skipped.append(heapq.heappop(self._heap))
+            elif now - scored_at > self.rescore_interval:
+                heapq.heappop(self._heap)
+                self._push(self._headers[task_id], now)
+            else:
+                candidates.append(heapq.heappop(self._heap))
+
+        for entry in skipped + candidates:
+            heapq.heappush(self._heap, entry)
+        if not candidates:
+            return None
+        # scores are stored negated; the best task scores 0 when all do
+        if len(candidates) == 1 or candidates[0][0] >= 0:
+            return candidates[0][2]
+        weights = [-entry[0] for entry in candidates]
+        return random.choices(candidates, weights)[0][2]
+
+    def _is_postponed(self, task_id: str, now: float) -> bool:
+        until = self._postponed.get(task_id)
+        if until is None:
+            return False
+        if until <= now:
+            del self._postponed[task_id]
+            return False
+        return True
+
+    def score(self, header: dt_tasks.TaskHeader) -> float:
+        """ Expected profit per second of computing a subtask of the task """
+        requestor = self._get_requestor_info(header.task_owner.key)
+        subtask_timeout = max(header.subtask_timeout, 1)
+
+        price = min(requestor.price, header.max_price)
+        profit = compute_subtask_value(price, subtask_timeout) \
+            * requestor.trust
+        computation_time = subtask_timeout / max(requestor.efficiency, 1e-3)
+
+        time_left = header.deadline - get_timestamp_utc()
+        if time_left <= 0:
+            return 0.0
+        deadline_factor = min(
+            1.0, time_left / (self.deadline_margin * subtask_timeout))
+
+        return profit / computation_time * deadline_factor
+
+    def _push(self, header: dt_tasks.TaskHeader, now: float) -> None:
+        try:
+            score = self.score(header)
+        except Exception:  # pylint: disable=broad-except
+            logger.warning("Cannot score task %s", header.task_id,
+                           exc_info=True)
+            score = 0.0
+
+        self._sequence += 1
+        self._current[header.task_id] = self._sequence
+        heapq.heappush(
+            self._heap, (-score, self._sequence, header.task_id, now))
+
+    def _compact(self) -> None:
+        self._heap = [entry for entry in self._heap
+                      if self._current.get(entry[2]) == entry[1]]
+        heapq.heapify(self._heap)
+
+    def _get_requestor_info(self, requestor_id: str) -> RequestorInfo:
+        now = time.time()
+        cached = self._requestors.get(requestor_id)
+        if cached and cached[0] > now:
+            return cached[1]
+
+        if len(self._requestors) > 2 * len(self._headers) + 64:
+            self._requestors = {k: v for k, v in self._requestors.items()
+                                if v[0] > now}
+
+        info = get_requestor_info(requestor_id,
+                                  self.price_getter(requestor_id))
+        self._requestors[requestor_id] = (now + self.requestor_info_ttl, info)
+        return info
@@ -83,9 +83,11 @@ from .server import helpers
 from .server import queue_ as srv_queue
 from .server import resources
 from .server import verification as srv_verification
+from .headerverifier import TaskHeaderVerifier
 from .taskcomputer import TaskComputerAdapter
 from .taskkeeper import TaskHeaderKeeper
 from .taskmanager import TaskManager
+from .taskscheduler import ExpectedProfitScheduler
 from .tasksession import TaskSession
 
 if TYPE_CHECKING:
@@ -160,12 +162,23 @@ class TaskServer(
 
         self.node = node
         self.task_archiver = task_archiver
+        CoreTask.VERIFICATION_QUEUE.set_concurrency(
+            config_desc.verification_concurrency)
+        scheduler = None
+        if config_desc.profit_task_scheduler:
+            scheduler = ExpectedProfitScheduler(
+                price_getter=lambda requestor_id: _calculate_price(
+                    self.config_desc.min_price, requestor_id),
+            )
         self.task_keeper = TaskHeaderKeeper(
             old_env_manager=client.environments_manager,
             new_env_manager=new_env_manager,
             node=self.node,
             min_price=config_desc.min_price,
-            task_archiver=task_archiver)
+            task_archiver=task_archiver,
+            scheduler=scheduler)
+        self.header_verifier = TaskHeaderVerifier(
+            verify=lambda header: self._verify_header_sig(header))
         self.task_manager = TaskManager(
             self.node,
             self.keys_auth,
@@ -320,15 +333,16 @@ class TaskServer(
         self._request_task(task_header)
 
     def _request_random_task(self) -> None:
-        """ If there is no task currently computing and time elapsed from last
-            request exceeds the configured request interval, choose a random
-            task from the network to compute on our machine. """
+        """ If there is a free computing slot and time elapsed from last
+            request exceeds the configured request interval, choose the most
+            profitable task (or a random one, if the profit scheduler is
+            disabled) from the network to compute on our machine. """
 
         if time.time() - self._last_task_request_time \
                 < self.config_desc.task_request_interval:
             return
 
-        if self.task_computer.has_assigned_task() \
+        if (not self.task_computer.has_free_slot()) \
                 or (not self.task_computer.compute_tasks) \
                 or (not self.task_computer.runnable):
             return
@@ -390,6 +404,7 @@ class TaskServer(
                         theader.task_id,
                         supported,
                     )
+                self.task_keeper.postpone_task(theader.task_id)
                 return None
 
             # Check performance
@@ -401,6 +416,7 @@ class TaskServer(
                 performance = yield env_mgr.get_performance(env_id)
             if performance is None:
                 logger.debug("Not requesting task, benchmark is in progress.")
+                self.task_keeper.postpone_task(theader.task_id)
                 return None
 
             # Check handshake
@@ -415,6 +431,8 @@ class TaskServer(
                     key_id=theader.task_owner.key,
                     task_id=theader.task_id,
                 )
+                # requested again by `request_task_by_id` after handshake
+                self.task_keeper.postpone_task(theader.task_id)
                 return None
             handshake.task_id = theader.task_id
             if not handshake.success():
@@ -423,6 +441,7 @@ class TaskServer(
                     theader.task_owner.key,
                     theader.task_id,
                 )
+                self.task_keeper.postpone_task(theader.task_id)
                 return None
 
             # Send WTCT
@@ -464,11 +483,11 @@ class TaskServer(
             self,
             msg: message.tasks.TaskToCompute,
     ) -> bool:
-        if self.task_computer.has_assigned_task():
-            logger.error("Trying to assign a task, when it's already assigned")
+        if not self.task_computer.task_given(msg.compute_task_def):
+            logger.error("Trying to assign a task, when all computing slots "
+                         "are busy")
             return False
 
-        self.task_computer.task_given(msg.compute_task_def)
         if msg.want_to_compute_task.task_header.environment_prerequisites:
             deferreds = []
             for resource_id in msg.compute_task_def['resources']:
@@ -500,20 +519,22 @@ class TaskServer(
         return True
 
     def resource_collected(self, task_id: str) -> bool:
-        if self.task_computer.assigned_task_id != task_id:
+        # Resources are requested once per assigned subtask
+        subtask_id = self.task_computer.waiting_subtask_id(task_id)
+        if subtask_id is None:
             logger.error("Resource collected for a wrong task, %s", task_id)
             return False
 
-        self.task_computer.start_computation()
+        self.task_computer.start_computation(subtask_id)
         return True
 
     def resource_failure(self, task_id: str, reason: str) -> None:
-        if self.task_computer.assigned_task_id != task_id:
+        subtask_id = self.task_computer.waiting_subtask_id(task_id)
+        if subtask_id is None:
             logger.error("Resource failure for a wrong task, %s", task_id)
             return
 
-        subtask_id = self.task_computer.assigned_subtask_id
-        self.task_computer.task_interrupted()
+        self.task_computer.task_interrupted(subtask_id)
         self.send_task_failed(
             subtask_id,
             task_id,
@@ -629,7 +650,27 @@ class TaskServer(
         return self.task_keeper.get_all_tasks()
 
     def add_task_header(self, task_header: dt_tasks.TaskHeader) -> bool:
-        if not self._verify_header_sig(task_header):
+        valid = self.header_verifier.verify(task_header)
+        return self._add_verified_task_header(task_header, valid)
+
+    def add_task_headers(
+            self,
+            task_headers: List[dt_tasks.TaskHeader],
+    ) -> Deferred:
+        """ Verify signatures of task headers without blocking the reactor
+        and add the valid ones.
+        :return: deferred list of results of adding the headers
+        """
+        deferred = self.header_verifier.verify_many(task_headers)
+        deferred.addCallback(lambda valid: [
+            self._add_verified_task_header(task_header, is_valid)
+            for task_header, is_valid in zip(task_headers, valid)
+        ])
+        return deferred
+
+    def _add_verified_task_header(self, task_header: dt_tasks.TaskHeader,
+                                  valid_signature: bool) -> bool:
+        if not valid_signature:
             logger.info(
                 'Invalid signature. task_id=%r, signature=%r',
                 task_header.task_id,
@@ -689,6 +730,8 @@ class TaskServer(
     ) -> Deferred:  # pylint: disable=arguments-differ
 
         PendingConnectionsServer.change_config(self, config_desc)
+        CoreTask.VERIFICATION_QUEUE.set_concurrency(
+            config_desc.verification_concurrency)
         yield self.task_keeper.change_config(config_desc)
         yield self._change_task_computer_config(config_desc, run_benchmarks)
 
@@ -798,7 +841,8 @@ class TaskServer(
 
     def finished_subtask_listener(self,  # pylint: disable=too-many-arguments
                                   event='default', subtask_id=None,
-                                  min_performance=None, **_kwargs):
+                                  min_performance=None,
+                                  computation_time=None, **_kwargs):
 
         if event != 'subtask_finished':
             return
@@ -810,7 +854,8 @@ class TaskServer(
             task_id = keeper.get_task_id_for_subtask(subtask_id)
             header = keeper.get_task_header(task_id)
             performance = keeper.active_tasks[task_id].performance
-            computation_time = timer.ProviderTimer.time
+            if computation_time is None:
+                computation_time = timer.ProviderTimer.time
 
             update_requestor_efficiency(
                 node_id=keeper.get_node_for_task_id(task_id),
@@ -879,6 +924,7 @@ class TaskServer(
 
     def quit(self):
         self.task_computer.quit()
+        self.task_manager.quit()
 
     def add_forwarded_session_request(self, key_id, conn_id):
         self.forwarded_session_requests[key_id] = dict(
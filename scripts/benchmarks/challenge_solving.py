@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+"""
+Solves proof-of-work challenges of increasing difficulty and compares
+the original hashing loop with the current one. Also measures for how long
+the reactor is blocked when a challenge is solved by ChallengeSolver.
+"""
+import argparse
+import statistics
+import time
+
+from twisted.internet import reactor
+from twisted.internet.defer import inlineCallbacks
+
+from golem.core.keysauth import sha2
+from golem.core.simplechallenge import (
+    ChallengeSolver, create_challenge, solve_challenge)
+
+
+def solve_challenge_sha2(challenge, difficulty):
+    """ Hashing loop used before solve_challenge_range """
+    min_hash = pow(2, 256 - difficulty)
+    solution = 0
+    while sha2(challenge + str(solution)) > min_hash:
+        solution += 1
+    return solution
+
+
+def hash_rate(fn, challenges, difficulty):
+    start = time.perf_counter()
+    hashes = 0
+    for challenge in challenges:
+        hashes += fn(challenge, difficulty) + 1
+    return hashes / (time.perf_counter() - start)
+
+
+def run_loops(args, challenges):
+    for difficulty in args.difficulties:
+        old = hash_rate(solve_challenge_sha2, challenges, difficulty)
+        new = hash_rate(lambda c, d: solve_challenge(c, d)[0],
+                        challenges, difficulty)
+        print(f'difficulty {difficulty:>2}: sha2 loop {old / 1000:.0f}k/s, '
+              f'range loop {new / 1000:.0f}k/s, speedup {new / old:.2f}x')
+
+
+def run_solver(args, challenges):
+    solver = ChallengeSolver(workers=args.workers,
+                             chunk_size=args.chunk_size)
+    ticks = []
+
+    def tick(last):
+        now = time.perf_counter()
+        ticks.append(now - last)
+        reactor.callLater(0.01, tick, now)
+
+    @inlineCallbacks
+    def solve():
+        for difficulty in args.difficulties:
+            ticks.clear()
+            start = time.perf_counter()
+            for challenge in challenges:
+                yield solver.solve(challenge, difficulty)
+            elapsed = time.perf_counter() - start
+            print(f'difficulty {difficulty:>2}: solved in {elapsed:.3f}s, '
+                  f'max reactor tick {max(ticks, default=0):.3f}s, '
+                  f'median {statistics.median(ticks or [0]):.3f}s')
+
+    def finish(_):
+        solver.stop()
+        reactor.stop()
+
+    def run():
+        tick(time.perf_counter())
+        solve().addBoth(finish)
+
+    reactor.callWhenRunning(run)
+    reactor.run()
+
+
+def main(args):
+    challenges = [create_challenge([], None) for _ in range(args.challenges)]
+    print(f'{args.challenges} challenges per difficulty')
+    run_loops(args, challenges)
+    run_solver(args, challenges)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Benchmark proof-of-work challenge solving",
+    )
+    parser.add_argument('--difficulties', type=int, nargs='+',
+                        default=[5, 10, 14, 17])
+    parser.add_argument('--challenges', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--chunk-size', type=int, default=2 ** 16)
+    main(parser.parse_args())
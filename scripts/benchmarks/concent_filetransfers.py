@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+"""
+Uploads files to and downloads them from a local HTTP server, which mimics
+the Concent storage cluster with a limited bandwidth per connection, using
+ConcentFiletransferService with different concurrency. Optionally the server
+drops every download halfway once, to show how much is transferred again
+when downloads are resumed.
+"""
+import argparse
+import hashlib
+import http.server
+import os
+import shutil
+import tempfile
+import threading
+import time
+from unittest import mock
+
+from golem_messages.factories.concents import (
+    FileInfoFactory, FileTransferTokenFactory)
+from golem_messages.message.concents import FileTransferToken
+
+from golem.network.concent.filetransfers import ConcentFiletransferService
+
+CATEGORY = FileTransferToken.FileInfo.Category.results
+
+
+class StorageHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def _throttled(self, size):
+        chunk = 1 << 16
+        delay = chunk / self.server.bandwidth
+        while size > 0:
+            yield min(chunk, size)
+            size -= chunk
+            time.sleep(delay)
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        path = os.path.join(self.server.root,
+                            self.headers['Concent-Upload-Path'])
+        with open(path, 'wb') as f:
+            for size in self._throttled(int(self.headers['Content-Length'])):
+                f.write(self.rfile.read(size))
+        self.server.transferred += os.path.getsize(path)
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        path = os.path.join(self.server.root,
+                            self.path[len('/download/'):])
+        size = os.path.getsize(path)
+        offset = 0
+        if 'Range' in self.headers:
+            offset = int(self.headers['Range'][len('bytes='):].rstrip('-'))
+            self.send_response(206)
+            self.send_header('Content-Range',
+                             'bytes {}-{}/{}'.format(offset, size - 1, size))
+        else:
+            self.send_response(200)
+        self.send_header('Content-Length', str(size - offset))
+        self.end_headers()
+
+        # Drop the connection halfway through the first download
+        drop = self.server.interrupt and path not in self.server.dropped
+        self.server.dropped.add(path)
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            for chunk_size in self._throttled(size - offset):
+                if drop and f.tell() >= size // 2:
+                    self.close_connection = True
+                    return
+                self.wfile.write(f.read(chunk_size))
+                self.server.transferred += chunk_size
+
+    def log_message(self, *_):
+        pass
+
+
+class BenchmarkService(ConcentFiletransferService):
+    RETRY_DELAY = 0.01
+
+    def _get_auth_headers(self, file_transfer_token):
+        return {}
+
+
+def make_files(directory, args):
+    files = []
+    for i in range(args.files):
+        path = os.path.join(directory, 'file{}'.format(i))
+        with open(path, 'wb') as f:
+            f.write(os.urandom(args.size))
+        with open(path, 'rb') as f:
+            checksum = 'sha1:' + hashlib.sha1(f.read()).hexdigest()
+        files.append((path, FileInfoFactory(
+            path='file{}'.format(i),
+            checksum=checksum,
+            size=args.size,
+            category=CATEGORY,
+        )))
+    return files
+
+
+def run_transfers(server, concurrency, requests):
+    service = BenchmarkService(keys_auth=None, variant={'pubkey': None},
+                               concurrency=concurrency)
+    errors = []
+    server.transferred = 0
+    start = time.perf_counter()
+    for path, ftt in requests:
+        service.transfer(path, ftt, error=errors.append,
+                         file_category=CATEGORY)
+    # No reactor is running, errors are collected on the pool threads
+    with mock.patch('twisted.internet.reactor.callFromThread',
+                    lambda fn, *args: fn(*args)):
+        while service._transfers.unfinished_tasks:  # noqa pylint: disable=protected-access
+            service._run()  # pylint: disable=protected-access
+            time.sleep(0.01)
+    elapsed = time.perf_counter() - start
+    service._get_executor().shutdown()  # pylint: disable=protected-access
+    return elapsed, server.transferred, errors
+
+
+def main(args):
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), StorageHandler)
+    server.root = tempfile.mkdtemp()
+    server.bandwidth = args.bandwidth * 1024 * 1024
+    server.interrupt = args.interrupt
+    server.dropped = set()
+    address = 'http://127.0.0.1:{}/'.format(server.server_port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    local = tempfile.mkdtemp()
+    try:
+        files = make_files(local, args)
+        total = args.files * args.size / 1024 / 1024
+        print(f'{args.files} files, {total:.1f} MiB, '
+              f'{args.bandwidth} MiB/s per connection')
+        for concurrency in args.concurrency:
+            uploads = [
+                (path, FileTransferTokenFactory(
+                    files=[info], upload=True,
+                    storage_cluster_address=address))
+                for path, info in files]
+            downloads = [
+                (path + '.downloaded', FileTransferTokenFactory(
+                    files=[info], download=True,
+                    storage_cluster_address=address))
+                for path, info in files]
+            server.dropped.clear()
+            for name, requests in (('upload', uploads),
+                                   ('download', downloads)):
+                elapsed, transferred, errors = run_transfers(
+                    server, concurrency, requests)
+                print(f'concurrency {concurrency}: {name} {elapsed:.2f}s, '
+                      f'{transferred / 1024 / 1024:.1f} MiB transferred, '
+                      f'{len(errors)} errors')
+            for path, _ in files:
+                os.remove(path + '.downloaded')
+    finally:
+        server.shutdown()
+        shutil.rmtree(server.root)
+        shutil.rmtree(local)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Benchmark Concent file transfers",
+    )
+    parser.add_argument('--files', type=int, default=8)
+    parser.add_argument('--size', type=int, default=4 * 1024 * 1024)
+    parser.add_argument('--bandwidth', type=float, default=8,
+                        help="MiB/s per connection")
+    parser.add_argument('--concurrency', type=int, nargs='+',
+                        default=[1, 4])
+    parser.add_argument('--interrupt', action='store_true',
+                        help="drop each download halfway once")
+    main(parser.parse_args())
@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+"""
+Simulates gossip ranking stages of a node which knows local ranks of many
+other nodes and receives gossip about all of them from its neighbours,
+until the working vector converges. Reports time spent in every phase of
+Ranking. For comparison, the last round is run again with the original
+per-node loops over dicts of lists, and saving the working vector row by
+row is measured on a sample.
+"""
+import argparse
+import random
+import tempfile
+import time
+from unittest import mock
+
+import numpy as np
+
+from golem import model
+from golem.database import Database
+from golem.ranking.helper import min_max_utility as util
+from golem.ranking.manager import database_manager as dm
+from golem.ranking.ranking import Ranking
+
+
+class SimulatedClient:
+    """ Neighbours run push-sum gossip over the same nodes with their own
+    opinions, each of them keeps half of its vector and sends the other half
+    to a random member of the network every round. Time spent here is
+    not counted as time of the ranking. """
+
+    def __init__(self, node_ids, neighbours: int) -> None:
+        self.node_ids = node_ids
+        self.neighbours = [f'neighbour-{i}' for i in range(neighbours)]
+        self.index = {node_id: i for i, node_id in enumerate(node_ids)}
+        self.vectors = {
+            neighbour: np.stack([
+                np.stack([np.random.uniform(0, 1, len(node_ids)),
+                          np.ones(len(node_ids))], axis=-1),
+                np.stack([np.random.uniform(0, 1, len(node_ids)),
+                          np.ones(len(node_ids))], axis=-1),
+            ], axis=1)
+            for neighbour in self.neighbours
+        }
+        self.inbox = {neighbour: [] for neighbour in self.neighbours}
+        self.collected: list = []
+        self.elapsed = 0.0
+
+    def get_neighbours_degree(self):
+        return {neighbour: len(self.neighbours)
+                for neighbour in self.neighbours}
+
+    def send_gossip(self, gossip, send_to):
+        start = time.perf_counter()
+        vector = np.zeros_like(self.vectors[self.neighbours[0]])
+        indices = [self.index[node_id] for node_id, _ in gossip]
+        vector[indices] = [trust for _, trust in gossip]
+        for neighbour in send_to:
+            self.inbox[neighbour].append(vector)
+        self.elapsed += time.perf_counter() - start
+
+    def collect_gossip(self):
+        start = time.perf_counter()
+        members = self.neighbours + [None]
+        to_us = []
+        for neighbour in self.neighbours:
+            half = self.vectors[neighbour] / 2
+            target = random.choice([m for m in members if m != neighbour])
+            if target is None:
+                to_us.append(half)
+            else:
+                self.inbox[target].append(half)
+            self.vectors[neighbour] = half
+        for neighbour in self.neighbours:
+            for vector in self.inbox[neighbour]:
+                self.vectors[neighbour] = self.vectors[neighbour] + vector
+            self.inbox[neighbour] = []
+        self.collected = [
+            [[node_id, trust]
+             for node_id, trust in zip(self.node_ids, vector.tolist())]
+            for vector in to_us
+        ]
+        self.elapsed += time.perf_counter() - start
+        return self.collected
+
+    def collect_stopped_peers(self):
+        return set(self.neighbours)
+
+    def collect_neighbours_loc_ranks(self):
+        return []
+
+    def push_local_rank(self, node_id, trust):
+        pass
+
+    def send_stop_gossip(self):
+        pass
+
+
+def create_local_ranks(node_ids) -> None:
+    rows = [{
+        'node_id': node_id,
+        'positive_computed': random.randint(0, 100),
+        'negative_computed': random.randint(0, 10),
+        'positive_payment': random.randint(0, 100),
+        'negative_payment': random.randint(0, 10),
+    } for node_id in node_ids]
+    with model.db.atomic():
+        for start in range(0, len(rows), 50):
+            model.LocalRank.insert_many(rows[start:start + 50]).execute()
+
+
+def legacy_round(working_vec, prev_rank, received_gossip, k):
+    """ Gossip merging, comparison and preparation with dicts of lists,
+    as done before the working vector was kept in NumPy arrays """
+    new_vec = {}
+    for gossip_group in received_gossip:
+        for node_id, [comp, req] in gossip_group:
+            if node_id in new_vec:
+                prev_comp, prev_req = new_vec[node_id]
+                new_vec[node_id] = [list(map(sum, zip(comp, prev_comp))),
+                                    list(map(sum, zip(req, prev_req)))]
+            else:
+                new_vec[node_id] = [comp, req]
+
+    aggregated_trust = 0.0
+    for node_id, (computing, requesting) in new_vec.items():
+        comp_old, req_old = prev_rank.get(node_id, (0, 0))
+        aggregated_trust += abs(util.vec_to_trust(computing) - comp_old)
+        aggregated_trust += abs(util.vec_to_trust(requesting) - req_old)
+
+    gossip = [[node_id, [[v / (k + 1) for v in comp],
+                         [v / (k + 1) for v in req]]]
+              for node_id, (comp, req) in working_vec.items()]
+    return new_vec, aggregated_trust, gossip
+
+
+def legacy_save(ranks):
+    """ Saving the working vector row by row, as done before """
+    for rank in ranks:
+        dm.upsert_global_rank(*rank)
+
+
+def timed(client, fn, *args):
+    """ Time of fn, without the time spent in the simulated client """
+    elapsed = client.elapsed
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start - (client.elapsed - elapsed)
+
+
+def simulate(args, nodes: int) -> None:
+    node_ids = [f'node-{i}' for i in range(nodes)]
+    create_local_ranks(node_ids)
+    client = SimulatedClient(node_ids, args.neighbours)
+    ranking = Ranking(client, max_steps=args.max_steps)
+    ranking.reactor = mock.Mock()
+
+    def phase(name):
+        return getattr(ranking, '_Ranking__' + name)
+
+    init = timed(client, phase('init_stage'))
+    rounds = []
+    while not ranking.global_finished:
+        working_vec = dict(ranking.working_vec.items())
+        prev_rank = dict(ranking.prevRank.items())
+        rounds.append(timed(client, phase('new_round'))
+                      + timed(client, phase('end_round')))
+        phase('make_break')()
+    save = timed(client, phase('save_working_vec'))
+    resave = timed(client, phase('save_working_vec'))
+    sample = [(node_id, 0.5, 0.5, 1.0, 1.0)
+              for node_id in node_ids[:args.save_sample]]
+    legacy_resave = timed(client, legacy_save, sample) \
+        * nodes / len(sample)
+
+    # The last round once again, with the original loops
+    legacy = timed(client, legacy_round, working_vec, prev_rank,
+                   client.collected + [phase('prepare_gossip')()],
+                   ranking.k)
+
+    print(f'{nodes} nodes: init {init:.3f}s, converged in {len(rounds)} '
+          f'rounds, {sum(rounds):.3f}s (longest round {max(rounds):.3f}s, '
+          f'original loops {legacy:.3f}s), save {save:.3f}s, '
+          f'save again {resave:.3f}s (row by row ~{legacy_resave:.1f}s, '
+          f'estimated from {len(sample)} rows)')
+
+
+def main(args):
+    random.seed(args.seed)
+    np.random.seed(args.seed)
+    for nodes in args.nodes:
+        with tempfile.TemporaryDirectory() as tempdir:
+            database = Database(model.db, fields=model.DB_FIELDS,
+                                models=model.DB_MODELS, db_dir=tempdir)
+            try:
+                simulate(args, nodes)
+            finally:
+                database.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Benchmark gossip ranking convergence",
+    )
+    parser.add_argument('--nodes', type=int, nargs='+',
+                        default=[10000, 100000])
+    parser.add_argument('--neighbours', type=int, default=4)
+    parser.add_argument('--max-steps', type=int, default=20)
+    parser.add_argument('--save-sample', type=int, default=2000,
+                        help="rows saved one by one, to estimate the "
+                             "original saving time")
+    parser.add_argument('--seed', type=int, default=0)
+    main(parser.parse_args())
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+"""
+Fills a temporary database with synthetic outgoing payments and incomes,
+then measures how long it takes to mark the payments as sent with the
+original per-row `save()` loop and with the set-based updates of
+WalletOperation.update_many, as used by PaymentProcessor and IncomesKeeper.
+Also reports the time of loading incomes joined with their operations.
+"""
+import argparse
+import tempfile
+import time
+
+from golem import model
+from golem.database import Database
+
+
+def create_payments(count: int, direction) -> list:
+    with model.db.atomic():
+        operations = [
+            model.WalletOperation.create(
+                direction=direction,
+                operation_type=model.WalletOperation.TYPE.task_payment,
+                status=model.WalletOperation.STATUS.awaiting,
+                sender_address='0x' + 40 * '1',
+                recipient_address='0x' + 40 * '2',
+                amount=0,
+                currency=model.WalletOperation.CURRENCY.GNT,
+                gas_cost=0,
+            )
+            for _ in range(count)
+        ]
+        for i, operation in enumerate(operations):
+            model.TaskPayment.create(
+                wallet_operation=operation,
+                node='n' * 128,
+                task='task',
+                subtask=f'subtask-{i}',
+                expected_amount=10 ** 18,
+                accepted_ts=1,
+            )
+    return list(model.TaskPayment.select().where(
+        model.TaskPayment.wallet_operation << [o.id for o in operations],
+    ))
+
+
+def reset(payments):
+    model.WalletOperation.update_many(
+        [p.wallet_operation_id for p in payments],
+        status=model.WalletOperation.STATUS.awaiting,
+        tx_hash=None,
+    )
+
+
+def run_loop(payments, status, tx_hash):
+    # Payments are not joined with their operations, like the original
+    # queries, so every operation is fetched lazily
+    for payment in payments:
+        wallet_operation = payment.wallet_operation
+        wallet_operation.status = status
+        wallet_operation.tx_hash = tx_hash
+        wallet_operation.save()
+
+
+def run_bulk(payments, status, tx_hash):
+    model.WalletOperation.update_many(
+        [p.wallet_operation_id for p in payments],
+        status=status,
+        tx_hash=tx_hash,
+    )
+
+
+def measure(fn, payments, repeat) -> float:
+    best = float('inf')
+    for i in range(repeat):
+        reset(payments)
+        # Start from unloaded instances every time
+        fresh = list(model.TaskPayment.select().where(
+            model.TaskPayment.id << [p.id for p in payments],
+        ))
+        start = time.perf_counter()
+        fn(fresh, model.WalletOperation.STATUS.sent, f'0x{i:064x}')
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(args):
+    with tempfile.TemporaryDirectory() as tempdir:
+        database = Database(model.db, fields=model.DB_FIELDS,
+                            models=model.DB_MODELS, db_dir=tempdir)
+        try:
+            outgoing = create_payments(
+                args.payments, model.WalletOperation.DIRECTION.outgoing)
+            create_payments(
+                args.payments, model.WalletOperation.DIRECTION.incoming)
+            print(f'{args.payments} payments and incomes')
+
+            loop = measure(run_loop, outgoing, args.repeat)
+            bulk = measure(run_bulk, outgoing, args.repeat)
+            print(f'mark as sent: save loop {loop:.3f}s, '
+                  f'bulk update {bulk:.3f}s, speedup {loop / bulk:.1f}x')
+
+            start = time.perf_counter()
+            incomes = list(model.TaskPayment.incomes())
+            total = sum(i.missing_amount for i in incomes)
+            print(f'load incomes with operations: '
+                  f'{time.perf_counter() - start:.3f}s '
+                  f'({len(incomes)} rows, {total / 10 ** 18:.0f} GNT)')
+        finally:
+            database.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Benchmark bulk updates of payments",
+    )
+    parser.add_argument('--payments', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=3)
+    main(parser.parse_args())
@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+"""
+Simulates a provider requesting tasks from a synthetic market and compares
+earnings and idle time of the random task choice with the expected profit
+scheduler.
+
+Requestors differ in the probability of paying and in how long their
+subtasks really take compared to their timeouts. The provider learns both
+from its own history, just like LocalRank does. Some requestors never give
+subtasks to the provider (e.g. it is not on their ACL), such requests are
+wasted and their tasks are postponed by the scheduler.
+"""
+import argparse
+import random
+import types
+from typing import Dict, List, Optional
+from unittest import mock
+
+from golem.task.taskkeeper import IndexedSet, compute_subtask_value
+from golem.task.taskscheduler import ExpectedProfitScheduler, RequestorInfo
+
+
+class Requestor:
+    def __init__(self, key: str, rng: random.Random,
+                 rejecting: float) -> None:
+        self.key = key
+        self.pay_probability = rng.choice([1.0, 1.0, 0.9, 0.5, 0.1])
+        self.efficiency = rng.uniform(0.8, 3.0)
+        self.rejects = rng.random() < rejecting
+        # What the provider learned so far
+        self.assigned = 0
+        self.paid = 0
+        self.computed = 0
+        self.efficiency_sum = 0.0
+
+    def info(self, price: int) -> RequestorInfo:
+        efficiency = self.efficiency_sum / self.computed \
+            if self.computed else 1.0
+        return RequestorInfo(
+            price=price,
+            trust=min(1.0, (self.paid + 1) / (self.assigned + 1)),
+            efficiency=efficiency,
+        )
+
+
+class Market:
+    def __init__(self, args) -> None:
+        rng = random.Random(args.seed)
+        self.requestors = [Requestor(f'requestor{i}', rng, args.rejecting)
+                           for i in range(args.requestors)]
+        self.tasks: List[types.SimpleNamespace] = []
+        now = 0.0
+        for i in range(args.tasks):
+            now += rng.expovariate(args.tasks / args.duration)
+            subtask_timeout = rng.choice([60, 300, 600, 1200])
+            self.tasks.append(types.SimpleNamespace(
+                task_id=f'task{i}',
+                task_owner=types.SimpleNamespace(
+                    key=rng.choice(self.requestors).key),
+                max_price=rng.randint(10, 100) * 10 ** 15,
+                subtask_timeout=subtask_timeout,
+                deadline=now + rng.uniform(1, 10) * subtask_timeout,
+                published=now,
+                subtasks=rng.randint(1, 20),
+            ))
+        self.by_key: Dict[str, Requestor] = {
+            r.key: r for r in self.requestors}
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def time(self) -> float:
+        return self.now
+
+
+def simulate(args, policy: str) -> Dict[str, float]:
+    market = Market(args)
+    rng = random.Random(args.seed + 1)
+    clock = Clock()
+    price = args.min_price * 10 ** 15
+
+    scheduler = ExpectedProfitScheduler(price_getter=lambda _: price)
+    candidates = IndexedSet()
+    headers = {}
+    pending = list(reversed(market.tasks))
+
+    def publish():
+        while pending and pending[-1].published <= clock.now:
+            header = pending.pop()
+            headers[header.task_id] = header
+            candidates.add(header.task_id)
+            if policy == 'profit':
+                scheduler.add(header)
+        for task_id in list(candidates):
+            header = headers[task_id]
+            if header.deadline <= clock.now or header.subtasks <= 0:
+                candidates.discard(task_id)
+                scheduler.discard(task_id)
+
+    def choose() -> Optional[str]:
+        if policy == 'profit':
+            return scheduler.choose()
+        return candidates.choice()
+
+    earned = 0
+    idle = 0.0
+    computed = failed = rejected = 0
+    patches = (
+        mock.patch('golem.task.taskscheduler.time', clock),
+        mock.patch('golem.task.taskscheduler.get_timestamp_utc', clock.time),
+        mock.patch(
+            'golem.task.taskscheduler.get_requestor_info',
+            lambda key, price: market.by_key[key].info(price)),
+    )
+    for patch in patches:
+        patch.start()
+    try:
+        while clock.now < args.duration:
+            publish()
+            # Every request round takes some time, even a successful one
+            clock.now += args.request_time
+            idle += args.request_time
+            task_id = choose()
+            if task_id is None:
+                continue
+
+            header = headers[task_id]
+            requestor = market.by_key[header.task_owner.key]
+            if requestor.rejects:
+                rejected += 1
+                scheduler.postpone(task_id)
+                continue
+            header.subtasks -= 1
+            value = compute_subtask_value(
+                min(price, header.max_price), header.subtask_timeout)
+            requestor.assigned += value
+
+            computation_time = header.subtask_timeout / requestor.efficiency
+            clock.now += computation_time
+            requestor.computed += 1
+            requestor.efficiency_sum += requestor.efficiency
+
+            if clock.now > header.deadline:
+                failed += 1
+                continue
+            computed += 1
+            if rng.random() < requestor.pay_probability:
+                requestor.paid += value
+                earned += value
+    finally:
+        for patch in patches:
+            patch.stop()
+
+    return {
+        'earned': earned / 10 ** 18,
+        'idle': idle / clock.now,
+        'computed': computed,
+        'failed': failed,
+        'rejected': rejected,
+    }
+
+
+def main(args):
+    print(f'{args.tasks} tasks from {args.requestors} requestors '
+          f'in {args.duration / 3600:.1f}h')
+    for policy in ('random', 'profit'):
+        result = simulate(args, policy)
+        print(f'{policy:>8}: earned {result["earned"]:.4f} GNT, '
+              f'idle {result["idle"]:.1%}, '
+              f'computed {result["computed"]}, '
+              f'past deadline {result["failed"]}, '
+              f'rejected {result["rejected"]}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Compare provider task choice policies on a simulated "
+                    "market",
+    )
+    parser.add_argument('--tasks', type=int, default=2000)
+    parser.add_argument('--requestors', type=int, default=100)
+    parser.add_argument('--duration', type=float, default=7 * 24 * 3600)
+    parser.add_argument('--request-time', type=float, default=20.0)
+    parser.add_argument('--min-price', type=int, default=10,
+                        help="provider's price, in 10^-3 GNT per hour")
+    parser.add_argument('--rejecting', type=float, default=0.1,
+                        help="fraction of requestors that never give "
+                             "subtasks to the provider")
+    parser.add_argument('--seed', type=int, default=0)
+    main(parser.parse_args())
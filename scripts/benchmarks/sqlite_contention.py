@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+"""
+Reproduces contention between threads writing to the same SQLite database,
+like the message history thread, payment processing and the reactor do.
+Reports throughput and latency of write transactions with the default
+settings and with the performance profile of GolemSqliteDatabase, both
+with writers accessing the database directly and through the serialized
+writer thread.
+"""
+import argparse
+import datetime
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+import peewee
+
+from golem.database import GolemSqliteDatabase
+
+# Settings of golem.model.db
+DEFAULT_PRAGMAS = (
+    ('foreign_keys', True),
+    ('busy_timeout', 1000),
+    ('journal_mode', 'WAL'),
+)
+MODES = ('default', 'profile', 'profile-writer')
+
+
+class Row(peewee.Model):
+    writer = peewee.IntegerField()
+    created = peewee.DateTimeField(default=datetime.datetime.now)
+    data = peewee.BlobField()
+
+
+def make_database(path: str, mode: str) -> GolemSqliteDatabase:
+    db = GolemSqliteDatabase(path, threadlocals=True,
+                             pragmas=list(DEFAULT_PRAGMAS))
+    db.connect()
+    Row._meta.database = db
+    db.create_tables([Row])
+    if mode != 'default':
+        db.enable_performance_profile()
+    return db
+
+
+def run_writer(db, writer, args, latencies, errors):
+    def transaction():
+        with db.atomic():
+            for _ in range(args.rows):
+                Row.create(writer=writer, data=os.urandom(args.size))
+
+    for _ in range(args.transactions):
+        start = time.perf_counter()
+        try:
+            if args.mode == 'profile-writer':
+                db.write(transaction)
+            else:
+                transaction()
+        except peewee.PeeweeException:
+            errors.append(writer)
+        latencies.append(time.perf_counter() - start)
+    if not db.is_closed():
+        db.close()
+
+
+def main(args):
+    with tempfile.TemporaryDirectory() as tempdir:
+        db = make_database(os.path.join(tempdir, 'bench.db'), args.mode)
+        latencies = []
+        errors = []
+        threads = [
+            threading.Thread(target=run_writer,
+                             args=(db, i, args, latencies, errors))
+            for i in range(args.writers)
+        ]
+
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        rows = Row.select().count()
+        db.stop_writer()
+        db.close()
+
+    transactions = args.writers * args.transactions
+    latencies.sort()
+    print(f'mode: {args.mode}, writers: {args.writers}, '
+          f'transactions: {transactions}, rows: {rows}')
+    print(f'{"total":>12}: {elapsed:.3f}s '
+          f'({transactions / elapsed:.1f} tx/s)')
+    print(f'{"latency":>12}: median {statistics.median(latencies)*1e3:.2f}ms'
+          f', p99 {latencies[int(len(latencies) * 0.99)]*1e3:.2f}ms'
+          f', max {latencies[-1]*1e3:.2f}ms')
+    print(f'{"failed":>12}: {len(errors)}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--mode', choices=MODES, default='default')
+    parser.add_argument('--writers', type=int, default=8,
+                        help='number of concurrent writer threads')
+    parser.add_argument('--transactions', type=int, default=200,
+                        help='transactions per writer')
+    parser.add_argument('--rows', type=int, default=5,
+                        help='rows inserted per transaction')
+    parser.add_argument('--size', type=int, default=256,
+                        help='size of a single row in bytes')
+    main(parser.parse_args())
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+"""
+Floods a node with `Tasks` messages, in which every task header is broadcast
+many times, and reports the time spent verifying header signatures with
+and without TaskHeaderVerifier.
+"""
+import argparse
+import random
+import time
+
+from eth_utils import encode_hex
+from golem_messages import idgenerator
+from golem_messages.datastructures import tasks as dt_tasks
+from golem_messages.datastructures.masking import Mask
+from twisted.internet import reactor
+from twisted.internet.defer import inlineCallbacks
+
+import golem
+from golem.core.common import timeout_to_deadline
+from golem.core.keysauth import KeysAuth
+from golem.task.headerverifier import TaskHeaderVerifier
+from golem.task.taskserver import TaskServer
+
+
+def make_header(private_key: bytes, public_key: bytes) \
+        -> dt_tasks.TaskHeader:
+    header = dt_tasks.TaskHeader(
+        task_id=idgenerator.generate_id(public_key),
+        task_owner={
+            "node_name": "flood",
+            "key": encode_hex(public_key)[2:],
+            "pub_addr": "10.10.10.10",
+            "pub_port": 10101,
+        },
+        environment="DEFAULT",
+        deadline=timeout_to_deadline(3600),
+        subtask_timeout=120,
+        subtasks_count=1,
+        max_price=10,
+        min_version=golem.__version__,
+        estimated_memory=0,
+        mask=Mask().to_bytes(),
+        timestamp=0,
+        signature=None,
+    )
+    header.sign(private_key=private_key)
+    return header
+
+
+def make_messages(args):
+    keys = [KeysAuth._generate_keys()  # pylint: disable=protected-access
+            for _ in range(args.owners)]
+    headers = [make_header(*keys[i % len(keys)]) for i in range(args.headers)]
+    broadcast = headers * args.broadcasts
+    random.shuffle(broadcast)
+    return [broadcast[i:i + args.per_message]
+            for i in range(0, len(broadcast), args.per_message)]
+
+
+def verify_signature(header):
+    return TaskServer._verify_header_sig(header)  # noqa pylint: disable=protected-access
+
+
+def run_sync(messages):
+    start = time.perf_counter()
+    for msg in messages:
+        for header in msg:
+            verify_signature(header)
+    elapsed = time.perf_counter() - start
+    print(f'{"synchronous":>12}: total {elapsed:.3f}s, '
+          f'reactor blocked {elapsed:.3f}s')
+
+
+def run_pipelined(args, messages):
+    verifier = TaskHeaderVerifier(verify=verify_signature,
+                                  batch_size=args.batch_size,
+                                  workers=args.workers)
+    blocked = 0.0
+    start = time.perf_counter()
+
+    @inlineCallbacks
+    def flood():
+        nonlocal blocked
+        # Messages arrive one after another, so later broadcasts of
+        # a header may hit the cache
+        for msg in messages:
+            msg_start = time.perf_counter()
+            deferred = verifier.verify_many(msg)
+            blocked += time.perf_counter() - msg_start
+            yield deferred
+
+    def finish(_):
+        elapsed = time.perf_counter() - start
+        stats = verifier.stats
+        print(f'{"pipelined":>12}: total {elapsed:.3f}s, '
+              f'reactor blocked {blocked:.3f}s, '
+              f'crypto {stats["crypto_time"]:.3f}s, '
+              f'verified {stats["verified"]}, cached {stats["cached"]}')
+        reactor.stop()
+
+    def run():
+        flood().addBoth(finish)
+
+    reactor.callWhenRunning(run)
+    reactor.run()
+
+
+def main(args):
+    messages = make_messages(args)
+    print(f'{len(messages)} messages, {args.headers} headers '
+          f'broadcast {args.broadcasts} times')
+    run_sync(messages)
+    run_pipelined(args, messages)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Benchmark task header signature verification",
+    )
+    parser.add_argument('--headers', type=int, default=2000)
+    parser.add_argument('--owners', type=int, default=200)
+    parser.add_argument('--broadcasts', type=int, default=10)
+    parser.add_argument('--per-message', type=int, default=20)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--workers', type=int, default=4)
+    main(parser.parse_args())
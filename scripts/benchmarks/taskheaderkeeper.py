@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+"""
+Replays a synthetic flood of task headers against TaskHeaderKeeper and
+reports the time spent adding headers, picking tasks and expiring them.
+"""
+import argparse
+import time
+from unittest import mock
+
+from eth_utils import encode_hex
+from golem_messages import idgenerator
+from golem_messages.datastructures import tasks as dt_tasks
+from golem_messages.datastructures.masking import Mask
+from golem_messages.factories.datastructures import p2p as dt_p2p_factory
+
+import golem
+from golem.core.common import timeout_to_deadline
+from golem.environments.environment import SupportStatus
+from golem.task.taskkeeper import TaskHeaderKeeper
+
+
+def make_header(owner: bytes, timeout: int) -> dt_tasks.TaskHeader:
+    return dt_tasks.TaskHeader(
+        task_id=idgenerator.generate_id(owner),
+        task_owner={
+            "node_name": "flood",
+            "key": encode_hex(owner)[2:],
+            "pub_addr": "10.10.10.10",
+            "pub_port": 10101,
+        },
+        environment="DEFAULT",
+        deadline=timeout_to_deadline(timeout),
+        subtask_timeout=120,
+        subtasks_count=1,
+        max_price=10,
+        min_version=golem.__version__,
+        estimated_memory=0,
+        mask=Mask().to_bytes(),
+        timestamp=0,
+        signature=None,
+    )
+
+
+def timed(label, count, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f'{label:>20}: {elapsed:.3f}s '
+          f'({elapsed / max(count, 1) * 1e6:.1f}us per op)')
+
+
+def main(args):
+    keeper = TaskHeaderKeeper(
+        old_env_manager=mock.Mock(),
+        new_env_manager=mock.Mock(),
+        node=dt_p2p_factory.Node(),
+        max_tasks_per_requestor=args.max_per_owner,
+    )
+    keeper.check_support = mock.Mock(return_value=SupportStatus.ok())
+
+    owners = [f'owner{i}'.encode() for i in range(args.owners)]
+    headers = [
+        make_header(owners[i % len(owners)], 1 + (i % args.max_timeout))
+        for i in range(args.headers)
+    ]
+    print(f'{len(headers)} headers from {len(owners)} owners')
+
+    def add_all():
+        for header in headers:
+            keeper.add_task_header(header)
+
+    def get_tasks():
+        exclude = set(list(keeper.supported_tasks)[:args.exclude])
+        for _ in range(args.requests):
+            keeper.get_task(exclude=exclude)
+
+    def remove_old():
+        for _ in range(args.syncs):
+            keeper.remove_old_tasks()
+
+    timed('add_task_header', len(headers), add_all)
+    print(f'{len(keeper.supported_tasks)} supported tasks')
+    timed('get_task', args.requests, get_tasks)
+    timed('remove_old_tasks', args.syncs, remove_old)
+    time.sleep(args.max_timeout)
+    timed('expire all', len(keeper.task_headers), keeper.remove_old_tasks)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Benchmark TaskHeaderKeeper under a header flood",
+    )
+    parser.add_argument('--headers', type=int, default=50000)
+    parser.add_argument('--owners', type=int, default=5000)
+    parser.add_argument('--max-per-owner', type=int, default=10)
+    parser.add_argument('--max-timeout', type=int, default=3)
+    parser.add_argument('--requests', type=int, default=10000)
+    parser.add_argument('--exclude', type=int, default=100)
+    parser.add_argument('--syncs', type=int, default=1000)
+    main(parser.parse_args())
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""
+Feeds large and fragmented message streams through BasicProtocol and compares
+the FrameDecoder based receive path with the legacy DataBuffer one.
+"""
+import argparse
+import os
+import time
+from unittest import mock
+
+from golem.core.databuffer import DataBuffer
+from golem.core.framedecoder import FrameDecoder
+from golem.network.transport import tcpnetwork
+
+
+class BenchmarkProtocol(tcpnetwork.BasicProtocol):
+
+    def __init__(self):
+        super().__init__()
+        self.opened = True
+        self.session = mock.Mock()
+        self.transport = mock.Mock()
+
+    def _load_message(self, data):
+        return len(data)
+
+
+class LegacyBenchmarkProtocol(BenchmarkProtocol):
+    """ Receive path as it was before FrameDecoder """
+
+    def __init__(self):
+        super().__init__()
+        self.db = DataBuffer()
+
+    def _interpret(self, data):
+        self.db.append_bytes(data)
+        for data_ in self.db.get_len_prefixed_bytes():
+            if len(data_) > tcpnetwork.MAX_MESSAGE_SIZE:
+                continue
+            self.session.interpret(self._load_message(data_))
+
+
+def make_stream(message_size: int, messages: int) -> bytes:
+    payload = os.urandom(message_size)
+    return FrameDecoder.encode(payload) * messages
+
+
+def feed(protocol_cls, stream: bytes, chunk_size: int) -> float:
+    protocol = protocol_cls()
+    start = time.process_time()
+    for i in range(0, len(stream), chunk_size):
+        protocol.dataReceived(stream[i:i + chunk_size])
+    return time.process_time() - start
+
+
+def main(args):
+    scenarios = [
+        ('large', args.large_size, args.large_count, args.chunk_size),
+        ('fragmented', args.small_size, args.small_count, args.small_chunk),
+    ]
+    for name, size, count, chunk_size in scenarios:
+        stream = make_stream(size, count)
+        legacy = feed(LegacyBenchmarkProtocol, stream, chunk_size)
+        current = feed(BenchmarkProtocol, stream, chunk_size)
+        print(
+            f'{name:>10}: {count} x {size}B in {chunk_size}B chunks | '
+            f'DataBuffer {legacy:.3f}s | FrameDecoder {current:.3f}s | '
+            f'speedup {legacy / max(current, 1e-9):.1f}x'
+        )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Benchmark TCP message framing",
+    )
+    parser.add_argument('--large-size', type=int,
+                        default=tcpnetwork.MAX_MESSAGE_SIZE)
+    parser.add_argument('--large-count', type=int, default=10)
+    parser.add_argument('--chunk-size', type=int, default=64 * 1024)
+    parser.add_argument('--small-size', type=int, default=512)
+    parser.add_argument('--small-count', type=int, default=20000)
+    parser.add_argument('--small-chunk', type=int, default=1400)
+    main(parser.parse_args())
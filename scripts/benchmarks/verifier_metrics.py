@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+"""
+Runs the Blender verifier image metrics over the test images and checks
+them against their previous, per pixel implementations. Reports the time
+spent in every metric and the speedup where a reference is available.
+"""
+import argparse
+import itertools
+import math
+import os
+import time
+
+import numpy
+import pywt
+from PIL import Image
+
+from apps.blender.resources.images.entrypoints.scripts.verifier_tools import \
+    image_metrics
+
+TEST_DATA = os.path.join('tests', 'apps', 'blender', 'verification',
+                         'test_data')
+
+
+def reference_mass_centers(image):
+    image = image.convert('RGB')
+    pixels = image.load()
+    width, height = image.size
+    results = dict()
+    for channel_index in range(len(pixels[0, 0])):
+        mass_center_x = 0
+        mass_center_y = 0
+        total_mass = 0
+        for x in range(width):
+            for y in range(height):
+                mass = pixels[x, y][channel_index]
+                mass_center_x += mass * x
+                mass_center_y += mass * y
+                total_mass += mass
+        divisor_x = (float(total_mass) * width)
+        divisor_y = (float(total_mass) * height)
+        mass_center_x = mass_center_x / divisor_x if divisor_x else 0.5
+        mass_center_y = mass_center_y / divisor_y if divisor_y else 0.5
+        results[channel_index] = mass_center_x, mass_center_y
+    return results
+
+
+def reference_mass_center_distance(image1, image2):
+    centers_1 = reference_mass_centers(image1)
+    centers_2 = reference_mass_centers(image2)
+    return {
+        "max_x_mass_center_distance": max(
+            abs(centers_1[c][0] - centers_2[c][0]) for c in centers_1),
+        "max_y_mass_center_distance": max(
+            abs(centers_1[c][1] - centers_2[c][1]) for c in centers_1),
+    }
+
+
+def _reference_sum(coefficient):
+    return sum(sum(coefficient ** 2))
+
+
+def _reference_mse(coefficient1, coefficient2, low, high):
+    if low == high:
+        if low == 0:
+            high = low + 1
+        else:
+            low = high - 1
+    sum_ = 0
+    count = 0
+    for i in range(low, high):
+        if type(coefficient1[i]) is tuple:
+            for j in range(3):
+                sum_ += _reference_sum(coefficient1[i][j] - coefficient2[i][j])
+            count += 3 * coefficient1[i][0].size
+        else:
+            sum_ += _reference_sum(coefficient1[i] - coefficient2[i])
+            count += coefficient1[i].size
+    return sum_ / count if count else 0
+
+
+def reference_wavelet(image1, image2):
+    np_image1 = numpy.array(image1.convert("RGB"))
+    np_image2 = numpy.array(image2.convert("RGB"))
+    result = dict()
+    for wavelet in ("db4", "sym2", "haar"):
+        for i in range(0, 3):
+            coefficient1 = pywt.wavedec2(np_image1[..., i], wavelet)
+            coefficient2 = pywt.wavedec2(np_image2[..., i], wavelet)
+            total_length = len(coefficient1) - 1
+            third = int(total_length / 3)
+            two_thirds = int(total_length * 2 / 3)
+            ranges = {
+                "base": (0, 1),
+                "low": (1, 1 + third),
+                "mid": (1 + third, 1 + two_thirds),
+                "high": (1 + two_thirds, 1 + total_length),
+            }
+            for band, (low, high) in ranges.items():
+                key = "wavelet_{}_{}".format(wavelet, band)
+                result[key] = result.get(key, 0) + _reference_mse(
+                    coefficient1, coefficient2, low, high)
+            if wavelet != "haar":
+                continue
+            levels = len(coefficient1)
+            for index, level in enumerate(reversed(range(levels - 3, levels))):
+                sum1 = sum(sum(sum(numpy.absolute(coefficient1[level]))))
+                sum2 = sum(sum(sum(numpy.absolute(coefficient2[level]))))
+                key = "wavelet_haar_freq_x{}".format(index + 1)
+                result[key] = result.get(key, 0) + numpy.absolute(
+                    sum2 - sum1) / (3 * coefficient1[level][0].size)
+    return result
+
+
+REFERENCES = {
+    'MetricMassCenterDistance': reference_mass_center_distance,
+    'MetricWavelet': reference_wavelet,
+}
+
+
+def measure(function, image1, image2, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function(image1, image2)
+    return result, (time.perf_counter() - start) / repeat
+
+
+def compare(result, expected, tolerance):
+    mismatched = []
+    for key, value in expected.items():
+        if not math.isclose(result[key], value, rel_tol=tolerance,
+                            abs_tol=tolerance):
+            mismatched.append((key, result[key], value))
+    return mismatched
+
+
+def main(args):
+    paths = sorted(
+        os.path.join(args.data_dir, name)
+        for name in os.listdir(args.data_dir) if name.endswith('.png')
+    )
+    images = [Image.open(path) for path in paths]
+    for image in images:
+        image.load()
+    pairs = list(itertools.combinations(range(len(images)), 2))
+
+    failed = False
+    print('{:<30} {:>12} {:>12} {:>8}'.format(
+        'metric', 'current [s]', 'previous [s]', 'speedup'))
+    for metric_class in image_metrics.ImgageMetrics.get_metric_classes():
+        name = metric_class.__name__
+        reference = REFERENCES.get(name)
+        current_time = reference_time = 0.
+        for first, second in pairs:
+            image1, image2 = images[first], images[second]
+            result, elapsed = measure(metric_class.compute_metrics,
+                                      image1, image2, args.repeat)
+            current_time += elapsed
+            if reference is None:
+                continue
+            expected, elapsed = measure(reference, image1, image2, 1)
+            reference_time += elapsed
+            for key, value, previous in compare(result, expected,
+                                                args.tolerance):
+                failed = True
+                print('MISMATCH {} {} vs {}: {} = {!r}, previously {!r}'
+                      .format(name, paths[first], paths[second], key,
+                              value, previous))
+
+        if reference is None:
+            print('{:<30} {:>12.4f} {:>12} {:>8}'.format(
+                name, current_time, '-', '-'))
+        else:
+            print('{:<30} {:>12.4f} {:>12.4f} {:>7.1f}x'.format(
+                name, current_time, reference_time,
+                reference_time / current_time))
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--data-dir', default=TEST_DATA,
+                        help='directory with PNG images to compare pairwise')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='runs of every current metric per image pair')
+    parser.add_argument('--tolerance', type=float, default=1e-9,
+                        help='relative and absolute tolerance of comparison')
+    raise SystemExit(main(parser.parse_args()))
@@ -2,6 +2,7 @@
 import array
 
 import os
+import pickle
 from os import path
 from random import randrange, shuffle
 
@@ -455,6 +456,27 @@ class TestBlenderTask(TempDirFixture, LogTestCase):
                 img_y, img_x = img.shape[:2]
                 self.assertTrue(self.bt.res_x == img_x and res_y == img_y)
 
+    @mock.patch('twisted.internet.reactor', create=True)
+    def test_frame_preview_marked_saved_when_written(self, _reactor):
+        preview_file = self.temp_file_name('preview.png')
+        bt = self.build_bt(10, 20, 2, frames=[1])
+        updater = PreviewUpdater(preview_file, 10, 20, {1: 0, 2: 10},
+                                 save_interval=60)
+        bt.preview_updaters = [updater]
+        chunk = self.temp_file_name('chunk1.png')
+        cv2.imwrite(chunk, numpy.zeros((10, 10, 3), numpy.uint8))
+        updater.update_preview(chunk, 1)
+        updater.update_preview(chunk, 2)
+        assert updater.has_unsaved_changes()
+
+        # Reading the preview doesn't save the changes of the updater
+        img = bt._open_frame_preview(preview_file)
+        assert updater.has_unsaved_changes()
+
+        bt._save_frame_preview(img, preview_file)
+        assert not updater.has_unsaved_changes()
+        assert os.path.exists(preview_file)
+
     def test_update_frame_preview(self):
         file1 = self.temp_file_name('preview1.exr')
         file2 = self.temp_file_name('preview2.exr')
@@ -623,6 +645,92 @@ class TestPreviewUpdater(TempDirFixture, LogTestCase):
         with self.assertLogs(logger, level="WARNING"):
             pu.update_preview("Not existing", 4)
 
+    def _make_chunk(self, name, res_x, res_y, color):
+        img = numpy.zeros((res_y, res_x, 3), numpy.uint8)
+        img[:] = color
+        chunk_path = self.temp_file_name(name)
+        cv2.imwrite(chunk_path, img)
+        return chunk_path
+
+    @mock.patch('twisted.internet.reactor', create=True)
+    def test_saves_are_rate_limited(self, reactor):
+        preview_file = self.temp_file_name('preview.png')
+        pu = PreviewUpdater(preview_file, 10, 30, {1: 0, 2: 10, 3: 20},
+                            save_interval=60)
+
+        pu.update_preview(self._make_chunk('c1.png', 10, 10, (1, 2, 3)), 1)
+        # first change is saved right away
+        assert os.path.exists(preview_file)
+        assert not pu.has_unsaved_changes()
+        reactor.callLater.assert_not_called()
+
+        pu.update_preview(self._make_chunk('c2.png', 10, 10, (4, 5, 6)), 2)
+        pu.update_preview(self._make_chunk('c3.png', 10, 10, (7, 8, 9)), 3)
+        assert pu.has_unsaved_changes()
+        reactor.callLater.assert_called_once()
+        delay, save = reactor.callLater.call_args[0]
+        assert 0 < delay <= 60
+        assert cv2.imread(preview_file)[25].tolist() == [[0, 0, 0]] * 10
+
+        save()
+        assert not pu.has_unsaved_changes()
+        assert cv2.imread(preview_file)[25].tolist() == [[7, 8, 9]] * 10
+
+    @mock.patch('twisted.internet.reactor', create=True)
+    def test_preview_in_memory(self, _reactor):
+        preview_file = self.temp_file_name('preview.png')
+        pu = PreviewUpdater(preview_file, 10, 20, {1: 0, 2: 10})
+        assert pu.get_preview() is None
+        assert pu.get_preview_bytes() is None
+
+        pu.update_preview(self._make_chunk('c1.png', 10, 10, (1, 2, 3)), 1)
+        pu.update_preview(self._make_chunk('c2.png', 10, 10, (4, 5, 6)), 2)
+
+        preview = pu.get_preview()
+        assert preview.img[5].tolist() == [[1, 2, 3]] * 10
+        assert preview.img[15].tolist() == [[4, 5, 6]] * 10
+        data = numpy.frombuffer(pu.get_preview_bytes(), numpy.uint8)
+        assert numpy.array_equal(cv2.imdecode(data, cv2.IMREAD_UNCHANGED),
+                                 preview.img)
+
+        pu.remove_part(2)
+        assert pu.get_preview().img[15].tolist() == [[0, 0, 0]] * 10
+        data = numpy.frombuffer(pu.get_preview_bytes(), numpy.uint8)
+        assert cv2.imdecode(data, cv2.IMREAD_UNCHANGED)[15].tolist() == \
+            [[0, 0, 0]] * 10
+
+        # preview is loaded from the file after being restored
+        pu.save()
+        restored = pickle.loads(pickle.dumps(pu))
+        assert not restored.has_unsaved_changes()
+        assert numpy.array_equal(restored.get_preview().img,
+                                 pu.get_preview().img)
+
+    @mock.patch('twisted.internet.reactor', create=True)
+    def test_unpickle_old_state(self, _reactor):
+        preview_file = self.temp_file_name('preview.png')
+        pu = PreviewUpdater.__new__(PreviewUpdater)
+        # State of an updater pickled before the preview was kept in memory
+        pu.__dict__ = {
+            'chunks': {},
+            'preview_res_x': 10,
+            'preview_res_y': 20,
+            'preview_file_path': preview_file,
+            'expected_offsets': {1: 0, 2: 10},
+            'perfect_match_area_y': 0,
+            'perfectly_placed_subtasks': 0,
+        }
+
+        restored = pickle.loads(pickle.dumps(pu))
+        assert restored.save_interval == PreviewUpdater.SAVE_INTERVAL
+        assert not restored.has_unsaved_changes()
+        assert restored.get_preview() is None
+
+        restored.update_preview(
+            self._make_chunk('c1.png', 10, 10, (1, 2, 3)), 1)
+        assert restored.get_preview().img[5].tolist() == [[1, 2, 3]] * 10
+        assert cv2.imread(preview_file)[5].tolist() == [[1, 2, 3]] * 10
+
 
 class TestBlenderRenderTaskBuilder(TempDirFixture):
 
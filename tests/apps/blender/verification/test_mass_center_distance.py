@@ -0,0 +1,74 @@
+import os
+import unittest
+
+from PIL import Image
+
+from apps.blender.resources.images.entrypoints.scripts.verifier_tools.\
+    mass_center_distance import MetricMassCenterDistance
+
+TEST_DATA = os.path.join(os.path.dirname(__file__), 'test_data')
+
+
+def reference_mass_centers(image):
+    """ Per pixel implementation the metric used to be computed with """
+    image = image.convert('RGB')
+    pixels = image.load()
+    width, height = image.size
+    results = dict()
+    for channel_index in range(3):
+        mass_center_x = mass_center_y = total_mass = 0
+        for x in range(width):
+            for y in range(height):
+                mass = pixels[x, y][channel_index]
+                mass_center_x += mass * x
+                mass_center_y += mass * y
+                total_mass += mass
+        if total_mass == 0:
+            results[channel_index] = 0.5, 0.5
+        else:
+            results[channel_index] = (
+                mass_center_x / (float(total_mass) * width),
+                mass_center_y / (float(total_mass) * height),
+            )
+    return results
+
+
+class TestMassCenterDistance(unittest.TestCase):
+
+    def test_single_pixel(self):
+        image = Image.new('RGB', (10, 4))
+        image.putpixel((7, 1), (255, 0, 10))
+
+        centers = MetricMassCenterDistance.compute_mass_centers(image)
+
+        self.assertEqual(centers[0], (0.7, 0.25))
+        self.assertEqual(centers[1], (0.5, 0.5))
+        self.assertEqual(centers[2], (0.7, 0.25))
+
+    def test_matches_reference_implementation(self):
+        for name in ('almost_good_image.png', 'very_bad_image.png'):
+            image = Image.open(os.path.join(TEST_DATA, name))
+            self.assertEqual(
+                MetricMassCenterDistance.compute_mass_centers(image),
+                reference_mass_centers(image),
+            )
+
+    def test_metrics(self):
+        image1 = Image.new('RGB', (10, 10))
+        image1.putpixel((0, 0), (1, 1, 1))
+        image2 = Image.new('RGB', (10, 10))
+        image2.putpixel((5, 2), (1, 1, 1))
+
+        metrics = MetricMassCenterDistance.compute_metrics(image1, image2)
+
+        self.assertEqual(metrics, {
+            'max_x_mass_center_distance': 0.5,
+            'max_y_mass_center_distance': 0.2,
+        })
+
+    def test_size_mismatch(self):
+        with self.assertRaises(Exception):
+            MetricMassCenterDistance.compute_metrics(
+                Image.new('RGB', (2, 2)),
+                Image.new('RGB', (2, 3)),
+            )
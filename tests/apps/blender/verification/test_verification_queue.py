@@ -1,6 +1,9 @@
-from unittest import mock
+from unittest import mock, TestCase
 import functools
+
+from freezegun import freeze_time
 from twisted.internet.defer import Deferred
+from twisted.internet.task import Clock
 
 from golem.verifier.blender_verifier import BlenderVerifier
 from golem.core.common import timeout_to_deadline
@@ -52,3 +55,130 @@ class TestVerificationQueue(TestWithReactor):
 
         sync_wait(d, 60)
         _verification_timed_out.assert_called_once()
+
+
+class FakeReactor(Clock):
+
+    @staticmethod
+    def callFromThread(f, *args, **kwargs):  # noqa pylint: disable=invalid-name
+        f(*args, **kwargs)
+
+
+@mock.patch('twisted.internet.reactor', FakeReactor())
+class TestVerificationQueueScheduling(TestCase):
+
+    def setUp(self):
+        self.queue = VerificationQueue(concurrency=2)
+        self.started = {}
+        self.finished = []
+
+        def start(entry, _verifier_class):
+            deferred = Deferred()
+            self.started[entry.subtask_id] = deferred
+            return deferred
+
+        def stop(_entry, deferred):
+            deferred.cancel()
+
+        for name, side_effect in (('start', start), ('stop', stop)):
+            patcher = mock.patch(
+                'apps.core.verification_queue.VerificationTask.' + name,
+                autospec=True, side_effect=side_effect)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch(
+            'apps.core.verification_queue.VerificationTask.get_results',
+            autospec=True,
+            side_effect=lambda entry: (entry.subtask_id, 'failure', None))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def submit(self, task_id, subtask_id, deadline=100):
+        def cb(subtask_id, verdict, result):  # noqa pylint: disable=unused-argument
+            self.finished.append((subtask_id, verdict))
+
+        self.queue.submit(mock.Mock(), subtask_id, deadline, cb,
+                          task_id=task_id)
+
+    def verify(self, subtask_id):
+        self.started[subtask_id].callback((subtask_id, 'verified', {}))
+
+    def test_concurrency(self):
+        for i in range(3):
+            self.submit('task', 'sub%d' % i)
+        self.assertEqual(set(self.started), {'sub0', 'sub1'})
+
+        self.verify('sub1')
+        self.assertEqual(self.finished, [('sub1', 'verified')])
+        self.assertEqual(set(self.started), {'sub0', 'sub1', 'sub2'})
+
+    def test_set_concurrency(self):
+        for i in range(3):
+            self.submit('task', 'sub%d' % i)
+        self.queue.set_concurrency(3)
+        self.assertEqual(len(self.started), 3)
+
+    @mock.patch('apps.core.verification_queue.cpu_count', return_value=8)
+    @mock.patch('apps.core.verification_queue.psutil')
+    def test_auto_concurrency(self, psutil, _cpu_count):
+        psutil.virtual_memory.return_value.available = \
+            10 * VerificationQueue.VERIFICATION_MEMORY
+        self.assertEqual(VerificationQueue.auto_concurrency(), 4)
+        psutil.virtual_memory.return_value.available = \
+            VerificationQueue.VERIFICATION_MEMORY // 2
+        self.assertEqual(VerificationQueue.auto_concurrency(), 1)
+
+    def test_deadline_order(self):
+        self.queue.set_concurrency(1)
+        self.submit('task1', 'late', deadline=200)
+        self.submit('task2', 'early', deadline=100)
+        self.submit('task3', 'earliest', deadline=50)
+        self.verify('late')
+        self.verify('earliest')
+        self.assertEqual(list(self.started), ['late', 'earliest', 'early'])
+
+    def test_task_fairness(self):
+        self.queue.pause()
+        for i in range(3):
+            self.submit('busy', 'busy%d' % i, deadline=50)
+        self.submit('other', 'other', deadline=100)
+        self.queue.resume()
+        self.assertEqual(set(self.started), {'busy0', 'other'})
+
+    def test_cancel(self):
+        self.submit('task', 'sub0')
+        self.submit('other', 'other')
+        self.submit('task', 'sub1')
+        self.queue.cancel('task')
+
+        self.assertEqual(self.finished, [])
+        self.assertEqual(set(self.started), {'sub0', 'other'})
+        self.assertEqual(self.queue.get_metrics()['cancelled'], 2)
+        self.assertEqual(self.queue.get_metrics()['running'], 1)
+
+    def test_timeout(self):
+        self.submit('task', 'sub0')
+        self.started['sub0'].cancel()
+        self.assertEqual(self.finished, [('sub0', 'failure')])
+        self.assertEqual(self.queue.get_metrics()['running'], 0)
+
+    def test_metrics(self):
+        with freeze_time() as frozen_time:
+            self.queue.set_concurrency(1)
+            self.submit('task', 'sub0')
+            self.submit('task', 'sub1')
+            frozen_time.tick(10)
+            self.verify('sub0')
+            frozen_time.tick(5)
+            self.verify('sub1')
+
+        metrics = self.queue.get_metrics()
+        self.assertEqual(metrics['submitted'], 2)
+        self.assertEqual(metrics['started'], 2)
+        self.assertEqual(metrics['finished'], 2)
+        self.assertEqual(metrics['pending'], 0)
+        self.assertEqual(metrics['running'], 0)
+        self.assertAlmostEqual(metrics['max_wait_time'], 10)
+        self.assertAlmostEqual(metrics['avg_wait_time'], 5)
+        self.assertAlmostEqual(metrics['max_run_time'], 10)
+        self.assertAlmostEqual(metrics['avg_run_time'], 7.5)
@@ -380,7 +380,9 @@ class TestCoreTask(LogTestCase, TestDirFixture):
 
     def test_abort(self):
         c = self._get_core_task()
-        c.abort()
+        with patch.object(c, 'VERIFICATION_QUEUE') as verification_queue:
+            c.abort()
+        verification_queue.cancel.assert_called_once_with(c.header.task_id)
 
     def test_get_progress(self):
         c = self._get_core_task(subtasks_count=13)
@@ -8,7 +8,8 @@ import numpy as np
 from apps.rendering.resources.imgrepr import (EXRImgRepr, ImgRepr,
                                               load_img,
                                               OpenCVImgRepr,
-                                              OpenCVError)
+                                              OpenCVError,
+                                              read_image_size)
 
 from golem.testutils import TempDirFixture, PEP8MixIn
 from golem.tools.assertlogs import (LogTestCase)
@@ -164,3 +165,20 @@ class TestImgFunctions(TempDirFixture, LogTestCase):
         assert os.path.isfile("path1.png") is False
         os.remove("path2.png")
         assert os.path.isfile("path2.png") is False
+
+    def test_read_image_size(self):
+        png_path = self.temp_file_name("img.png")
+        make_test_img(png_path, (10, 20))
+        assert read_image_size(png_path) == (10, 20)
+
+        make_test_img_16bits(png_path, width=7, height=3)
+        assert read_image_size(png_path) == (7, 3)
+
+        assert read_image_size(get_test_exr()) == (10, 10)
+
+        bmp_path = self.temp_file_name("img.bmp")
+        make_test_img(bmp_path, (5, 6))
+        assert read_image_size(bmp_path) == (5, 6)
+
+        with pytest.raises(OpenCVError):
+            read_image_size(self.temp_file_name("notexisting.png"))
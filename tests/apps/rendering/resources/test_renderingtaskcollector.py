@@ -140,3 +140,63 @@ class TestRenderingTaskCollector(TestDirFixture):
         for img_path in images:
             os.remove(img_path)
             assert os.path.exists(img_path) is False
+
+    def _make_parts(self, count, width, height, bits16=False):
+        images = []
+        for i in range(count):
+            img_path = self.temp_file_name("part{}.png".format(i))
+            color = (i * 10, i * 20, 255 - i * 30)
+            if bits16:
+                make_test_img_16bits(img_path, width=width, height=height,
+                                     color=tuple(c * 257 for c in color))
+            else:
+                make_test_img(img_path, size=(height, width), color=color)
+            images.append(img_path)
+        return images
+
+    def _assert_same_as_default(self, images, **kwargs):
+        collector = RenderingTaskCollector()
+        streaming_collector = RenderingTaskCollector(streaming=True, **kwargs)
+        for img_path in images:
+            collector.add_img_file(img_path)
+            streaming_collector.add_img_file(img_path)
+
+        expected = collector.finalize()
+        final_img = streaming_collector.finalize()
+        assert final_img.img.dtype == expected.img.dtype
+        assert numpy.array_equal(final_img.img, expected.img)
+        assert (streaming_collector.width, streaming_collector.height) == \
+            (collector.width, collector.height)
+        return streaming_collector
+
+    def test_finalize_streaming(self):
+        images = self._make_parts(5, width=12, height=7)
+        collector = self._assert_same_as_default(images)
+        assert collector.stats.parts == 5
+        assert not collector.stats.memory_mapped
+        # Final image and a single decoded part
+        assert collector.stats.peak_memory == (5 + 1) * 12 * 7 * 3
+
+    def test_finalize_streaming_workers(self):
+        images = self._make_parts(9, width=20, height=15, bits16=True)
+        collector = self._assert_same_as_default(images, workers=4)
+        assert collector.stats.peak_memory <= (9 + 4) * 20 * 15 * 3 * 2
+
+    def test_finalize_streaming_memmap(self):
+        images = self._make_parts(3, width=10, height=10)
+        collector = self._assert_same_as_default(images, memmap_threshold=0)
+        assert collector.stats.memory_mapped
+
+    def test_finalize_streaming_exr(self):
+        collector = RenderingTaskCollector(streaming=True)
+        collector.add_img_file(_get_test_exr())
+        collector.add_img_file(_get_test_exr(alt=True))
+        img = collector.finalize()
+        assert isinstance(img, OpenCVImgRepr)
+        assert img.img.shape[:2] == (20, 10)
+
+    def test_finalize_streaming_nonexisting_img(self):
+        collector = RenderingTaskCollector(streaming=True)
+        collector.add_img_file(self.temp_file_name("img.png"))
+        with pytest.raises(OpenCVError):
+            collector.finalize()
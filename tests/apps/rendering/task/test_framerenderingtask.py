@@ -289,6 +289,9 @@ class TestFrameRenderingTask(TestDirFixture, LogTestCase):
         img_repr = load_img(out_path)
         assert isinstance(img_repr, EXRImgRepr)
         img_repr.close()
+        stats = task.frames_collector_stats[5]
+        assert stats.parts == 2
+        assert stats.peak_memory > 0
 
     def test_get_subtask_for_multiple_subtask_per_frame(self):
         task = self._get_frame_task(True, 18)
@@ -1,10 +1,13 @@
-from unittest import TestCase
+from unittest import TestCase, mock
 from uuid import uuid4
 
 from golem_messages.factories.datastructures import p2p
 from golem.testutils import TempDirFixture
 
 from apps.wasm.task import (
+    file_digest,
+    VbrSubtask,
+    WasmResult,
     WasmTask,
     WasmTaskBuilder,
     WasmTaskDefinition,
@@ -167,3 +170,66 @@ class WasmTaskTestCase(TempDirFixture):
             all([item in subt_extra_data.items()
                  for item in expected_dict.items()])
         )
+
+    def test_find_vbrsubtask_by_id(self):
+        self.task.query_extra_data(1.0, 'node1')
+        self.task.query_extra_data(1.0, 'node2')
+        s_id1, s_id2 = list(self.task.subtasks_given)
+        self.assertIs(self.task._find_vbrsubtask_by_id(s_id1),
+                      self.task.subtasks[0])
+        self.assertIs(self.task._find_vbrsubtask_by_id(s_id2),
+                      self.task.subtasks[0])
+        with self.assertRaises(KeyError):
+            self.task._find_vbrsubtask_by_id('unknown')
+
+
+class WasmResultsComparisonTestCase(TempDirFixture):
+    def _result(self, *contents):
+        files = []
+        for content in contents:
+            path = self.temp_file_name(str(uuid4()))
+            with open(path, 'wb') as f:
+                f.write(content)
+            files.append(path)
+        return WasmResult(files)
+
+    def test_equal(self):
+        result_a = self._result(b'a' * 2 ** 21, b'b')
+        result_b = self._result(b'a' * 2 ** 21, b'b')
+        self.assertTrue(WasmTask.cmp_results(result_a, result_b))
+        self.assertTrue(WasmTask.cmp_results(result_a, result_b,
+                                             compare_bytewise=True))
+
+    def test_different(self):
+        result_a = self._result(b'a', b'b')
+        self.assertFalse(
+            WasmTask.cmp_results(result_a, self._result(b'a', b'c')))
+        self.assertFalse(
+            WasmTask.cmp_results(result_a, self._result(b'a')))
+
+    def test_compare_bytewise(self):
+        result_a = self._result(b'a')
+        result_b = self._result(b'b')
+        # Pretend that the digests collide
+        result_b.digests = result_a.digests
+        self.assertTrue(WasmTask.cmp_results(result_a, result_b))
+        self.assertFalse(WasmTask.cmp_results(result_a, result_b,
+                                              compare_bytewise=True))
+
+    def test_results_hashed_once(self):
+        subtask = VbrSubtask(lambda: str(uuid4()), 'name', {}, 1)
+        s_id1, _ = subtask.new_instance('node1')
+        s_id2, _ = subtask.new_instance('node2')
+        files1 = self._result(b'a').files
+        files2 = self._result(b'a').files
+
+        with mock.patch('apps.wasm.task.file_digest',
+                        wraps=file_digest) as digest:
+            subtask.add_result(s_id1, files1)
+            subtask.add_result(s_id2, files2)
+            self.assertEqual(digest.call_count, 2)
+
+        self.assertTrue(subtask.is_finished())
+        self.assertEqual(subtask.get_instance(s_id1)['results'], files1)
+        subtask.get_verdicts()
+        self.assertEqual(subtask.get_result(), files1)
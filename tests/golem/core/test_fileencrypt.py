@@ -1,3 +1,5 @@
+import hashlib
+import io
 import os
 import random
 
@@ -114,6 +116,55 @@ class TestAESFileEncryptor(TestDirFixture):
         self.assertEqual(len(key), key_len)
         self.assertEqual(len(iv), iv_len)
 
+    def test_stream_encryptor_compatible_with_decrypt(self):
+        secret = FileEncryptor.gen_secret(10, 20)
+        decrypted_path = self.test_file_path + ".dec"
+        plain_path = self.test_file_path + ".plain"
+        sha1 = hashlib.sha1()
+
+        with open(self.test_file_path, 'rb') as f:
+            data = f.read()
+
+        with AESFileEncryptor.stream_encryptor(self.enc_file_path, secret,
+                                               hash_obj=sha1,
+                                               plain_out=plain_path) as dst:
+            for i in range(0, len(data), 100):
+                dst.write(data[i:i + 100])
+            self.assertEqual(dst.tell(), len(data))
+
+        AESFileEncryptor.decrypt(self.enc_file_path, decrypted_path, secret)
+
+        with open(decrypted_path, 'rb') as f:
+            self.assertEqual(f.read(), data)
+        with open(plain_path, 'rb') as f:
+            self.assertEqual(f.read(), data)
+        self.assertEqual(sha1.digest(), hashlib.sha1(data).digest())
+
+    def test_stream_decryptor(self):
+        secret = FileEncryptor.gen_secret(10, 20)
+        for size in (0, 1, 15, 16, 17, 100):
+            data = os.urandom(size)
+            with open(self.test_file_path, 'wb') as f:
+                f.write(data)
+            AESFileEncryptor.encrypt(self.test_file_path,
+                                     self.enc_file_path,
+                                     secret)
+
+            with AESFileEncryptor.stream_decryptor(self.enc_file_path,
+                                                   secret) as src:
+                self.assertEqual(src.read(), data)
+                for start in range(size + 1):
+                    src.seek(start)
+                    self.assertEqual(src.read(17), data[start:start + 17])
+                src.seek(-1, io.SEEK_END)
+                self.assertEqual(src.read(), data[-1:])
+
+    def test_stream_decryptor_wrong_size(self):
+        with open(self.enc_file_path, 'wb') as f:
+            f.write(b'0' * 40)
+        with self.assertRaises(ValueError):
+            AESFileEncryptor.stream_decryptor(self.enc_file_path, b'secret')
+
 
 class TestFileHelper(TestDirFixture):
     """ Tests for FileHelper class """
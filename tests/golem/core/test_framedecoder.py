@@ -0,0 +1,88 @@
+import struct
+from unittest import TestCase, mock
+
+from golem.core.framedecoder import FrameDecoder
+
+
+def frame(data: bytes) -> bytes:
+    return struct.pack("!L", len(data)) + data
+
+
+class TestFrameDecoder(TestCase):
+
+    def setUp(self):
+        self.callback = mock.Mock()
+        self.decoder = FrameDecoder(
+            max_frame_size=16,
+            oversized_callback=self.callback,
+            compact_threshold=8,
+        )
+
+    def _frames(self):
+        return [bytes(f) for f in self.decoder.frames()]
+
+    def test_encode(self):
+        self.assertEqual(FrameDecoder.encode(b"abc"), frame(b"abc"))
+
+    def test_whole_frames(self):
+        self.decoder.feed(frame(b"abc") + frame(b"") + frame(b"defg"))
+        self.assertEqual(self._frames(), [b"abc", b"", b"defg"])
+        self.assertEqual(self.decoder.data_size(), 0)
+
+    def test_fragmented_frames(self):
+        stream = frame(b"abc") + frame(b"0123456789") + frame(b"x")
+        result = []
+        for i in range(len(stream)):
+            self.decoder.feed(stream[i:i + 1])
+            result += self._frames()
+        self.assertEqual(result, [b"abc", b"0123456789", b"x"])
+
+    def test_incomplete_frame(self):
+        self.decoder.feed(frame(b"abcdef")[:-1])
+        self.assertEqual(self._frames(), [])
+        self.assertEqual(self.decoder.data_size(), 9)
+        self.decoder.feed(b"f")
+        self.assertEqual(self._frames(), [b"abcdef"])
+
+    def test_oversized_frame_not_buffered(self):
+        self.decoder.feed(struct.pack("!L", 100) + bytes(10))
+        self.assertEqual(self._frames(), [])
+        self.callback.assert_called_once_with(100)
+        self.assertEqual(self.decoder.data_size(), 0)
+
+        self.decoder.feed(bytes(90) + frame(b"ok"))
+        self.assertEqual(self._frames(), [b"ok"])
+        self.callback.assert_called_once_with(100)
+
+    def test_oversized_frame_in_single_chunk(self):
+        self.decoder.feed(struct.pack("!L", 20) + bytes(20) + frame(b"ok"))
+        self.assertEqual(self._frames(), [b"ok"])
+        self.callback.assert_called_once_with(20)
+
+    def test_frames_are_memoryviews(self):
+        self.decoder.feed(frame(b"abc"))
+        frames = list(self.decoder.frames())
+        self.assertIsInstance(frames[0], memoryview)
+        self.assertEqual(frames[0], b"abc")
+
+    def test_feed_with_referenced_frame(self):
+        self.decoder.feed(frame(b"0123456789") + frame(b"ab"))
+        frames = list(self.decoder.frames())
+        self.decoder.feed(frame(b"cd"))
+        self.assertEqual(bytes(frames[0]), b"0123456789")
+        self.assertEqual(self._frames(), [b"cd"])
+
+    def test_compaction(self):
+        for _ in range(10):
+            self.decoder.feed(frame(b"0123456789") + frame(b"ab")[:3])
+            self.assertEqual(len(self._frames()), 1)
+            self.decoder.feed(frame(b"ab")[3:])
+            self.assertEqual(self._frames(), [b"ab"])
+        self.assertLessEqual(len(self.decoder._buffer), 32)
+
+    def test_clear(self):
+        self.decoder.feed(frame(b"abc")[:-1])
+        self.decoder.clear()
+        self.assertEqual(self.decoder.data_size(), 0)
+        self.decoder.feed(frame(b"abc"))
+        self.assertEqual(self._frames(), [b"abc"])
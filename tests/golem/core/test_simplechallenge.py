@@ -0,0 +1,102 @@
+from concurrent.futures import Future
+from unittest import TestCase, mock
+
+from twisted.internet.defer import CancelledError
+
+from golem.core.simplechallenge import (
+    accept_challenge, ChallengeSolver, create_challenge, solve_challenge,
+    solve_challenge_range)
+
+
+class SyncExecutor:
+    def __init__(self):
+        self.futures = []
+
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_result(fn(*args))
+        self.futures.append(future)
+        return future
+
+
+class PendingExecutor(SyncExecutor):
+    def submit(self, fn, *args):
+        future = Future()
+        self.futures.append(future)
+        return future
+
+
+class TestSolveChallenge(TestCase):
+
+    def test_solve_and_accept(self):
+        challenge = create_challenge([], None)
+        solution, _ = solve_challenge(challenge, 8)
+        self.assertTrue(accept_challenge(challenge, solution, 8))
+        # The smallest solution is found
+        for candidate in range(solution):
+            self.assertFalse(accept_challenge(challenge, candidate, 8))
+
+    def test_range(self):
+        challenge = create_challenge([], None)
+        solution, _ = solve_challenge(challenge, 6)
+        self.assertEqual(
+            solve_challenge_range(challenge, 6, 0, solution + 1), solution)
+        self.assertIsNone(solve_challenge_range(challenge, 6, 0, solution))
+        found = solve_challenge_range(challenge, 6, solution + 1, 10 ** 6)
+        self.assertGreater(found, solution)
+        self.assertTrue(accept_challenge(challenge, found, 6))
+
+    def test_range_zero_difficulty(self):
+        self.assertEqual(solve_challenge_range('abc', 0, 7, 1), 7)
+
+
+@mock.patch('twisted.internet.reactor.callFromThread',
+            lambda fn, *args: fn(*args))
+class TestChallengeSolver(TestCase):
+
+    def setUp(self):
+        self.solver = ChallengeSolver(chunk_size=16, inline_difficulty=2)
+        self.challenge = create_challenge([], None)
+
+    def solve(self, difficulty):
+        results = []
+        self.solver.solve(self.challenge, difficulty) \
+            .addCallback(results.append)
+        self.assertEqual(len(results), 1)
+        return results[0]
+
+    @mock.patch('golem.core.simplechallenge.ChallengeSolver._get_executor')
+    def test_inline(self, get_executor):
+        solution, _ = self.solve(2)
+        self.assertTrue(accept_challenge(self.challenge, solution, 2))
+        get_executor.assert_not_called()
+
+    def test_chunks(self):
+        executor = SyncExecutor()
+        with mock.patch.object(self.solver, '_get_executor',
+                               return_value=executor):
+            solution, _ = self.solve(8)
+        self.assertEqual(solution, solve_challenge(self.challenge, 8)[0])
+        self.assertEqual(len(executor.futures), solution // 16 + 1)
+
+    def test_cancel(self):
+        executor = PendingExecutor()
+        with mock.patch.object(self.solver, '_get_executor',
+                               return_value=executor):
+            deferred = self.solver.solve(self.challenge, 8)
+        errors = []
+        deferred.addErrback(errors.append)
+        deferred.cancel()
+        self.assertTrue(errors[0].check(CancelledError))
+        self.assertTrue(executor.futures[0].cancelled())
+        self.assertEqual(len(executor.futures), 1)
+
+    def test_error(self):
+        executor = PendingExecutor()
+        with mock.patch.object(self.solver, '_get_executor',
+                               return_value=executor):
+            deferred = self.solver.solve(self.challenge, 8)
+        errors = []
+        deferred.addErrback(errors.append)
+        executor.futures[0].set_exception(ValueError())
+        self.assertTrue(errors[0].check(ValueError))
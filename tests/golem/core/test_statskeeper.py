@@ -1,6 +1,12 @@
+import time
 from threading import Thread
+from unittest import mock
 
+from peewee import DatabaseError
+
+from golem.core import statskeeper
 from golem.core.statskeeper import IntStatsKeeper
+from golem.model import Stats
 from golem.task.taskcomputer import CompStats
 from golem.tools.testwithdatabase import TestWithDatabase
 
@@ -58,3 +64,121 @@ class TestStatsKeeper(TestWithDatabase):
 
         self.assertEqual(sk.session_stats.computed_tasks, n_expected)
         self.assertEqual(sk.global_stats.computed_tasks, n_expected)
+
+
+class TestWriteBackStatsKeeper(TestWithDatabase):
+    def _keeper(self):
+        keeper = IntStatsKeeper(CompStats, flush_interval=3600)
+        self.addCleanup(keeper.stop)
+        return keeper
+
+    @staticmethod
+    def _stored(name):
+        return int(Stats.get(Stats.name == name).value)
+
+    def test_increase_stat(self):
+        st = self._keeper()
+        st.increase_stat("computed_tasks")
+        st.increase_stat("computed_tasks", 2)
+        self.assertEqual(st.get_stats("computed_tasks"), (3, 3))
+        self.assertEqual(self._stored("computed_tasks"), 0)
+
+        st.flush()
+        self.assertEqual(self._stored("computed_tasks"), 3)
+        self.assertEqual(st.get_stats("computed_tasks"), (3, 3))
+
+    def test_increments_of_many_keepers(self):
+        st1 = self._keeper()
+        st2 = self._keeper()
+        st1.increase_stat("computed_tasks")
+        st2.increase_stat("computed_tasks", 2)
+        st1.flush()
+        st2.flush()
+        self.assertEqual(self._stored("computed_tasks"), 3)
+        self.assertEqual(st2.get_stats("computed_tasks"), (2, 3))
+
+    def test_set_stat(self):
+        st = self._keeper()
+        st.increase_stat("tasks_with_errors")
+        st.set_stat("tasks_with_errors", 10)
+        st.increase_stat("tasks_with_errors")
+        self.assertEqual(self._stored("tasks_with_errors"), 0)
+
+        st.flush()
+        self.assertEqual(self._stored("tasks_with_errors"), 11)
+        self.assertEqual(st.get_stats("tasks_with_errors"), (11, 11))
+
+    @staticmethod
+    def _failing_write(change):
+        """ Makes the given change while the flush is being written and
+        fails the write """
+        def write(*_args, **_kwargs):
+            change()
+            raise DatabaseError('locked')
+        return mock.patch.object(statskeeper.db, 'write', side_effect=write)
+
+    def test_set_stat_then_failed_flush(self):
+        st = self._keeper()
+        st.set_stat("tasks_with_errors", 10)
+        with self._failing_write(
+                lambda: st.increase_stat("tasks_with_errors")):
+            st.flush()
+        self.assertEqual(self._stored("tasks_with_errors"), 0)
+
+        st.flush()
+        self.assertEqual(self._stored("tasks_with_errors"), 11)
+        self.assertEqual(st.get_stats("tasks_with_errors"), (11, 11))
+
+    def test_increase_stat_then_failed_flush(self):
+        st = self._keeper()
+        st.increase_stat("computed_tasks", 2)
+        with self._failing_write(lambda: st.increase_stat("computed_tasks")):
+            st.flush()
+        st.flush()
+        self.assertEqual(self._stored("computed_tasks"), 3)
+
+    def test_failed_flush_then_set_stat(self):
+        st = self._keeper()
+        st.increase_stat("tasks_with_errors", 2)
+        with self._failing_write(
+                lambda: st.set_stat("tasks_with_errors", 10)):
+            st.flush()
+        st.flush()
+        self.assertEqual(self._stored("tasks_with_errors"), 10)
+
+    def test_stop(self):
+        st = self._keeper()
+        st.increase_stat("computed_tasks")
+        st.stop()
+        self.assertEqual(self._stored("computed_tasks"), 1)
+        # Written through after stopping
+        st.increase_stat("computed_tasks")
+        self.assertEqual(self._stored("computed_tasks"), 2)
+
+    def test_flush_periodically(self):
+        st = IntStatsKeeper(CompStats, flush_interval=0.01)
+        self.addCleanup(st.stop)
+        st.increase_stat("computed_tasks")
+        for _ in range(100):
+            if self._stored("computed_tasks"):
+                break
+            time.sleep(0.01)
+        self.assertEqual(self._stored("computed_tasks"), 1)
+
+    def test_for_race_conditions(self):
+        st = self._keeper()
+
+        def increase_stat():
+            for _ in range(5):
+                st.increase_stat("computed_tasks")
+                st.flush()
+
+        threads = [Thread(target=increase_stat) for _ in range(10)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        st.flush()
+
+        self.assertEqual(self._stored("computed_tasks"), 50)
+        self.assertEqual(st.get_stats("computed_tasks"), (50, 50))
@@ -1,6 +1,11 @@
+import os
+import threading
+
+import peewee
+
 from golem import model as m
-from golem.database import Database
-from golem.testutils import DatabaseFixture, PEP8MixIn
+from golem.database import Database, GolemSqliteDatabase
+from golem.testutils import DatabaseFixture, PEP8MixIn, TempDirFixture
 
 
 class TestDatabase(DatabaseFixture, PEP8MixIn):
@@ -25,3 +30,86 @@ class TestDatabase(DatabaseFixture, PEP8MixIn):
                             db_dir=self.path)
         self.assertEqual(database.get_user_version(), database.SCHEMA_VERSION)
         database.close()
+
+
+class Row(peewee.Model):
+    value = peewee.IntegerField()
+
+
+class TestPerformanceProfile(TempDirFixture):
+    def setUp(self):
+        super().setUp()
+        self.db = GolemSqliteDatabase(os.path.join(self.tempdir, 'test.db'),
+                                      threadlocals=True,
+                                      pragmas=[('foreign_keys', True)])
+        self.db.connect()
+        Row._meta.database = self.db
+        self.db.create_tables([Row])
+
+    def tearDown(self):
+        self.db.stop_writer()
+        self.db.close()
+        super().tearDown()
+
+    def test_pragmas(self):
+        self.db.enable_performance_profile(cache_size=-1024)
+        self.assertEqual(self.db.pragma('journal_mode')[0], 'wal')
+        # NORMAL
+        self.assertEqual(self.db.pragma('synchronous')[0], 1)
+        self.assertEqual(self.db.pragma('cache_size')[0], -1024)
+        self.assertEqual(self.db.pragma('busy_timeout')[0], 10000)
+        self.assertEqual(self.db.pragma('foreign_keys')[0], 1)
+
+        # Pragmas are applied to new connections too
+        self.db.close()
+        self.db.connect()
+        self.assertEqual(self.db.pragma('synchronous')[0], 1)
+        self.assertEqual(self.db.pragma('cache_size')[0], -1024)
+
+    def test_write_inline_when_disabled(self):
+        threads = []
+        result = self.db.write(
+            lambda: threads.append(threading.current_thread()) or 7,
+        )
+        self.assertEqual(result, 7)
+        self.assertEqual(threads, [threading.current_thread()])
+
+    def test_write_serialized(self):
+        self.db.enable_performance_profile()
+        threads = []
+
+        def insert(value):
+            threads.append(threading.current_thread())
+            with self.db.atomic():
+                return Row.create(value=value).id
+
+        workers = [
+            threading.Thread(target=self.db.write, args=(insert, i))
+            for i in range(10)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        self.assertEqual(Row.select().count(), 10)
+        self.assertEqual(set(threads), {self.db.writer})
+
+    def test_write_exception(self):
+        self.db.enable_performance_profile()
+
+        def fail():
+            raise ValueError()
+
+        with self.assertRaises(ValueError):
+            self.db.write(fail)
+        # Writer is still working
+        self.assertEqual(self.db.write(lambda: 1), 1)
+
+    def test_stop_writer(self):
+        self.db.enable_performance_profile()
+        writer = self.db.writer
+        self.db.stop_writer()
+        self.assertFalse(writer.is_alive())
+        self.assertIsNone(self.db.writer)
+        self.assertEqual(self.db.write(lambda: 1), 1)
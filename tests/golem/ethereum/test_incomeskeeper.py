@@ -196,6 +196,41 @@ class TestIncomesKeeper(TestWithDatabase):
         self.assertIncomeHash(sender_node1, subtask_id1, transaction_id1)
         self.assertIncomeHash(sender_node2, subtask_id2, transaction_id2)
 
+    def test_received_batch_transfer_partial(self):
+        payer_address = '0x' + 40 * '1'
+        incomes = [
+            self._create_income(
+                accepted_ts=1337,
+                expected_amount=10,
+                wallet_operation__amount=0,
+                wallet_operation__sender_address=payer_address,
+                wallet_operation__status=model.WalletOperation.STATUS.awaiting,
+                wallet_operation__tx_hash=None,
+            )
+            for _ in range(4)
+        ]
+        transaction_id = '0x' + 64 * 'b'
+
+        with mock.patch('golem.ethereum.incomeskeeper.dispatcher') \
+                as dispatcher:
+            self.incomes_keeper.received_batch_transfer(
+                transaction_id,
+                payer_address,
+                25,
+                1337,
+            )
+
+        amounts = [i.wallet_operation.refresh().amount for i in incomes]
+        self.assertEqual(sorted(amounts), [0, 5, 10, 10])
+        for income in incomes:
+            operation = income.wallet_operation.refresh()
+            self.assertEqual(operation.tx_hash, transaction_id)
+            self.assertIs(
+                operation.status,
+                model.WalletOperation.STATUS.confirmed,
+            )
+        self.assertEqual(dispatcher.send.call_count, 2)
+
     @staticmethod
     def _create_income(**kwargs):
         income = model_factories.TaskPayment(
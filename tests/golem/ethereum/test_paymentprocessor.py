@@ -530,6 +530,21 @@ class UpdateOverdueTest(PaymentProcessorBase):
                 model.WalletOperation.STATUS.overdue,
             )
 
+    def test_overdues_in_chunks(self):
+        payments = [self.add_overdue_payment() for _ in range(5)]
+        payment = self.add_current_payment()
+        with mock.patch.object(model.WalletOperation, 'UPDATE_BATCH_SIZE', 2):
+            self.pp.update_overdue()
+        for payment_overdue in payments:
+            self.assertIs(
+                payment_overdue.refresh().wallet_operation.status,
+                model.WalletOperation.STATUS.overdue,
+            )
+        self.assertIs(
+            payment.refresh().wallet_operation.status,
+            model.WalletOperation.STATUS.awaiting,
+        )
+
     def test_already_overdue(self):
         payment_overdue = self.add_overdue_payment()
         payment_overdue.wallet_operation.status = \
@@ -1,6 +1,6 @@
 import sys
 from unittest import TestCase
-from unittest.mock import patch, Mock
+from unittest.mock import patch
 
 from golem.marketplace import (RequestorBrassMarketStrategy,
                                ProviderPerformance, Offer)
@@ -17,6 +17,10 @@ def _fake_get_efficacy():
     return A()
 
 
+def _fake_get_reputation(node_ids):
+    return {node_id: (.0, _fake_get_efficacy()) for node_id in node_ids}
+
+
 class TestScalePrice(TestCase):
 
     def test_basic(self):
@@ -26,10 +30,8 @@ class TestScalePrice(TestCase):
         assert scale_price(5, 0) == sys.float_info.max
 
 
-@patch('golem.ranking.manager.database_manager.get_provider_efficiency',
-       Mock(return_value=0.0))
-@patch('golem.ranking.manager.database_manager.get_provider_efficacy',
-       Mock(return_value=_fake_get_efficacy()))
+@patch('golem.ranking.manager.database_manager.get_providers_reputation',
+       _fake_get_reputation)
 class TestRequestorBrassMarketStrategy(TestCase):
     TASK_A = 'aaa'
 
@@ -65,3 +67,13 @@ class TestRequestorBrassMarketStrategy(TestCase):
             RequestorBrassMarketStrategy.get_task_offer_count(self.TASK_A), 2)
         result = RequestorBrassMarketStrategy.resolve_task_offers(self.TASK_A)
         self.assertEqual(len(result), 2)
+
+    def test_reputation_fetched_once(self):
+        offer = self._mock_offer()
+        RequestorBrassMarketStrategy.add(self.TASK_A, offer)
+        RequestorBrassMarketStrategy.add(self.TASK_A, offer)
+        with patch('golem.ranking.manager.database_manager'
+                   '.get_providers_reputation',
+                   side_effect=_fake_get_reputation) as get_reputation:
+            RequestorBrassMarketStrategy.resolve_task_offers(self.TASK_A)
+        get_reputation.assert_called_once()
@@ -1,7 +1,9 @@
 # pylint: disable=protected-access, no-self-use
 import datetime
 import gc
+import http.server
 import logging
+import threading
 import time
 from unittest import mock, TestCase
 import urllib
@@ -285,28 +287,102 @@ class TestConcentClientService(testutils.TempDirFixture):
 
         assert 'key' not in self.concent_service._delayed
 
+    def _loop(self):
+        executor = mock.Mock(submit=lambda fn, *args: fn(*args))
+        with mock.patch.object(self.concent_service, '_get_executor',
+                               return_value=executor):
+            self.concent_service._loop()
+
     def test_loop_exception(self, send_mock, *_):
-        self.concent_service.submit(
-            'key',
-            self.msg,
-            delay=datetime.timedelta(),
-        )
+        self.concent_service.submit('key', self.msg, delay=datetime.timedelta())
+        self.concent_service.submit('other', self.msg,
+                                    delay=datetime.timedelta())
 
-        send_mock.side_effect = exceptions.ConcentRequestError
-        mock_path = ("golem.network.concent.client.ConcentClientService"
-                     "._grace_sleep")
-        with mock.patch(mock_path) as sleep_mock:
-            self.concent_service._loop()
-            sleep_mock.assert_called_once_with()
+        send_mock.side_effect = exceptions.ConcentServiceError
+        self._loop()
 
         send_mock.assert_called_once_with(
             self.msg,
             self.concent_service.keys_auth._private_key,
             concent_variant=self.concent_service.variant,
+            session=self.concent_service._session,
         )
-
+        # Sending is paused, receiving is not
+        assert self.concent_service._backoff['send'].active
+        assert not self.concent_service._backoff['receive'].active
+        assert self.concent_service.queue_depth == 1
+        assert self.concent_service.stats['failed'] == 1
         assert not self.concent_service._delayed
 
+    def test_loop_request_error(self, send_mock, *_):
+        self.concent_service.submit('key', self.msg, delay=datetime.timedelta())
+        self.concent_service.submit('other', self.msg,
+                                    delay=datetime.timedelta())
+
+        send_mock.side_effect = exceptions.ConcentRequestError
+        self._loop()
+
+        # Only the request was rejected, so there's no grace period
+        assert send_mock.call_count == 2
+        assert not self.concent_service._backoff['send'].active
+        assert self.concent_service.queue_depth == 0
+
+    def test_loop_backoff(self, send_mock, *_):
+        backoff = self.concent_service._backoff['send']
+        send_mock.side_effect = exceptions.ConcentUnavailableError
+        for delay in (5, 10, 20):
+            self.concent_service.submit('key', self.msg,
+                                        delay=datetime.timedelta())
+            backoff._until = 0.0
+            self._loop()
+            assert backoff.delay == delay
+
+        send_mock.side_effect = None
+        send_mock.return_value = None
+        self.concent_service.submit('key', self.msg, delay=datetime.timedelta())
+        backoff._until = 0.0
+        self._loop()
+        assert backoff.delay == 0
+        assert not backoff.active
+
+    def test_loop_concurrency(self, send_mock, *_):
+        executor = mock.Mock()
+        for i in range(self.concent_service.CONCURRENCY + 1):
+            self.concent_service.submit_task_message(
+                f'subtask{i}', self.msg, delay=datetime.timedelta())
+        with mock.patch.object(self.concent_service, '_get_executor',
+                               return_value=executor):
+            self.concent_service._loop()
+
+        assert executor.submit.call_count == self.concent_service.CONCURRENCY
+        assert self.concent_service.queue_depth == \
+            self.concent_service.CONCURRENCY + 1
+        send_mock.assert_not_called()
+
+    def test_loop_ordering(self, send_mock, *_):
+        sent = []
+        send_mock.side_effect = lambda msg, *_, **__: sent.append(msg)
+        executor = mock.Mock()
+        messages = [message.concents.ForceReportComputedTask(),
+                    message.concents.ForceSubtaskResults(),
+                    message.concents.ForceReportComputedTask()]
+        for i, msg in enumerate(messages):
+            self.concent_service.submit_task_message(
+                'subtask' if i < 2 else 'other', msg,
+                delay=datetime.timedelta())
+
+        with mock.patch.object(self.concent_service, '_get_executor',
+                               return_value=executor):
+            self.concent_service._loop()
+
+        # Messages of the same subtask are sent one by one
+        assert executor.submit.call_count == 2
+        for call in executor.submit.call_args_list:
+            call[0][0](*call[0][1:])
+        assert sent == messages
+        assert self.concent_service.queue_depth == 0
+        assert self.concent_service.get_stats()['sent'] == 3
+
     @mock.patch(
         'golem.network.concent.client.ConcentClientService'
         '.react_to_concent_message'
@@ -320,11 +396,12 @@ class TestConcentClientService(testutils.TempDirFixture):
             delay=datetime.timedelta(),
         )
 
-        self.concent_service._loop()
+        self._loop()
         send_mock.assert_called_once_with(
             self.msg,
             self.concent_service.keys_auth._private_key,
             concent_variant=self.concent_service.variant,
+            session=self.concent_service._session,
         )
         react_mock.assert_called_once_with(data, response_to=self.msg)
 
@@ -339,6 +416,7 @@ class TestConcentClientService(testutils.TempDirFixture):
             signing_key=self.concent_service.keys_auth._private_key,
             public_key=self.concent_service.keys_auth.public_key,
             concent_variant=self.concent_service.variant,
+            session=self.concent_service._session,
         )
         react_mock.assert_has_calls(
             (
@@ -346,17 +424,12 @@ class TestConcentClientService(testutils.TempDirFixture):
             ),
         )
 
-    @mock.patch(
-        'golem.network.concent.client.ConcentClientService'
-        '._grace_sleep'
-    )
     @mock.patch(
         'golem.network.concent.client.ConcentClientService'
         '.react_to_concent_message'
     )
     def test_receive_concent_error(self,
                                    react_mock,
-                                   sleep_mock,
                                    _send_mock,
                                    receive_mock,
                                    *_):
@@ -366,21 +439,18 @@ class TestConcentClientService(testutils.TempDirFixture):
             signing_key=mock.ANY,
             public_key=mock.ANY,
             concent_variant=self.concent_service.variant,
+            session=mock.ANY,
         )
-        sleep_mock.assert_called_once_with()
+        assert self.concent_service._backoff['receive'].active
+        assert not self.concent_service._backoff['send'].active
         react_mock.assert_not_called()
 
-    @mock.patch(
-        'golem.network.concent.client.ConcentClientService'
-        '._grace_sleep'
-    )
     @mock.patch(
         'golem.network.concent.client.ConcentClientService'
         '.react_to_concent_message'
     )
     def test_receive_exception(self,
                                react_mock,
-                               sleep_mock,
                                _send_mock,
                                receive_mock,
                                *_):
@@ -390,8 +460,9 @@ class TestConcentClientService(testutils.TempDirFixture):
             signing_key=mock.ANY,
             public_key=mock.ANY,
             concent_variant=mock.ANY,
+            session=mock.ANY,
         )
-        sleep_mock.assert_called_once_with()
+        assert self.concent_service._backoff['receive'].active
         react_mock.assert_not_called()
 
     def test_react_to_concent_message_none(self, *_):
@@ -432,6 +503,75 @@ class TestConcentClientService(testutils.TempDirFixture):
         )
 
 
+class ConcentStubHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        self.rfile.read(int(self.headers['Content-Length']))
+        self.server.requests.append((self.path, self.client_address))
+        self.send_response(200)
+        self.send_header('Concent-Golem-Messages-Version',
+                         golem_messages.__version__)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *_):
+        pass
+
+
+@mock.patch('golem.terms.ConcentTermsOfUse.are_accepted', return_value=True)
+class ConcentClientServiceStubTestCase(testutils.TempDirFixture):
+    def setUp(self):
+        super().setUp()
+        self.server = http.server.ThreadingHTTPServer(
+            ('127.0.0.1', 0), ConcentStubHandler)
+        self.server.requests = []
+        threading.Thread(target=self.server.serve_forever, daemon=True) \
+            .start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        self.concent_service = client.ConcentClientService(
+            keys_auth=keysauth.KeysAuth(
+                datadir=self.path,
+                private_key_name='priv_key',
+                password='password',
+            ),
+            variant={
+                'url': 'http://127.0.0.1:{}'.format(self.server.server_port),
+                'pubkey': variables.CONCENT_CHOICES['dev']['pubkey'],
+            },
+        )
+
+    def test_drain_queue(self, *_):
+        count = 20
+        self.concent_service.start()
+        for i in range(count):
+            self.concent_service.submit_task_message(
+                'subtask{}'.format(i % 5),
+                msg_factories.concents.ForceReportComputedTaskFactory(),
+                delay=datetime.timedelta(),
+            )
+
+        deadline = time.time() + 10
+        while self.concent_service.get_stats()['sent'] < count \
+                and time.time() < deadline:
+            time.sleep(.05)
+        self.concent_service.stop()
+        self.concent_service.join(timeout=3)
+
+        stats = self.concent_service.get_stats()
+        self.assertEqual(stats['sent'], count)
+        self.assertEqual(stats['queue_depth'], 0)
+        self.assertGreater(stats['avg_latency'], 0)
+        sent = [r for r in self.server.requests if r[0] == '/api/v1/send/']
+        self.assertEqual(len(sent), count)
+        # Connections are kept alive and reused
+        connections = {address for _, address in self.server.requests}
+        self.assertLessEqual(len(connections),
+                             self.concent_service.CONCURRENCY + 1)
+
+
 class ConcentCallLaterTestCase(testutils.TempDirFixture):
     def setUp(self):
         super().setUp()
@@ -1,8 +1,12 @@
 import base64
+import hashlib
+import os
 import queue
+import threading
 import unittest
 
 import mock
+import requests
 
 from golem_messages.factories.concents import (
     FileTransferTokenFactory, FileInfoFactory)
@@ -103,23 +107,96 @@ class ConcentFiletransferServiceTest(testutils.TempDirFixture):
                          FileTransferToken.FileInfo.Category.results)
 
     @mock.patch('golem.network.concent.filetransfers.'
-                'ConcentFiletransferService.process')
-    def test_run_empty(self, process_mock):
+                'ConcentFiletransferService._transfer')
+    def test_run_empty(self, transfer_mock):
         self.cfs._run()
-        process_mock.assert_not_called()
+        transfer_mock.assert_not_called()
 
+    @mock.patch('twisted.internet.reactor.callFromThread',
+                lambda fn, *args: fn(*args))
     @mock.patch('golem.network.concent.filetransfers.'
-                'ConcentFiletransferService.process')
-    def test_run(self, process_mock):
+                'ConcentFiletransferService._transfer')
+    def test_run(self, transfer_mock):
         path = '/yeta/nother.file'
         ftt = FileTransferTokenFactory()
-        self.cfs.transfer(path, ftt)
-        self.cfs._run()
-        process_mock.assert_called_once()
-        request = process_mock.call_args[0][0]
+        success = mock.Mock()
+        self.cfs.transfer(path, ftt, success=success)
+        executor = mock.Mock(submit=lambda fn, *args: fn(*args))
+        with mock.patch.object(self.cfs, '_get_executor',
+                               return_value=executor):
+            self.cfs._run()
+        transfer_mock.assert_called_once()
+        request = transfer_mock.call_args[0][0]
         self.assertIsInstance(request, filetransfers.ConcentFileRequest)
         self.assertEqual(request.file_path, path)
         self.assertEqual(request.file_transfer_token, ftt)
+        success.assert_called_once_with(transfer_mock.return_value)
+
+    def test_run_callbacks_on_reactor_thread(self):
+        calls = queue.Queue()
+        threads = {}
+        self.cfs.concurrency = 2
+        for name in ('success', 'error'):
+            self.cfs.transfer(
+                '/yeta/nother.file', FileTransferTokenFactory(),
+                **{name: lambda _, name=name: threads.setdefault(
+                    name, threading.current_thread())})
+
+        def transfer(request):
+            if request.success is None:
+                raise filetransfers.ConcentFiletransferError()
+            return mock.Mock()
+
+        with mock.patch('twisted.internet.reactor.callFromThread',
+                        lambda fn, *args: calls.put((fn, args))), \
+                mock.patch.object(self.cfs, '_transfer', transfer):
+            self.cfs._run()
+            self.cfs._transfers.join()
+            self.cfs._get_executor().shutdown()
+        self.assertEqual(threads, {})
+
+        # The reactor calls the callbacks
+        while not calls.empty():
+            fn, args = calls.get()
+            fn(*args)
+        self.assertEqual(threads, {'success': threading.current_thread(),
+                                   'error': threading.current_thread()})
+
+    @mock.patch('golem.network.concent.filetransfers.'
+                'ConcentFiletransferService._transfer')
+    def test_run_concurrency(self, transfer_mock):
+        self.cfs.concurrency = 2
+        for _ in range(3):
+            self.cfs.transfer('/yeta/nother.file', FileTransferTokenFactory())
+        executor = mock.Mock()
+        with mock.patch.object(self.cfs, '_get_executor',
+                               return_value=executor):
+            self.cfs._run()
+            self.assertEqual(executor.submit.call_count, 2)
+            self.cfs._run()
+            self.assertEqual(executor.submit.call_count, 2)
+
+            fn, request = executor.submit.call_args[0]
+            with mock.patch('twisted.internet.reactor.callFromThread'):
+                fn(request)
+            transfer_mock.assert_called_once_with(request)
+            self.cfs._run()
+            self.assertEqual(executor.submit.call_count, 3)
+
+    @mock.patch('twisted.internet.reactor.callFromThread',
+                lambda fn, *args: fn(*args))
+    @mock.patch('golem.network.concent.filetransfers.'
+                'ConcentFiletransferService._transfer',
+                mock.Mock(side_effect=Exception()))
+    def test_run_error(self):
+        self.cfs.transfer('/yeta/nother.file', FileTransferTokenFactory())
+        executor = mock.Mock(submit=lambda fn, *args: fn(*args))
+        with mock.patch.object(self.cfs, '_get_executor',
+                               return_value=executor):
+            self.cfs._run()
+        # The queue is not blocked by the failed transfer
+        self.cfs._transfers.join()
+        self.assertEqual(self.cfs._active, 0)
 
     @mock.patch('golem.network.concent.filetransfers.'
                 'ConcentFiletransferService.upload')
@@ -187,7 +264,7 @@ class ConcentFiletransferServiceTest(testutils.TempDirFixture):
         file.write_text('meh')
         return str(file)
 
-    @mock.patch('golem.network.concent.filetransfers.requests.post')
+    @mock.patch('requests.Session.post')
     def test_upload(self, requests_mock):
         path = self._init_uploaded_file('something.good')
 
@@ -212,7 +289,7 @@ class ConcentFiletransferServiceTest(testutils.TempDirFixture):
         self.assertIsNotNone(kwargs.get('headers').pop('Concent-Auth'))
         self.assertEqual(kwargs.get('headers'), headers)
 
-    @mock.patch('golem.network.concent.filetransfers.requests.post')
+    @mock.patch('requests.Session.post')
     def test_upload_multiple_files(self, requests_mock):
         path = self._init_uploaded_file('obsta.cles')
         category = FileTransferToken.FileInfo.Category.resources
@@ -240,11 +317,34 @@ class ConcentFiletransferServiceTest(testutils.TempDirFixture):
         concent_upload_path = kwargs.get('headers').get('Concent-Upload-Path')
         self.assertEqual(concent_upload_path, ftt.files[1].get('path'))  # noqa pylint:disable=unsubscriptable-object
 
-    @mock.patch('golem.network.concent.filetransfers.requests.get')
+    @staticmethod
+    def _file_info(content: bytes, **kwargs):
+        return FileInfoFactory(
+            checksum='sha1:' + hashlib.sha1(content).hexdigest(),
+            size=len(content),
+            **kwargs,
+        )
+
+    @staticmethod
+    def _mock_response(requests_mock, content: bytes, status_code=200):
+        requests_mock.return_value = mock.Mock(
+            ok=True,
+            status_code=status_code,
+            iter_content=mock.Mock(return_value=[content]),
+        )
+
+    @mock.patch('requests.Session.get')
     def test_download(self, requests_mock):
         path = self.path + '/gotwell.soon'
+        content = b'meh'
+        self._mock_response(requests_mock, content)
 
-        ftt = FileTransferTokenFactory(download=True)
+        ftt = FileTransferTokenFactory(
+            files=[self._file_info(
+                content,
+                category=FileTransferToken.FileInfo.Category.results)],
+            download=True,
+        )
 
         request = ConcentFileRequestFactory(
             file_path=path,
@@ -265,16 +365,20 @@ class ConcentFiletransferServiceTest(testutils.TempDirFixture):
             kwargs.get('headers'),
             self._mock_get_auth_headers(ftt)
         )
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), content)
+        self.assertFalse(os.path.exists(path + filetransfers.PART_SUFFIX))
 
-    @mock.patch('golem.network.concent.filetransfers.requests.get')
+    @mock.patch('requests.Session.get')
     def test_download_multiple_files(self, requests_mock):
         path = self.path + '/spanish.sahara'
         category = FileTransferToken.FileInfo.Category.resources
+        self._mock_response(requests_mock, b'')
         ftt = FileTransferTokenFactory(
             files=[
                 FileInfoFactory(
                     category=FileTransferToken.FileInfo.Category.results),
-                FileInfoFactory(category=category),
+                self._file_info(b'', category=category),
             ],
             download=True,
         )
@@ -292,3 +396,123 @@ class ConcentFiletransferServiceTest(testutils.TempDirFixture):
 
         requests_mock.assert_called_once()
         self.assertEqual(requests_mock.call_args[0], (download_address, ))
+
+    def _download_request(self, content: bytes):
+        return ConcentFileRequestFactory(
+            file_path=self.path + '/gotwell.soon',
+            file_transfer_token=FileTransferTokenFactory(
+                files=[self._file_info(
+                    content,
+                    category=FileTransferToken.FileInfo.Category.results)],
+                download=True,
+            ),
+        )
+
+    @mock.patch('requests.Session.get')
+    def test_download_resume(self, requests_mock):
+        content = b'0123456789'
+        request = self._download_request(content)
+        with open(request.file_path + filetransfers.PART_SUFFIX, 'wb') as f:
+            f.write(content[:4])
+        self._mock_response(requests_mock, content[4:], status_code=206)
+
+        self.cfs.download(request)
+
+        headers = requests_mock.call_args[1]['headers']
+        self.assertEqual(headers['Range'], 'bytes=4-')
+        with open(request.file_path, 'rb') as f:
+            self.assertEqual(f.read(), content)
+
+    @mock.patch('requests.Session.get')
+    def test_download_range_ignored(self, requests_mock):
+        content = b'0123456789'
+        request = self._download_request(content)
+        with open(request.file_path + filetransfers.PART_SUFFIX, 'wb') as f:
+            f.write(b'xxxx')
+        self._mock_response(requests_mock, content)
+
+        self.cfs.download(request)
+
+        with open(request.file_path, 'rb') as f:
+            self.assertEqual(f.read(), content)
+
+    @mock.patch('requests.Session.get')
+    def test_download_checksum_mismatch(self, requests_mock):
+        request = self._download_request(b'0123456789')
+        self._mock_response(requests_mock, b'9876543210')
+
+        with self.assertRaises(filetransfers.ConcentFiletransferError):
+            self.cfs.download(request)
+        self.assertFalse(os.path.exists(request.file_path))
+        self.assertFalse(os.path.exists(
+            request.file_path + filetransfers.PART_SUFFIX))
+
+    @mock.patch('golem.network.concent.filetransfers.time.sleep')
+    @mock.patch('requests.Session.get')
+    def test_download_retry(self, requests_mock, sleep_mock):
+        content = b'0123456789'
+        request = self._download_request(content)
+        response = mock.Mock(ok=True, status_code=200,
+                             iter_content=mock.Mock(return_value=[content]))
+        requests_mock.side_effect = [requests.exceptions.ConnectionError(),
+                                     response]
+
+        self.cfs.process(request)
+
+        self.assertEqual(requests_mock.call_count, 2)
+        sleep_mock.assert_called_once_with(self.cfs.RETRY_DELAY)
+        with open(request.file_path, 'rb') as f:
+            self.assertEqual(f.read(), content)
+
+    @mock.patch('golem.network.concent.filetransfers.time.sleep', mock.Mock())
+    @mock.patch('requests.Session.get',
+                side_effect=requests.exceptions.ConnectionError())
+    def test_download_retries_exceeded(self, requests_mock):
+        error = mock.Mock()
+        request = self._download_request(b'')
+        request.error = error
+
+        self.cfs.process(request)
+
+        self.assertEqual(requests_mock.call_count, self.cfs.RETRIES)
+        error.assert_called_once()
+
+
+class ChecksumReaderTest(testutils.TempDirFixture):
+
+    def setUp(self):
+        super().setUp()
+        self.content = os.urandom(3 * filetransfers.CHUNK_SIZE + 1)
+        self.path = os.path.join(self.path, 'file')
+        with open(self.path, 'wb') as f:
+            f.write(self.content)
+        self.checksum = 'sha1:' + hashlib.sha1(self.content).hexdigest()
+
+    def _reader(self, f, checksum, size=None):
+        return filetransfers.ChecksumReader(
+            f, len(self.content), checksum=checksum, expected_size=size)
+
+    def test_read(self):
+        with open(self.path, 'rb') as f:
+            reader = self._reader(f, self.checksum, len(self.content))
+            self.assertEqual(len(reader), len(self.content))
+            self.assertEqual(b''.join(reader), self.content)
+
+    def test_no_checksum(self):
+        with open(self.path, 'rb') as f:
+            self.assertEqual(self._reader(f, None).read(), self.content)
+
+    def test_checksum_mismatch(self):
+        checksum = 'sha1:' + hashlib.sha1(b'other').hexdigest()
+        chunks = []
+        with open(self.path, 'rb') as f:
+            with self.assertRaises(filetransfers.ConcentFiletransferError):
+                for chunk in self._reader(f, checksum):
+                    chunks.append(chunk)
+        # The last chunk is never returned
+        self.assertLess(len(b''.join(chunks)), len(self.content))
+
+    def test_size_mismatch(self):
+        with open(self.path, 'rb') as f:
+            with self.assertRaises(filetransfers.ConcentFiletransferError):
+                self._reader(f, self.checksum, len(self.content) + 1).read()
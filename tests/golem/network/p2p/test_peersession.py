@@ -13,6 +13,7 @@ from golem_messages import factories as msg_factories
 from golem_messages import message
 from golem_messages.factories.datastructures import p2p as dt_p2p_factory
 from pydispatch import dispatcher
+from twisted.internet.defer import Deferred
 
 import golem
 from golem import clientconfigdescriptor
@@ -350,6 +351,47 @@ class TestPeerSession(testutils.DatabaseFixture, LogTestCase,
         assert peer_session.p2p_service.remove_peer.called
         assert not peer_session.p2p_service.remove_pending_conn.called
 
+    @patch('golem.network.p2p.peersession.PeerSession.send')
+    def test_solve_challenge(self, send_mock):
+        peer_session = PeerSession(MagicMock())
+        peer_session.p2p_service = MagicMock()
+        deferred = Deferred()
+        peer_session.p2p_service.solve_challenge.return_value = deferred
+
+        peer_session._solve_challenge('challenge', 10)
+        send_mock.assert_not_called()
+        deferred.callback(42)
+        send_mock.assert_called_once()
+        msg = send_mock.call_args[0][0]
+        self.assertIsInstance(msg, message.base.ChallengeSolution)
+        self.assertEqual(msg.solution, 42)
+        self.assertIsNone(peer_session._solving)
+
+    @patch('golem.network.p2p.peersession.PeerSession.send')
+    def test_dropped_cancels_challenge(self, send_mock):
+        peer_session = PeerSession(MagicMock())
+        peer_session.p2p_service = MagicMock()
+        deferred = Deferred()
+        peer_session.p2p_service.solve_challenge.return_value = deferred
+
+        peer_session._solve_challenge('challenge', 10)
+        peer_session.dropped()
+        self.assertTrue(deferred.called)
+        self.assertIsNone(peer_session._solving)
+        send_mock.assert_not_called()
+
+    @patch('golem.network.p2p.peersession.PeerSession.disconnect')
+    def test_solve_challenge_error(self, disconnect_mock):
+        peer_session = PeerSession(MagicMock())
+        peer_session.p2p_service = MagicMock()
+        deferred = Deferred()
+        peer_session.p2p_service.solve_challenge.return_value = deferred
+
+        peer_session._solve_challenge('challenge', 10)
+        deferred.errback(ValueError())
+        disconnect_mock.assert_called_once_with(
+            message.base.Disconnect.REASON.Unverified)
+
     def test_react_to_stop_gossip(self):
         conn = MagicMock()
         conf = MagicMock()
@@ -212,36 +212,51 @@ class TestMessageHistoryService(MessageHistoryServiceTestBase):
         self.service._loop()
         assert not self.service._sweep.called
 
-    def test_loop_add_sync(self):
+    def test_loop_save_batch(self):
         self.service._sweep = mock.Mock()
         self.service._queue_timeout = 0.1
-        self.service.add_sync = mock.Mock()
+        self.service._save_batch = mock.Mock()
 
         # No message
         self.service._loop()
-        assert not self.service.add_sync.called
+        assert not self.service._save_batch.called
 
-        # Add message
-        msg = self._build_dict()
-        self.service._save_queue.put(msg)
+        # Add messages
+        msgs = [self._build_dict() for _ in range(3)]
+        for msg in msgs:
+            self.service._save_queue.put(msg)
+
+        # With messages
+        self.service._loop()
+        self.service._save_batch.assert_called_once_with(msgs)
 
-        # With message
+        # No message again, since they were popped from the queue
+        self.service._save_batch.reset_mock()
         self.service._loop()
-        assert self.service.add_sync.called
+        assert not self.service._save_batch.called
+
+    def test_loop_max_batch_size(self):
+        self.service._sweep = mock.Mock()
+        self.service._queue_timeout = 0.1
+        self.service.max_batch_size = 2
+        self.service._save_batch = mock.Mock()
 
-        # No message again, since it was popped from the queue
-        self.service.add_sync.reset_mock()
+        for _ in range(3):
+            self.service._save_queue.put(self._build_dict())
+
+        self.service._loop()
+        assert len(self.service._save_batch.call_args[0][0]) == 2
         self.service._loop()
-        assert not self.service.add_sync.called
+        assert len(self.service._save_batch.call_args[0][0]) == 1
 
-    def test_loop_remove_sync(self):
+    def test_loop_remove_batch(self):
         self.service._sweep = mock.Mock()
         self.service._queue_timeout = 0.1
-        self.service.remove_sync = mock.Mock()
+        self.service._remove_batch = mock.Mock()
 
         # No tuple
         self.service._loop()
-        assert not self.service.remove_sync.called
+        assert not self.service._remove_batch.called
 
         # Add tuple
         task = str(uuid.uuid4())
@@ -250,12 +265,91 @@ class TestMessageHistoryService(MessageHistoryServiceTestBase):
 
         # With tuple
         self.service._loop()
-        assert self.service.remove_sync.called
+        self.service._remove_batch.assert_called_once_with([(task, props)])
 
         # Not tuple again, since it was popped from the queue
-        self.service.remove_sync.reset_mock()
+        self.service._remove_batch.reset_mock()
+        self.service._loop()
+        assert not self.service._remove_batch.called
+
+    def test_save_batch(self):
+        count = self.service.INSERT_CHUNK_SIZE * 2 + 1
+        self.service._save_batch([self._build_dict() for _ in range(count)])
+        assert message_count() == count
+        assert self.service.get_metrics()['saved'] == count
+
+    def test_save_batch_invalid_message(self):
+        msgs = [self._build_dict() for _ in range(3)]
+        msgs[1]['msg_data'] = None
+
+        self.service._save_batch(msgs)
+        assert message_count() == 2
+        assert self.service._save_queue.empty()
+
+    def test_save_batch_temporary_error(self):
+        msgs = [self._build_dict() for _ in range(3)]
+
+        with mock.patch('peewee.InsertQuery.execute',
+                        side_effect=PeeweeException):
+            self.service._save_batch(msgs)
+
+        assert message_count() == 0
+        assert self.service._save_queue.qsize() == 3
+
+    def test_remove_batch(self):
+        task1, task2, task3 = (str(uuid.uuid4()) for _ in range(3))
+        msgs = [
+            self._build_dict(task1),
+            self._build_dict(task1),
+            self._build_dict(task2),
+            self._build_dict(task2),
+            self._build_dict(task2),
+            self._build_dict(task3),
+        ]
+        self.service._save_batch(msgs)
+        assert message_count() == 6
+
+        self.service._remove_batch([
+            (task1, {}),
+            (task2, dict(subtask=msgs[2]['subtask'])),
+            (task1, dict(subtask=msgs[0]['subtask'])),
+            (task2, dict(subtask=msgs[3]['subtask'])),
+        ])
+
+        remaining = NetworkMessage.select()
+        assert {m.subtask for m in remaining} == \
+            {msgs[4]['subtask'], msgs[5]['subtask']}
+        assert self.service.get_metrics()['removed'] == 4
+
+    def test_remove_batch_temporary_error(self):
+        task = str(uuid.uuid4())
+        props = dict(subtask=str(uuid.uuid4()))
+
+        with mock.patch('peewee.DeleteQuery.execute',
+                        side_effect=PeeweeException):
+            self.service._remove_batch([(task, props)])
+
+        assert self.service._remove_queue.get(block=False) == (task, props)
+
+    def test_metrics(self):
+        self.service._sweep = mock.Mock()
+        self.service._queue_timeout = 0.1
+        self.service.add(self._build_dict())
+        self.service.remove(str(uuid.uuid4()))
+
+        metrics = self.service.get_metrics()
+        assert metrics['save_queue_depth'] == 1
+        assert metrics['remove_queue_depth'] == 1
+        assert metrics['flushes'] == 0
+
         self.service._loop()
-        assert not self.service.remove_sync.called
+        metrics = self.service.get_metrics()
+        assert metrics['save_queue_depth'] == 0
+        assert metrics['remove_queue_depth'] == 0
+        assert metrics['flushes'] == 2
+        assert metrics['saved'] == 1
+        assert metrics['last_flush_latency'] >= 0.
+        assert metrics['max_flush_latency'] >= metrics['last_flush_latency']
 
 
 class TestMessageHistoryGet(MessageHistoryServiceTestBase):
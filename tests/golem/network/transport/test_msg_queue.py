@@ -15,9 +15,12 @@ class TestMsqQueue(testutils.DatabaseFixture):
         super().setUp()
         self.node_id = str(uuid.uuid4())
         self.msg = tasks_factories.WantToComputeTaskFactory()
+        msg_queue.recover()
 
     def test_put(self):
         msg_queue.put(self.node_id, self.msg)
+        self.assertEqual(model.QueuedMessage.select().count(), 0)
+        msg_queue.flush()
         row = model.QueuedMessage.get()
         self.assertEqual(
             row.msg_cls,
@@ -36,6 +39,46 @@ class TestMsqQueue(testutils.DatabaseFixture):
         self.assertEqual(msg.slots(), self.msg.slots())
         self.assertEqual(len(list(msg_queue.get(self.node_id))), 0)
 
+    def test_get_persisted(self):
+        for _ in range(3):
+            msg_queue.put(self.node_id, self.msg)
+        msg_queue.flush()
+        self.assertEqual(model.QueuedMessage.select().count(), 3)
+        self.assertEqual(len(list(msg_queue.get(self.node_id))), 3)
+        self.assertEqual(model.QueuedMessage.select().count(), 0)
+
+    def test_get_interrupted(self):
+        for _ in range(3):
+            msg_queue.put(self.node_id, self.msg)
+        msg_queue.flush()
+        msgs = msg_queue.get(self.node_id)
+        next(msgs)
+        msgs.close()
+        msg_queue.flush()
+        self.assertEqual(model.QueuedMessage.select().count(), 2)
+        self.assertEqual(len(list(msg_queue.get(self.node_id))), 2)
+
+    def test_recover(self):
+        node_id2 = str(uuid.uuid4())
+        msg_queue.put(self.node_id, self.msg)
+        msg_queue.put(node_id2, self.msg)
+        msg_queue.put(self.node_id, self.msg)
+        msg_queue.flush()
+        # Simulate restart
+        msg_queue.recover()
+        self.assertEqual(
+            frozenset(msg_queue.waiting()),
+            {self.node_id, node_id2},
+        )
+        self.assertEqual(len(list(msg_queue.get(self.node_id))), 2)
+        self.assertEqual(len(list(msg_queue.get(node_id2))), 1)
+        self.assertEqual(model.QueuedMessage.select().count(), 0)
+
+    def test_recover_unsaved_are_lost(self):
+        msg_queue.put(self.node_id, self.msg)
+        msg_queue.recover()
+        self.assertEqual(list(msg_queue.waiting()), [])
+
     def test_waiting(self):
         node_id2 = str(uuid.uuid4())
         node_id3 = str(uuid.uuid4())
@@ -79,3 +122,13 @@ class TestMsqQueue(testutils.DatabaseFixture):
             model.QueuedMessage.select().count(),
             0,
         )
+
+    def test_sweep_in_memory(self):
+        msg_queue.put(self.node_id, self.msg)
+        msg_queue.sweep()
+        self.assertEqual(list(msg_queue.waiting()), [self.node_id])
+        with freeze_time(datetime.datetime.now()+relativedelta(months=7)):
+            msg_queue.sweep()
+        self.assertEqual(list(msg_queue.waiting()), [])
+        msg_queue.flush()
+        self.assertEqual(model.QueuedMessage.select().count(), 0)
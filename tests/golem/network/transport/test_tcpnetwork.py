@@ -47,7 +47,7 @@ class TestBasicProtocol(LogTestCase):
         self.assertIsNone(self.protocol.dataReceived(data))
         self.protocol.opened = True
         self.assertIsNone(self.protocol.dataReceived(data))
-        self.protocol.db.clear_buffer()
+        self.protocol.decoder.clear()
         self.assertEqual(load_mock.call_count, 0)
 
         m = message.base.Disconnect(reason=None)
@@ -66,11 +66,40 @@ class TestBasicProtocol(LogTestCase):
         self.assertIsNone(self.protocol.dataReceived(data))
         self.assertEqual(load_mock.call_count, 0)
 
+    @mock.patch('golem_messages.load')
+    def test_dataReceived_fragmented(self, load_mock):
+        m = message.base.Disconnect(reason=None)
+        data = m.serialize()
+        packed_data = struct.pack("!L", len(data)) + data
+        load_mock.return_value = m
+        self.protocol.opened = True
+
+        for i in range(len(packed_data)):
+            self.protocol.dataReceived(packed_data[i:i + 1])
+
+        load_mock.assert_called_once_with(data, None, None)
+        self.protocol.session.interpret.assert_called_once_with(m)
+
+    @mock.patch('golem_messages.load')
+    def test_dataReceived_after_huge_message(self, load_mock):
+        m = message.base.Disconnect(reason=None)
+        data = m.serialize()
+        load_mock.return_value = m
+        self.protocol.opened = True
+
+        self.protocol.dataReceived(struct.pack("!L", MAX_MESSAGE_SIZE + 1))
+        self.protocol.dataReceived(bytes(MAX_MESSAGE_SIZE))
+        self.protocol.dataReceived(b'\0' + struct.pack("!L", len(data)))
+        self.protocol.dataReceived(data)
+
+        load_mock.assert_called_once_with(data, None, None)
+
     def hello(self, version=str(gm_version)):
         msg = msg_factories.base.HelloFactory()
         msg._version = version
         serialized = golem_messages.dump(msg, None, None)
-        self.protocol.db.append_len_prefixed_bytes(serialized)
+        self.protocol.decoder.feed(
+            struct.pack("!L", len(serialized)) + serialized)
         self.protocol._data_to_messages()
 
     @mock.patch('golem.network.transport.tcpnetwork.BasicProtocol.send_message')
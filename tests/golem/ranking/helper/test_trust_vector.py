@@ -0,0 +1,42 @@
+from unittest import TestCase
+
+import numpy as np
+
+from golem.ranking.helper.trust_vector import TrustVector
+
+
+class TestTrustVector(TestCase):
+    def setUp(self):
+        self.vec = TrustVector((2, ))
+
+    def test_set(self):
+        self.vec.set(['a', 'b'], np.array([[1., 2.], [3., 4.]]))
+        self.vec.set(['b', 'c'], np.array([[5., 6.], [7., 8.]]))
+        self.assertEqual(len(self.vec), 3)
+        self.assertIn('c', self.vec)
+        self.assertNotIn('d', self.vec)
+        self.assertEqual(self.vec['b'], [5., 6.])
+        self.assertEqual(dict(self.vec.items()),
+                         {'a': [1., 2.], 'b': [5., 6.], 'c': [7., 8.]})
+
+    def test_add(self):
+        self.vec.add(['a', 'b', 'a'],
+                     np.array([[1., 1.], [2., 2.], [3., 3.]]))
+        self.assertEqual(self.vec['a'], [4., 4.])
+        self.assertEqual(self.vec['b'], [2., 2.])
+        self.vec.add([], np.zeros((0, 2)))
+        self.assertEqual(len(self.vec), 2)
+
+    def test_get(self):
+        self.vec.set(['a'], np.array([[1., 2.]]))
+        np.testing.assert_array_equal(self.vec.get(['b', 'a']),
+                                      [[0., 0.], [1., 2.]])
+        self.assertNotIn('b', self.vec)
+
+    def test_grow(self):
+        node_ids = [str(i) for i in range(1000)]
+        for i, node_id in enumerate(node_ids):
+            self.vec.set([node_id], np.array([[i, -i]]))
+        self.assertEqual(self.vec.node_ids, node_ids)
+        np.testing.assert_array_equal(self.vec.array[:, 0], range(1000))
+        self.assertEqual(self.vec.values()[999], [999., -999.])
@@ -1,5 +1,10 @@
+import threading
+from unittest import mock
+
+from golem.ranking import ProviderEfficacy
 from golem.ranking.helper.trust import Trust
 from golem.ranking.manager import database_manager as dm
+from golem.task.taskstate import SubtaskOp
 from golem.testutils import DatabaseFixture
 
 
@@ -251,3 +256,188 @@ class TestDatabaseManager(DatabaseFixture):
         """Should throw exception for WRONG_COMPUTED increase."""
         with self.assertRaises(KeyError):
             Trust.WRONG_COMPUTED.increase('alpha', 0.3)
+
+
+class TestProvidersReputation(DatabaseFixture):
+    def setUp(self):
+        super().setUp()
+        dm._providers_reputation.clear()  # pylint: disable=protected-access
+        self.addCleanup(dm._providers_reputation.clear)  # noqa pylint: disable=protected-access
+
+    def test_bulk(self):
+        dm.update_provider_efficiency('alpha', 1., 2.)
+        dm.update_provider_efficacy('beta', SubtaskOp.FINISHED)
+        expected = {
+            node_id: (dm.get_provider_efficiency(node_id),
+                      dm.get_provider_efficacy(node_id).vector)
+            for node_id in ('alpha', 'beta')
+        }
+
+        with mock.patch.object(dm, 'PROVIDER_REPUTATION_BATCH_SIZE', 1):
+            reputation = dm.get_providers_reputation(
+                ['alpha', 'beta', 'gamma', 'alpha'])
+
+        self.assertEqual(set(reputation), {'alpha', 'beta', 'gamma'})
+        for node_id, (efficiency, efficacy) in expected.items():
+            self.assertEqual(reputation[node_id][0], efficiency)
+            self.assertEqual(reputation[node_id][1].vector, efficacy)
+        self.assertEqual(reputation['gamma'][0], 1.0)
+        self.assertEqual(reputation['gamma'][1].vector,
+                         ProviderEfficacy(0., 0., 0., 0.).vector)
+        # Unknown providers are not added to the database
+        self.assertIsNone(dm.get_local_rank('gamma'))
+
+    def test_cached(self):
+        dm.get_providers_reputation(['alpha'])
+        with mock.patch.object(dm.LocalRank, 'select') as select:
+            dm.get_providers_reputation(['alpha'])
+        select.assert_not_called()
+
+    def test_expired(self):
+        with mock.patch('golem.ranking.manager.database_manager.time') as t:
+            t.monotonic.return_value = 0.
+            dm.get_providers_reputation(['alpha'])
+            t.monotonic.return_value = dm.PROVIDER_REPUTATION_TTL + 1.
+            with mock.patch.object(dm.LocalRank, 'select',
+                                   wraps=dm.LocalRank.select) as select:
+                dm.get_providers_reputation(['alpha'])
+        select.assert_called_once()
+
+    def test_invalidated_by_updates(self):
+        efficiency, _ = dm.get_providers_reputation(['alpha'])['alpha']
+        dm.update_provider_efficiency('alpha', 1., 2.)
+        new_efficiency, efficacy = \
+            dm.get_providers_reputation(['alpha'])['alpha']
+        self.assertNotEqual(new_efficiency, efficiency)
+
+        dm.update_provider_efficacy('alpha', SubtaskOp.FINISHED)
+        _, new_efficacy = dm.get_providers_reputation(['alpha'])['alpha']
+        self.assertNotEqual(new_efficacy.vector, efficacy.vector)
+
+
+class TestLocalRankLedger(DatabaseFixture):
+    OPERATIONS = (
+        ('alpha', 'positive_computed', 1.),
+        ('beta', 'negative_computed', 0.5),
+        ('alpha', 'positive_computed', 2.),
+        ('gamma', 'positive_payment', 1.),
+        ('beta', 'negative_computed', 0.5),
+        ('alpha', 'wrong_computed', 1.),
+        ('delta', 'positive_payment', 1.),
+        ('gamma', 'positive_payment', 1.),
+    )
+
+    def setUp(self):
+        super().setUp()
+        self.ledger = dm.LocalRankLedger()
+        # Write back, without the flushing thread
+        self.ledger.flush_interval = 10.
+
+    @staticmethod
+    def _contents():
+        return {
+            rank.node_id: tuple(getattr(rank, counter) for counter in (
+                'positive_computed', 'negative_computed', 'wrong_computed',
+                'positive_payment'))
+            for rank in dm.LocalRank.select()
+        }
+
+    def test_write_back(self):
+        self.ledger.increase('alpha', 'positive_computed', 1.)
+        self.ledger.increase('alpha', 'positive_computed', 2.)
+        self.assertEqual(self.ledger.get('alpha').positive_computed, 3.)
+        self.assertIsNone(dm.LocalRank.select().first())
+
+        self.ledger.flush()
+        self.assertEqual(
+            dm.LocalRank.get(node_id='alpha').positive_computed, 3.)
+
+    def test_same_contents_as_write_through(self):
+        write_through = dm.LocalRankLedger()
+        for operation in self.OPERATIONS:
+            write_through.increase(*operation)
+        expected = self._contents()
+        dm.LocalRank.delete().execute()
+
+        for i, operation in enumerate(self.OPERATIONS):
+            self.ledger.increase(*operation)
+            if i == len(self.OPERATIONS) // 2:
+                self.ledger.flush()
+        self.ledger.flush()
+        self.assertEqual(self._contents(), expected)
+
+    def test_read_from_memory(self):
+        self.ledger.increase('alpha', 'positive_computed', 1.)
+        self.assertIsNone(self.ledger.get('beta'))
+        self.ledger.get('alpha')
+        with mock.patch.object(dm.LocalRank, 'select') as select:
+            self.ledger.increase('alpha', 'positive_computed', 1.)
+            self.ledger.increase('beta', 'negative_computed', 1.)
+            self.assertEqual(self.ledger.get('alpha').positive_computed, 2.)
+            self.assertEqual(self.ledger.get('beta').negative_computed, 1.)
+        select.assert_not_called()
+
+    def test_flush_error(self):
+        self.ledger.increase('alpha', 'positive_computed', 1.)
+        with mock.patch.object(dm.db, 'write',
+                               side_effect=dm.DatabaseError()):
+            self.ledger.flush()
+        self.ledger.increase('alpha', 'positive_computed', 1.)
+        self.ledger.flush()
+        self.assertEqual(
+            dm.LocalRank.get(node_id='alpha').positive_computed, 2.)
+
+    def test_stop(self):
+        self.ledger.increase('alpha', 'positive_computed', 1.)
+        self.ledger.stop()
+        self.assertEqual(
+            dm.LocalRank.get(node_id='alpha').positive_computed, 1.)
+        self.ledger.increase('alpha', 'positive_computed', 1.)
+        self.assertEqual(
+            dm.LocalRank.get(node_id='alpha').positive_computed, 2.)
+
+    def test_invalidated_by_updates(self):
+        with mock.patch.object(dm, 'local_rank_ledger', self.ledger):
+            dm.increase_positive_computed('alpha', 1.)
+            self.assertEqual(dm.get_local_rank('alpha').requestor_paid_sum, 0)
+            dm.update_requestor_paid_sum('alpha', 5)
+            rank = dm.get_local_rank('alpha')
+        self.assertEqual(rank.requestor_paid_sum, 5)
+        self.assertEqual(rank.positive_computed, 1.)
+
+    def test_updates_save_only_their_columns(self):
+        def calculate_efficiency(*_):
+            # Written by the flush thread, between the read and the save
+            dm.LocalRank.update(positive_computed=5.).execute()
+            return 2.
+
+        dm.increase_positive_computed('alpha', 1.)
+        with mock.patch.object(dm, 'local_rank_ledger', self.ledger), \
+                mock.patch.object(dm, '_calculate_efficiency',
+                                  calculate_efficiency):
+            dm.update_provider_efficiency('alpha', 1., 2.)
+        rank = dm.LocalRank.get(node_id='alpha')
+        self.assertEqual(rank.positive_computed, 5.)
+        self.assertEqual(rank.provider_efficiency, 2.)
+
+    def test_flush_during_update(self):
+        self.ledger.increase('alpha', 'positive_computed', 1.)
+        self.ledger.flush()
+        self.ledger.increase('alpha', 'positive_computed', 2.)
+        flush = threading.Thread(target=self.ledger.flush)
+
+        def calculate_efficiency(*_):
+            flush.start()
+            # The flush waits for the update to finish
+            flush.join(0.1)
+            self.assertTrue(flush.is_alive())
+            return 2.
+
+        with mock.patch.object(dm, 'local_rank_ledger', self.ledger), \
+                mock.patch.object(dm, '_calculate_efficiency',
+                                  calculate_efficiency):
+            dm.update_provider_efficiency('alpha', 1., 2.)
+        flush.join()
+        rank = dm.LocalRank.get(node_id='alpha')
+        self.assertEqual(rank.positive_computed, 3.)
+        self.assertEqual(rank.provider_efficiency, 2.)
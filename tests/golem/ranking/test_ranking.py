@@ -1,5 +1,7 @@
 from threading import Thread
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
+
+import numpy as np
 
 from golem.client import Client
 from golem.ranking.helper.trust import Trust
@@ -74,6 +76,28 @@ class TestRankingDatabase(TestWithDatabase):
         self.assertEqual(gr.gossip_weight_computing, 0.9)
         self.assertEqual(gr.gossip_weight_requesting, 0.8)
 
+    def test_global_ranks(self):
+        dm.upsert_global_rank("ABC", 0.3, 0.2, 1.0, 1.0)
+        created = dm.get_global_rank("ABC")
+        with patch.object(dm, 'GLOBAL_RANK_BATCH_SIZE', 1), \
+                patch.object(dm, 'GLOBAL_RANK_INSERT_BATCH_SIZE', 1):
+            dm.upsert_global_ranks([
+                ("ABC", 0.4, 0.1, 0.8, 0.7),
+                ("DEF", -0.1, -0.2, 0.9, 0.8),
+                ("GHI", 0.5, 0.5, 0.5, 0.5),
+            ])
+        gr = dm.get_global_rank("ABC")
+        self.assertEqual(gr.id, created.id)
+        self.assertEqual(gr.created_date, created.created_date)
+        self.assertEqual(gr.computing_trust_value, 0.4)
+        self.assertEqual(gr.requesting_trust_value, 0.1)
+        self.assertEqual(gr.gossip_weight_computing, 0.8)
+        self.assertEqual(gr.gossip_weight_requesting, 0.7)
+        gr = dm.get_global_rank("DEF")
+        self.assertEqual(gr.computing_trust_value, -0.1)
+        self.assertEqual(gr.gossip_weight_requesting, 0.8)
+        self.assertEqual(dm.GlobalRank.select().count(), 3)
+
     def test_neighbour_rank(self):
         self.assertIsNone(dm.get_neighbour_loc_rank("ABC", "DEF"))
         dm.upsert_neighbour_loc_rank("ABC", "DEF", (0.2, 0.3))
@@ -114,6 +138,40 @@ class TestRanking(TestWithDatabase, LogTestCase, PEP8MixIn):
         result = min_max_utility.count_trust(1, 999999999)
         self.assertGreaterEqual(result, min_max_utility.MIN_TRUST)
 
+    def test_count_trusts(self):
+        from golem.ranking.helper import min_max_utility
+
+        pos = np.array([600., 999999999., 1., 0., 10.])
+        neg = np.array([200., 1., 999999999., 0., 3.])
+        expected = [min_max_utility.count_trust(p, n)
+                    for p, n in zip(pos.tolist(), neg.tolist())]
+        self.assertEqual(min_max_utility.count_trusts(pos, neg).tolist(),
+                         expected)
+
+    def test_vecs_to_trust(self):
+        from golem.ranking.helper import min_max_utility
+
+        vecs = [[0.3, 0.5], [0., 0.5], [0.3, 0.], [-0.3, 0.5], [3., 0.5]]
+        expected = [min_max_utility.vec_to_trust(vec) for vec in vecs]
+        self.assertEqual(
+            min_max_utility.vecs_to_trust(np.array(vecs)).tolist(),
+            expected)
+
+    def test_wrong_gossip(self):
+        r = Ranking(MagicMock(spec=Client))
+        r.received_gossip = [
+            [['ABC', [[0.2, 0.5], [0.1, 0.5]]],
+             ['DEF', [[0.2], [0.1, 0.5]]],
+             ['GHI', [[0.2, float('nan')], [0.1, 0.5]]],
+             'JKL'],
+            [['ABC', [[0.1, 0.5], [0.1, 0.5]]]],
+        ]
+        r._Ranking__add_gossip()
+        self.assertEqual(r.working_vec.node_ids, ['ABC'])
+        np.testing.assert_allclose(r.working_vec['ABC'],
+                                   [[0.3, 1.0], [0.2, 1.0]])
+        self.assertEqual(r.received_gossip, [])
+
     def test_increase_trust_thread_safety(self):
         c = MagicMock(spec=Client)
         r = Ranking(c)
@@ -3,7 +3,7 @@ from os import makedirs, listdir
 from os.path import basename, exists, join, relpath
 from pathlib import Path
 
-from golem.core.fileencrypt import FileEncryptor
+from golem.core.fileencrypt import AESFileEncryptor, FileEncryptor
 from golem.resource.dirmanager import DirManager
 from golem.task.result.resultpackage import EncryptingPackager, \
     EncryptingTaskResultPackager, ExtractedPackage, ZipPackager, backup_rename
@@ -148,6 +148,29 @@ class TestEncryptingPackager(PackageDirContentsFixture):
 
         self.assertTrue(len(files) == len(self.all_files))
 
+    def testCreateHashesPlainPackage(self):
+        ep = EncryptingPackager(self.secret)
+        path, sha1 = ep.create(self.out_path, self.disk_files)
+        zip_path = ep.package_name(self.out_path)
+
+        self.assertTrue(exists(zip_path))
+        self.assertEqual(sha1, ep.compute_sha1(zip_path))
+
+        files, _ = ZipPackager().extract(zip_path, join(self.path, 'plain'))
+        self.assertEqual(len(files), len(self.all_files))
+
+    def testExtractPreviousFormat(self):
+        zip_path, _ = ZipPackager().create(self.out_path + '.zip',
+                                           self.disk_files)
+        AESFileEncryptor.encrypt(zip_path, self.out_path, self.secret)
+
+        ep = EncryptingPackager(self.secret)
+        files, out_dir = ep.extract(self.out_path)
+
+        self.assertEqual(len(files), len(self.all_files))
+        self.assertFalse(exists(self.out_path))
+        self.assertTrue(all(exists(join(out_dir, f)) for f in files))
+
 
 class TestEncryptingTaskResultPackager(PackageDirContentsFixture):
 
@@ -2,9 +2,10 @@ import types
 from unittest.mock import Mock, patch
 
 from apps.appsmanager import AppsManager
+from golem.clientconfigdescriptor import ClientConfigDescriptor
 from golem.environments.environment import Environment as DefaultEnvironment
-from golem.model import Performance
-from golem.task.benchmarkmanager import BenchmarkManager
+from golem.model import BenchmarkResult, Performance
+from golem.task.benchmarkmanager import BENCHMARK_MEMORY, BenchmarkManager
 from golem.testutils import DatabaseFixture, PEP8MixIn
 
 
@@ -33,7 +34,10 @@ class TestBenchmarkManager(DatabaseFixture, PEP8MixIn):
         am = AppsManager()
         am.load_all_apps()
         am._benchmark_enabled = Mock(return_value=True)
-        self.b = BenchmarkManager("NODE1", Mock(), self.path,
+        self.config_desc = ClientConfigDescriptor()
+        task_server = Mock()
+        task_server.client.config_desc = self.config_desc
+        self.b = BenchmarkManager("NODE1", task_server, self.path,
                                   am.get_benchmarks())
 
     def test_benchmarks_not_needed_wo_apps(self):
@@ -104,3 +108,137 @@ class TestBenchmarkManager(DatabaseFixture, PEP8MixIn):
         for idx, env_id in enumerate(reversed(list(self.b.benchmarks))):
             assert (1 + idx) * 100 == \
                    Performance.get(Performance.environment_id == env_id).value
+
+
+@patch("golem.task.benchmarkmanager.get_cpu_model", Mock(return_value="CPU"))
+@patch("golem.task.benchmarkmanager.BenchmarkRunner")
+class TestConcurrentBenchmarks(DatabaseFixture):
+
+    def setUp(self):
+        super().setUp()
+        am = AppsManager()
+        am.load_all_apps()
+        am._benchmark_enabled = Mock(return_value=True)
+        self.config_desc = ClientConfigDescriptor()
+        self.config_desc.num_cores = 4
+        self.config_desc.max_memory_size = 4 * BENCHMARK_MEMORY
+        task_server = Mock()
+        task_server.client.config_desc = self.config_desc
+        self.b = BenchmarkManager("NODE1", task_server, self.path,
+                                  am.get_benchmarks())
+        Performance.update_or_create(DefaultEnvironment.get_id(), 3)
+
+    @staticmethod
+    def _succeed(br_mock):
+        def _run():
+            success_callback = br_mock.call_args[1].get('success_callback')
+            return success_callback(br_mock.call_count * 100)
+        br_mock.return_value.run.side_effect = _run
+
+    def test_get_concurrency(self, _):
+        self.config_desc.benchmark_concurrency = 8
+        assert self.b.get_concurrency() == 4
+        self.config_desc.max_memory_size = 2 * BENCHMARK_MEMORY
+        assert self.b.get_concurrency() == 2
+        self.config_desc.num_cores = 0
+        assert self.b.get_concurrency() == 1
+
+    def test_results_cached(self, br_mock):
+        self._succeed(br_mock)
+        self.b.run_all_benchmarks()
+        assert br_mock.call_count == len(self.b.benchmarks)
+        fingerprint = self.b.get_fingerprint()
+        for env_id in self.b.benchmarks:
+            assert BenchmarkResult.get_value(env_id, fingerprint) == \
+                Performance.get(Performance.environment_id == env_id).value
+
+        Performance.update(value=0).execute()
+        success = Mock()
+        self.b.run_all_benchmarks(success)
+
+        success.assert_called_once_with(None)
+        assert br_mock.call_count == len(self.b.benchmarks)
+        for env_id in self.b.benchmarks:
+            assert Performance.get(
+                Performance.environment_id == env_id).value > 0
+            assert self.b.get_progress()[env_id]['status'] == 'cached'
+
+    def test_fingerprint_changed(self, br_mock):
+        self._succeed(br_mock)
+        self.b.run_all_benchmarks()
+        fingerprint = self.b.get_fingerprint()
+
+        self.config_desc.num_cores = 2
+        assert self.b.get_fingerprint() != fingerprint
+        self.b.run_all_benchmarks()
+        assert br_mock.call_count == 2 * len(self.b.benchmarks)
+
+    def test_concurrency(self, br_mock):
+        self.config_desc.benchmark_concurrency = len(self.b.benchmarks) - 1
+        success = Mock()
+        self.b.run_all_benchmarks(success)
+
+        assert br_mock.call_count == len(self.b.benchmarks) - 1
+        progress = self.b.get_progress()
+        assert len(progress) == len(self.b.benchmarks) - 1
+        assert all(p['status'] == 'running' for p in progress.values())
+
+        callbacks = [c[1]['success_callback'] for c in br_mock.call_args_list]
+        callbacks[0](100)
+        assert br_mock.call_count == len(self.b.benchmarks)
+        assert len(self.b.get_progress()) == len(self.b.benchmarks)
+
+        for c in br_mock.call_args_list[1:]:
+            c[1]['success_callback'](200)
+        success.assert_called_once_with(None)
+        for progress in self.b.get_progress().values():
+            assert progress['status'] == 'done'
+            assert progress['duration'] >= 0
+
+    def test_error(self, br_mock):
+        self.config_desc.benchmark_concurrency = 1
+        success, error = Mock(), Mock()
+        self.b.run_all_benchmarks(success, error)
+        br_mock.call_args[1]['error_callback']("failed")
+
+        error.assert_called_once()
+        success.assert_not_called()
+        assert br_mock.call_count == 1
+        env_id, progress = self.b.get_progress().popitem()
+        assert progress['status'] == 'failed'
+        assert not BenchmarkResult.select().where(
+            BenchmarkResult.environment_id == env_id).exists()
+
+    def test_default_benchmark_alone(self, br_mock):
+        Performance.delete().execute()
+        self.config_desc.benchmark_concurrency = 2
+        self._succeed(br_mock)
+        with patch("golem.task.benchmarkmanager.Thread") as thread:
+            self.b.run_all_benchmarks()
+        br_mock.assert_not_called()
+
+        thread.call_args[1]['kwargs']['callback'](3.0)
+        assert br_mock.call_count == len(self.b.benchmarks)
+
+    def test_contended_results(self, br_mock):
+        self._succeed(br_mock)
+        self.config_desc.benchmark_concurrency = 2
+        self.b.run_all_benchmarks()
+        for env_id in self.b.benchmarks:
+            assert BenchmarkResult.get_value(
+                env_id, self.b.get_fingerprint()) is None
+            assert BenchmarkResult.get_value(
+                env_id, self.b.get_fingerprint(2)) is not None
+
+        # Measured again alone, not taken from the contended results
+        self.config_desc.benchmark_concurrency = 1
+        self.b.run_all_benchmarks()
+        assert br_mock.call_count == 2 * len(self.b.benchmarks)
+        values = {p.environment_id: p.value for p in Performance.select()}
+
+        # Results measured alone are preferred
+        self.config_desc.benchmark_concurrency = 2
+        self.b.run_all_benchmarks()
+        assert br_mock.call_count == 2 * len(self.b.benchmarks)
+        assert values == \
+            {p.environment_id: p.value for p in Performance.select()}
@@ -39,6 +39,10 @@ def _fake_get_efficacy():
     return A()
 
 
+def _fake_get_reputation(node_ids):
+    return {node_id: (.0, _fake_get_efficacy()) for node_id in node_ids}
+
+
 def _call_in_place(_delay, fn, *args, **kwargs):
     return fn(*args, **kwargs)
 
@@ -405,10 +409,8 @@ class ReactToReportComputedTaskTestCase(testutils.TempDirFixture):
 
 
 @mock.patch('golem.core.deferred.call_later', _call_in_place)
-@mock.patch('golem.ranking.manager.database_manager.get_provider_efficiency',
-            mock.Mock(return_value=0.0))
-@mock.patch('golem.ranking.manager.database_manager.get_provider_efficacy',
-            mock.Mock(return_value=_fake_get_efficacy()))
+@mock.patch('golem.ranking.manager.database_manager.get_providers_reputation',
+            _fake_get_reputation)
 @mock.patch(
     'golem.task.tasksession.TaskSession.send',
     side_effect=lambda msg: msg._fake_sign(),
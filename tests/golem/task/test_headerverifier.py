@@ -0,0 +1,99 @@
+from unittest import TestCase, mock
+
+from twisted.internet import defer
+
+from golem.task.headerverifier import TaskHeaderVerifier
+
+
+def header(task_id, signature=b'sig', max_price=100):
+    content = {'task_id': task_id, 'signature': signature,
+               'max_price': max_price}
+    return mock.Mock(task_id=task_id, signature=signature,
+                     max_price=max_price, to_dict=lambda: dict(content))
+
+
+@mock.patch('golem.task.headerverifier.deferToThreadPool',
+            lambda _reactor, _pool, fn, *args: defer.execute(fn, *args))
+@mock.patch('golem.task.headerverifier.TaskHeaderVerifier._get_pool',
+            mock.Mock())
+class TestTaskHeaderVerifier(TestCase):
+
+    def setUp(self):
+        self.verify = mock.Mock(
+            side_effect=lambda header: header.signature == b'sig')
+        self.verifier = TaskHeaderVerifier(verify=self.verify, cache_size=3,
+                                           batch_size=2)
+
+    def verify_many(self, headers):
+        results = []
+        self.verifier.verify_many(headers).addCallback(results.append)
+        self.assertEqual(len(results), 1)
+        return results[0]
+
+    def test_verify_cached(self):
+        th = header('a')
+        self.assertTrue(self.verifier.verify(th))
+        self.assertTrue(self.verifier.verify(header('a')))
+        self.verify.assert_called_once_with(th)
+        self.assertEqual(self.verifier.stats['cached'], 1)
+        self.assertEqual(self.verifier.stats['verified'], 1)
+
+    def test_verify_invalid_not_cached(self):
+        th = header('a', b'bad')
+        self.assertFalse(self.verifier.verify(th))
+        self.assertFalse(self.verifier.verify(th))
+        self.assertEqual(self.verify.call_count, 2)
+        self.assertEqual(self.verifier.stats['invalid'], 2)
+
+    def test_new_signature(self):
+        self.assertTrue(self.verifier.verify(header('a')))
+        self.assertFalse(self.verifier.verify(header('a', b'bad')))
+
+    def test_tampered_header(self):
+        self.verify.side_effect = lambda header: header.max_price == 100
+        self.assertTrue(self.verifier.verify(header('a')))
+        tampered = header('a', max_price=1000)
+        self.assertFalse(self.verifier.is_verified(tampered))
+        self.assertFalse(self.verifier.verify(tampered))
+        self.assertEqual(self.verify_many([tampered, header('a')]),
+                         [False, True])
+        self.assertEqual(self.verify.call_count, 3)
+
+    def test_lru(self):
+        for task_id in 'abcd':
+            self.verifier.verify(header(task_id))
+        self.assertFalse(self.verifier.is_verified(header('a')))
+        self.assertTrue(self.verifier.is_verified(header('b')))
+        # 'b' was used recently, so 'c' goes first
+        self.verifier.verify(header('e'))
+        self.assertTrue(self.verifier.is_verified(header('b')))
+        self.assertFalse(self.verifier.is_verified(header('c')))
+
+    def test_verify_many_empty(self):
+        self.assertEqual(self.verify_many([]), [])
+
+    def test_verify_many(self):
+        self.verifier.verify(header('cached'))
+        self.verify.reset_mock()
+
+        headers = [header('a'), header('cached'), header('b', b'bad'),
+                   header('a'), header('c'), header('d')]
+        self.assertEqual(self.verify_many(headers),
+                         [True, True, False, True, True, True])
+        # Duplicates and cached headers are not verified again
+        self.assertEqual(self.verify.call_count, 4)
+        self.assertTrue(self.verifier.is_verified(header('d')))
+        self.assertFalse(self.verifier.is_verified(header('b', b'bad')))
+
+    def test_verify_many_all_cached(self):
+        self.verifier.verify(header('a'))
+        self.verify.reset_mock()
+        self.assertEqual(self.verify_many([header('a'), header('a')]),
+                         [True, True])
+        self.verify.assert_not_called()
+
+    def test_verify_many_error(self):
+        self.verify.side_effect = ValueError
+        errors = []
+        self.verifier.verify_many([header('a')]).addErrback(errors.append)
+        self.assertEqual(len(errors), 1)
@@ -16,7 +16,7 @@ from golem.core.common import timeout_to_deadline
 from golem.core.deferred import sync_wait
 from golem.docker.manager import DockerManager
 from golem.envs.docker.cpu import DockerCPUEnvironment
-from golem.task.taskcomputer import TaskComputer, PyTaskThread
+from golem.task.taskcomputer import ComputingSlot, TaskComputer, PyTaskThread
 from golem.task.taskserver import TaskServer
 from golem.testutils import DatabaseFixture
 from golem.tools.ci import ci_skip
@@ -193,13 +193,16 @@ class TestTaskComputer(DatabaseFixture, LogTestCase):
         task_computer.lock = Lock()
         task_computer.dir_lock = Lock()
 
-        task_computer.assigned_subtask = ComputeTaskDef(
+        slot = ComputingSlot(0)
+        slot.subtask = ComputeTaskDef(
             task_id=task_id,
             subtask_id=subtask_id,
             docker_images=[],
             extra_data=mock.Mock(),
             deadline=time.time() + 3600
         )
+        task_computer.slots = [slot]
+        task_computer._get_slot.return_value = slot
         task_computer.task_server.task_keeper.task_headers = {
             task_id: None
         }
@@ -342,6 +345,7 @@ class TestTaskMonitor(DatabaseFixture):
                 .task_keeper.task_headers[subtask_id].subtask_timeout = duration
 
             task.assigned_subtask = subtask
+            task.counting_thread = task_thread
 
         def check(expected):
             listener = mock.Mock()
@@ -455,7 +459,7 @@ class TestTaskInterrupted(TestTaskComputerBase):
     def test_ok(self, task_finished):
         self.task_computer.assigned_subtask = mock.Mock()
         self.task_computer.task_interrupted()
-        task_finished.assert_called_once_with()
+        task_finished.assert_called_once_with(self.task_computer.slots[0])
 
 
 class TestTaskFinished(TestTaskComputerBase):
@@ -484,8 +488,115 @@ class TestTaskFinished(TestTaskComputerBase):
             signal='golem.taskcomputer',
             event='subtask_finished',
             subtask_id=ctd['subtask_id'],
-            min_performance=ctd['performance']
+            min_performance=ctd['performance'],
+            computation_time=None,
         )
         self.task_server.task_keeper.task_ended.assert_called_once_with(
             ctd['task_id'])
         self.task_computer.finished_cb.assert_called_once_with()
+
+
+@mock.patch('golem.task.taskcomputer.dispatcher')
+@mock.patch('golem.task.taskcomputer.ProviderTimer')
+class TestSlots(TestTaskComputerBase):
+
+    def setUp(self):
+        super().setUp()
+        self.task_computer.slots = [ComputingSlot(i) for i in range(3)]
+
+    @staticmethod
+    def _ctd(task_id='task', subtask_id=None):
+        return ComputeTaskDef(
+            task_id=task_id,
+            subtask_id=subtask_id or str(uuid.uuid4()),
+            performance=1,
+        )
+
+    def test_task_given(self, provider_timer, _dispatcher):
+        ctds = [self._ctd() for _ in range(3)]
+        for ctd in ctds:
+            self.assertTrue(self.task_computer.has_free_slot())
+            self.task_computer.task_given(ctd)
+
+        self.assertFalse(self.task_computer.has_free_slot())
+        self.assertEqual([slot.subtask for slot in self.task_computer.slots],
+                         ctds)
+        provider_timer.start.assert_called_once_with()
+        with self.assertRaises(AssertionError):
+            self.task_computer.task_given(self._ctd())
+
+    def test_waiting_subtask_id(self, *_):
+        first, second = self._ctd('task'), self._ctd('task')
+        self.task_computer.task_given(first)
+        self.task_computer.task_given(self._ctd('other'))
+        self.task_computer.task_given(second)
+
+        self.assertEqual(self.task_computer.waiting_subtask_id('task'),
+                         first['subtask_id'])
+        self.task_computer.slots[0].counting_thread = mock.Mock()
+        self.assertEqual(self.task_computer.waiting_subtask_id('task'),
+                         second['subtask_id'])
+        self.assertIsNone(self.task_computer.waiting_subtask_id('unknown'))
+
+    def test_task_finished(self, provider_timer, _dispatcher):
+        ctds = [self._ctd() for _ in range(2)]
+        for ctd in ctds:
+            self.task_computer.task_given(ctd)
+
+        self.task_computer.task_interrupted(ctds[1]['subtask_id'])
+        self.assertIsNone(self.task_computer.slots[1].subtask)
+        self.assertEqual(self.task_computer.slots[0].subtask, ctds[0])
+        provider_timer.finish.assert_not_called()
+        # Subtask hasn't been started
+        self.task_server.task_keeper.task_ended.assert_not_called()
+
+        self.task_computer.task_interrupted(ctds[0]['subtask_id'])
+        self.assertFalse(self.task_computer.has_assigned_task())
+        provider_timer.finish.assert_called_once_with()
+
+    def test_task_computed(self, *_):
+        self.task_server.task_keeper.task_headers = {
+            'task': mock.Mock(subtask_timeout=10),
+        }
+        ctds = [self._ctd() for _ in range(2)]
+        threads = [mock.Mock(error=False, error_msg=None,
+                             result={'data': []}, end_time=None,
+                             start_time=time.time())
+                   for _ in ctds]
+        for ctd, thread in zip(ctds, threads):
+            self.task_computer.task_given(ctd)
+        for slot, thread in zip(self.task_computer.slots, threads):
+            slot.counting_thread = thread
+
+        self.task_computer.task_computed(threads[1])
+
+        self.task_server.send_results.assert_called_once_with(
+            subtask_id=ctds[1]['subtask_id'],
+            task_id=ctds[1]['task_id'],
+            result=[],
+            stats=threads[1].stats,
+        )
+        slot = self.task_computer.slots[1]
+        self.assertTrue(slot.free)
+        self.assertEqual(slot.computed_tasks, 1)
+        self.assertIs(self.task_computer.counting_thread, threads[0])
+        self.task_server.task_keeper.task_ended.assert_called_once_with(
+            ctds[1]['task_id'])
+
+    def test_check_timeout(self, *_):
+        threads = [mock.Mock() for _ in self.task_computer.slots]
+        for slot, thread in zip(self.task_computer.slots, threads):
+            slot.counting_thread = thread
+        self.task_computer.check_timeout()
+        for thread in threads:
+            thread.check_timeout.assert_called_once_with()
+
+    def test_set_slots(self, *_):
+        self.task_computer._set_slots(8, num_cores=4)
+        self.assertEqual(len(self.task_computer.slots), 4)
+        self.task_computer._set_slots(0, num_cores=4)
+        self.assertEqual(len(self.task_computer.slots), 1)
+
+        self.task_computer.task_given(self._ctd())
+        self.task_computer._set_slots(2, num_cores=4)
+        self.assertEqual(len(self.task_computer.slots), 1)
@@ -57,41 +57,92 @@ class TestTaskGiven(TaskComputerAdapterTestBase):
 
     def test_new_computer_has_assigned_task(self):
         self.new_computer.has_assigned_task.return_value = True
-        self.old_computer.has_assigned_task.return_value = False
-        with self.assertRaises(AssertionError):
-            self.adapter.task_given(ComputeTaskDef())
+        self.old_computer.has_free_slot.return_value = True
+        self.assertFalse(self.adapter.task_given(ComputeTaskDef()))
+        self.new_computer.task_given.assert_not_called()
+        self.old_computer.task_given.assert_not_called()
+
+    def test_old_computer_no_free_slot(self):
+        self.new_computer.has_assigned_task.return_value = False
+        self.old_computer.has_free_slot.return_value = False
+        self.assertFalse(self.adapter.task_given(ComputeTaskDef()))
+        self.new_computer.task_given.assert_not_called()
+        self.old_computer.task_given.assert_not_called()
 
-    def test_old_computer_has_assigned_task(self):
+    def test_new_task_old_computer_busy(self):
         self.new_computer.has_assigned_task.return_value = False
+        self.old_computer.has_free_slot.return_value = True
         self.old_computer.has_assigned_task.return_value = True
-        with self.assertRaises(AssertionError):
-            self.adapter.task_given(ComputeTaskDef())
+        ctd = ComputeTaskDef(task_id='test')
+        task_header = mock.Mock(environment_prerequisites=mock.Mock())
+        self.task_server.task_keeper.task_headers = {
+            'test': task_header
+        }
+        self.assertFalse(self.adapter.task_given(ctd))
+        self.new_computer.task_given.assert_not_called()
 
     def test_new_task_ok(self):
         self.new_computer.has_assigned_task.return_value = False
+        self.old_computer.has_free_slot.return_value = True
         self.old_computer.has_assigned_task.return_value = False
         ctd = ComputeTaskDef(task_id='test')
         task_header = mock.Mock(environment_prerequisites=mock.Mock())
         self.task_server.task_keeper.task_headers = {
             'test': task_header
         }
-        self.adapter.task_given(ctd)
+        self.assertTrue(self.adapter.task_given(ctd))
         self.new_computer.task_given.assert_called_once_with(task_header, ctd)
         self.old_computer.task_given.assert_not_called()
 
     def test_old_task_ok(self):
         self.new_computer.has_assigned_task.return_value = False
-        self.old_computer.has_assigned_task.return_value = False
+        # Other slots may be busy
+        self.old_computer.has_assigned_task.return_value = True
+        self.old_computer.has_free_slot.return_value = True
         ctd = ComputeTaskDef(task_id='test')
         task_header = mock.Mock(environment_prerequisites=None)
         self.task_server.task_keeper.task_headers = {
             'test': task_header
         }
-        self.adapter.task_given(ctd)
+        self.assertTrue(self.adapter.task_given(ctd))
         self.new_computer.task_given.assert_not_called()
         self.old_computer.task_given.assert_called_once_with(ctd)
 
 
+class TestHasFreeSlot(TaskComputerAdapterTestBase):
+
+    def test_new_computer_has_assigned_task(self):
+        self.new_computer.has_assigned_task.return_value = True
+        self.old_computer.has_free_slot.return_value = True
+        self.assertFalse(self.adapter.has_free_slot())
+
+    def test_old_computer(self):
+        self.new_computer.has_assigned_task.return_value = False
+        self.old_computer.has_free_slot.return_value = False
+        self.assertFalse(self.adapter.has_free_slot())
+        self.old_computer.has_free_slot.return_value = True
+        self.assertTrue(self.adapter.has_free_slot())
+
+
+class TestWaitingSubtaskId(TaskComputerAdapterTestBase):
+
+    def test_new_computer(self):
+        self.new_computer.has_assigned_task.return_value = True
+        self.new_computer.assigned_task_id = 'task'
+        self.new_computer.assigned_subtask_id = 'subtask'
+        self.new_computer.is_computing.return_value = False
+        self.assertEqual(self.adapter.waiting_subtask_id('task'), 'subtask')
+        self.assertIsNone(self.adapter.waiting_subtask_id('other'))
+        self.new_computer.is_computing.return_value = True
+        self.assertIsNone(self.adapter.waiting_subtask_id('task'))
+
+    def test_old_computer(self):
+        self.new_computer.has_assigned_task.return_value = False
+        self.old_computer.waiting_subtask_id.return_value = 'subtask'
+        self.assertEqual(self.adapter.waiting_subtask_id('task'), 'subtask')
+        self.old_computer.waiting_subtask_id.assert_called_once_with('task')
+
+
 class TestHasAssignedTask(TaskComputerAdapterTestBase):
 
     def test_no_assigned_task(self):
@@ -178,10 +229,11 @@ class TestStartComputation(TaskComputerAdapterTestBase):
         self.new_computer.has_assigned_task.return_value = False
         self.old_computer.has_assigned_task.return_value = True
 
-        self.adapter.start_computation()
+        self.adapter.start_computation('subtask')
 
         self.new_computer.compute.assert_not_called()
-        self.old_computer.start_computation.assert_called_once()
+        self.old_computer.start_computation.assert_called_once_with(
+            'subtask')
         handle_results.assert_not_called()
 
 
@@ -238,9 +290,9 @@ class TestTaskInterrupted(TaskComputerAdapterTestBase):
     def test_assigned_old_task(self):
         self.new_computer.has_assigned_task.return_value = False
         self.old_computer.has_assigned_task.return_value = True
-        self.adapter.task_interrupted()
+        self.adapter.task_interrupted('subtask')
         self.new_computer.task_interrupted.assert_not_called()
-        self.old_computer.task_interrupted.assert_called_once()
+        self.old_computer.task_interrupted.assert_called_once_with('subtask')
 
 
 class TestCheckTimeout(TaskComputerAdapterTestBase):
@@ -3,6 +3,7 @@ from datetime import timedelta
 from pathlib import Path
 import random
 import time
+import unittest
 import unittest.mock as mock
 
 from eth_utils import encode_hex
@@ -28,6 +29,7 @@ from golem.task import taskarchiver
 from golem.task import taskkeeper
 from golem.task.envmanager import EnvironmentManager as NewEnvManager
 from golem.task.taskkeeper import TaskHeaderKeeper, CompTaskKeeper, logger
+from golem.task.taskscheduler import ExpectedProfitScheduler
 from golem.testutils import PEP8MixIn
 from golem.testutils import TempDirFixture
 from golem.tools.assertlogs import LogTestCase
@@ -228,6 +230,27 @@ class TestTaskHeaderKeeper(TaskHeaderKeeperBase):
         th = self.thk.get_task()
         self.assertEqual(task_header2.to_dict(), th.to_dict())
 
+    def test_get_task_scheduler(self):
+        self.thk.scheduler = mock.Mock(spec=ExpectedProfitScheduler)
+        e = Environment()
+        e.accept_tasks = True
+        self.thk.old_env_manager.add_environment(e)
+        task_header = get_task_header("xyz")
+        self.assertTrue(self.thk.add_task_header(task_header))
+        self.thk.scheduler.add.assert_called_once_with(task_header)
+
+        self.thk.scheduler.choose.return_value = task_header.task_id
+        self.assertIs(self.thk.get_task({'abc'}), task_header)
+        self.thk.scheduler.choose.assert_called_once_with({'abc'})
+
+        self.thk.postpone_task(task_header.task_id)
+        self.thk.scheduler.postpone.assert_called_once_with(
+            task_header.task_id)
+
+        self.thk.remove_task_header(task_header.task_id)
+        self.thk.scheduler.discard.assert_called_once_with(
+            task_header.task_id)
+
     @freeze_time(as_arg=True)
     def test_old_tasks(frozen_time, self):  # pylint: disable=no-self-argument
         e = Environment()
@@ -1058,3 +1081,36 @@ class TestCheckNewEnvironment(TestTaskHeaderKeeperBase):
         env.parse_prerequisites.assert_called_once_with(prereqs_dict)
         env.install_prerequisites.assert_called_once_with(
             env.parse_prerequisites())
+
+
+class TestIndexedSet(unittest.TestCase):
+    def test_add_and_remove(self):
+        ids = taskkeeper.IndexedSet(['a', 'b', 'c'])
+        ids.add('a')
+        assert len(ids) == 3
+        ids.discard('a')
+        ids.discard('x')
+        assert 'a' not in ids
+        assert sorted(ids) == ['b', 'c']
+        with self.assertRaises(KeyError):
+            ids.remove('a')
+        ids.remove('c')
+        assert list(ids) == ['b']
+        assert ids[0] == 'b'
+
+    def test_remove_during_iteration(self):
+        ids = taskkeeper.IndexedSet(['a', 'b', 'c'])
+        for item in ids:
+            ids.discard(item)
+        assert not ids
+
+    def test_choice(self):
+        ids = taskkeeper.IndexedSet()
+        assert ids.choice() is None
+        ids = taskkeeper.IndexedSet(str(i) for i in range(10))
+        assert ids.choice() in ids
+        assert ids.choice(exclude={str(i) for i in range(10)}) is None
+        for _ in range(20):
+            assert ids.choice(exclude={'0', '1', 'x'}) not in {'0', '1'}
+            assert ids.choice(
+                exclude={str(i) for i in range(1, 10)}) == '0'
@@ -664,6 +664,21 @@ class TestTaskManager(LogTestCase, TestDatabaseWithReactor,  # noqa # pylint: di
                  ("xyz", "aabbcc", OtherOp.UNEXPECTED)])
         del handler
 
+    def test_subtask_changes_are_coalesced(self, *_):
+        task_mock = self._get_task_mock()
+        task_mock.needs_computation = lambda: True
+        self.tm.add_new_task(task_mock)
+        self.tm.start_task(task_mock.header.task_id)
+        task_mock.query_extra_data_return_value.ctd['subtask_id'] = "aabbcc"
+
+        with patch.object(self.tm, 'dump_task') as dump_mock, \
+                patch.object(self.tm.persistence, 'mark_dirty') as dirty_mock:
+            self.tm.get_next_subtask("NODE", "xyz", 1000, 100, 'oh')
+            self.tm.task_computation_failure("aabbcc", "something went wrong")
+
+        dump_mock.assert_not_called()
+        dirty_mock.assert_called_with("xyz")
+
     @patch('golem.task.taskmanager.TaskManager.dump_task')
     def test_task_computation_cancelled(self, *_):
         # create a task with a single subtask, call task_computation_cancelled
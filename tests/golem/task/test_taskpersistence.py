@@ -0,0 +1,147 @@
+from pathlib import Path
+from unittest import mock
+
+from golem.task.taskpersistence import TaskPersistence
+from golem.task.taskstate import TaskState, TaskStatus, SubtaskStatus
+from golem.testutils import TempDirFixture
+from tests.factories.task import taskstate as taskstate_factory
+
+
+class DummyHeader:
+    def __init__(self, task_id):
+        self.task_id = task_id
+
+
+class DummyTask:
+    def __init__(self, task_id):
+        self.header = DummyHeader(task_id)
+
+
+class TestTaskPersistence(TempDirFixture):
+
+    def setUp(self):
+        super().setUp()
+        self.tasks = {}
+        self.persistence = self._persistence()
+
+    def tearDown(self):
+        self.persistence.quit()
+        super().tearDown()
+
+    def _persistence(self, **kwargs):
+        return TaskPersistence(
+            Path(self.tempdir),
+            snapshot_getter=self.tasks.get,
+            **kwargs,
+        )
+
+    def _add_task(self, task_id='task'):
+        state = TaskState()
+        self.tasks[task_id] = DummyTask(task_id), state
+        return state
+
+    def _restore(self, **kwargs):
+        persistence = self._persistence(**kwargs)
+        return {
+            restored[0].header.task_id: restored[1]
+            for _, restored in persistence.restore()
+            if restored is not None
+        }
+
+    def test_dump_and_restore(self):
+        state = self._add_task()
+        state.status = TaskStatus.computing
+        self.persistence.dump('task')
+
+        restored = self._restore()
+        assert restored['task'].status == TaskStatus.computing
+        assert not list(Path(self.tempdir).glob('*.tmp'))
+
+    @mock.patch('twisted.internet.reactor.callLater')
+    def test_mark_dirty_coalesces(self, call_later):
+        self._add_task()
+        with mock.patch.object(self.persistence, '_serialize',
+                               wraps=self.persistence._serialize) as serialize:
+            for _ in range(10):
+                self.persistence.mark_dirty('task')
+            call_later.assert_called_once_with(
+                self.persistence.flush_interval, self.persistence.flush)
+            self.persistence.flush()
+            self.persistence.quit()
+        serialize.assert_called_once_with('task')
+        assert self.persistence.snapshot_path('task').exists()
+
+    @mock.patch('twisted.internet.reactor.callLater')
+    def test_journal_replay(self, _):
+        self.persistence = self._persistence(journal=True)
+        state = self._add_task()
+        self.persistence.dump('task')
+
+        subtask = taskstate_factory.SubtaskState(
+            status=SubtaskStatus.finished)
+        state.subtask_states[subtask.subtask_id] = subtask
+        state.progress = 0.5
+        self.persistence.journal_subtask('task', subtask, state)
+        self.persistence.quit()
+
+        assert self.persistence.journal_path('task').exists()
+        restored = self._restore()
+        assert restored['task'].progress == 0.5
+        assert restored['task'].subtask_states[subtask.subtask_id].status \
+            == SubtaskStatus.finished
+
+    @mock.patch('twisted.internet.reactor.callLater')
+    def test_journal_truncated_entry(self, _):
+        self.persistence = self._persistence(journal=True)
+        state = self._add_task()
+        self.persistence.dump('task')
+        subtask = taskstate_factory.SubtaskState()
+        state.subtask_states[subtask.subtask_id] = subtask
+        self.persistence.journal_subtask('task', subtask, state)
+        self.persistence.quit()
+
+        with self.persistence.journal_path('task').open('ab') as f:
+            f.write(b'\x80\x02broken')
+
+        restored = self._restore()
+        assert subtask.subtask_id in restored['task'].subtask_states
+
+    @mock.patch('twisted.internet.reactor.callLater')
+    def test_journal_compaction(self, _):
+        self.persistence = self._persistence(journal=True, journal_limit=2)
+        state = self._add_task()
+        self.persistence.dump('task')
+        for _ in range(2):
+            subtask = taskstate_factory.SubtaskState()
+            state.subtask_states[subtask.subtask_id] = subtask
+            self.persistence.journal_subtask('task', subtask, state)
+        assert 'task' in self.persistence._dirty
+
+        self.persistence.quit()
+        assert not self.persistence.journal_path('task').exists()
+        assert len(self._restore()['task'].subtask_states) == 2
+
+    def test_outdated_snapshot_is_not_written(self):
+        state = self._add_task()
+        generation, data = self.persistence._serialize('task')
+        state.progress = 1.0
+        self.persistence.dump('task')
+
+        self.persistence._write_snapshot('task', generation, data)
+        assert self._restore()['task'].progress == 1.0
+
+    def test_remove(self):
+        self._add_task()
+        self.persistence.dump('task')
+        generation, data = self.persistence._serialize('task')
+        self.persistence.remove('task')
+        self.persistence._write_snapshot('task', generation, data)
+
+        assert not self.persistence.snapshot_path('task').exists()
+        assert self._restore() == {}
+
+    def test_restore_broken(self):
+        path = Path(self.tempdir) / 'broken.pickle'
+        path.write_bytes(b'notapickle')
+        restored = list(self.persistence.restore())
+        assert restored == [(path, None)]
@@ -1,4 +1,7 @@
 # pylint: disable=protected-access
+import random
+import time
+from collections import defaultdict
 from unittest import TestCase
 from unittest.mock import Mock, patch
 
@@ -634,6 +637,225 @@ class TestRequestorTaskStats(LogTestCase):
             assert any("Skipping completed task" in l for l in log.output)
 
 
+class LoggedTaskInfo:
+    """Reference implementation of :py:class:`TaskInfo`, which stores all
+    the messages and computes the statistics from them"""
+
+    def __init__(self):
+        self.latest_status = TaskStatus.notStarted
+        self.want_to_compute_cnt = 0
+        self.messages = []
+        self.subtasks = defaultdict(list)
+        self.subtask_statuses = dict()
+
+    def got_want_to_compute(self):
+        self.want_to_compute_cnt += 1
+
+    def got_task_message(self, msg, latest_status):
+        self.messages.append(msg)
+        self.latest_status = latest_status
+
+    def got_subtask_message(self, subtask_id, msg, latest_status):
+        self.subtask_statuses[subtask_id] = latest_status
+        self.subtasks[subtask_id].append(msg)
+
+    def _count_ops(self, op):
+        return sum(msg.op == op
+                   for msgs in self.subtasks.values() for msg in msgs)
+
+    def _last_toggle(self, msgs, on, off):
+        state = False
+        for msg in msgs:
+            if msg.op in on:
+                state = True
+            elif msg.op in off:
+                state = False
+        return state
+
+    def stats(self):
+        verified = sum(status == SubtaskStatus.finished
+                       for status in self.subtask_statuses.values())
+        not_accepted = self._count_ops(SubtaskOp.NOT_ACCEPTED)
+        not_downloaded = sum(
+            self._last_toggle(msgs, [SubtaskOp.RESULT_DOWNLOADING],
+                              [SubtaskOp.FINISHED, SubtaskOp.NOT_ACCEPTED])
+            for msgs in self.subtasks.values())
+        in_progress = 0
+        if not self.latest_status.is_completed():
+            in_progress = sum(
+                self._last_toggle(msgs, [SubtaskOp.ASSIGNED],
+                                  [SubtaskOp.TIMEOUT, SubtaskOp.FINISHED,
+                                   SubtaskOp.FAILED, SubtaskOp.NOT_ACCEPTED])
+                for s_id, msgs in self.subtasks.items()
+                if self.subtask_statuses[s_id] not in [
+                    SubtaskStatus.finished, SubtaskStatus.failure])
+
+        start_time = finish_time = 0.0
+        if not self.latest_status.is_completed():
+            finish_time = time.time()
+        for msg in reversed(self.messages):
+            if msg.op in [TaskOp.CREATED, TaskOp.RESTORED] and not start_time:
+                start_time = msg.ts
+            elif msg.op.is_completed() and not finish_time:
+                finish_time = msg.ts
+
+        had_failures = any(
+            msg.op in [TaskOp.NOT_ACCEPTED, TaskOp.TIMEOUT]
+            for msg in self.messages) or any(
+                msg.op in [SubtaskOp.FAILED, SubtaskOp.NOT_ACCEPTED,
+                           SubtaskOp.TIMEOUT]
+                for msgs in self.subtasks.values() for msg in msgs)
+
+        return {
+            'finished': self.latest_status.is_completed(),
+            'task_failed': self.latest_status in [TaskStatus.aborted,
+                                                  TaskStatus.timeout],
+            'total_time': finish_time - start_time,
+            'had_failures': had_failures,
+            'work_offers': self.want_to_compute_cnt,
+            'subtasks': len(self.subtasks),
+            'collected': verified + not_accepted,
+            'verified': verified,
+            'not_accepted': not_accepted,
+            'timeouts': self._count_ops(SubtaskOp.TIMEOUT),
+            'failed': self._count_ops(SubtaskOp.FAILED),
+            'not_downloaded': not_downloaded,
+            'in_progress': in_progress,
+        }
+
+
+def task_info_stats(ti: TaskInfo):
+    return {
+        'finished': ti.is_completed(),
+        'task_failed': ti.has_task_failed(),
+        'total_time': ti.total_time(),
+        'had_failures': ti.had_failures_or_timeouts(),
+        'work_offers': ti.want_to_compute_count(),
+        'subtasks': ti.subtask_count(),
+        'collected': ti.collected_results_count(),
+        'verified': ti.verified_results_count(),
+        'not_accepted': ti.not_accepted_results_count(),
+        'timeouts': ti.timeout_count(),
+        'failed': ti.failed_count(),
+        'not_downloaded': ti.not_downloaded_count(),
+        'in_progress': ti.in_progress_subtasks_count(),
+    }
+
+
+class LoggedRequestorTaskStats(RequestorTaskStats):
+    def __init__(self):
+        super().__init__()
+        self.tasks = defaultdict(LoggedTaskInfo)
+
+    def get_task_stats(self, task_id: str) -> TaskStats:
+        stats = self.tasks[task_id].stats()
+        return TaskStats(
+            finished=stats['finished'],
+            task_failed=stats['task_failed'],
+            total_time=stats['total_time'],
+            had_failures=stats['had_failures'],
+            work_offers_cnt=stats['work_offers'],
+            requested_subtasks_cnt=stats['subtasks'],
+            collected_results_cnt=stats['collected'],
+            verified_results_cnt=stats['verified'],
+            timed_out_subtasks_cnt=stats['timeouts'],
+            not_downloaded_subtasks_cnt=stats['not_downloaded'],
+            failed_subtasks_cnt=stats['failed'])
+
+
+COMPLETED_STATUSES = {
+    TaskOp.FINISHED: TaskStatus.finished,
+    TaskOp.NOT_ACCEPTED: TaskStatus.finished,
+    TaskOp.TIMEOUT: TaskStatus.timeout,
+    TaskOp.RESTARTED: TaskStatus.restarted,
+    TaskOp.ABORTED: TaskStatus.aborted,
+}
+
+
+class TestIncrementalStats(TestCase):
+    """Random sequences of messages give the same statistics as computing
+    them from all the messages"""
+
+    RUNS = 20
+    STEPS = 200
+
+    def setUp(self):
+        self.rng = random.Random(0)
+        self.now = 1.0
+        patcher = patch('golem.task.taskrequestorstats.time.time',
+                        side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def random_task_status(self, op):
+        if op in COMPLETED_STATUSES:
+            return COMPLETED_STATUSES[op]
+        return self.rng.choice([status for status in TaskStatus
+                                if not status.is_completed()])
+
+    def random_subtask_message(self):
+        subtask_id = 'st{}'.format(self.rng.randrange(10))
+        msg = TaskMsg(ts=self.now, op=self.rng.choice(list(SubtaskOp)))
+        return subtask_id, msg, self.rng.choice(list(SubtaskStatus))
+
+    def test_task_info(self):
+        for _ in range(self.RUNS):
+            ti = TaskInfo()
+            reference = LoggedTaskInfo()
+            for _ in range(self.STEPS):
+                self.now += self.rng.random()
+                kind = self.rng.random()
+                if kind < 0.1:
+                    ti.got_want_to_compute()
+                    reference.got_want_to_compute()
+                elif kind < 0.3:
+                    op = self.rng.choice(list(TaskOp))
+                    msg = TaskMsg(ts=self.now, op=op)
+                    status = self.random_task_status(op)
+                    ti.got_task_message(msg, status)
+                    reference.got_task_message(msg, status)
+                else:
+                    args = self.random_subtask_message()
+                    ti.got_subtask_message(*args)
+                    reference.got_subtask_message(*args)
+                self.assertEqual(task_info_stats(ti), reference.stats())
+
+    def random_task_state(self, op, subtask_ids):
+        task_state = Mock()
+        task_state.status = self.random_task_status(op)
+        task_state.subtask_states = {
+            subtask_id: Mock(status=self.rng.choice(list(SubtaskStatus)))
+            for subtask_id in subtask_ids}
+        return task_state
+
+    def test_requestor_task_stats(self):
+        rs = RequestorTaskStats()
+        reference = LoggedRequestorTaskStats()
+        ops = list(TaskOp) + list(SubtaskOp) + list(OtherOp)
+
+        for _ in range(self.RUNS * self.STEPS):
+            self.now += self.rng.random()
+            task_id = 'task{}'.format(self.rng.randrange(5))
+            op = self.rng.choice(ops)
+            subtask_id = None
+            subtask_ids = ['st{}'.format(i)
+                           for i in range(self.rng.randrange(5))]
+            if op in SubtaskOp:
+                subtask_id = 'st{}'.format(self.rng.randrange(5))
+                subtask_ids.append(subtask_id)
+            task_state = self.random_task_state(op, subtask_ids)
+
+            rs.on_message(task_id, task_state, subtask_id, op)
+            reference.on_message(task_id, task_state, subtask_id, op)
+            self.assertEqual(rs.get_current_stats(),
+                             reference.get_current_stats())
+            self.assertEqual(rs.get_finished_stats(),
+                             reference.get_finished_stats())
+            if task_id in reference.tasks:
+                self.assertEqual(rs.get_task_stats(task_id),
+                                 reference.get_task_stats(task_id))
+
+
 class TestRequestorTaskStatsManager(DatabaseFixture):
     def test_empty_stats(self):
         rtsm = RequestorTaskStatsManager()
@@ -0,0 +1,178 @@
+from unittest import TestCase, mock
+
+from freezegun import freeze_time
+from golem_messages.factories.datastructures import tasks as dt_tasks_factory
+
+from golem.core.common import timeout_to_deadline
+from golem.task.taskscheduler import ExpectedProfitScheduler, RequestorInfo
+
+
+class TestExpectedProfitScheduler(TestCase):
+
+    def setUp(self):
+        self.requestors = {}
+        patcher = mock.patch(
+            'golem.task.taskscheduler.get_requestor_info',
+            side_effect=lambda requestor_id, price:
+            self.requestors[requestor_id]._replace(price=price),
+        )
+        self.get_requestor_info = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.scheduler = ExpectedProfitScheduler(
+            price_getter=lambda _: 10 ** 18)
+
+    def header(self, max_price=100, timeout=3600, subtask_timeout=60,
+               trust=1.0, efficiency=1.0):
+        header = dt_tasks_factory.TaskHeaderFactory(
+            max_price=max_price,
+            deadline=timeout_to_deadline(timeout),
+            subtask_timeout=subtask_timeout,
+        )
+        self.requestors[header.task_owner.key] = RequestorInfo(
+            price=0, trust=trust, efficiency=efficiency)
+        return header
+
+    def add(self, *headers):
+        for header in headers:
+            self.scheduler.add(header)
+
+    def test_empty(self):
+        self.assertIsNone(self.scheduler.choose())
+        self.assertIsNone(self.scheduler.choose({'abc'}))
+
+    def test_price(self):
+        cheap = self.header(max_price=100)
+        expensive = self.header(max_price=200)
+        self.add(cheap, expensive)
+        self.assertEqual(self.scheduler.choose(), expensive.task_id)
+
+    def test_offered_price(self):
+        self.scheduler.price_getter = lambda _: 50
+        cheap = self.header(max_price=60)
+        expensive = self.header(max_price=200, efficiency=0.9)
+        self.add(cheap, expensive)
+        # Both requestors would get the same offer
+        self.assertEqual(self.scheduler.choose(), cheap.task_id)
+
+    def test_trust_and_efficiency(self):
+        untrusted = self.header(max_price=200, trust=0.1)
+        inefficient = self.header(max_price=200, efficiency=0.2)
+        trusted = self.header(max_price=100)
+        self.add(untrusted, inefficient, trusted)
+        self.assertEqual(self.scheduler.choose(), trusted.task_id)
+
+    def test_deadline(self):
+        near = self.header(timeout=30, subtask_timeout=60)
+        far = self.header(timeout=3600, subtask_timeout=60)
+        self.add(near, far)
+        self.assertEqual(self.scheduler.choose(), far.task_id)
+
+    def test_exclude(self):
+        best = self.header(max_price=300)
+        second = self.header(max_price=200)
+        self.add(best, self.header(max_price=100), second)
+        self.assertEqual(self.scheduler.choose({best.task_id}),
+                         second.task_id)
+        self.assertIsNone(
+            self.scheduler.choose(set(self.scheduler._headers)))
+        self.assertEqual(self.scheduler.choose(), best.task_id)
+
+    def test_discard(self):
+        best = self.header(max_price=300)
+        second = self.header(max_price=200)
+        self.add(best, second)
+        self.scheduler.discard(best.task_id)
+        self.scheduler.discard('unknown')
+        self.assertNotIn(best.task_id, self.scheduler)
+        self.assertEqual(len(self.scheduler), 1)
+        self.assertEqual(self.scheduler.choose(), second.task_id)
+
+    def test_update(self):
+        first = self.header(max_price=300)
+        second = self.header(max_price=200)
+        self.add(first, second)
+        first.max_price = 100
+        self.scheduler.add(first)
+        self.assertEqual(self.scheduler.choose(), second.task_id)
+        self.assertEqual(len(self.scheduler), 2)
+
+    def test_clear(self):
+        self.add(self.header(), self.header())
+        self.scheduler.clear()
+        self.assertEqual(len(self.scheduler), 0)
+        self.assertIsNone(self.scheduler.choose())
+
+    def test_compact(self):
+        headers = [self.header() for _ in range(100)]
+        self.add(*headers)
+        for header in headers[:90]:
+            self.scheduler.discard(header.task_id)
+        self.assertLess(len(self.scheduler._heap), 50)
+        self.assertIn(self.scheduler.choose(),
+                      {header.task_id for header in headers[90:]})
+
+    def test_rescore(self):
+        with freeze_time() as frozen_time:
+            self.scheduler.rescore_interval = 10
+            ending = self.header(max_price=200, timeout=300,
+                                 subtask_timeout=60)
+            other = self.header(max_price=150, timeout=3600,
+                                subtask_timeout=60)
+            self.add(ending, other)
+            self.assertEqual(self.scheduler.choose(), ending.task_id)
+
+            frozen_time.tick(250)
+            self.assertEqual(self.scheduler.choose(), other.task_id)
+
+    def test_requestor_info_cached(self):
+        with freeze_time() as frozen_time:
+            header = self.header()
+            self.add(header, header)
+            self.get_requestor_info.assert_called_once()
+
+            frozen_time.tick(self.scheduler.requestor_info_ttl + 1)
+            self.scheduler.add(header)
+            self.assertEqual(self.get_requestor_info.call_count, 2)
+
+    def test_score_error(self):
+        header = self.header()
+        self.get_requestor_info.side_effect = ValueError
+        self.scheduler.add(header)
+        self.assertEqual(self.scheduler.choose(), header.task_id)
+
+    def test_postpone(self):
+        with freeze_time() as frozen_time:
+            best = self.header(max_price=300)
+            second = self.header(max_price=200)
+            self.add(best, second)
+            self.scheduler.postpone(best.task_id)
+            self.scheduler.postpone('unknown')
+            self.assertEqual(self.scheduler.choose(), second.task_id)
+
+            frozen_time.tick(self.scheduler.postpone_interval + 1)
+            self.assertEqual(self.scheduler.choose(), best.task_id)
+
+    def test_postpone_discarded(self):
+        header = self.header()
+        self.add(header)
+        self.scheduler.postpone(header.task_id, 3600)
+        self.scheduler.discard(header.task_id)
+        self.scheduler.add(header)
+        self.assertEqual(self.scheduler.choose(), header.task_id)
+
+    def test_near_equal_scores(self):
+        similar = [self.header(max_price=200 - i) for i in range(3)]
+        worse = self.header(max_price=100)
+        self.add(*similar, worse)
+        chosen = {self.scheduler.choose() for _ in range(100)}
+        self.assertEqual(chosen, {header.task_id for header in similar})
+        self.assertEqual(len(self.scheduler._current), 4)
+
+    def test_max_candidates(self):
+        self.scheduler.max_candidates = 2
+        headers = [self.header(max_price=200) for _ in range(5)]
+        self.add(*headers)
+        with mock.patch('golem.task.taskscheduler.random.choices',
+                        side_effect=lambda population, _: population):
+            self.assertIn(self.scheduler.choose(),
+                          {header.task_id for header in headers[:2]})
@@ -901,6 +901,33 @@ class TaskServerTaskHeaderTest(TaskServerTestBase):
         self.assertTrue(ts.add_task_header(task_header))
         self.assertEqual(len(ts.get_others_tasks_headers()), 2)
 
+    @patch('golem.task.headerverifier.deferToThreadPool',
+           lambda _reactor, _pool, fn, *args: defer.execute(fn, *args))
+    @patch('golem.task.headerverifier.TaskHeaderVerifier._get_pool', Mock())
+    def test_add_task_headers(self):
+        keys_auth_2 = KeysAuth(
+            os.path.join(self.path, "2"),
+            'priv_key',
+            'password',
+        )
+
+        ts = self.ts
+
+        valid = get_example_task_header(keys_auth_2.public_key)
+        valid.sign(private_key=keys_auth_2._private_key)  # noqa pylint:disable=no-value-for-parameter
+        invalid = get_example_task_header(keys_auth_2.public_key)
+
+        results = []
+        ts.add_task_headers([valid, invalid, valid]) \
+            .addCallback(results.append)
+        self.assertEqual(results, [[True, False, True]])
+        self.assertEqual(len(ts.get_others_tasks_headers()), 1)
+        self.assertTrue(ts.header_verifier.is_verified(valid))
+
+        with patch.object(ts, '_verify_header_sig') as verify:
+            self.assertTrue(ts.add_task_header(valid))
+        verify.assert_not_called()
+
     def test_add_task_header_past_deadline(self):
         keys_auth_2 = KeysAuth(
             os.path.join(self.path, "2"),
@@ -1265,7 +1292,7 @@ class TestTaskGiven(TaskServerTestBase):
             self, logger_mock, dispatcher_mock, update_requestor_assigned_sum,
             request_resource):
 
-        self.ts.task_computer.has_assigned_task.return_value = False
+        self.ts.task_computer.task_given.return_value = True
         ttc = msg_factories.tasks.TaskToComputeFactory()
 
         result = self.ts.task_given(ttc)
@@ -1296,11 +1323,14 @@ class TestTaskGiven(TaskServerTestBase):
             self, logger_mock, dispatcher_mock, update_requestor_assigned_sum,
             request_resource):
 
-        self.ts.task_computer.has_assigned_task.return_value = True
-        result = self.ts.task_given(Mock())
+        self.ts.task_computer.task_given.return_value = False
+        ttc = msg_factories.tasks.TaskToComputeFactory()
+        result = self.ts.task_given(ttc)
         self.assertEqual(result, False)
 
-        self.ts.task_computer.task_given.assert_not_called()
+        self.ts.task_computer.task_given.assert_called_once_with(
+            ttc.compute_task_def
+        )
         request_resource.assert_not_called()
         update_requestor_assigned_sum.assert_not_called()
         dispatcher_mock.send.assert_not_called()
@@ -1309,7 +1339,7 @@ class TestTaskGiven(TaskServerTestBase):
     def test_task_api(
             self, _logger_mock, _dispatcher_mock,
             _update_requestor_assigned_sum, _request_resource):
-        self.ts.task_computer.has_assigned_task.return_value = False
+        self.ts.task_computer.task_given.return_value = True
         ttc = msg_factories.tasks.TaskToComputeFactory()
         ttc.want_to_compute_task.task_header.environment_prerequisites = Mock()
         self.assertTrue(ttc.compute_task_def['resources'])  # noqa pylint: disable=unsubscriptable-object
@@ -1335,18 +1365,21 @@ class TestTaskGiven(TaskServerTestBase):
 class TestResourceCollected(TaskServerTestBase):
 
     def test_wrong_task_id(self, logger_mock):
-        self.ts.task_computer.assigned_task_id = 'test'
+        self.ts.task_computer.waiting_subtask_id.return_value = None
         result = self.ts.resource_collected('wrong_id')
         self.assertFalse(result)
         logger_mock.error.assert_called_once()
         self.ts.task_computer.start_computation.assert_not_called()
 
     def test_ok(self, logger_mock):
-        self.ts.task_computer.assigned_task_id = 'test'
+        self.ts.task_computer.waiting_subtask_id.return_value = 'subtask'
         result = self.ts.resource_collected('test')
         self.assertTrue(result)
         logger_mock.error.assert_not_called()
-        self.ts.task_computer.start_computation.assert_called_once_with()
+        self.ts.task_computer.waiting_subtask_id.assert_called_once_with(
+            'test')
+        self.ts.task_computer.start_computation.assert_called_once_with(
+            'subtask')
 
 
 @patch('golem.task.taskserver.logger')
@@ -1354,18 +1387,18 @@ class TestResourceCollected(TaskServerTestBase):
 class TestResourceFailure(TaskServerTestBase):
 
     def test_wrong_task_id(self, send_task_failed, logger_mock):
-        self.ts.task_computer.assigned_task_id = 'test'
+        self.ts.task_computer.waiting_subtask_id.return_value = None
         self.ts.resource_failure('wrong_id', 'reason')
         logger_mock.error.assert_called_once()
         self.ts.task_computer.task_interrupted.assert_not_called()
         send_task_failed.assert_not_called()
 
     def test_ok(self, send_task_failed, logger_mock):
-        self.ts.task_computer.assigned_task_id = 'test_task'
-        self.ts.task_computer.assigned_subtask_id = 'test_subtask'
+        self.ts.task_computer.waiting_subtask_id.return_value = 'test_subtask'
         self.ts.resource_failure('test_task', 'test_reason')
         logger_mock.error.assert_not_called()
-        self.ts.task_computer.task_interrupted.assert_called_once_with()
+        self.ts.task_computer.task_interrupted.assert_called_once_with(
+            'test_subtask')
         send_task_failed.assert_called_once_with(
             'test_subtask',
             'test_task',
@@ -1388,10 +1421,10 @@ class TestRequestRandomTask(TaskServerTestBase):
             mock_req.assert_not_called()
 
     @freezegun.freeze_time()
-    def test_task_already_assigned(self):
+    def test_no_free_slot(self):
         self.ts.config_desc.task_request_interval = 1.0
         self.ts._last_task_request_time = time.time() - 1.0
-        self.ts.task_computer.has_assigned_task.return_value = True
+        self.ts.task_computer.has_free_slot.return_value = False
         self.ts.task_computer.compute_tasks = True
         self.ts.task_computer.runnable = True
 
@@ -1403,7 +1436,7 @@ class TestRequestRandomTask(TaskServerTestBase):
     def test_task_computer_not_accepting_tasks(self):
         self.ts.config_desc.task_request_interval = 1.0
         self.ts._last_task_request_time = time.time() - 1.0
-        self.ts.task_computer.has_assigned_task.return_value = False
+        self.ts.task_computer.has_free_slot.return_value = True
         self.ts.task_computer.compute_tasks = False
         self.ts.task_computer.runnable = True
 
@@ -1415,7 +1448,7 @@ class TestRequestRandomTask(TaskServerTestBase):
     def test_task_computer_not_runnable(self):
         self.ts.config_desc.task_request_interval = 1.0
         self.ts._last_task_request_time = time.time() - 1.0
-        self.ts.task_computer.has_assigned_task.return_value = False
+        self.ts.task_computer.has_free_slot.return_value = True
         self.ts.task_computer.compute_tasks = True
         self.ts.task_computer.runnable = False
 
@@ -1427,7 +1460,7 @@ class TestRequestRandomTask(TaskServerTestBase):
     def test_no_supported_tasks_in_task_keeper(self):
         self.ts.config_desc.task_request_interval = 1.0
         self.ts._last_task_request_time = time.time() - 1.0
-        self.ts.task_computer.has_assigned_task.return_value = False
+        self.ts.task_computer.has_free_slot.return_value = True
         self.ts.task_computer.compute_tasks = True
         self.ts.task_computer.runnable = True
         self.ts.task_keeper.get_task.return_value = None
@@ -1441,7 +1474,7 @@ class TestRequestRandomTask(TaskServerTestBase):
     def test_ok(self, request_task):
         self.ts.config_desc.task_request_interval = 1.0
         self.ts._last_task_request_time = time.time() - 1.0
-        self.ts.task_computer.has_assigned_task.return_value = False
+        self.ts.task_computer.has_free_slot.return_value = True
         self.ts.task_computer.compute_tasks = True
         self.ts.task_computer.runnable = True
         task_header = Mock()
@@ -1558,10 +1591,13 @@ class TestTaskServerConcent(TaskServerAsyncTestBase):
         task_header = get_example_task_header('test')
         task_header.max_price = self.ccd.max_price
         task_header.concent_enabled = False
+        self.ts.task_keeper.postpone_task = Mock()
 
         result = yield self.ts._request_task(task_header)
 
         self.assertIsNone(result)
+        self.ts.task_keeper.postpone_task.assert_called_once_with(
+            task_header.task_id)
         self.ts.task_archiver.add_support_status.assert_called_once_with(
             task_header.task_id,
             SupportStatus(
@@ -1674,12 +1710,15 @@ class TestEnvManager(TaskServerAsyncTestBase):
         self.ts.resource_handshakes[
             task_header.task_owner.key  # pylint: disable=no-member
         ] = mock_handshake
+        self.ts.task_keeper.postpone_task = Mock()
 
         # When
         result = yield self.ts._request_task(task_header)
 
         self.assertEqual(result, performance)
         mock_get.assert_called_once()
+        self.ts.task_keeper.postpone_task.assert_called_once_with(
+            task_header.task_id)
 
     def test_get_min_performance_for_task(self):
         # Given
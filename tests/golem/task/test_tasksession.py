@@ -62,6 +62,10 @@ def _fake_get_efficacy():
     return A()
 
 
+def _fake_get_reputation(node_ids):
+    return {node_id: (.0, _fake_get_efficacy()) for node_id in node_ids}
+
+
 def fill_slots(msg):
     for slot in msg.__slots__:
         if hasattr(msg, slot):
@@ -94,10 +98,8 @@ class ConcentMessageMixin():
 
 
 # pylint:disable=no-member,too-many-instance-attributes
-@patch('golem.ranking.manager.database_manager.get_provider_efficiency',
-       Mock(return_value=0.0))
-@patch('golem.ranking.manager.database_manager.get_provider_efficacy',
-       Mock(return_value=_fake_get_efficacy()))
+@patch('golem.ranking.manager.database_manager.get_providers_reputation',
+       _fake_get_reputation)
 class TaskSessionTaskToComputeTest(TestDirFixtureWithReactor):
     def setUp(self):
         super().setUp()
@@ -719,6 +719,13 @@ class TestClientRPCMethods(TestClientBase, LogTestCase):
                 self.assertRaisesRegex(Exception, 'Test exception'):
             sync_wait(self.client.run_benchmark(DummyTaskEnvironment.get_id()))
 
+    def test_get_benchmark_progress(self, *_):
+        benchmark_manager = self.client.task_server.benchmark_manager
+        progress = {'BLENDER': {'status': 'running', 'started': 1.0,
+                                'duration': None, 'performance': None}}
+        benchmark_manager.get_progress = Mock(return_value=progress)
+        assert self.client.get_benchmark_progress() == progress
+
     def test_config_changed(self, *_):
         c = self.client
 
@@ -876,6 +883,17 @@ class TestClientRPCMethods(TestClientBase, LogTestCase):
             task_id, single=False
         )
 
+    def test_task_preview_bytes(self, *_):
+        task_id = str(uuid.uuid4())
+        c = self.client
+        c.task_server.task_manager.get_task_preview_bytes = Mock(
+            return_value=b'preview')
+
+        assert c.get_task_preview_bytes(task_id, frame=3) == b'preview'
+        c.task_server.task_manager.get_task_preview_bytes.assert_called_with(
+            task_id, frame=3
+        )
+
     def test_task_stats(self, *_):
         c = self.client
 
@@ -2,6 +2,7 @@ from datetime import (
     datetime,
     timezone,
 )
+from unittest import mock
 
 from peewee import IntegrityError
 
@@ -33,6 +34,33 @@ class TestPayment(DatabaseFixture):
         payment.save(force_insert=True)
 
 
+class TestWalletOperation(DatabaseFixture):
+    def test_update_many(self):
+        operations = [
+            m_factory.WalletOperation(status=m.WalletOperation.STATUS.awaiting)
+            for _ in range(5)
+        ]
+        for operation in operations:
+            operation.save(force_insert=True)
+        ids = [operation.id for operation in operations]
+
+        with mock.patch.object(m.WalletOperation, 'UPDATE_BATCH_SIZE', 2):
+            m.WalletOperation.update_many(
+                ids[1:],
+                status=m.WalletOperation.STATUS.sent,
+                tx_hash='0x' + 64 * 'a',
+            )
+
+        self.assertIs(
+            operations[0].refresh().status,
+            m.WalletOperation.STATUS.awaiting,
+        )
+        for operation in operations[1:]:
+            operation = operation.refresh()
+            self.assertIs(operation.status, m.WalletOperation.STATUS.sent)
+            self.assertEqual(operation.tx_hash, '0x' + 64 * 'a')
+
+
 class TestLocalRank(DatabaseFixture):
     def test_default_fields(self):
         # pylint: disable=no-member